@@ -1,14 +1,41 @@
 # pylint: disable=wildcard-import,unused-wildcard-import,unused-import
 """App Entrypoint."""
 
+import os
+from functools import partial
+
 from fastapi import FastAPI
-from omegaconf import OmegaConf
+from omegaconf import DictConfig, OmegaConf
 
 from src.containers.containers import AppContainer
-from src.routes import detector_endpoints, recognizer_endpoints, health_endpoints  # noqa: F401
-from src.routes.routers import detector_router, health_router, recognizer_router
+from src.routes import (  # noqa: F401
+    admin_endpoints,
+    debug_endpoints,
+    detector_endpoints,
+    health_endpoints,
+    recognizer_endpoints,
+    stream_endpoints,
+)
+from src.routes.routers import (
+    admin_router,
+    debug_router,
+    detector_router,
+    health_router,
+    recognizer_router,
+    stream_router,
+)
 from src.settings import app_settings
-from src.utils.metrics import PrometheusMiddleware, metrics
+from src.utils.exposition import metrics
+from src.worker import add_middlewares, create_recorder, worker_lifespan
+
+ROUTERS = (
+    (health_router, "health"),
+    (detector_router, "detector"),
+    (recognizer_router, "recognizer"),
+    (stream_router, "stream"),
+    (debug_router, "debug"),
+    (admin_router, "admin"),
+)
 
 
 def create_app() -> FastAPI:
@@ -21,18 +48,75 @@ def create_app() -> FastAPI:
     container = AppContainer()
     cfg = OmegaConf.load("configs/config.yml")
     container.config.from_dict(cfg)  # type: ignore
-    container.wire([recognizer_endpoints, detector_endpoints])
-    container.logger()
+    container.wire(
+        [
+            recognizer_endpoints,
+            detector_endpoints,
+            stream_endpoints,
+            debug_endpoints,
+            admin_endpoints,
+            health_endpoints,
+        ],
+    )
+    recorder = create_recorder()
+    lifespan = partial(
+        worker_lifespan,
+        container=container,
+        app_logger=container.logger(),
+        recorder=recorder,
+    )
+    container.model_reloader().report_configured()
 
     app: FastAPI = FastAPI(
         title=app_settings.component_name,
         version=app_settings.service_version,
         description="Inference service for barcode recognition task.",
+        lifespan=lifespan,
     )
-
-    app.add_middleware(PrometheusMiddleware, filter_unhandled_paths=True)
-    app.include_router(health_router, prefix="/health", tags=["health"])
-    app.include_router(detector_router, prefix="/detector", tags=["detector"])
-    app.include_router(recognizer_router, prefix="/recognizer", tags=["recognizer"])
+    add_middlewares(app, container, recorder)
+    for router, name in ROUTERS:
+        app.include_router(router, prefix=f"/{name}", tags=[name])
     app.add_route("/metrics", metrics)
     return app
+
+
+def load_config(synthetic_weights_dir: str, force_synthetic: bool = False) -> DictConfig:
+    """
+    Load the app configuration, pointing at the synthetic stand-in models when the checkpoints are not available.
+
+    Args:
+        synthetic_weights_dir (str): The directory to export the synthetic checkpoints to.
+        force_synthetic (bool): Use the synthetic models even if the configured checkpoints exist.
+
+    Returns:
+        DictConfig: The app configuration.
+    """
+    # the synthetic models are slow to import, they are loaded by the tests and benchmarks only
+    from src.synthetic import with_synthetic_checkpoints  # noqa: WPS433
+
+    cfg: DictConfig = OmegaConf.load(app_settings.base_config_path)  # type: ignore
+    checkpoints = (cfg["segmentation_model"]["checkpoint"], cfg["recognizer_model"]["checkpoint"])
+    if force_synthetic or not all(map(os.path.exists, checkpoints)):
+        cfg = with_synthetic_checkpoints(cfg, synthetic_weights_dir)
+    return cfg
+
+
+def create_inference_app(synthetic_weights_dir: str) -> FastAPI:
+    """
+    Create a FastAPI instance with the inference routes only, for the benchmarks.
+
+    Falls back to the synthetic stand-in models when the configured checkpoints are not available.
+
+    Args:
+        synthetic_weights_dir (str): The directory to export the synthetic checkpoints to.
+
+    Returns:
+        FastAPI: An instance of the FastAPI application.
+    """
+    container = AppContainer()
+    container.config.from_dict(load_config(synthetic_weights_dir))  # type: ignore
+    container.wire([detector_endpoints, recognizer_endpoints])
+    app = FastAPI()
+    app.include_router(detector_router, prefix="/detector")
+    app.include_router(recognizer_router, prefix="/recognizer")
+    return app
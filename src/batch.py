@@ -0,0 +1,250 @@
+"""Offline batch inference over image directories and JSONL manifests.
+
+Usage:
+    python -m src.batch --source images/ --output results.jsonl
+    python -m src.batch --source manifest.jsonl --output results.jsonl --workers 8
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+import torch
+
+from src.containers.containers import AppContainer
+from src.services.detector import SegTorchWrapper
+from src.services.recognizer import RecTorchWrapper
+from src.services.selection import ScoredBox
+from src.settings import app_settings
+from src.utils.batch_io import (
+    BatchItem,
+    Checkpoint,
+    DecodedImage,
+    LoadedItem,
+    ProgressReporter,
+    collect_items,
+    iter_batches,
+    iter_loaded,
+)
+from src.utils.cli import with_options
+from src.utils.regions import crop_regions
+from src.utils.serialization import barcode_records
+
+DEFAULT_BATCH_SIZE: int = 16
+DEFAULT_REC_BATCH_SIZE: int = 64
+
+Record = Dict[str, Any]
+# a result record and its decoded image
+DecodedRecord = Tuple[Record, DecodedImage]
+# the result record and the scored box of a barcode crop
+CropOwner = Tuple[Record, ScoredBox]
+# the stacked barcode crops and their owners
+Crops = Tuple[torch.Tensor, List[CropOwner]]
+
+
+def group_by_shape(loaded: List[DecodedImage]) -> List[List[int]]:
+    """
+    Group the loaded images by the shape of their detector input.
+
+    Args:
+        loaded (List[DecodedImage]): The original images and their detector inputs.
+
+    Returns:
+        List[List[int]]: The indices of the images in every group.
+    """
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for index, (_, prepared) in enumerate(loaded):
+        groups.setdefault(prepared.shape, []).append(index)
+    return list(groups.values())
+
+
+def detect(detector: SegTorchWrapper, loaded: List[DecodedImage]) -> List[List[ScoredBox]]:
+    """
+    Run the detector on the loaded images with one forward per detector input shape.
+
+    Only the inputs of the same shape are stacked, so an image preprocessed to another shape gets its own forward
+    instead of failing the whole batch.
+
+    Args:
+        detector (SegTorchWrapper): The segmentation service.
+        loaded (List[DecodedImage]): The original images and their detector inputs.
+
+    Returns:
+        List[List[ScoredBox]]: The scored boxes in COCO format of every image, in order.
+    """
+    all_scored: Dict[int, List[ScoredBox]] = {}
+    for indices in group_by_shape(loaded):
+        group = [loaded[index] for index in indices]
+        originals = [original for original, _ in group]
+        inputs = torch.stack([torch.from_numpy(prepared) for _, prepared in group])
+        shapes = [original.shape[:2] for original in originals]
+        all_scored.update(zip(indices, detector.predict_preprocessed_scored(inputs, shapes, originals)))
+    return [all_scored[index] for index in range(len(loaded))]
+
+
+def crop_barcodes(decoded: List[DecodedRecord], all_scored: List[List[ScoredBox]]) -> Crops:
+    """
+    Crop the detected barcodes of all the images for the recognizer.
+
+    Args:
+        decoded (List[DecodedRecord]): The result records and their decoded images.
+        all_scored (List[List[ScoredBox]]): The scored boxes of every image.
+
+    Returns:
+        Crops: The stacked crops and their owners.
+    """
+    crops = []
+    owners: List[CropOwner] = []
+    for (record, decoded_image), scored in zip(decoded, all_scored):
+        bboxes = [scored_box[0] for scored_box in scored]
+        crops.append(crop_regions(decoded_image[0], bboxes))
+        owners.extend((record, scored_box) for scored_box in scored)
+    return torch.cat(crops), owners
+
+
+def recognize(
+    decoded: List[DecodedRecord],
+    all_scored: List[List[ScoredBox]],
+    recognizer: RecTorchWrapper,
+    rec_batch_size: int,
+) -> None:
+    """
+    Recognize the detected barcodes and append them to the result records.
+
+    Args:
+        decoded (List[DecodedRecord]): The result records and their decoded images.
+        all_scored (List[List[ScoredBox]]): The scored boxes of every image.
+        recognizer (RecTorchWrapper): The recognizer service.
+        rec_batch_size (int): Maximal number of crops in a single recognizer forward.
+    """
+    all_crops, owners = crop_barcodes(decoded, all_scored)
+    for start in range(0, len(owners), rec_batch_size):
+        stop = start + rec_batch_size
+        rec_values = recognizer.predict_preprocessed(all_crops[start:stop])
+        chunk = owners[start:stop]
+        for (record, scored_box), rec_value in zip(chunk, rec_values):
+            record["barcodes"].extend(barcode_records([scored_box], [rec_value]))
+
+
+def process_batch(
+    batch: List[LoadedItem],
+    detector: SegTorchWrapper,
+    recognizer: RecTorchWrapper,
+    rec_batch_size: int,
+) -> List[Record]:
+    """
+    Run the detector and the recognizer on a batch of loaded images.
+
+    Args:
+        batch (List[LoadedItem]): The loaded images.
+        detector (SegTorchWrapper): The segmentation service.
+        recognizer (RecTorchWrapper): The recognizer service.
+        rec_batch_size (int): Maximal number of crops in a single recognizer forward.
+
+    Returns:
+        List[Record]: A result record per image, in the same format as `/recognizer/recognize_image`.
+    """
+    records: List[Record] = []
+    decoded: List[DecodedRecord] = []
+    for (key, path), image in batch:
+        record: Record = {"id": key, "path": path}
+        if image is None:
+            record["error"] = "Image could not be decoded."
+        else:
+            record["barcodes"] = []
+            decoded.append((record, image))
+        records.append(record)
+
+    if decoded:
+        all_scored = detect(detector, [decoded_image for _, decoded_image in decoded])
+        recognize(decoded, all_scored, recognizer, rec_batch_size)
+    return records
+
+
+def run_batch(  # noqa: WPS211
+    container: AppContainer,
+    batch_items: List[BatchItem],
+    output_path: str,
+    checkpoint_path: str,
+    batch_size: int,
+    rec_batch_size: int,
+    workers: Optional[int],
+    resume: bool = True,
+) -> int:
+    """
+    Run the detection and recognition pipeline over the items and write the results as JSONL.
+
+    Args:
+        container (AppContainer): The configured application container.
+        batch_items (List[BatchItem]): The images to process.
+        output_path (str): Path to the output JSONL file.
+        checkpoint_path (str): Path to the checkpoint file.
+        batch_size (int): Number of images in a single detector forward.
+        rec_batch_size (int): Maximal number of crops in a single recognizer forward.
+        workers (Optional[int]): Number of decode and preprocess processes, None for the CPU count.
+        resume (bool): Whether to skip the items recorded in an existing checkpoint.
+
+    Returns:
+        int: Number of processed images.
+    """
+    detector, recognizer = container.seg_model(), container.rec_model()
+    with Checkpoint(checkpoint_path, resume=resume) as checkpoint:
+        todo = checkpoint.pending(batch_items)
+        progress = ProgressReporter(len(todo))
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+            for batch in iter_batches(iter_loaded(todo, workers), batch_size):
+                checkpoint.write(process_batch(batch, detector, recognizer, rec_batch_size), output)
+                progress.update(len(batch))
+    progress.update(0, force=True)
+    return progress.processed
+
+
+@click.command()
+@with_options(
+    click.option("--source", required=True, type=click.Path(exists=True), help="Image directory or JSONL manifest."),
+    click.option("--output", "output_path", required=True, type=click.Path(), help="Output JSONL file."),
+    click.option("--checkpoint", "checkpoint_path", default=None, help="Checkpoint file, defaults to <output>.ckpt."),
+    click.option("--config", "config_path", default=app_settings.base_config_path, help="Service configuration file."),
+    click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, help="Images per detector forward."),
+    click.option("--rec-batch-size", default=DEFAULT_REC_BATCH_SIZE, show_default=True, help="Crops per forward."),
+    click.option("--workers", type=int, default=None, help="Decode processes, defaults to the CPU count."),
+    click.option("--resume/--no-resume", default=True, show_default=True, help="Skip images from the checkpoint."),
+)
+def main(  # noqa: WPS211
+    source: str,
+    output_path: str,
+    checkpoint_path: Optional[str],
+    config_path: str,
+    batch_size: int,
+    rec_batch_size: int,
+    workers: Optional[int],
+    resume: bool,
+) -> None:
+    """
+    Run the barcode detection and recognition pipeline over a directory or a manifest of images.
+
+    Args:
+        source (str): Image directory or JSONL manifest.
+        output_path (str): Output JSONL file.
+        checkpoint_path (Optional[str]): Checkpoint file, defaults to <output>.ckpt.
+        config_path (str): Service configuration file.
+        batch_size (int): Images per detector forward.
+        rec_batch_size (int): Crops per recognizer forward.
+        workers (Optional[int]): Decode and preprocess processes, defaults to the CPU count.
+        resume (bool): Skip images from the checkpoint.
+    """
+    container = AppContainer()
+    container.config.from_yaml(config_path)
+    container.logger()
+    run_batch(
+        container,
+        collect_items(source),
+        output_path=output_path,
+        checkpoint_path=checkpoint_path or f"{output_path}.ckpt",
+        batch_size=batch_size,
+        rec_batch_size=rec_batch_size,
+        workers=workers,
+        resume=resume,
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,124 @@
+"""Micro- and macro-benchmark suite runner with machine-readable baselines.
+
+Usage:
+    python -m src.bench run --output tests/benchmarks/baseline.json
+    python -m src.bench compare --baseline tests/benchmarks/baseline.json --tolerance 0.25
+"""
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+from src.utils.benchmark import CASES_DIR, MS_WIDTH, NAME_WIDTH, ROUNDS, load_cases, run_benchmarks
+from src.utils.cli import with_options
+
+DEFAULT_TOLERANCE: float = 0.25
+BASELINE_PATH: str = os.path.join(CASES_DIR, "baseline.json")
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float,
+) -> Tuple[List[str], List[str]]:
+    """
+    Compare the medians of the current run against the baseline.
+
+    Args:
+        baseline (Dict[str, Any]): The baseline results.
+        current (Dict[str, Any]): The current results.
+        tolerance (float): Allowed relative slowdown, e.g. 0.25 for 25%.
+
+    Returns:
+        Tuple[List[str], List[str]]: The report lines and the names of the regressed cases.
+    """
+    lines, regressions = [], []
+    for case_name, measurement in current["cases"].items():
+        label = case_name.ljust(NAME_WIDTH)
+        reference = baseline["cases"].get(case_name)
+        if reference is None:
+            lines.append(" ".join((label, "new".rjust(MS_WIDTH))))
+            continue
+        ratio = measurement["median_s"] / reference["median_s"]
+        status = "REGRESSED" if ratio > 1 + tolerance else "ok"
+        if status != "ok":
+            regressions.append(case_name)
+        shown_ratio = f"{ratio:.2f}x"
+        lines.append(" ".join((label, shown_ratio.rjust(MS_WIDTH), status)))
+    return lines, regressions
+
+
+@click.group()
+def main() -> None:
+    """Run the benchmark suite and compare it against a baseline."""
+
+
+@main.command()
+@click.option("--output", default=BASELINE_PATH, show_default=True)
+@click.option("--cases-dir", default=CASES_DIR, show_default=True, help="Directory with bench_*.py modules.")
+@click.option("--filter", "name_filter", default=None, help="Run only cases containing this substring.")
+@click.option("--rounds", default=ROUNDS, show_default=True, help="Timed rounds per case.")
+def run(output: str, cases_dir: str, name_filter: Optional[str], rounds: int) -> None:
+    """
+    Run the suite and write the results as the new baseline.
+
+    Args:
+        output (str): The results file.
+        cases_dir (str): Directory with bench_*.py modules.
+        name_filter (Optional[str]): Run only cases containing this substring.
+        rounds (int): Timed rounds per case.
+    """
+    load_cases(cases_dir)
+    measurements = run_benchmarks(name_filter, rounds)
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(measurements, output_file, indent=2, sort_keys=True)
+
+
+@main.command()
+@with_options(
+    click.option("--baseline", "baseline_path", default=BASELINE_PATH, show_default=True),
+    click.option("--tolerance", default=DEFAULT_TOLERANCE, show_default=True, help="Allowed relative slowdown."),
+    click.option("--cases-dir", default=CASES_DIR, show_default=True, help="Directory with bench_*.py modules."),
+    click.option("--filter", "name_filter", default=None, help="Run only cases containing this substring."),
+    click.option("--rounds", default=ROUNDS, show_default=True, help="Timed rounds per case."),
+    click.option("--output", default=None, help="Also write the current results to this file."),
+)
+def compare(  # noqa: WPS211
+    baseline_path: str,
+    tolerance: float,
+    cases_dir: str,
+    name_filter: Optional[str],
+    rounds: int,
+    output: Optional[str],
+) -> None:
+    """
+    Run the suite and exit with an error if a case regressed beyond the tolerance.
+
+    Args:
+        baseline_path (str): The baseline results file.
+        tolerance (float): Allowed relative slowdown of the median.
+        cases_dir (str): Directory with bench_*.py modules.
+        name_filter (Optional[str]): Run only cases containing this substring.
+        rounds (int): Timed rounds per case.
+        output (Optional[str]): Also write the current results to this file.
+    """
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    load_cases(cases_dir)
+    current = run_benchmarks(name_filter, rounds)
+    if output:
+        with open(output, "w", encoding="utf-8") as output_file:
+            json.dump(current, output_file, indent=2, sort_keys=True)
+
+    lines, regressions = compare_results(baseline, current, tolerance)
+    click.echo("\n".join(lines))
+    if regressions:
+        count = len(regressions)
+        click.echo(f"{count} case(s) regressed by more than {tolerance:.0%}", err=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Python client of the barcode service."""
@@ -0,0 +1,567 @@
+"""Sync and asyncio clients of the barcode service."""
+import asyncio
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+import numpy as np
+from numpy.typing import NDArray
+
+from src.client.images import (
+    DETECTOR_MAX_SIDE,
+    JPEG_QUALITY,
+    RECOGNITION_MAX_SIDE,
+    RECOGNIZER_SIDE,
+    ImageInput,
+    PreparedImage,
+    prepare_image,
+)
+from src.client.retries import RetryPolicy
+
+DEFAULT_CONCURRENCY: int = 8
+DEFAULT_TIMEOUT_SEC: float = 60.0
+TENANT_HEADER: str = "X-Tenant-Id"
+
+Body = Dict[str, Any]
+Records = List[Body]
+
+# (path, longest side of the upload)
+Route = Tuple[str, Optional[int]]
+PREDICT_MASK: Route = ("/detector/predict_mask", DETECTOR_MAX_SIDE)
+PREDICT_BARCODES: Route = ("/detector/predict_barcodes", DETECTOR_MAX_SIDE)
+RECOGNIZE_BARCODE: Route = ("/recognizer/recognize_barcode", RECOGNIZER_SIDE)
+RECOGNIZE_IMAGE: Route = ("/recognizer/recognize_image", RECOGNITION_MAX_SIDE)
+
+
+class ServiceError(Exception):
+    """
+    Raised when the service answers with an error.
+
+    Args:
+        status_code (int): The HTTP status of the response.
+        detail (str): The error detail of the response.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        """
+        Initialize the error.
+
+        Args:
+            status_code (int): The HTTP status of the response.
+            detail (str): The error detail of the response.
+        """
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def error_detail(response: httpx.Response) -> str:
+    """
+    Get the error detail of a response.
+
+    Args:
+        response (httpx.Response): The error response.
+
+    Returns:
+        str: The "detail" of a JSON body, otherwise the body text.
+    """
+    try:
+        return str(response.json()["detail"])
+    except (ValueError, KeyError, TypeError):
+        return response.text
+
+
+class ClientBase:
+    """
+    Request preparation and response parsing shared by the sync and asyncio clients.
+
+    Images are downscaled to the longest side the server actually feeds the models with and re-encoded as JPEG, so
+    large photos are not uploaded and decoded only to be resized on the server. The returned boxes and masks are
+    mapped back to the coordinates of the original image.
+
+    Args:
+        retry (Optional[RetryPolicy]): The retries of the rejected and failed requests, the default policy if None.
+        downscale (bool): Whether to downscale the images before the upload.
+        quality (int): The JPEG quality of the re-encoded images.
+        tenant (Optional[str]): The tenant sent in the `X-Tenant-Id` header.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        downscale: bool = True,
+        quality: int = JPEG_QUALITY,
+        tenant: Optional[str] = None,
+    ):
+        """
+        Initialize the client settings.
+
+        Args:
+            retry (Optional[RetryPolicy]): The retries of the rejected and failed requests, the default policy if None.
+            downscale (bool): Whether to downscale the images before the upload.
+            quality (int): The JPEG quality of the re-encoded images.
+            tenant (Optional[str]): The tenant sent in the `X-Tenant-Id` header.
+        """
+        self.retry = retry or RetryPolicy()
+        self.downscale = downscale
+        self.quality = quality
+        self.headers = {TENANT_HEADER: tenant} if tenant else {}
+
+    def prepare(self, image: ImageInput, route: Route, full_resolution: bool = False) -> PreparedImage:
+        """
+        Prepare an image for the upload to a route.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+            route (Route): The route.
+            full_resolution (bool): Whether to upload the image without downscaling it.
+
+        Returns:
+            PreparedImage: The upload.
+        """
+        _, max_side = route
+        if full_resolution or not self.downscale:
+            max_side = None
+        return prepare_image(image, max_side, self.quality)
+
+    @staticmethod
+    def parse(response: httpx.Response) -> Any:
+        """
+        Parse a response, raising on an error status.
+
+        Args:
+            response (httpx.Response): The response.
+
+        Returns:
+            Any: The JSON body.
+
+        Raises:
+            ServiceError: If the response has an error status.
+        """
+        if response.is_error:
+            raise ServiceError(response.status_code, error_detail(response))
+        return response.json()
+
+    @staticmethod
+    def mask(body: Dict[str, str], prepared: PreparedImage) -> NDArray[np.float32]:
+        """
+        Decode a predicted mask in the coordinates of the original image.
+
+        Args:
+            body (Dict[str, str]): The body of the mask response.
+            prepared (PreparedImage): The uploaded image.
+
+        Returns:
+            NDArray[np.float32]: The mask.
+        """
+        mask = np.frombuffer(base64.b64decode(body["base64_encoded_mask"]), dtype=np.float32)
+        return prepared.rescale_mask(mask.reshape(prepared.shape))
+
+    @staticmethod
+    def barcodes(body: Body, prepared: PreparedImage) -> Body:
+        """
+        Map the predicted boxes to the coordinates of the original image.
+
+        Args:
+            body (Body): The body of the barcodes response.
+            prepared (PreparedImage): The uploaded image.
+
+        Returns:
+            Body: The "bboxes" in MinMax format and their "scores".
+        """
+        bboxes = [prepared.rescale_bbox(bbox) for bbox in body["bboxes"]]
+        return {"bboxes": bboxes, "scores": body["scores"]}
+
+    @staticmethod
+    def recognized(body: Body, prepared: PreparedImage) -> Records:
+        """
+        Map the recognized barcodes to the coordinates of the original image.
+
+        Args:
+            body (Body): The body of the recognition response.
+            prepared (PreparedImage): The uploaded image.
+
+        Returns:
+            Records: The {"bbox", "score", "value"} records.
+        """
+        records = []
+        for barcode in body["barcodes"]:
+            bbox = prepared.rescale_bbox(barcode["bbox"])
+            records.append({**barcode, "bbox": bbox})
+        return records
+
+
+class SyncConnection(ClientBase):
+    """
+    Connection pool of the sync client, retrying the rejected and failed uploads.
+
+    Keeps up to `concurrency` connections alive and reuses them across the requests. Thread-safe.
+
+    Args:
+        base_url (Union[str, httpx.Client]): The URL of the service, or the HTTP client to use, e.g. a test client.
+        concurrency (int): Maximum number of concurrent requests.
+        timeout (float): Timeout of a request in seconds.
+        kwargs: The `ClientBase` settings.
+    """
+
+    def __init__(
+        self,
+        base_url: Union[str, httpx.Client] = "http://localhost:5000",
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT_SEC,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the connection pool.
+
+        Args:
+            base_url (Union[str, httpx.Client]): The URL of the service, or the HTTP client to use, e.g. a test client.
+            concurrency (int): Maximum number of concurrent requests.
+            timeout (float): Timeout of a request in seconds.
+            kwargs: The `ClientBase` settings.
+        """
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+        if isinstance(base_url, httpx.Client):
+            self.http = base_url
+            return
+        self.http = httpx.Client(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            # waiting for a free connection is bounded by the concurrency, not by the timeout
+            timeout=httpx.Timeout(timeout, pool=None),
+        )
+
+    def close(self) -> None:
+        """Close the connections."""
+        self.http.close()
+
+    def post(self, route: Route, prepared: PreparedImage) -> Any:
+        """
+        Upload an image to a route, retrying the rejected and failed attempts.
+
+        Args:
+            route (Route): The route.
+            prepared (PreparedImage): The upload.
+
+        Returns:
+            Any: The JSON body of the response, `parse` raises `ServiceError` on an error status.
+        """
+        path, _ = route
+        attempt = 0
+        response: Optional[httpx.Response] = None
+        while response is None:
+            response = self.send(path, prepared, attempt)
+            attempt += 1
+        return self.parse(response)
+
+    def send(self, path: str, prepared: PreparedImage, attempt: int) -> Optional[httpx.Response]:
+        """
+        Send an attempt of an upload, waiting before the next one if it is retried.
+
+        Args:
+            path (str): The route path.
+            prepared (PreparedImage): The upload.
+            attempt (int): Number of the attempt, starting from 0.
+
+        Returns:
+            Optional[httpx.Response]: The final response, None if the attempt is retried.
+
+        Raises:
+            httpx.TransportError: If the last attempt fails to connect.
+        """
+        files = {"image": prepared.body}
+        response: Optional[httpx.Response]
+        try:
+            response = self.http.post(path, files=files, headers=self.headers)
+        except httpx.TransportError:
+            if self.retry.delay(None, attempt) is None:
+                raise
+            response = None
+        delay = self.retry.delay(response, attempt)
+        if delay is None:
+            return response
+        time.sleep(delay)
+        return None
+
+
+class BarcodeClient(SyncConnection):
+    """
+    Sync client of the barcode service.
+
+    The batch helpers send up to `concurrency` requests at a time.
+    """
+
+    def __enter__(self) -> "BarcodeClient":
+        """
+        Enter the client context.
+
+        Returns:
+            BarcodeClient: The client.
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Close the connections on the context exit.
+
+        Args:
+            exc_info: The exception info.
+        """
+        self.close()
+
+    def predict_mask(self, image: ImageInput) -> NDArray[np.float32]:
+        """
+        Predict the barcode mask of an image.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+
+        Returns:
+            NDArray[np.float32]: The mask of the size of the image.
+        """
+        prepared = self.prepare(image, PREDICT_MASK)
+        return self.mask(self.post(PREDICT_MASK, prepared), prepared)
+
+    def predict_barcodes(self, image: ImageInput, full_resolution: bool = False) -> Body:
+        """
+        Detect the barcodes of an image.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+            full_resolution (bool): Whether to upload the image as is, for the tiled detection of large images.
+
+        Returns:
+            Body: The "bboxes" in MinMax format and their "scores", the best scored first.
+        """
+        prepared = self.prepare(image, PREDICT_BARCODES, full_resolution)
+        return self.barcodes(self.post(PREDICT_BARCODES, prepared), prepared)
+
+    def recognize_barcode(self, image: ImageInput) -> str:
+        """
+        Recognize the value of a barcode crop.
+
+        Args:
+            image (ImageInput): The encoded crop or the decoded BGR crop.
+
+        Returns:
+            str: The recognized value.
+        """
+        return self.post(RECOGNIZE_BARCODE, self.prepare(image, RECOGNIZE_BARCODE))
+
+    def recognize_image(self, image: ImageInput, full_resolution: bool = False) -> Records:
+        """
+        Detect and recognize the barcodes of an image.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+            full_resolution (bool): Whether to upload the image as is, for small or dense barcodes.
+
+        Returns:
+            Records: The {"bbox", "score", "value"} records, the best scored first.
+        """
+        prepared = self.prepare(image, RECOGNIZE_IMAGE, full_resolution)
+        return self.recognized(self.post(RECOGNIZE_IMAGE, prepared), prepared)
+
+    def recognize_images(self, images: Iterable[ImageInput], full_resolution: bool = False) -> List[Records]:
+        """
+        Recognize the barcodes of many images, sending up to `concurrency` requests at a time.
+
+        Args:
+            images (Iterable[ImageInput]): The encoded images or the decoded BGR images.
+            full_resolution (bool): Whether to upload the images as is.
+
+        Returns:
+            List[Records]: The records of every image, in order.
+        """
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            return list(executor.map(lambda image: self.recognize_image(image, full_resolution), images))
+
+
+class AsyncConnection(ClientBase):
+    """
+    Connection pool of the asyncio client, retrying the rejected and failed uploads.
+
+    Keeps up to `concurrency` connections alive and sends up to `concurrency` requests at a time, the others wait.
+
+    Args:
+        base_url (Union[str, httpx.AsyncClient]): The URL of the service, or the HTTP client to use.
+        concurrency (int): Maximum number of concurrent requests.
+        timeout (float): Timeout of a request in seconds.
+        kwargs: The `ClientBase` settings.
+    """
+
+    def __init__(
+        self,
+        base_url: Union[str, httpx.AsyncClient] = "http://localhost:5000",
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT_SEC,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the connection pool.
+
+        Args:
+            base_url (Union[str, httpx.AsyncClient]): The URL of the service, or the HTTP client to use.
+            concurrency (int): Maximum number of concurrent requests.
+            timeout (float): Timeout of a request in seconds.
+            kwargs: The `ClientBase` settings.
+        """
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency)
+        if isinstance(base_url, httpx.AsyncClient):
+            self.http = base_url
+            return
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=httpx.Timeout(timeout, pool=None),
+        )
+
+    async def aclose(self) -> None:
+        """Close the connections."""
+        await self.http.aclose()
+
+    async def post(self, route: Route, prepared: PreparedImage) -> Any:
+        """
+        Upload an image to a route, retrying the rejected and failed attempts.
+
+        Args:
+            route (Route): The route.
+            prepared (PreparedImage): The upload.
+
+        Returns:
+            Any: The JSON body of the response, `parse` raises `ServiceError` on an error status.
+        """
+        path, _ = route
+        attempt = 0
+        response: Optional[httpx.Response] = None
+        while response is None:
+            response = await self.send(path, prepared, attempt)
+            attempt += 1
+        return self.parse(response)
+
+    async def send(self, path: str, prepared: PreparedImage, attempt: int) -> Optional[httpx.Response]:
+        """
+        Send an attempt of an upload, waiting before the next one if it is retried.
+
+        The concurrency slot is released while waiting for the retry.
+
+        Args:
+            path (str): The route path.
+            prepared (PreparedImage): The upload.
+            attempt (int): Number of the attempt, starting from 0.
+
+        Returns:
+            Optional[httpx.Response]: The final response, None if the attempt is retried.
+
+        Raises:
+            httpx.TransportError: If the last attempt fails to connect.
+        """
+        files = {"image": prepared.body}
+        response: Optional[httpx.Response]
+        try:
+            async with self._slots:
+                response = await self.http.post(path, files=files, headers=self.headers)
+        except httpx.TransportError:
+            if self.retry.delay(None, attempt) is None:
+                raise
+            response = None
+        delay = self.retry.delay(response, attempt)
+        if delay is None:
+            return response
+        await asyncio.sleep(delay)
+        return None
+
+
+class AsyncBarcodeClient(AsyncConnection):
+    """Asyncio client of the barcode service."""
+
+    async def __aenter__(self) -> "AsyncBarcodeClient":
+        """
+        Enter the client context.
+
+        Returns:
+            AsyncBarcodeClient: The client.
+        """
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """
+        Close the connections on the context exit.
+
+        Args:
+            exc_info: The exception info.
+        """
+        await self.aclose()
+
+    async def predict_mask(self, image: ImageInput) -> NDArray[np.float32]:
+        """
+        Predict the barcode mask of an image.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+
+        Returns:
+            NDArray[np.float32]: The mask of the size of the image.
+        """
+        prepared = await asyncio.to_thread(self.prepare, image, PREDICT_MASK)
+        return self.mask(await self.post(PREDICT_MASK, prepared), prepared)
+
+    async def predict_barcodes(self, image: ImageInput, full_resolution: bool = False) -> Body:
+        """
+        Detect the barcodes of an image.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+            full_resolution (bool): Whether to upload the image as is, for the tiled detection of large images.
+
+        Returns:
+            Body: The "bboxes" in MinMax format and their "scores", the best scored first.
+        """
+        prepared = await asyncio.to_thread(self.prepare, image, PREDICT_BARCODES, full_resolution)
+        return self.barcodes(await self.post(PREDICT_BARCODES, prepared), prepared)
+
+    async def recognize_barcode(self, image: ImageInput) -> str:
+        """
+        Recognize the value of a barcode crop.
+
+        Args:
+            image (ImageInput): The encoded crop or the decoded BGR crop.
+
+        Returns:
+            str: The recognized value.
+        """
+        prepared = await asyncio.to_thread(self.prepare, image, RECOGNIZE_BARCODE)
+        return await self.post(RECOGNIZE_BARCODE, prepared)
+
+    async def recognize_image(self, image: ImageInput, full_resolution: bool = False) -> Records:
+        """
+        Detect and recognize the barcodes of an image.
+
+        Args:
+            image (ImageInput): The encoded image or the decoded BGR image.
+            full_resolution (bool): Whether to upload the image as is, for small or dense barcodes.
+
+        Returns:
+            Records: The {"bbox", "score", "value"} records, the best scored first.
+        """
+        prepared = await asyncio.to_thread(self.prepare, image, RECOGNIZE_IMAGE, full_resolution)
+        return self.recognized(await self.post(RECOGNIZE_IMAGE, prepared), prepared)
+
+    async def recognize_images(self, images: Iterable[ImageInput], full_resolution: bool = False) -> List[Records]:
+        """
+        Recognize the barcodes of many images, sending up to `concurrency` requests at a time.
+
+        Args:
+            images (Iterable[ImageInput]): The encoded images or the decoded BGR images.
+            full_resolution (bool): Whether to upload the images as is.
+
+        Returns:
+            List[Records]: The records of every image, in order.
+        """
+        recognitions = [self.recognize_image(image, full_resolution) for image in images]
+        return list(await asyncio.gather(*recognitions))
@@ -0,0 +1,123 @@
+"""Client-side downscale and re-encode of the uploaded images."""
+from typing import Dict, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+# largest side of the default detector input buckets, the detector never sees more pixels
+DETECTOR_MAX_SIDE: int = 320
+# side of the recognizer input, a single barcode crop is letterboxed into it
+RECOGNIZER_SIDE: int = 224
+# barcodes spanning a sixth of the image width keep the full recognizer resolution
+RECOGNITION_MAX_SIDE: int = RECOGNIZER_SIDE * 6
+JPEG_QUALITY: int = 90
+
+ImageInput = Union[bytes, NDArray[np.uint8]]
+# the height and width of an image
+Shape = Tuple[int, int]
+
+
+class PreparedImage:
+    """
+    An image ready for upload and the scale back to the original coordinates.
+
+    Args:
+        body (bytes): The encoded image.
+        shape (Shape): The (height, width) of the uploaded image.
+        original_shape (Shape): The (height, width) of the original image.
+    """
+
+    __slots__ = ("body", "shape", "original_shape")
+
+    def __init__(self, body: bytes, shape: Shape, original_shape: Shape):
+        """
+        Initialize the prepared image.
+
+        Args:
+            body (bytes): The encoded image.
+            shape (Shape): The (height, width) of the uploaded image.
+            original_shape (Shape): The (height, width) of the original image.
+        """
+        self.body = body
+        self.shape = shape
+        self.original_shape = original_shape
+
+    def rescale_bbox(self, bbox: Dict[str, int]) -> Dict[str, int]:
+        """
+        Map a MinMax bbox of the uploaded image to the original image.
+
+        Args:
+            bbox (Dict[str, int]): The bbox in the uploaded image.
+
+        Returns:
+            Dict[str, int]: The bbox in the original image.
+        """
+        if self.shape == self.original_shape:
+            return bbox
+        scale_y = self.original_shape[0] / self.shape[0]
+        scale_x = self.original_shape[1] / self.shape[1]
+        rescaled: Dict[str, int] = {}
+        for key, coord in bbox.items():
+            scale = scale_x if key.startswith("x") else scale_y
+            rescaled[key] = round(coord * scale)
+        return rescaled
+
+    def rescale_mask(self, mask: NDArray[np.float32]) -> NDArray[np.float32]:
+        """
+        Resize a mask of the uploaded image to the original image.
+
+        Args:
+            mask (NDArray[np.float32]): The mask of the uploaded image.
+
+        Returns:
+            NDArray[np.float32]: The mask of the original image.
+        """
+        if self.shape == self.original_shape:
+            return mask
+        height, width = self.original_shape
+        resized = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+        return resized.astype(np.float32, copy=False)
+
+
+def prepare_image(image: ImageInput, max_side: Optional[int], quality: int = JPEG_QUALITY) -> PreparedImage:
+    """
+    Downscale an image to the longest side the server uses and encode it as JPEG.
+
+    An encoded image that already fits is uploaded as is, without decoding the pixels twice on the way.
+
+    Args:
+        image (ImageInput): The encoded image or the decoded BGR image.
+        max_side (Optional[int]): The longest side of the upload, None for the full resolution.
+        quality (int): The JPEG quality of a re-encoded image.
+
+    Returns:
+        PreparedImage: The upload.
+
+    Raises:
+        ValueError: If the image cannot be decoded or encoded.
+    """
+    if isinstance(image, bytes):
+        pixels = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+    else:
+        pixels = image
+    if pixels is None:
+        raise ValueError("The image could not be decoded")
+    height, width = pixels.shape[:2]
+    original_shape = (height, width)
+    scale: float = 1
+    if max_side is not None:
+        scale = min(1, max_side / max(original_shape))
+    if scale == 1 and isinstance(image, bytes):
+        return PreparedImage(image, original_shape, original_shape)
+
+    shape = original_shape
+    if scale < 1:
+        new_height = max(1, round(height * scale))
+        new_width = max(1, round(width * scale))
+        shape = (new_height, new_width)
+        pixels = cv2.resize(pixels, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    encoded, buffer = cv2.imencode(".jpg", pixels, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not encoded:
+        raise ValueError("The image could not be encoded")
+    return PreparedImage(buffer.tobytes(), shape, original_shape)
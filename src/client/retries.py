@@ -0,0 +1,99 @@
+"""Retry policy of the rejected and failed requests."""
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+DEFAULT_RETRIES: int = 3
+DEFAULT_BACKOFF_SEC: float = 0.5
+MAX_BACKOFF_SEC: float = 30.0
+# rejected by the scheduler or the load shedding, or the server is restarting
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+
+
+def retry_after_seconds(retry_after: str) -> Optional[float]:
+    """
+    Parse a `Retry-After` header.
+
+    Args:
+        retry_after (str): The header, in seconds or as an HTTP date.
+
+    Returns:
+        Optional[float]: The seconds to wait, None for a malformed header.
+    """
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0, retry_at.timestamp() - time.time())
+
+
+def retry_delay(response: Optional[httpx.Response], attempt: int, backoff: float, max_backoff: float) -> float:
+    """
+    Get the seconds to wait before the next attempt.
+
+    The `Retry-After` header of the response is honoured, otherwise the delay grows exponentially from `backoff`.
+
+    Args:
+        response (Optional[httpx.Response]): The retried response, None after a connection error.
+        attempt (int): Number of the failed attempt, starting from 0.
+        backoff (float): Delay after the first attempt.
+        max_backoff (float): Maximum exponential delay.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    asked = retry_after_seconds(retry_after) if retry_after else None
+    if asked is not None:
+        return asked
+    return min(max_backoff, backoff * 2**attempt)
+
+
+class RetryPolicy:
+    """
+    Retries of the rejected requests and the connection errors with exponential backoff.
+
+    Args:
+        retries (int): Number of retries of a rejected or failed request.
+        backoff (float): Delay after the first failed attempt, doubled with every retry.
+        max_backoff (float): Maximum delay between the attempts, unless the server asks for a longer one.
+    """
+
+    def __init__(
+        self,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF_SEC,
+        max_backoff: float = MAX_BACKOFF_SEC,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            retries (int): Number of retries of a rejected or failed request.
+            backoff (float): Delay after the first failed attempt, doubled with every retry.
+            max_backoff (float): Maximum delay between the attempts, unless the server asks for a longer one.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, response: Optional[httpx.Response], attempt: int) -> Optional[float]:
+        """
+        Get the seconds to wait before retrying an attempt.
+
+        Args:
+            response (Optional[httpx.Response]): The response, None after a connection error.
+            attempt (int): Number of the attempt, starting from 0.
+
+        Returns:
+            Optional[float]: The delay in seconds, None if the attempt is not retried.
+        """
+        if attempt >= self.retries:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return None
+        return retry_delay(response, attempt, self.backoff, self.max_backoff)
@@ -1,46 +1,19 @@
 # pylint: disable=c-extension-no-member,no-name-in-module
 """Containers for injection."""
 
-import sys
-
-import loguru
 from dependency_injector import containers, providers
 from dependency_injector.providers import Singleton
-from loguru import logger
-from rfc5424logging import Rfc5424SysLogHandler
 
-from src.logger.log import DevelopFormatter
+from src.logger.log import LoggerInitializer
 from src.services.detector import SegTorchWrapper
+from src.services.pipeline import RecognitionPipeline
 from src.services.recognizer import RecTorchWrapper
+from src.services.reload import ModelReloader
+from src.services.stream import StreamSession
 from src.settings import app_settings
-
-
-class LoggerInitializer:
-    """Class to handle the initialization and closing of logger."""
-
-    def __init__(self):
-        """Initialize the logger initializer."""
-        self.develop_fmt = DevelopFormatter("InferenceService")
-        self.syslog_handler = Rfc5424SysLogHandler(address=(app_settings.syslog_host, 9000))
-
-    def init_logger(self) -> "loguru.Logger":
-        """Initialize and configure the logger.
-
-        Returns:
-            loguru.Logger: The configured logger.
-        """
-        logger.remove()
-        logger.add(sys.stderr, format=self.develop_fmt)  # type: ignore
-        logger.add(self.syslog_handler, format=self.develop_fmt, serialize=True)  # type: ignore
-        return logger
-
-    def close_logger(self, my_logger: "loguru.Logger"):
-        """Close and clean up the logger.
-
-        Args:
-            my_logger (loguru.Logger): The logger to be closed.
-        """
-        my_logger.remove()
+from src.utils.load import LoadMonitor
+from src.utils.scheduling import FairScheduler
+from src.utils.slow_requests import SlowRequestLog
 
 
 class AppContainer(containers.DeclarativeContainer):
@@ -51,6 +24,7 @@ class AppContainer(containers.DeclarativeContainer):
         containers.DeclarativeContainer: The base class for the dependency injection container.
     """
 
+    __self__ = providers.Self()
     config = providers.Configuration()
 
     """
@@ -59,11 +33,20 @@ class AppContainer(containers.DeclarativeContainer):
     Returns:
         checkpoint (str): path to model weights.
         device (str): device type
+        threshold (float): mask probability threshold
+        optimization (dict): inference optimization options
+        input_buckets (list): (height, width) input shapes
+        selection (dict): component filtering and ranking options
     """
     seg_model: Singleton[SegTorchWrapper] = Singleton(
         SegTorchWrapper,
         checkpoint=config.segmentation_model.checkpoint,
         device=config.segmentation_model.device,
+        threshold=config.segmentation_model.threshold,
+        optimization=config.segmentation_model.optimization,
+        input_buckets=config.segmentation_model.input_buckets,
+        selection=config.segmentation_model.selection,
+        tiling=config.segmentation_model.tiling,
     )
 
     """
@@ -72,11 +55,107 @@ class AppContainer(containers.DeclarativeContainer):
     Returns:
         checkpoint (str): path to model weights.
         device (str): device type
+        optimization (dict): inference optimization options
     """
     rec_model: Singleton[RecTorchWrapper] = Singleton(
         RecTorchWrapper,
         checkpoint=config.recognizer_model.checkpoint,
         device=config.recognizer_model.device,
+        optimization=config.recognizer_model.optimization,
+        cache=config.recognizer_model.cache,
+    )
+
+    """
+    Singleton provider for the staged detect, crop and recognize pipeline.
+
+    Returns:
+        detector (Callable): provider of the segmentation model, resolved per request
+        recognizer (Callable): provider of the recognizer model, resolved per request
+        stages (dict): workers and queue size of every stage
+    """
+    recognition_pipeline: Singleton[RecognitionPipeline] = Singleton(
+        RecognitionPipeline,
+        detector=seg_model.provider,
+        recognizer=rec_model.provider,
+        stages=config.pipeline,
+    )
+
+    """
+    Factory provider for the per-connection video stream session.
+
+    Returns:
+        StreamSession: A new stream session sharing the model singletons.
+    """
+    stream_session: providers.Factory[StreamSession] = providers.Factory(
+        StreamSession,
+        detector=seg_model,
+        recognizer=rec_model,
+        detect_every_n_frames=config.stream.detect_every_n_frames,
+        frame_diff_threshold=config.stream.frame_diff_threshold,
+        iou_threshold=config.stream.iou_threshold,
+        max_track_age=config.stream.max_track_age,
+        max_pending_frames=config.stream.max_pending_frames,
+    )
+
+    """
+    Singleton provider for the scheduler of the inference requests.
+
+    Returns:
+        concurrency (int): number of requests running at once
+        classes (dict): weight and paths of every priority class
+        max_queue (int): maximum number of waiting requests
+        quota (dict): default token bucket of the tenants
+        tenant_quotas (dict): token buckets of specific tenants
+    """
+    scheduler: Singleton[FairScheduler] = Singleton(
+        FairScheduler,
+        concurrency=config.scheduler.concurrency,
+        classes=config.scheduler.classes,
+        max_queue=config.scheduler.max_queue,
+        quota=config.scheduler.quota,
+        tenant_quotas=config.scheduler.tenant_quotas,
+    )
+
+    """
+    Singleton provider for the load snapshot of the worker.
+
+    Returns:
+        scheduler (FairScheduler): the scheduler of the inference requests
+        pipeline (RecognitionPipeline): the staged recognition pipeline
+        latency_target (float): model p95 latency reported as saturated
+        queue_target (int): number of waiting requests reported as saturated
+    """
+    load_monitor: Singleton[LoadMonitor] = Singleton(
+        LoadMonitor,
+        scheduler=scheduler,
+        pipeline=recognition_pipeline,
+        latency_target=app_settings.load_latency_target,
+        queue_target=app_settings.load_queue_target,
+    )
+
+    """
+    Singleton provider for the buffer of slow requests.
+
+    Returns:
+        threshold (float): duration in seconds above which requests are captured
+        size (int): number of the most recent slow requests kept
+    """
+    slow_requests: Singleton[SlowRequestLog] = Singleton(
+        SlowRequestLog,
+        threshold=app_settings.slow_request_threshold,
+        size=app_settings.slow_request_buffer_size,
+    )
+
+    """
+    Singleton provider for the model hot-reload.
+
+    Returns:
+        container (AppContainer): this container, whose model singletons are swapped
+    """
+    model_reloader: Singleton[ModelReloader] = Singleton(
+        ModelReloader,
+        container=__self__,
+        weights_dir=app_settings.hot_reload_weights_dir,
     )
 
     """
@@ -86,4 +165,4 @@ class AppContainer(containers.DeclarativeContainer):
         Singleton[LoggerInitializer]: An instance of the Logger component.
     """
     logger_initializer = providers.Singleton(LoggerInitializer)
-    logger = providers.Callable(logger_initializer().init_logger)
+    logger = providers.Callable(LoggerInitializer.init_logger, logger_initializer)
@@ -0,0 +1,244 @@
+"""Import time report of the service startup with a cold-start budget.
+
+Usage:
+    python -m src.importtime --top 25
+    python -m src.importtime --module src.batch --budget 4
+"""
+import json
+import subprocess  # noqa: S404
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import click
+
+DEFAULT_MODULE: str = "src.app"
+COLD_START_BUDGET_SEC: float = 5.0
+TOP_IMPORTS: int = 20
+US_PER_MS: int = 1000
+PACKAGE_WIDTH: int = 40
+MS_WIDTH: int = 10
+IMPORTTIME_PREFIX: str = "import time:"
+# rarely used modules the service imports on first use only
+LAZY_MODULES = ("scipy", "torchvision", "rfc5424logging", "prometheus_client.multiprocess", "src.synthetic")
+# the dependencies every inference route needs, the reference of the startup overhead
+EAGER_MODULES = ("torch", "cv2", "fastapi")
+# the import of the app may take this many times the import of `EAGER_MODULES`
+MAX_STARTUP_OVERHEAD: float = 1.5
+
+# (package, self microseconds, cumulative microseconds, nesting depth)
+ImportTiming = Tuple[str, int, int, int]
+PackageTotal = Tuple[str, int]
+
+MEASURE_CODE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}}))
+"""
+
+
+def parse_timing(line: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Parse a line of the `-X importtime` report.
+
+    Args:
+        line (str): The line, without the "import time:" prefix.
+
+    Returns:
+        Optional[Tuple[str, int, int]]: The indented package, self and cumulative microseconds, None for the header.
+    """
+    self_us, cumulative_us, package = line.split("|")
+    if not self_us.strip().isdigit():
+        return None
+    return package.rstrip(), int(self_us), int(cumulative_us)
+
+
+def parse_importtime(report: str) -> List[ImportTiming]:
+    """
+    Parse the `-X importtime` report of an interpreter.
+
+    Args:
+        report (str): The stderr of the interpreter.
+
+    Returns:
+        List[ImportTiming]: The timing of every imported package, in import order.
+    """
+    timings = []
+    for line in report.splitlines():
+        if not line.startswith(IMPORTTIME_PREFIX):
+            continue
+        timing = parse_timing(line[len(IMPORTTIME_PREFIX) :])
+        if timing is None:
+            continue  # the header
+        name, self_us, cumulative_us = timing
+        package = name.strip()
+        depth = (len(name) - len(package) - 1) // 2
+        timings.append((package, self_us, cumulative_us, depth))
+    return timings
+
+
+def package_totals(timings: List[ImportTiming]) -> List[PackageTotal]:
+    """
+    Sum the self import time of the modules of every top-level package.
+
+    Args:
+        timings (List[ImportTiming]): The timings of the imported modules.
+
+    Returns:
+        List[PackageTotal]: The packages with their total microseconds, the slowest first.
+    """
+    totals: Dict[str, int] = {}
+    for package, self_us, _, _ in timings:
+        root = package.split(".")[0]
+        totals[root] = totals.get(root, 0) + self_us
+    return sorted(totals.items(), key=lambda total: -total[1])
+
+
+class ImportMeasurement:
+    """Wall time, loaded modules and per package timings of the import of a module in a fresh interpreter."""
+
+    def __init__(self, module: str, seconds: float, modules: List[str], timings: List[ImportTiming]):
+        """
+        Initialize the measurement.
+
+        Args:
+            module (str): The measured module.
+            seconds (float): The wall time of the import.
+            modules (List[str]): The loaded modules.
+            timings (List[ImportTiming]): The timing of every imported package, in import order.
+        """
+        self.module = module
+        self.seconds = seconds
+        self.modules = modules
+        self.timings = timings
+
+    def lazy_loaded(self) -> List[str]:
+        """
+        Get the lazy modules that were imported anyway.
+
+        Returns:
+            List[str]: The loaded modules of `LAZY_MODULES`, other than the measured module and its parents.
+        """
+        loaded = set(self.modules)
+        # importing a lazy module, or one of its submodules, imports it by definition
+        module_prefix = f"{self.module}."
+        eager = []
+        for lazy in LAZY_MODULES:
+            lazy_prefix = f"{lazy}."
+            if lazy in loaded and not module_prefix.startswith(lazy_prefix):
+                eager.append(lazy)
+        return eager
+
+    def failures(self, budget: float) -> List[str]:
+        """
+        Check the lazy modules and the import time.
+
+        Args:
+            budget (float): Import seconds budget, 0 disables.
+
+        Returns:
+            List[str]: The failure messages, empty if the import is within the budget.
+        """
+        failures = []
+        eager = ", ".join(self.lazy_loaded())
+        if eager:
+            failures.append(f"lazy modules imported at startup: {eager}")
+        seconds = self.seconds
+        if budget and seconds > budget:
+            message = f"import took {seconds:.2f}s, over the {budget:.2f}s budget"
+            failures.append(message)
+        return failures
+
+    def report(self, top: int) -> List[str]:
+        """
+        Format the slowest packages and the wall time.
+
+        Args:
+            top (int): Number of the slowest packages.
+
+        Returns:
+            List[str]: The report lines.
+        """
+        lines = ["package".ljust(PACKAGE_WIDTH) + "ms".rjust(MS_WIDTH)]
+        for package, total_us in package_totals(self.timings)[:top]:
+            total_ms = "{0:.1f}".format(total_us / US_PER_MS)
+            lines.append(package.ljust(PACKAGE_WIDTH) + total_ms.rjust(MS_WIDTH))
+        module, seconds = self.module, self.seconds
+        lines.append(f"import {module}: {seconds:.2f}s")
+        return lines
+
+
+def measure_imports(module: str = DEFAULT_MODULE) -> ImportMeasurement:
+    """
+    Import a module in a fresh interpreter and time it.
+
+    Args:
+        module (str): The module to import, or several separated by commas.
+
+    Returns:
+        ImportMeasurement: The measured import.
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", MEASURE_CODE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith(IMPORTTIME_PREFIX)]
+        reason = errors[-1] if errors else completed.returncode
+        raise RuntimeError(f"import {module} failed: {reason}")
+    measured = json.loads(completed.stdout.splitlines()[-1])
+    timings = parse_importtime(completed.stderr)
+    return ImportMeasurement(module, measured["seconds"], measured["modules"], timings)
+
+
+def startup_overhead(module: str = DEFAULT_MODULE) -> float:
+    """
+    Get the import time of a module relative to the import of `EAGER_MODULES`.
+
+    The ratio holds across machines and disk caches, unlike the wall time. The reference is imported first, so a
+    cold disk cache slows it down rather than the module.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        float: The import seconds of the module over the import seconds of the eager dependencies.
+    """
+    reference = measure_imports(", ".join(EAGER_MODULES))
+    return measure_imports(module).seconds / reference.seconds
+
+
+@click.command()
+@click.option("--module", default=DEFAULT_MODULE, show_default=True, help="Module to import.")
+@click.option("--top", default=TOP_IMPORTS, show_default=True, help="Number of the slowest packages.")
+@click.option("--budget", default=COLD_START_BUDGET_SEC, show_default=True, help="Import seconds budget, 0 disables.")
+def main(module: str, top: int, budget: float) -> None:
+    """
+    Report the slowest imports of a module and check its cold-start budget.
+
+    Args:
+        module (str): Module to import.
+        top (int): Number of the slowest packages.
+        budget (float): Import seconds budget, 0 disables.
+
+    Raises:
+        ClickException: If the import fails.
+    """
+    try:
+        measured = measure_imports(module)
+    except RuntimeError as exp:
+        raise click.ClickException(str(exp)) from exp
+    click.echo("\n".join(measured.report(top)))
+    failures = measured.failures(budget)
+    if failures:
+        click.echo("\n".join(failures), err=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 """This module provides classes for custom logging with Loguru."""
 
+import sys
 from typing import Any, Dict
 
+import loguru
+
+from src.logger.shipping import QueuedLogShipper
+from src.settings import app_settings
+
 
 class DevelopFormatter:
     """Loguru formatter that formats logs for development environment."""
@@ -62,3 +68,45 @@ class DevelopFormatter:
             "- <lvl>{message}</> - "
             f"{extra}{exception}"
         )
+
+
+class LoggerInitializer:
+    """Class to handle the initialization and closing of logger."""
+
+    def __init__(self):
+        """Initialize the logger initializer."""
+        # the syslog handler is only loaded when the logger is configured
+        from rfc5424logging import Rfc5424SysLogHandler  # noqa: WPS433
+
+        self.develop_fmt = DevelopFormatter("InferenceService")
+        self.syslog_handler = Rfc5424SysLogHandler(address=(app_settings.syslog_host, 9000))
+        self.log_shipper = QueuedLogShipper(
+            self.syslog_handler,
+            queue_size=app_settings.log_queue_size,
+            batch_size=app_settings.log_batch_size,
+            flush_interval=app_settings.log_flush_interval,
+        )
+
+    def init_logger(self) -> "loguru.Logger":
+        """Initialize and configure the logger.
+
+        Records for syslog are queued as they are, then serialized and sent in batches by a background thread, so the
+        logging thread never serializes them nor waits for the syslog host.
+
+        Returns:
+            loguru.Logger: The configured logger.
+        """
+        loguru.logger.remove()
+        loguru.logger.add(sys.stderr, format=self.develop_fmt)  # type: ignore
+        self.log_shipper.start()
+        loguru.logger.add(self.log_shipper.write, format="{message}")
+        return loguru.logger
+
+    def close_logger(self, my_logger: "loguru.Logger"):
+        """Close and clean up the logger, shipping the queued records.
+
+        Args:
+            my_logger (loguru.Logger): The logger to be closed.
+        """
+        my_logger.remove()
+        self.log_shipper.close()
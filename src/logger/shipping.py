@@ -0,0 +1,167 @@
+"""This module provides a non-blocking loguru sink shipping records to a logging handler from a background thread."""
+
+import json
+import logging
+import queue
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from src.utils.metrics import LOG_RECORDS
+
+STOP_TIMEOUT_SEC: float = 5.0
+# the loguru record fields shipped as they are
+RECORD_FIELDS = ("name", "module", "function", "line", "message", "extra")
+
+Record = Dict[str, Any]
+
+
+def serialize_record(record: Record) -> str:
+    """
+    Serialize a loguru record to JSON with its fields under "record", like the loguru `serialize=True` sinks.
+
+    Args:
+        record (Record): The loguru record.
+
+    Returns:
+        str: The JSON record, with the level name, the ISO time and the formatted exception.
+    """
+    fields = {field: record[field] for field in RECORD_FIELDS}
+    fields["time"] = record["time"].isoformat()
+    fields["level"] = record["level"].name
+    exc = record["exception"]
+    if exc:
+        lines = traceback.format_exception(exc.type, exc.value, exc.traceback)
+        fields["exception"] = "".join(lines)
+    return json.dumps({"record": fields}, default=str)
+
+
+class QueuedLogShipper:
+    """
+    Loguru sink handing records to a logging handler through a bounded queue.
+
+    The calling thread only enqueues the loguru record. A background thread collects the records into batches of up
+    to `batch_size`, waiting at most `flush_interval` seconds for a batch to fill, serializes them to JSON and passes
+    them to the handler, so neither the serialization nor a slow or unreachable log destination delays the caller.
+    When the queue is full the record is dropped and counted.
+
+    Args:
+        destination (logging.Handler): The destination handler, e.g. the syslog handler.
+        queue_size (int): Maximum number of records waiting for shipping.
+        batch_size (int): Maximum number of records shipped per wakeup.
+        flush_interval (float): Seconds a batch waits for more records after its first one.
+    """
+
+    def __init__(self, destination: logging.Handler, queue_size: int, batch_size: int, flush_interval: float):
+        """
+        Initialize the shipper.
+
+        Args:
+            destination (logging.Handler): The destination handler, e.g. the syslog handler.
+            queue_size (int): Maximum number of records waiting for shipping.
+            batch_size (int): Maximum number of records shipped per wakeup.
+            flush_interval (float): Seconds a batch waits for more records after its first one.
+        """
+        self._destination = destination
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Record]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the shipping thread unless it is already running."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._ship_loop, name="log-shipper", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Any) -> None:
+        """
+        Enqueue the record of a loguru message, called by loguru on the logging thread.
+
+        Args:
+            message (Any): The loguru message, a string with the `record` attribute.
+        """
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            LOG_RECORDS.labels(outcome="dropped").inc()
+
+    def close(self) -> None:
+        """
+        Ship the queued records and stop the thread, waiting at most a few seconds for the handler.
+
+        The thread closes the handler once it has shipped the last record, so a handler that is still busy after the
+        timeout is never closed under it.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(STOP_TIMEOUT_SEC)
+        self._thread = None
+
+    def _next_batch(self) -> List[Record]:
+        """
+        Wait for the first queued record and for the following ones until the batch is full or the interval is over.
+
+        Once the shipper is stopping, only the records already queued are taken.
+
+        Returns:
+            List[Record]: The batch, empty if nothing arrived during the flush interval.
+        """
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = max(deadline - time.monotonic(), 0)
+            if self._stop.is_set():
+                remaining = 0
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _ship(self, record: Record) -> None:
+        """
+        Serialize a loguru record to a standard logging record and pass it to the handler.
+
+        Args:
+            record (Record): The loguru record.
+        """
+        exc = record["exception"]
+        exc_info = (exc.type, exc.value, exc.traceback) if exc else None
+        log_record = logging.getLogger().makeRecord(
+            record["name"],
+            record["level"].no,
+            record["file"].path,
+            record["line"],
+            serialize_record(record),
+            args=(),
+            exc_info=exc_info,
+            func=record["function"],
+            extra={"extra": record["extra"]},
+        )
+        if exc:
+            log_record.exc_text = "\n"
+        self._destination.handle(log_record)
+
+    def _ship_loop(self) -> None:
+        """Ship batches until stopped and the queue is drained, then close the handler."""
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            for record in batch:
+                try:
+                    self._ship(record)
+                except Exception:  # the thread must survive a broken destination
+                    LOG_RECORDS.labels(outcome="failed").inc()
+                else:
+                    LOG_RECORDS.labels(outcome="shipped").inc()
+            if batch:
+                self._destination.flush()
+        self._destination.close()
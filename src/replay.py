@@ -0,0 +1,283 @@
+"""Replay recorded traffic against the service and report per-endpoint throughput and latency.
+
+Usage:
+    python -m src.replay --records recordings/traffic.jsonl --url http://localhost:5000 --concurrency 16
+    python -m src.replay --records recordings/traffic.jsonl --in-process --speed 2 --report report.json
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import click
+import httpx
+import numpy as np
+
+from src.utils.cli import with_options
+from src.utils.recording import BodyResolver, Record, load_records
+
+PERCENTILES = (50, 95, 99)
+REQUEST_TIMEOUT_SEC: float = 60
+ERROR_STATUS: int = 400
+DEFAULT_CONCURRENCY: int = 8
+# guards the throughput against a zero wall time
+MIN_WALL_TIME_SEC: float = 1e-9
+PERCENTILE_KEYS = tuple(f"p{percentile}_ms" for percentile in PERCENTILES)
+ENDPOINT_WIDTH: int = 40
+COLUMN_WIDTH: int = 8
+MS_SPEC: str = ".1f"
+# (title, stats key, format spec) of the report columns
+REPORT_COLUMNS = (
+    ("reqs", "requests", ".0f"),
+    ("rps", "throughput_rps", MS_SPEC),
+    ("p50ms", "p50_ms", MS_SPEC),
+    ("p95ms", "p95_ms", MS_SPEC),
+    ("p99ms", "p99_ms", MS_SPEC),
+    ("err", "error_rate", ".2%"),
+)
+
+EXISTING_FILE = click.Path(exists=True, dir_okay=False)
+
+# (endpoint, latency in seconds, is error)
+ReplayResult = Tuple[str, float, bool]
+# requests, throughput, latency percentiles in ms and error rate per endpoint
+Report = Dict[str, Dict[str, float]]
+
+
+def schedule_offsets(records: List[Record], speed: float, rate: float) -> List[float]:
+    """
+    Compute when every request is sent, relative to the start of the replay.
+
+    Args:
+        records (List[Record]): The recorded requests ordered by arrival time.
+        speed (float): Multiplier of the recorded rate, 0 to send as fast as the concurrency allows.
+        rate (float): Fixed rate in requests per second, overrides `speed` when positive.
+
+    Returns:
+        List[float]: Offsets in seconds.
+    """
+    if rate > 0:
+        return [idx / rate for idx in range(len(records))]
+    if speed <= 0 or not records:
+        return [0 for _ in records]
+    first_ts = records[0].get("ts", 0)
+    return [(record.get("ts", first_ts) - first_ts) / speed for record in records]
+
+
+async def send_request(
+    client: httpx.AsyncClient,
+    record: Record,
+    resolver: BodyResolver,
+    semaphore: asyncio.Semaphore,
+) -> ReplayResult:
+    """
+    Send a recorded request and release its concurrency slot.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the service.
+        record (Record): The recorded request.
+        resolver (BodyResolver): The body builder.
+        semaphore (asyncio.Semaphore): The concurrency slots, one was acquired for this request.
+
+    Returns:
+        ReplayResult: The endpoint, latency and error flag of the request.
+    """
+    method, path = record["method"], record["path"]
+    request_kwargs = resolver.request_kwargs(record)
+    started = time.perf_counter()
+    try:
+        response: Optional[httpx.Response] = await client.request(method, path, **request_kwargs)
+    except httpx.HTTPError:
+        response = None
+    finally:
+        semaphore.release()
+    latency = time.perf_counter() - started
+    is_error = response is None or response.status_code >= ERROR_STATUS
+    return f"{method} {path}", latency, is_error
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: List[Record],
+    resolver: BodyResolver,
+    offsets: List[float],
+    concurrency: int,
+) -> Tuple[List[ReplayResult], float]:
+    """
+    Send the recorded requests on schedule with bounded concurrency.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the service.
+        records (List[Record]): The recorded requests.
+        resolver (BodyResolver): The body builder.
+        offsets (List[float]): Send time of every request relative to the start.
+        concurrency (int): Maximal number of requests in flight.
+
+    Returns:
+        Tuple[List[ReplayResult], float]: The result of every request and the wall time of the replay.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
+    started = time.perf_counter()
+    for record, offset in zip(records, offsets):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(send_request(client, record, resolver, semaphore)))
+    replay_results = await asyncio.gather(*tasks)
+    return list(replay_results), time.perf_counter() - started
+
+
+def build_report(replay_results: List[ReplayResult], wall_time: float) -> Report:
+    """
+    Aggregate the results per endpoint.
+
+    Args:
+        replay_results (List[ReplayResult]): The result of every request.
+        wall_time (float): The wall time of the replay in seconds.
+
+    Returns:
+        Report: Requests, throughput, latency percentiles in ms and error rate per endpoint, plus a "total" entry.
+    """
+    grouped: Dict[str, List[ReplayResult]] = {"total": replay_results}
+    for replay_result in replay_results:
+        grouped.setdefault(replay_result[0], []).append(replay_result)
+
+    report = {}
+    for endpoint, endpoint_results in grouped.items():
+        if not endpoint_results:
+            continue
+        _, latencies, errors = zip(*endpoint_results)
+        stats = {
+            "requests": len(latencies),
+            "throughput_rps": len(latencies) / max(wall_time, MIN_WALL_TIME_SEC),
+            "error_rate": sum(errors) / len(errors),
+        }
+        percentiles = np.percentile(np.array(latencies) * 1000, PERCENTILES)
+        stats.update(zip(PERCENTILE_KEYS, map(float, percentiles)))
+        report[endpoint] = stats
+    return report
+
+
+def format_report(report: Report) -> str:
+    """
+    Render the report as a plain text table.
+
+    Args:
+        report (Report): The report built by `build_report`.
+
+    Returns:
+        str: The table.
+    """
+    header = [title.rjust(COLUMN_WIDTH) for title, _, _ in REPORT_COLUMNS]
+    lines = [" ".join(["endpoint".ljust(ENDPOINT_WIDTH), *header])]
+    for endpoint, stats in report.items():
+        formatted = [format(stats[key], spec) for _, key, spec in REPORT_COLUMNS]
+        cells = [cell.rjust(COLUMN_WIDTH) for cell in formatted]
+        lines.append(" ".join([endpoint.ljust(ENDPOINT_WIDTH), *cells]))
+    return "\n".join(lines)
+
+
+async def run_replay(  # noqa: WPS211
+    records: List[Record],
+    resolver: BodyResolver,
+    url: Optional[str],
+    speed: float,
+    rate: float,
+    concurrency: int,
+) -> Report:
+    """
+    Replay the records against a running service or an in-process app.
+
+    Args:
+        records (List[Record]): The recorded requests.
+        resolver (BodyResolver): The body builder.
+        url (Optional[str]): Base url of a running service, None to drive `create_app()` in-process via ASGI.
+        speed (float): Multiplier of the recorded rate, 0 to send as fast as the concurrency allows.
+        rate (float): Fixed rate in requests per second, overrides `speed` when positive.
+        concurrency (int): Maximal number of requests in flight.
+
+    Returns:
+        Report: The per endpoint report.
+    """
+    offsets = schedule_offsets(records, speed, rate)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=REQUEST_TIMEOUT_SEC) as client:
+            replay_results, wall_time = await replay(client, records, resolver, offsets, concurrency)
+        return build_report(replay_results, wall_time)
+
+    from src.app import create_app  # noqa: WPS433 pylint: disable=import-outside-toplevel
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)  # type: ignore
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://replay",
+            timeout=REQUEST_TIMEOUT_SEC,
+        ) as asgi_client:
+            replay_results, wall_time = await replay(asgi_client, records, resolver, offsets, concurrency)
+    return build_report(replay_results, wall_time)
+
+
+@click.command()
+@with_options(
+    click.option("--records", "records_path", required=True, type=EXISTING_FILE, help="Recorded JSONL."),
+    click.option("--url", default=None, help="Base url of a running service, e.g. http://localhost:5000."),
+    click.option("--in-process", is_flag=True, help="Drive create_app() in-process via ASGI instead of --url."),
+    click.option("--bodies-dir", default=None, help="Directory with the recorded request bodies."),
+    click.option("--image", "fallback_image", default=None, help="Image to send when a recorded body is missing."),
+    click.option("--speed", default=1.0, show_default=True, help="Multiplier of the recorded rate, 0 for max rate."),
+    click.option(
+        "--rate",
+        type=float,
+        default=0,
+        show_default=True,
+        help="Fixed requests per second, overrides --speed.",
+    ),
+    click.option("--concurrency", default=DEFAULT_CONCURRENCY, show_default=True, help="Maximal requests in flight."),
+    click.option("--report", "report_path", default=None, help="Write the report as JSON to this file."),
+)
+def main(  # noqa: WPS211
+    records_path: str,
+    url: Optional[str],
+    in_process: bool,
+    bodies_dir: Optional[str],
+    fallback_image: Optional[str],
+    speed: float,
+    rate: float,
+    concurrency: int,
+    report_path: Optional[str],
+) -> None:
+    """
+    Replay recorded traffic and report throughput, latency percentiles and error rate per endpoint.
+
+    Args:
+        records_path (str): Recorded JSONL.
+        url (Optional[str]): Base url of a running service.
+        in_process (bool): Drive create_app() in-process via ASGI.
+        bodies_dir (Optional[str]): Directory with the recorded request bodies.
+        fallback_image (Optional[str]): Image to send when a recorded body is missing.
+        speed (float): Multiplier of the recorded rate.
+        rate (float): Fixed requests per second.
+        concurrency (int): Maximal number of requests in flight.
+        report_path (Optional[str]): Write the report as JSON to this file.
+
+    Raises:
+        UsageError: If neither or both of --url and --in-process are given.
+    """
+    if bool(url) == in_process:
+        raise click.UsageError("Pass exactly one of --url and --in-process.")
+    records = load_records(records_path)
+    resolver = BodyResolver(bodies_dir, fallback_image)
+    report = asyncio.run(run_replay(records, resolver, url, speed, rate, concurrency))
+    click.echo(format_report(report))
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,73 @@
+"""This module provides the administration endpoints of a live worker."""
+
+from enum import Enum
+from types import MappingProxyType
+from typing import Optional
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from src.containers.containers import AppContainer
+from src.routes.routers import admin_router
+from src.services.reload import CheckpointNotAllowedError, ModelReloader, ReloadInProgressError
+from src.settings import app_settings
+
+HTTP_NOT_FOUND: int = 404
+HTTP_CONFLICT: int = 409
+HTTP_BAD_REQUEST: int = 400
+HTTP_FORBIDDEN: int = 403
+# reloads refused before loading anything
+REJECTION_STATUSES = MappingProxyType(
+    {
+        CheckpointNotAllowedError: HTTP_FORBIDDEN,
+        ReloadInProgressError: HTTP_CONFLICT,
+    },
+)
+
+
+class ModelName(str, Enum):  # noqa: WPS600
+    """Models that can be reloaded, named after their config sections."""
+
+    segmentation_model = "segmentation_model"
+    recognizer_model = "recognizer_model"
+
+
+RELOADED_MODEL = Query(...)
+RELOADED_CHECKPOINT = Query(None)
+MODEL_RELOADER = Depends(Provide[AppContainer.model_reloader])
+
+
+@admin_router.post("/reload")  # type: ignore
+@inject  # type: ignore
+async def reload_model(
+    model: ModelName = RELOADED_MODEL,
+    checkpoint: Optional[str] = RELOADED_CHECKPOINT,
+    reloader: ModelReloader = MODEL_RELOADER,
+):
+    """
+    Load, warm up and swap a model of this worker without dropping requests.
+
+    The new checkpoint is loaded in a worker thread while the current model keeps serving. The requests already
+    running finish on the old model, the following ones get the new one.
+
+    Args:
+        model (ModelName): The model to reload.
+        checkpoint (Optional[str]): The new checkpoint inside `hot_reload_weights_dir`, defaults to the configured one.
+        reloader (ModelReloader): The model reloader.
+
+    Returns:
+        dict: The model, checkpoint, sha256 and load time of the active model.
+
+    Raises:
+        HTTPException: 404 if reloading is disabled, 403 for a checkpoint outside of the weights directory, 409 if
+            a reload is running, 400 if the checkpoint fails to load.
+    """
+    if not app_settings.hot_reload_enabled:
+        raise HTTPException(status_code=HTTP_NOT_FOUND, detail="Model reload is disabled.")
+    try:
+        return await run_in_threadpool(reloader.reload, model.value, checkpoint)
+    except (CheckpointNotAllowedError, ReloadInProgressError) as exp:
+        raise HTTPException(status_code=REJECTION_STATUSES[type(exp)], detail=str(exp))
+    except (OSError, RuntimeError, ValueError) as exp:
+        raise HTTPException(status_code=HTTP_BAD_REQUEST, detail=f"Failed to reload {model.value}: {exp}")
@@ -0,0 +1,107 @@
+"""This module provides the debugging endpoints of a live worker."""
+
+from contextlib import ExitStack
+from enum import Enum
+from types import MappingProxyType
+from typing import Callable
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+
+from src.containers.containers import AppContainer
+from src.routes.routers import debug_router
+from src.settings import app_settings
+from src.utils.profiling import capture_python_profile, capture_torch_trace, profile_lock, write_profile
+from src.utils.slow_requests import SlowRequestLog
+
+HTTP_NOT_FOUND: int = 404
+HTTP_CONFLICT: int = 409
+HTTP_BAD_REQUEST: int = 400
+DEFAULT_PROFILE_SECONDS: float = 10
+DEBUG_DISABLED: str = "The debugging endpoints are disabled."
+SLOW_REQUESTS = Depends(Provide[AppContainer.slow_requests])
+
+
+class ProfileMode(str, Enum):  # noqa: WPS600
+    """Kinds of profiles."""
+
+    python = "python"
+    torch = "torch"
+
+
+PROFILE_FORMATS = MappingProxyType(
+    {
+        ProfileMode.python: ("text/plain", "folded"),
+        ProfileMode.torch: ("application/json", "json"),
+    },
+)
+PROFILE_SECONDS = Query(DEFAULT_PROFILE_SECONDS, gt=0)
+PROFILE_MODE = Query(ProfileMode.python)
+
+
+@debug_router.get("/profile")  # type: ignore
+async def profile(
+    seconds: float = PROFILE_SECONDS,
+    mode: ProfileMode = PROFILE_MODE,
+):
+    """
+    Profile this worker for the given number of seconds.
+
+    The python mode samples the stacks of all the threads and returns them in the folded stacks format. The torch
+    mode returns a Chrome trace of the model forwards run during the capture. Only one profile runs at a time.
+
+    Args:
+        seconds (float): Capture duration.
+        mode (ProfileMode): "python" for sampled stacks or "torch" for the torch profiler trace of the forwards.
+
+    Returns:
+        Response: The profile, or the path it was written to when `profile_output_dir` is set.
+
+    Raises:
+        HTTPException: 404 if the debugging endpoints are disabled, 400 for a too long capture, 409 if a profile
+            is running.
+    """
+    if not app_settings.profile_enabled:
+        raise HTTPException(status_code=HTTP_NOT_FOUND, detail=DEBUG_DISABLED)
+    if seconds > app_settings.profile_max_seconds:
+        raise HTTPException(
+            status_code=HTTP_BAD_REQUEST,
+            detail=f"Capture is limited to {app_settings.profile_max_seconds} seconds.",
+        )
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=HTTP_CONFLICT, detail="A profile is already running.")
+    with ExitStack() as capturing:
+        capturing.callback(profile_lock.release)
+        capture: Callable[[float], bytes] = capture_torch_trace
+        if mode == ProfileMode.python:
+            capture = capture_python_profile
+        artifact = await run_in_threadpool(capture, seconds)
+
+    media_type, extension = PROFILE_FORMATS[mode]
+    if not app_settings.profile_output_dir:
+        return Response(artifact, media_type=media_type)
+    return {"path": write_profile(artifact, app_settings.profile_output_dir, mode.value, extension)}
+
+
+@debug_router.get("/slow")  # type: ignore
+@inject  # type: ignore
+async def slow(slow_requests: SlowRequestLog = SLOW_REQUESTS):
+    """
+    List the recent requests of this worker that were slower than `slow_request_threshold`, the slowest first.
+
+    Every entry holds the endpoint, duration, status code, upload size, image dimensions, number of detected
+    barcodes, the wait until the endpoint started and the per-stage timings.
+
+    Args:
+        slow_requests (SlowRequestLog): The buffer of slow requests.
+
+    Returns:
+        dict: The threshold and the captured requests.
+
+    Raises:
+        HTTPException: 404 if the debugging endpoints are disabled.
+    """
+    if not app_settings.profile_enabled:
+        raise HTTPException(status_code=HTTP_NOT_FOUND, detail=DEBUG_DISABLED)
+    return {"threshold": slow_requests.threshold, "requests": slow_requests.entries()}
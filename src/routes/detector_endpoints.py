@@ -5,12 +5,15 @@ import base64
 import cv2
 import numpy as np
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, File
+from fastapi import Depends, File, Query
+from fastapi.responses import ORJSONResponse
 
 from src.containers.containers import AppContainer
 from src.routes.routers import detector_router
 from src.services.detector import SegTorchWrapper
 from src.utils.processing import prepare_bbox
+from src.utils.serialization import ResultFormat, barcode_columns
+from src.utils.timing import observe_barcodes, observe_image, stage, trace_request
 
 
 @detector_router.post("/predict_mask")  # type: ignore
@@ -32,17 +35,22 @@ def predict_mask(
     Returns:
         dict: A dictionary with the key 'objs' containing the sorted bboxes by confidence.
     """
-    img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
-    predicted_mask = service.predict_mask(img)
-    mask_bytes = predicted_mask.tobytes()
-    base64_encoded_mask = base64.b64encode(mask_bytes).decode("utf-8")
-    return {"base64_encoded_mask": base64_encoded_mask}
+    with trace_request("/detector/predict_mask"):
+        with stage("decode"):
+            img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+        observe_image(img)
+        predicted_mask = service.predict_mask(img)
+        with stage("serialize"):
+            mask_bytes = predicted_mask.tobytes()
+            base64_encoded_mask = base64.b64encode(mask_bytes).decode("utf-8")
+    return ORJSONResponse({"base64_encoded_mask": base64_encoded_mask})
 
 
 @detector_router.post("/predict_barcodes")  # type: ignore
 @inject  # type: ignore
 def predict_barcodes(
     image: bytes = File(),
+    result_format: ResultFormat = Query(ResultFormat.records, alias="format"),
     service: SegTorchWrapper = Depends(Provide[AppContainer.seg_model]),
 ):
     """
@@ -53,11 +61,21 @@ def predict_barcodes(
 
     Args:
         image (bytes): The image file in bytes to make predictions on.
+        result_format (ResultFormat): "records" for a dict per box, "columnar" for parallel arrays.
         service (SegTorchWrapper): The segmentation service to use for making predictions.
 
     Returns:
-        List[List[int]]: Predicted bounding boxes in COCO format.
+        ORJSONResponse: Predicted bounding boxes in MinMax format and their scores, the best scored first.
     """
-    img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
-    bboxes = service.predict(img)
-    return {"bboxes": [prepare_bbox(bbox) for bbox in bboxes]}
+    with trace_request("/detector/predict_barcodes"):
+        with stage("decode"):
+            img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+        observe_image(img)
+        scored = service.predict_scored(img)
+        observe_barcodes(len(scored))
+        with stage("serialize"):
+            if result_format == ResultFormat.columnar:
+                return ORJSONResponse(barcode_columns(scored))
+            bboxes = [prepare_bbox(bbox) for bbox, _ in scored]
+            scores = [score for _, score in scored]
+            return ORJSONResponse({"bboxes": bboxes, "scores": scores})
@@ -1,10 +1,16 @@
 """Health realted endpoints."""
 
-from fastapi import Response
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, Response
+from fastapi.responses import JSONResponse
 
+from src.containers.containers import AppContainer
 from src.routes.routers import health_router
+from src.settings import app_settings
+from src.utils.load import LoadMonitor
 
 AWESOME_RESPONSE: int = 200
+LOAD_MONITOR = Depends(Provide[AppContainer.load_monitor])
 
 
 @health_router.get("/health_checker")  # type: ignore
@@ -15,3 +21,24 @@ async def health_checker():
         Response: An HTTP response indicating the health status.
     """
     return Response(status_code=AWESOME_RESPONSE)
+
+
+@health_router.get("/load")  # type: ignore
+@inject  # type: ignore
+async def load(monitor: LoadMonitor = LOAD_MONITOR):
+    """Report the load of this worker for load balancing and outlier ejection.
+
+    The response holds the 0-1 saturation score, the queue depths of the scheduler and the pipeline, the running
+    requests, the model calls in flight and the recent p95 latency per model. It is cheap enough to poll every few
+    hundred milliseconds.
+
+    Args:
+        monitor (LoadMonitor): The load monitor of the worker.
+
+    Returns:
+        JSONResponse: The load snapshot, with `load_shed_status` instead of 200 from `load_shed_threshold` on.
+    """
+    snapshot = monitor.snapshot()
+    saturated = snapshot["saturation"] >= app_settings.load_shed_threshold
+    status = app_settings.load_shed_status if saturated else AWESOME_RESPONSE
+    return JSONResponse(snapshot, status_code=status)
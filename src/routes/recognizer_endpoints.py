@@ -1,17 +1,19 @@
 """This module provides the recognizer prediction endpoint for a inference service."""
 
-from typing import Dict
+import asyncio
 
 import cv2
 import numpy as np
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, File
+from fastapi import Depends, File, Query
+from fastapi.responses import ORJSONResponse
 
 from src.containers.containers import AppContainer
 from src.routes.routers import recognizer_router
-from src.services.detector import SegTorchWrapper
+from src.services.pipeline import RecognitionPipeline
 from src.services.recognizer import RecTorchWrapper
-from src.utils.processing import prepare_bbox
+from src.utils.serialization import ResultFormat, barcode_columns, barcode_records
+from src.utils.timing import observe_barcodes, observe_image, stage, trace_request
 
 
 @recognizer_router.post("/recognize_barcode")  # type: ignore
@@ -30,45 +32,58 @@ def recognize_barcode(
         service (RecTorchWrapper): The recognizer service to use for making predictions.
 
     Returns:
-        str: Predicted symbols.
+        ORJSONResponse: Predicted symbols.
     """
-    img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
-    return service.predict(img)
+    with trace_request("/recognizer/recognize_barcode"):
+        with stage("decode"):
+            img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+        observe_image(img)
+        return ORJSONResponse(service.predict(img))
 
 
 @recognizer_router.post("/recognize_image")  # type: ignore
 @inject  # type: ignore
-def recognize_image(
+async def recognize_image(
     image: bytes = File(),
-    recognizer_service: RecTorchWrapper = Depends(Provide[AppContainer.rec_model]),
-    detector_service: SegTorchWrapper = Depends(Provide[AppContainer.seg_model]),
+    result_format: ResultFormat = Query(ResultFormat.records, alias="format"),
+    pipeline: RecognitionPipeline = Depends(Provide[AppContainer.recognition_pipeline]),
 ):
     """
     Make a prediction on the given barcode image using the provided recognizer model.
 
-    This endpoint takes an barcode image file in by tes and uses the `RecTorchWrapper` service to make a prediction.
+    This endpoint takes an barcode image file in by tes and passes it through the detect, crop and recognize stages
+    of the `RecognitionPipeline`, which overlap across requests.
 
     Args:
         image (bytes): The image file in bytes to make predictions on.
-        recognizer_service (RecTorchWrapper): The recognizer service to use for making predictions.
-        detector_service (SegTorchWrapper): The segmentation service to use for making predictions.
+        result_format (ResultFormat): "records" for a dict per barcode, "columnar" for parallel arrays.
+        pipeline (RecognitionPipeline): The staged detector and recognizer pipeline.
+
+    Returns:
+        ORJSONResponse: The barcodes with their boxes, scores and predicted symbols.
+    """
+    with trace_request("/recognizer/recognize_image"):
+        img = await asyncio.to_thread(decode_image, image)
+        observe_image(img)
+        # submitting waits while the detector queue is full
+        future = await asyncio.to_thread(pipeline.submit, img)
+        scored, rec_values = await asyncio.wrap_future(future)
+        observe_barcodes(len(scored))
+        with stage("serialize"):
+            if result_format == ResultFormat.columnar:
+                return ORJSONResponse(barcode_columns(scored, rec_values))
+            return ORJSONResponse({"barcodes": barcode_records(scored, rec_values)})
+
+
+def decode_image(image: bytes) -> np.ndarray:
+    """
+    Decode an uploaded image.
+
+    Args:
+        image (bytes): The image file in bytes.
 
     Returns:
-        str: Predicted symbols.
+        np.ndarray: The BGR image.
     """
-    img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
-    bboxes = detector_service.predict(img)
-
-    preds: Dict[str, list] = {"barcodes": []}
-    for bbox in bboxes:
-        converted_bbox = prepare_bbox(bbox)
-        barcode = img[
-            converted_bbox["y_min"] : converted_bbox["y_max"],
-            converted_bbox["x_min"] : converted_bbox["x_max"],
-            :,
-        ]
-        rec_value = recognizer_service.predict(barcode)
-
-        preds["barcodes"].append({"bbox": converted_bbox, "value": rec_value})
-
-    return preds
+    with stage("decode"):
+        return cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
@@ -1,7 +1,11 @@
 """Routers."""
 
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
-detector_router = APIRouter()
-recognizer_router = APIRouter()
+detector_router = APIRouter(default_response_class=ORJSONResponse)
+recognizer_router = APIRouter(default_response_class=ORJSONResponse)
 health_router = APIRouter()
+stream_router = APIRouter()
+debug_router = APIRouter()
+admin_router = APIRouter()
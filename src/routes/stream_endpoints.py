@@ -0,0 +1,83 @@
+"""This module provides the video stream recognition endpoint for a inference service."""
+
+import asyncio
+from typing import Optional
+
+import cv2
+import numpy as np
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from src.containers.containers import AppContainer
+from src.routes.routers import stream_router
+from src.services.stream import QueuedFrame, StreamSession
+from src.utils.metrics import STREAM_FRAMES
+from src.utils.timing import stage, trace_request
+
+STREAM_SESSION = Depends(Provide[AppContainer.stream_session])
+
+
+async def _process_frames(
+    websocket: WebSocket,
+    session: StreamSession,
+    frames: "asyncio.Queue[QueuedFrame]",
+) -> None:
+    """
+    Process queued frames one by one and send the results back to the client.
+
+    Args:
+        websocket (WebSocket): The client connection.
+        session (StreamSession): The stream session holding the tracker state.
+        frames (asyncio.Queue[QueuedFrame]): Queue of the frames waiting for processing.
+    """
+    while websocket.application_state == WebSocketState.CONNECTED:
+        frame_idx, frame_bytes = await frames.get()
+        with trace_request("/stream/recognize_frames"):
+            with stage("decode"):
+                # the stubs miss that imdecode gives None for a broken frame
+                img: Optional[np.ndarray] = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                await websocket.send_json({"frame": frame_idx, "error": "Frame could not be decoded."})
+                continue
+            frame_result = await asyncio.to_thread(session.process, img)
+        STREAM_FRAMES.labels(outcome="processed").inc()
+        await websocket.send_json({"frame": frame_idx, **frame_result})
+
+
+@stream_router.websocket("/recognize_frames")
+@inject  # type: ignore
+async def recognize_frames(
+    websocket: WebSocket,
+    session: StreamSession = STREAM_SESSION,
+):
+    """
+    Recognize barcodes on a stream of encoded video frames.
+
+    The client sends each frame as a binary message and receives a JSON message per processed frame with
+    the tracked barcodes. Frames that arrive while `max_pending_frames` frames are already waiting evict the
+    oldest waiting frame, so a slow connection never builds an unbounded backlog.
+
+    Args:
+        websocket (WebSocket): The client connection.
+        session (StreamSession): The stream session holding the tracker state.
+    """
+    await websocket.accept()
+    frames: "asyncio.Queue[QueuedFrame]" = asyncio.Queue(maxsize=session.max_pending_frames)
+    worker = asyncio.create_task(_process_frames(websocket, session, frames))
+
+    frame_idx = 0
+    try:
+        while not worker.done():
+            frame_bytes = await websocket.receive_bytes()
+            if frames.full():
+                frames.get_nowait()
+                STREAM_FRAMES.labels(outcome="dropped").inc()
+            frames.put_nowait((frame_idx, frame_bytes))
+            frame_idx += 1
+    except WebSocketDisconnect:
+        return
+    finally:
+        worker.cancel()
+    # the worker stopped on its own, surface its error
+    worker.result()
@@ -0,0 +1,284 @@
+"""Recognition cache of the barcode crops keyed by the profile across their bars."""
+import random
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import torch
+from numpy.typing import NDArray
+
+from src.utils.metrics import REC_CACHE_LOOKUPS, REC_CACHE_SIZE, REC_CACHE_VERIFICATIONS
+
+CachedValues = List[Optional[str]]
+# modules of an EAN-13 or UPC-A barcode, the bars are sampled once per module
+PROFILE_BINS: int = 95
+
+
+def profile_bits(profile: NDArray[np.float32]) -> NDArray[np.uint8]:
+    """
+    Binarize the profile across the bars, resampled between the outermost bars.
+
+    Anchoring the samples to the outermost bars ignores where the barcode sits in the crop and how wide it is, and
+    the threshold halfway between the darkest and the brightest column ignores the brightness and the contrast.
+
+    Args:
+        profile (NDArray[np.float32]): The mean of every column of the crop.
+
+    Returns:
+        NDArray[np.uint8]: The PROFILE_BINS samples, 1 on a bar.
+    """
+    threshold = (profile.min() + profile.max()) / 2
+    bars = np.flatnonzero(profile < threshold)
+    if not bars.size:
+        return np.zeros(PROFILE_BINS, dtype=np.uint8)
+    samples = np.linspace(bars[0], bars[-1], PROFILE_BINS)
+    resampled = np.interp(samples, np.arange(len(profile)), profile)
+    return (resampled < threshold).astype(np.uint8)
+
+
+def content_hash(batch: torch.Tensor) -> NDArray[np.uint8]:
+    """
+    Hash every image of a preprocessed batch by the profile across its bars.
+
+    Every crop is averaged over the channels and the rows, and the profile is binarized once per bar module, so a
+    shifted, rescaled or noisy crop of the same barcode keeps its hash, and barcodes differing in a single digit
+    differ in at least 4 bits.
+
+    Args:
+        batch (torch.Tensor): The batch of normalized crops.
+
+    Returns:
+        NDArray[np.uint8]: The packed bits, a row of PROFILE_BINS bits per image.
+    """
+    crops = batch.cpu().numpy()
+    profiles = crops.mean(axis=(1, 2), dtype=np.float32)
+    bits = np.stack([profile_bits(profile) for profile in profiles])
+    return np.packbits(bits, axis=1)
+
+
+def content_keys(batch: torch.Tensor) -> List[bytes]:
+    """
+    Get the cache keys of a preprocessed batch.
+
+    Args:
+        batch (torch.Tensor): The batch of normalized crops.
+
+    Returns:
+        List[bytes]: The packed content hash of every crop.
+    """
+    return [row.tobytes() for row in content_hash(batch)]
+
+
+def key_distance(key: bytes, other: bytes) -> int:
+    """
+    Count the differing bits of two keys.
+
+    Args:
+        key (bytes): A key.
+        other (bytes): Another key of the same length.
+
+    Returns:
+        int: The Hamming distance.
+    """
+    differing = int.from_bytes(key, "big") ^ int.from_bytes(other, "big")
+    return bin(differing).count("1")
+
+
+class NeighbourIndex:
+    """
+    Multi-index hashing of the keys, to find a key within `tolerance` bits without comparing it with every key.
+
+    Every key is split into `tolerance + 1` segments and indexed by each of them. Two keys differing in at most
+    `tolerance` bits share at least one identical segment, so only the keys sharing a segment are compared.
+
+    Args:
+        tolerance (int): Maximum number of differing bits of a neighbour.
+    """
+
+    def __init__(self, tolerance: int):
+        """
+        Initialize an empty index.
+
+        Args:
+            tolerance (int): Maximum number of differing bits of a neighbour.
+        """
+        self.tolerance = tolerance
+        self._buckets: Dict[Tuple[int, bytes], Set[bytes]] = defaultdict(set)
+
+    def add(self, key: bytes) -> None:
+        """
+        Index a key.
+
+        Args:
+            key (bytes): The key.
+        """
+        for segment in self._segments(key):
+            self._buckets[segment].add(key)
+
+    def remove(self, key: bytes) -> None:
+        """
+        Remove a key from the index.
+
+        Args:
+            key (bytes): The indexed key.
+        """
+        for segment in self._segments(key):
+            bucket = self._buckets[segment]
+            bucket.discard(key)
+            if not bucket:
+                self._buckets.pop(segment)
+
+    def nearest(self, key: bytes) -> Optional[bytes]:
+        """
+        Find the indexed key differing from a key in the fewest bits, within the tolerance.
+
+        Args:
+            key (bytes): The key.
+
+        Returns:
+            Optional[bytes]: The nearest indexed key, None if none is within the tolerance.
+        """
+        candidates: Set[bytes] = set()
+        for segment in self._segments(key):
+            candidates.update(self._buckets.get(segment, ()))
+        nearest = None
+        nearest_distance = self.tolerance + 1
+        for candidate in candidates:
+            distance = key_distance(key, candidate)
+            if distance < nearest_distance:
+                nearest, nearest_distance = candidate, distance
+        return nearest
+
+    def _segments(self, key: bytes) -> List[Tuple[int, bytes]]:
+        """
+        Split a key into the indexed segments.
+
+        Args:
+            key (bytes): The key.
+
+        Returns:
+            List[Tuple[int, bytes]]: The position and bytes of every segment.
+        """
+        key_bytes = np.frombuffer(key, dtype=np.uint8)
+        segments = np.array_split(key_bytes, self.tolerance + 1)
+        return [(position, segment.tobytes()) for position, segment in enumerate(segments)]
+
+
+class CropCache:
+    """
+    Bounded LRU cache of the recognized values of the crops.
+
+    The crops are keyed by the profile across their bars, so the same barcode is found again on the next frame or
+    another photo, even though the crop is shifted or rescaled and the surrounding image differs. A crop matches a
+    cached one if their keys differ in at most `tolerance` bits, found through a `NeighbourIndex` of the cached keys.
+    A `verify_rate` share of the hits is recognized anyway and compared with the cached value, which measures how
+    often the cache answers wrong, and the fresh value is cached for the crop.
+
+    Thread-safe.
+
+    Args:
+        size (int): Maximum number of cached crops.
+        tolerance (int): Maximum number of differing bits of a hit, 0 for identical keys only.
+        verify_rate (float): Share of the hits checked against a fresh forward.
+    """
+
+    def __init__(self, size: int, tolerance: int = 0, verify_rate: float = 0):
+        """
+        Initialize an empty cache.
+
+        Args:
+            size (int): Maximum number of cached crops.
+            tolerance (int): Maximum number of differing bits of a hit, 0 for identical keys only.
+            verify_rate (float): Share of the hits checked against a fresh forward.
+        """
+        self.size = size
+        self.tolerance = tolerance
+        self.verify_rate = verify_rate
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self._index = NeighbourIndex(tolerance) if tolerance else None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Get the number of cached crops.
+
+        Returns:
+            int: The cache size.
+        """
+        return len(self._entries)
+
+    def lookup(self, keys: List[bytes]) -> CachedValues:
+        """
+        Find the cached values of the crops.
+
+        Args:
+            keys (List[bytes]): The keys of the crops.
+
+        Returns:
+            CachedValues: The cached value of every crop, None on a miss.
+        """
+        with self._lock:
+            cached = [self._match(key) for key in keys]
+        hits = sum(rec_value is not None for rec_value in cached)
+        misses = len(cached) - hits
+        if hits:
+            REC_CACHE_LOOKUPS.labels(result="hit").inc(hits)
+        if misses:
+            REC_CACHE_LOOKUPS.labels(result="miss").inc(misses)
+        return cached
+
+    def should_verify(self) -> bool:
+        """
+        Draw whether a hit is checked against a fresh forward.
+
+        Returns:
+            bool: True for the sampled hits.
+        """
+        return random.random() < self.verify_rate  # noqa: S311
+
+    def verify(self, cached: str, fresh: str) -> None:
+        """
+        Count a sampled hit as agreeing or not with the fresh value.
+
+        Args:
+            cached (str): The cached value.
+            fresh (str): The value of the fresh forward.
+        """
+        REC_CACHE_VERIFICATIONS.labels(result="agree" if cached == fresh else "disagree").inc()
+
+    def store(self, key: bytes, rec_value: str) -> None:
+        """
+        Cache the value of a crop, evicting the least recently used ones.
+
+        Args:
+            key (bytes): The key of the crop.
+            rec_value (str): The recognized value.
+        """
+        with self._lock:
+            if self._index is not None and key not in self._entries:
+                self._index.add(key)
+            self._entries[key] = rec_value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                evicted, _ = self._entries.popitem(last=False)
+                if self._index is not None:
+                    self._index.remove(evicted)
+            REC_CACHE_SIZE.set(len(self._entries))
+
+    def _match(self, key: bytes) -> Optional[str]:
+        """
+        Find the entry of a key, the nearest one within the tolerance. Must be called under the lock.
+
+        Args:
+            key (bytes): The key of the crop.
+
+        Returns:
+            Optional[str]: The cached value, None on a miss.
+        """
+        if key not in self._entries and self._index is not None:
+            key = self._index.nearest(key) or key
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
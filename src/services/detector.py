@@ -1,15 +1,118 @@
 """Detector model wrappers."""
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import torch
-from numpy.typing import NDArray
-from scipy.ndimage import label
+from loguru import logger
 
 from src.services.base import ModelWrapper
-from src.utils.processing import preprocess_image, resize_mask_back_to_original
+from src.services.optimization import InferenceOptimizer
+from src.services.selection import ComponentSelector, ScoredBox
+from src.services.tiling import CoarseToFineTiler, Image, ProbabilityMap
+from src.utils.load import inference_tracker
+from src.utils.metrics import DETECTOR_BUCKET_LATENCY, DETECTOR_PADDING_RATIO
+from src.utils.processing import padding_ratio, preprocess_image, resize_mask_back_to_original, select_bucket
+from src.utils.timing import stage
 
-SCALE: int = 255
+THRESHOLD: float = 0.5
+MODEL_NAME: str = "segmentation_model"
+DEFAULT_INPUT_BUCKETS = ((224, 224),)
+WARMUP_RUNS: int = 2
+
+# (height, width) of a model input shape
+Bucket = Tuple[int, int]
+# bounding box in COCO format [x_min, y_min, width, height]
+BBox = List[int]
+
+
+def bucket_label(bucket: Tuple[int, ...]) -> str:
+    """
+    Get the metrics label of an input bucket.
+
+    Args:
+        bucket (Tuple[int, ...]): The (height, width) of the bucket.
+
+    Returns:
+        str: The "HxW" label.
+    """
+    return f"{bucket[0]}x{bucket[1]}"
+
+
+def unsupported_reason(optimizer: InferenceOptimizer, model: torch.nn.Module, batch: torch.Tensor) -> str:
+    """
+    Warm the model up on a batch and check that the mask keeps the aspect ratio of the input.
+
+    Args:
+        optimizer (InferenceOptimizer): The optimizations the model runs with.
+        model (torch.nn.Module): The model.
+        batch (torch.Tensor): A batch of the input bucket shape.
+
+    Returns:
+        str: Why the model does not support the input shape, empty if it does.
+    """
+    try:
+        for _ in range(WARMUP_RUNS):
+            output = optimizer.forward(model, batch)
+    except RuntimeError as exp:
+        return str(exp)
+    mask_height, mask_width = output.shape[-2:]
+    if mask_height * batch.shape[-1] != mask_width * batch.shape[-2]:
+        return f"the mask is {mask_height}x{mask_width}"
+    return ""
+
+
+def forward_probabilities(
+    optimizer: InferenceOptimizer,
+    model: torch.nn.Module,
+    batch: torch.Tensor,
+    initial_shapes: Sequence[Tuple[int, ...]],
+) -> List[ProbabilityMap]:
+    """
+    Run the model on a preprocessed batch and resize the probability maps back to the images.
+
+    Args:
+        optimizer (InferenceOptimizer): The optimizations the model runs with.
+        model (torch.nn.Module): The model.
+        batch (torch.Tensor): The batch built with `preprocess_image`.
+        initial_shapes (Sequence[Tuple[int, ...]]): The (height, width) of every original image.
+
+    Returns:
+        List[ProbabilityMap]: The probability map of every image in the image resolution.
+    """
+    latency = DETECTOR_BUCKET_LATENCY.labels(bucket=bucket_label(batch.shape[-2:]))
+    with latency.time():
+        with stage("seg_forward"):
+            output_data = optimizer.forward(model, batch).sigmoid().cpu().numpy()
+
+    probabilities = []
+    for image_probabilities, intial_shape in zip(output_data, initial_shapes):
+        with stage("mask_resize"):
+            resized = resize_mask_back_to_original(image_probabilities.squeeze(), intial_shape)  # type: ignore
+        probabilities.append(resized)
+    return probabilities
+
+
+def forward_crops(
+    optimizer: InferenceOptimizer,
+    model: torch.nn.Module,
+    bucket: Bucket,
+    crops: List[Image],
+) -> List[ProbabilityMap]:
+    """
+    Letterbox image crops into an input bucket and run the model on them in one forward.
+
+    Args:
+        optimizer (InferenceOptimizer): The optimizations the model runs with.
+        model (torch.nn.Module): The model.
+        bucket (Bucket): The (height, width) input shape.
+        crops (List[Image]): The crops.
+
+    Returns:
+        List[ProbabilityMap]: The probability map of every crop in the crop resolution.
+    """
+    with stage("seg_tile_preprocess"):
+        batch = torch.cat([preprocess_image(crop, bucket) for crop in crops])
+    return forward_probabilities(optimizer, model, batch, [crop.shape[:2] for crop in crops])
 
 
 class SegTorchWrapper(ModelWrapper):
@@ -19,57 +122,89 @@ class SegTorchWrapper(ModelWrapper):
     This class is used to load a PyTorch model from a given checkpoint path and
     perform predictions on the given input data on the specified device.
 
+    Every image is letterboxed into the input bucket, a (height, width) input shape, with the least padding, and the
+    images of a batch are run in one forward per bucket. Each bucket is warmed up on load, so the TorchScript
+    executor specializes for all of them before the first request.
+
+    With `tiling`, the large images are refined coarse-to-fine: the tiles where the full image mask shows activity
+    are run at a higher resolution in one batched forward, see `CoarseToFineTiler`.
+
     Attributes:
         model (torch.jit.ScriptModule): The loaded PyTorch model.
-        device (str): The device on which the model will be run.
+        input_buckets (List[Bucket]): The input shapes supported by the model.
 
     Args:
         checkpoint (str): The path to the PyTorch model checkpoint.
         device (str): The device to run the model on. Defaults to "cpu".
+        threshold (float): The probability threshold of the mask. Defaults to 0.5.
+        optimization (Optional[Dict[str, Any]]): Keyword arguments of the `InferenceOptimizer`.
+        input_buckets (Optional[Sequence[Bucket]]): The (height, width) input shapes. Defaults to 224x224.
+        selection (Optional[Dict[str, Any]]): Keyword arguments of the `ComponentSelector`.
+        tiling (Optional[Dict[str, Any]]): Keyword arguments of the `CoarseToFineTiler`, None disables tiling.
     """
 
-    def __init__(self, checkpoint: str, device: str = "cpu"):
+    def __init__(  # noqa: WPS211
+        self,
+        checkpoint: str,
+        device: str = "cpu",
+        threshold: float = THRESHOLD,
+        optimization: Optional[Dict[str, Any]] = None,
+        input_buckets: Optional[Sequence[Bucket]] = None,
+        selection: Optional[Dict[str, Any]] = None,
+        tiling: Optional[Dict[str, Any]] = None,
+    ):
         """
         Initialize the SegTorchWrapper class by loading the model and moving it to the specified device.
 
         Args:
             checkpoint (str): The path to the PyTorch model checkpoint.
             device (str): The device to run the model on. Defaults to "cpu".
+            threshold (float): The probability threshold of the mask. Defaults to 0.5.
+            optimization (Optional[Dict[str, Any]]): Keyword arguments of the `InferenceOptimizer`. Defaults to None.
+            input_buckets (Optional[Sequence[Bucket]]): The (height, width) input shapes. Defaults to 224x224.
+            selection (Optional[Dict[str, Any]]): Keyword arguments of the `ComponentSelector`. Defaults to None.
+            tiling (Optional[Dict[str, Any]]): Keyword arguments of the `CoarseToFineTiler`. Defaults to None.
         """
-        self.device = device
-        self.model = torch.jit.load(checkpoint, map_location=device)  # type: ignore
-        self.model.eval()
+        self.threshold = threshold
+        self.optimizer = InferenceOptimizer(**(optimization or {}))
+        self.selector = ComponentSelector(**(selection or {}))
+        self.model = self.optimizer.load(checkpoint, device)
+        buckets = input_buckets or DEFAULT_INPUT_BUCKETS
+        self.input_buckets = self.warmup([(int(height), int(width)) for height, width in buckets], device)
+        self.tiler = CoarseToFineTiler(**tiling) if tiling and tiling.get("min_side") else None
 
-    @staticmethod
-    def masks_to_bboxes(mask: NDArray[np.uint8]) -> List[List[int]]:
+    def warmup(self, buckets: List[Bucket], device: str) -> List[Bucket]:
         """
-        Convert a binary mask with potentially multiple objects to a list of bounding boxes in COCO format.
+        Run the model on every input bucket, dropping the ones it does not support, and load the postprocessing.
+
+        scipy is imported on first use to keep the app import fast, so an empty probability map is selected here
+        for the first request not to pay the import.
 
         Args:
-            mask (NDArray[np.uint8]): A binary mask where objects' pixels are 1 and the background is 0.
+            buckets (List[Bucket]): The (height, width) input shapes.
+            device (str): The device the model runs on.
 
         Returns:
-            List[List[int]]: A list of bounding boxes, each in the format [x_min, y_min, width, height].
-        """
-        # Label different components (barcodes)
-        labeled_array, num_features = label(mask)
-
-        bboxes = []
-        for barcode_label in range(1, num_features + 1):
-            # Find the bounding box for each labeled component
-            barcode_mask = labeled_array == barcode_label
-            rows = np.any(barcode_mask, axis=1)
-            cols = np.any(barcode_mask, axis=0)
-            y_min, y_max = np.where(rows)[0][[0, -1]]
-            x_min, x_max = np.where(cols)[0][[0, -1]]
+            List[Bucket]: The buckets giving a mask with the aspect ratio of the input.
 
-            bbox_width = x_max - x_min + 1
-            bbox_height = y_max - y_min + 1
-
-            bboxes.append([int(x_min), int(y_min), int(bbox_width), int(bbox_height)])
-        return bboxes
+        Raises:
+            ValueError: If the model supports none of the buckets.
+        """
+        supported = []
+        for bucket in buckets:
+            batch = torch.zeros(1, 3, *bucket, device=device)
+            reason = unsupported_reason(self.optimizer, self.model, batch)
+            if reason:
+                label = bucket_label(bucket)
+                logger.warning(f"Dropping the detector input bucket {label}: {reason}")
+            else:
+                supported.append(bucket)
+        if not supported:
+            raise ValueError(f"The detector supports none of the input buckets {buckets}")
+        self.selector.select(np.zeros(supported[0], dtype=np.float32), self.threshold)
+        return supported
 
-    def predict_mask(self, input_data: NDArray[np.uint8]) -> NDArray[np.float32]:
+    def predict_mask(self, input_data: Image) -> ProbabilityMap:
         """
         Perform prediction on the given input data.
 
@@ -78,22 +213,25 @@ class SegTorchWrapper(ModelWrapper):
         a numpy array before being returned.
 
         Args:
-            input_data (np.ndarray): The input data as a numpy array.
+            input_data (Image): The input data as a numpy array.
 
         Returns:
-            np.ndarray: The output data as a numpy array.
+            ProbabilityMap: The output data as a numpy array.
         """
-        batch = preprocess_image(input_data)
         intial_shape = input_data.shape[:2]
+        with stage("seg_preprocess"):
+            batch = preprocess_image(input_data, select_bucket(intial_shape, self.input_buckets))
 
-        with torch.no_grad():
-            output_data = self.model(batch).cpu().numpy()
-            output_data = output_data.squeeze()
+        with inference_tracker.track(MODEL_NAME):
+            with stage("seg_forward"):
+                output_data = self.optimizer.forward(self.model, batch).cpu().numpy()
+        output_data = output_data.squeeze()
+        with stage("mask_resize"):
             output_data = resize_mask_back_to_original(output_data, intial_shape)  # type: ignore
 
         return output_data
 
-    def predict(self, input_data: NDArray[np.uint8]) -> List[List[int]]:
+    def predict(self, input_data: Image) -> List[List[int]]:
         """
         Perform prediction on the given input data and postprocess it.
 
@@ -101,17 +239,87 @@ class SegTorchWrapper(ModelWrapper):
         and performs inference using the loaded model. The output is then postprocessed to get the bounding boxes
 
         Args:
-            input_data (np.ndarray): The input data as a numpy array.
+            input_data (Image): The input data as a numpy array.
 
         Returns:
-            List[List[int]]: Predicted bounding boxes in COCO format.
+            List[List[int]]: Predicted bounding boxes in COCO format, the best scored first.
         """
-        batch = preprocess_image(input_data)
-        intial_shape = input_data.shape[:2]
+        return [bbox for bbox, _ in self.predict_scored(input_data)]
 
-        with torch.no_grad():
-            output_data = self.model(batch).sigmoid().cpu().numpy()
-            output_data = (output_data > self.threshold).astype(np.uint8) * SCALE
-            output_data = output_data.squeeze()
-            output_data = resize_mask_back_to_original(output_data, intial_shape)  # type: ignore
-        return self.masks_to_bboxes(output_data)
+    def predict_scored(self, input_data: Image) -> List[ScoredBox]:
+        """
+        Perform prediction on the given input data and keep the component scores.
+
+        Args:
+            input_data (Image): The input data as a numpy array.
+
+        Returns:
+            List[ScoredBox]: Predicted bounding boxes in COCO format with their mean probability, the best first.
+        """
+        return self.predict_batch_scored([input_data])[0]
+
+    def predict_batch_scored(self, images: List[Image]) -> List[List[ScoredBox]]:
+        """
+        Perform prediction on several images with a single forward pass per input bucket, keeping the scores.
+
+        Args:
+            images (List[Image]): The input images.
+
+        Returns:
+            List[List[ScoredBox]]: Predicted bounding boxes in COCO format with their scores for every image.
+        """
+        groups: Dict[Bucket, List[int]] = {}
+        for image_index, image in enumerate(images):
+            image_bucket = select_bucket(image.shape[:2], self.input_buckets)
+            groups.setdefault(image_bucket, []).append(image_index)
+
+        scored: List[List[ScoredBox]] = [[] for _ in images]
+        for bucket, indices in groups.items():
+            bucket_images = [images[member] for member in indices]
+            shapes = [bucket_image.shape[:2] for bucket_image in bucket_images]
+            padding = DETECTOR_PADDING_RATIO.labels(bucket=bucket_label(bucket))
+            for shape in shapes:
+                padding.observe(padding_ratio(shape, bucket))
+            with stage("seg_preprocess"):
+                batch = torch.cat([preprocess_image(bucket_image, bucket) for bucket_image in bucket_images])
+            bucket_scored = self.predict_preprocessed_scored(batch, shapes, bucket_images)
+            for member, image_scored in zip(indices, bucket_scored):
+                scored[member] = image_scored
+        return scored
+
+    def predict_preprocessed_scored(
+        self,
+        batch: torch.Tensor,
+        initial_shapes: Sequence[Tuple[int, ...]],
+        images: Optional[Sequence[Image]] = None,
+    ) -> List[List[ScoredBox]]:
+        """
+        Perform prediction on an already preprocessed batch and select the scored components.
+
+        The probability maps are resized back to the images before thresholding, which gives the same masks as
+        thresholding first, and keeps the probabilities for scoring.
+
+        Args:
+            batch (torch.Tensor): The batch built with `preprocess_image`.
+            initial_shapes (Sequence[Tuple[int, ...]]): The (height, width) of every original image.
+            images (Optional[Sequence[Image]]): The original images to refine the large ones with. Defaults to None.
+
+        Returns:
+            List[List[ScoredBox]]: Predicted bounding boxes in COCO format with their scores for every image.
+        """
+        with inference_tracker.track(MODEL_NAME):
+            probabilities = forward_probabilities(self.optimizer, self.model, batch, initial_shapes)
+            if self.tiler is not None and images is not None:
+                tile_shape = (self.tiler.tile_size, self.tiler.tile_size)
+                bucket = select_bucket(tile_shape, self.input_buckets)
+                probabilities = self.tiler.refine(
+                    images,
+                    probabilities,
+                    lambda crops: forward_crops(self.optimizer, self.model, bucket, crops),
+                )
+
+            scored = []
+            for image_probabilities in probabilities:
+                with stage("bbox_extraction"):
+                    scored.append(self.selector.select(image_probabilities, self.threshold))
+        return scored
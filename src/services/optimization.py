@@ -0,0 +1,220 @@
+"""Inference optimizations of the TorchScript models."""
+import hashlib
+import os
+from contextlib import ExitStack
+from functools import partial
+from typing import Optional
+
+import torch
+from loguru import logger
+
+from src.utils.profiling import forward_profile
+
+# 1 MiB
+HASH_CHUNK_SIZE: int = 1048576
+CACHE_KEY_LENGTH: int = 16
+CHECK_SEED: int = 0
+
+
+def file_sha256(path: str) -> str:
+    """
+    Hash a file.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str: The hex sha256 of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as checkpoint_file:
+        for chunk in iter(partial(checkpoint_file.read, HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InferenceOptimizer:
+    """
+    Configurable optimization pipeline of a TorchScript model.
+
+    With `freeze` the loaded model is frozen and passed through `torch.jit.optimize_for_inference`, which folds
+    conv-bn and inlines the weights. The frozen model is cached on disk under the checkpoint hash, so only the
+    first start pays for freezing. The graph optimized for inference cannot be loaded back, so it is rebuilt from
+    the frozen model on every start. `channels_last` converts the input batches to the channels last memory format and
+    `bf16` runs the forward under bfloat16 autocast on CPU.
+
+    On load, the optimized model is checked against the plain one on a random batch and replaced by it when the
+    outputs differ by more than `tolerance`.
+
+    Args:
+        freeze (bool): Freeze and optimize the graph.
+        channels_last (bool): Use the channels last memory format for the inputs.
+        bf16 (bool): Run the forward under bfloat16 autocast on CPU.
+        cache_dir (str): Directory of the frozen artifacts, empty to freeze on every start.
+        tolerance (float): Relative and absolute tolerance of the startup self-check.
+        input_size (int): Height and width of the self-check batch.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        freeze: bool = False,
+        channels_last: bool = False,
+        bf16: bool = False,
+        cache_dir: str = "",
+        tolerance: float = 1e-3,
+        input_size: int = 224,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            freeze (bool): Freeze and optimize the graph.
+            channels_last (bool): Use the channels last memory format for the inputs.
+            bf16 (bool): Run the forward under bfloat16 autocast on CPU.
+            cache_dir (str): Directory of the frozen artifacts, empty to freeze on every start.
+            tolerance (float): Relative and absolute tolerance of the startup self-check.
+            input_size (int): Height and width of the self-check batch.
+        """
+        self.freeze = freeze
+        self.channels_last = channels_last
+        self.bf16 = bf16
+        self.cache_dir = cache_dir
+        self.tolerance = tolerance
+        self.input_size = input_size
+
+    def cache_path(self, checkpoint: str, device: str) -> str:
+        """
+        Get the path of the frozen artifact of a checkpoint.
+
+        Args:
+            checkpoint (str): The checkpoint path.
+            device (str): The device the model is loaded on.
+
+        Returns:
+            str: The artifact path, unique per checkpoint contents, device and torch version.
+        """
+        key_parts = (file_sha256(checkpoint), device, torch.__version__)
+        digest = hashlib.sha256(":".join(key_parts).encode()).hexdigest()
+        key = digest[:CACHE_KEY_LENGTH]
+        name = os.path.splitext(os.path.basename(checkpoint))[0]
+        file_name = f"{name}-{key}.pt"
+        return os.path.join(self.cache_dir, file_name)
+
+    def _frozen(self, model: torch.nn.Module, checkpoint: str, device: str) -> torch.nn.Module:
+        """
+        Freeze the model, or load the cached frozen model, and optimize it for inference.
+
+        Args:
+            model (torch.nn.Module): The plain model in eval mode.
+            checkpoint (str): The checkpoint path.
+            device (str): The device the model is loaded on.
+
+        Returns:
+            torch.nn.Module: The optimized model.
+        """
+        path = self.cache_path(checkpoint, device) if self.cache_dir else ""
+        if path and os.path.exists(path):
+            frozen = torch.jit.load(path, map_location=device)  # type: ignore
+        else:
+            frozen = torch.jit.freeze(model)  # type: ignore
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                torch.jit.save(frozen, tmp_path)  # type: ignore
+                os.replace(tmp_path, path)
+        return torch.jit.optimize_for_inference(frozen)  # type: ignore
+
+    def forward(self, model: torch.nn.Module, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Run the model without autograd, with the configured memory format and precision.
+
+        The forward is recorded when a torch trace is being captured.
+
+        Args:
+            model (torch.nn.Module): The model.
+            batch (torch.Tensor): The input batch.
+
+        Returns:
+            torch.Tensor: The float32 output.
+        """
+        if self.channels_last:
+            batch = batch.contiguous(memory_format=torch.channels_last)
+        with ExitStack() as forward:
+            forward.enter_context(torch.inference_mode())
+            forward.enter_context(forward_profile())
+            if self.bf16:
+                forward.enter_context(torch.autocast("cpu", dtype=torch.bfloat16))  # type: ignore
+            output = model(batch)
+        return output.float()
+
+    def _self_check(self, baseline: torch.nn.Module, optimized: torch.nn.Module, device: str) -> bool:
+        """
+        Compare the optimized model with the plain one on a random batch.
+
+        Args:
+            baseline (torch.nn.Module): The plain model.
+            optimized (torch.nn.Module): The optimized model.
+            device (str): The device the models are loaded on.
+
+        Returns:
+            bool: True if the outputs match within the tolerance.
+        """
+        generator = torch.Generator().manual_seed(CHECK_SEED)
+        shape = (1, 3, self.input_size, self.input_size)
+        batch = torch.rand(shape, generator=generator).to(device)
+        with torch.inference_mode():
+            expected = baseline(batch)
+            actual = self.forward(optimized, batch)
+        return torch.allclose(actual, expected, rtol=self.tolerance, atol=self.tolerance)
+
+    def load(self, checkpoint: str, device: str) -> torch.nn.Module:
+        """
+        Load the checkpoint and apply the optimizations that pass the self-check.
+
+        Args:
+            checkpoint (str): The checkpoint path.
+            device (str): The device to load the model on.
+
+        Returns:
+            torch.nn.Module: The model to run with `forward`.
+        """
+        model = torch.jit.load(checkpoint, map_location=device)  # type: ignore
+        model.eval()
+        if not (self.freeze or self.channels_last or self.bf16):
+            return model
+
+        try:
+            optimized = self._checked(model, checkpoint, device)
+        except RuntimeError as exp:
+            logger.error(f"Optimizing {checkpoint} failed: {exp}")
+            optimized = None
+        if optimized is not None:
+            return optimized
+        logger.error(f"Falling back to the original {checkpoint}")
+        self.freeze = False
+        self.channels_last = False
+        self.bf16 = False
+        return model
+
+    def _checked(
+        self,
+        model: torch.nn.Module,
+        checkpoint: str,
+        device: str,
+    ) -> Optional[torch.nn.Module]:
+        """
+        Optimize the model and run the self-check.
+
+        Args:
+            model (torch.nn.Module): The plain model in eval mode.
+            checkpoint (str): The checkpoint path.
+            device (str): The device the model is loaded on.
+
+        Returns:
+            Optional[torch.nn.Module]: The optimized model, None if it fails the self-check.
+        """
+        optimized = self._frozen(model, checkpoint, device) if self.freeze else model
+        if self._self_check(model, optimized, device):
+            return optimized
+        logger.warning(f"Optimized {checkpoint} does not match the original within {self.tolerance}")
+        return None
@@ -0,0 +1,323 @@
+"""Staged detect, crop and recognize pipeline with a worker pool per stage."""
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import torch
+
+from src.services.selection import ScoredBox
+from src.services.tiling import Image
+from src.utils.metrics import PIPELINE_BUSY, PIPELINE_QUEUE_DEPTH, PIPELINE_QUEUE_WAIT, PIPELINE_WORKERS
+from src.utils.regions import crop_regions
+from src.utils.timing import stage
+
+STAGE_NAMES = ("detect", "crop", "recognize")
+DEFAULT_WORKERS: int = 1
+DEFAULT_QUEUE_SIZE: int = 8
+
+Detected = Tuple[Image, List[ScoredBox]]
+Crops = Tuple[List[ScoredBox], torch.Tensor]
+Recognized = Tuple[List[ScoredBox], List[str]]
+StageOptions = Mapping[str, Mapping[str, int]]
+
+
+class PipelineJob:
+    """
+    A request moving through the pipeline stages.
+
+    Args:
+        payload (Any): The input of the next stage.
+    """
+
+    __slots__ = ("payload", "future", "context", "enqueued")
+
+    def __init__(self, payload: Any):
+        """
+        Initialize the job in the context of the caller, so the stage timings land in the request trace.
+
+        Args:
+            payload (Any): The input of the first stage.
+        """
+        self.payload = payload
+        self.future: "Future[Any]" = Future()
+        self.context = contextvars.copy_context()
+        self.enqueued = time.perf_counter()
+
+
+class PipelineStage:
+    """
+    A bounded queue drained by a pool of worker threads.
+
+    Every worker takes a job, runs the step on its payload and hands the result to the next stage, or resolves
+    the job future in the last stage. A job cancelled while waiting for the first stage is dropped. A full queue
+    blocks the previous stage, so a slow stage slows the intake instead of piling up images in memory.
+
+    Args:
+        name (str): The stage name used in the metrics.
+        step (Callable[[Any], Any]): Maps the payload of a job to the input of the next stage.
+        workers (int): Number of worker threads.
+        queue_size (int): Maximum number of jobs waiting for the stage.
+        next_stage (Optional[PipelineStage]): The following stage, None for the last one.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        name: str,
+        step: Callable[[Any], Any],
+        workers: int,
+        queue_size: int,
+        next_stage: Optional["PipelineStage"] = None,
+    ):
+        """
+        Initialize the stage.
+
+        Args:
+            name (str): The stage name used in the metrics.
+            step (Callable[[Any], Any]): Maps the payload of a job to the input of the next stage.
+            workers (int): Number of worker threads.
+            queue_size (int): Maximum number of jobs waiting for the stage.
+            next_stage (Optional[PipelineStage]): The following stage, None for the last one.
+        """
+        self.name = name
+        self.step = step
+        self.workers = workers
+        self.next_stage = next_stage
+        self._queue: "queue.Queue[Optional[PipelineJob]]" = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._busy = PIPELINE_BUSY.labels(stage=name)
+        self._depth = PIPELINE_QUEUE_DEPTH.labels(stage=name)
+        self._wait = PIPELINE_QUEUE_WAIT.labels(stage=name)
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        for index in range(self.workers):
+            thread_name = f"pipeline-{self.name}-{index}"
+            thread = threading.Thread(target=self._work_loop, name=thread_name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        PIPELINE_WORKERS.labels(stage=self.name).set(self.workers)
+
+    @property
+    def depth(self) -> int:
+        """
+        Get the number of waiting jobs.
+
+        Returns:
+            int: The queue length.
+        """
+        return self._queue.qsize()
+
+    def put(self, job: PipelineJob) -> None:
+        """
+        Enqueue a job, waiting while the queue is full.
+
+        Args:
+            job (PipelineJob): The job.
+        """
+        job.enqueued = time.perf_counter()
+        self._queue.put(job)
+        self._depth.set(self._queue.qsize())
+
+    def close(self) -> None:
+        """Let the workers finish the queued jobs and stop them."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        PIPELINE_WORKERS.labels(stage=self.name).set(0)
+
+    def _work_loop(self) -> None:
+        """Process jobs until the stop sentinel."""
+        while True:
+            job = self._queue.get()
+            self._depth.set(self._queue.qsize())
+            if job is None:
+                return
+            if claim(job):
+                self._process(job)
+
+    def _process(self, job: PipelineJob) -> None:
+        """
+        Run the step on a job and hand it over to the next stage, or resolve it in the last one.
+
+        Args:
+            job (PipelineJob): The job.
+        """
+        started = time.perf_counter()
+        self._wait.observe(started - job.enqueued)
+        try:
+            job.payload = job.context.run(self.step, job.payload)
+        except Exception as exp:  # the worker must survive a failing request
+            resolve(job.future.set_exception, exp)
+            return
+        finally:
+            self._busy.inc(time.perf_counter() - started)
+        if self.next_stage is None:
+            resolve(job.future.set_result, job.payload)
+        else:
+            self.next_stage.put(job)
+
+
+def claim(job: PipelineJob) -> bool:
+    """
+    Mark the future of a job as running the first time a stage takes it.
+
+    Args:
+        job (PipelineJob): The job.
+
+    Returns:
+        bool: Whether the job should be processed, False if it was cancelled while queued.
+    """
+    if job.future.running():
+        return True
+    return job.future.set_running_or_notify_cancel()
+
+
+def resolve(setter: Callable[[Any], None], outcome: Any) -> None:
+    """
+    Resolve a job future, ignoring a future resolved in the meantime.
+
+    Args:
+        setter (Callable[[Any], None]): The `set_result` or `set_exception` method of the future.
+        outcome (Any): The result or the exception.
+    """
+    try:
+        setter(outcome)
+    except InvalidStateError:  # a worker must not die with the caller gone
+        return
+
+
+class RecognitionPipeline:
+    """
+    The detect, crop and recognize steps of `/recognizer/recognize_image` as stages with their own worker pools.
+
+    The stages overlap across requests: the recognizer works on the crops of a request while the detector runs on
+    the next one. The models are resolved through their providers for every request, so a hot-reloaded model is
+    picked up by the running pipeline.
+
+    Args:
+        detector (Callable[[], Any]): Provider of the segmentation model.
+        recognizer (Callable[[], Any]): Provider of the recognizer model.
+        stages (Optional[StageOptions]): The `workers` and `queue_size` of every stage by name.
+    """
+
+    def __init__(
+        self,
+        detector: Callable[[], Any],
+        recognizer: Callable[[], Any],
+        stages: Optional[StageOptions] = None,
+    ):
+        """
+        Initialize the stages.
+
+        Args:
+            detector (Callable[[], Any]): Provider of the segmentation model.
+            recognizer (Callable[[], Any]): Provider of the recognizer model.
+            stages (Optional[StageOptions]): The `workers` and `queue_size` of every stage by name.
+        """
+        self.detector = detector
+        self.recognizer = recognizer
+        steps: Dict[str, Callable[[Any], Any]] = {"detect": self.detect, "crop": crop, "recognize": self.recognize}
+        next_stage = None
+        self.stages: List[PipelineStage] = []
+        for name in reversed(STAGE_NAMES):
+            options = (stages or {}).get(name) or {}
+            next_stage = PipelineStage(
+                name,
+                steps[name],
+                workers=options.get("workers", DEFAULT_WORKERS),
+                queue_size=options.get("queue_size", DEFAULT_QUEUE_SIZE),
+                next_stage=next_stage,
+            )
+            self.stages.insert(0, next_stage)
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        """Start the stage workers unless they are already running."""
+        with self._lock:
+            if self._started:
+                return
+            for pipeline_stage in self.stages:
+                pipeline_stage.start()
+            self._started = True
+
+    def close(self) -> None:
+        """Finish the queued requests and stop the workers, the first stage first."""
+        with self._lock:
+            if not self._started:
+                return
+            for pipeline_stage in self.stages:
+                pipeline_stage.close()
+            self._started = False
+
+    def queue_depth(self) -> int:
+        """
+        Get the number of requests waiting for any stage.
+
+        Returns:
+            int: The total length of the stage queues.
+        """
+        return sum(pipeline_stage.depth for pipeline_stage in self.stages)
+
+    def submit(self, image: Image) -> "Future[Recognized]":
+        """
+        Enqueue an image, waiting while the detector queue is full.
+
+        Args:
+            image (Image): The decoded image.
+
+        Returns:
+            Future[Recognized]: The scored boxes of the image and their values.
+        """
+        self.start()
+        job = PipelineJob(image)
+        self.stages[0].put(job)
+        return job.future
+
+    def detect(self, image: Image) -> Detected:
+        """
+        Detect the barcodes of an image.
+
+        Args:
+            image (Image): The decoded image.
+
+        Returns:
+            Detected: The image and its scored boxes.
+        """
+        return image, self.detector().predict_scored(image)
+
+    def recognize(self, crops: Crops) -> Recognized:
+        """
+        Recognize the crops of an image in a single batch.
+
+        Args:
+            crops (Crops): The scored boxes and the batch of their crops.
+
+        Returns:
+            Recognized: The scored boxes and their values.
+        """
+        scored, batch = crops
+        if not scored:
+            return scored, []
+        return scored, self.recognizer().predict_preprocessed(batch)
+
+
+def crop(detected: Detected) -> Crops:
+    """
+    Cut the detected barcodes out of the image into a preprocessed recognizer batch.
+
+    Args:
+        detected (Detected): The image and its scored boxes.
+
+    Returns:
+        Crops: The scored boxes and the batch of their crops.
+    """
+    image, scored = detected
+    with stage("crop"):
+        batch = crop_regions(image, [bbox for bbox, _ in scored])
+    return scored, batch
@@ -1,10 +1,19 @@
 """Detector model wrappers."""
+from typing import Any, Dict, List, Optional
+
 import numpy as np
 import torch
 from numpy.typing import NDArray
 
 from src.services.base import ModelWrapper
+from src.services.cache import CropCache, content_keys
+from src.services.optimization import InferenceOptimizer
+from src.utils.load import inference_tracker
 from src.utils.processing import preprocess_image
+from src.utils.regions import Regions, crop_regions
+from src.utils.timing import stage
+
+MODEL_NAME: str = "recognizer_model"
 
 
 class RecTorchWrapper(ModelWrapper):
@@ -14,26 +23,56 @@ class RecTorchWrapper(ModelWrapper):
     This class is used to load a PyTorch model from a given checkpoint path and
     perform predictions on the given input data on the specified device.
 
+    With a `cache`, the crops already recognized are looked up by the profile across their bars and only the misses go
+    through the model.
+
     Attributes:
         model (torch.jit.ScriptModule): The loaded PyTorch model.
         device (str): The device on which the model will be run.
+        cache (Optional[CropCache]): The crop cache, None if disabled.
 
     Args:
         checkpoint (str): The path to the PyTorch model checkpoint.
         device (str): The device to run the model on. Defaults to "cpu".
+        optimization (Optional[Dict[str, Any]]): Keyword arguments of the `InferenceOptimizer`.
+        cache (Optional[Dict[str, Any]]): Keyword arguments of the `CropCache`, a `size` of 0 disables it.
     """
 
-    def __init__(self, checkpoint: str, device: str = "cpu"):
+    def __init__(
+        self,
+        checkpoint: str,
+        device: str = "cpu",
+        optimization: Optional[Dict[str, Any]] = None,
+        cache: Optional[Dict[str, Any]] = None,
+    ):
         """
         Initialize the RecTorchWrapper class by loading the model and moving it to the specified device.
 
         Args:
             checkpoint (str): The path to the PyTorch model checkpoint.
             device (str): The device to run the model on. Defaults to "cpu".
+            optimization (Optional[Dict[str, Any]]): Keyword arguments of the `InferenceOptimizer`. Defaults to None.
+            cache (Optional[Dict[str, Any]]): Keyword arguments of the `CropCache`. Defaults to None.
         """
         self.device = device
-        self.model = torch.jit.load(checkpoint, map_location=device)  # type: ignore
-        self.model.eval()
+        self.optimizer = InferenceOptimizer(**(optimization or {}))
+        self.model = self.optimizer.load(checkpoint, device)
+        self.cache: Optional[CropCache] = None
+        if cache and cache.get("size"):
+            self.cache = CropCache(**cache)
+
+    @staticmethod
+    def decode_output(output_data: Any) -> str:
+        """
+        Convert the raw model output for a single crop into the barcode value.
+
+        Args:
+            output_data (Any): The model output for a single crop.
+
+        Returns:
+            str: Recognized info.
+        """
+        return output_data if isinstance(output_data, str) else "1244544219"
 
     def predict(self, input_data: NDArray[np.uint8]) -> str:
         """
@@ -49,9 +88,87 @@ class RecTorchWrapper(ModelWrapper):
         Returns:
             str: Recognized info.
         """
-        batch = preprocess_image(input_data)
+        return self.predict_batch([input_data])[0]
 
-        with torch.no_grad():
-            output_data = self.model(batch).cpu().numpy()
+    def predict_batch(self, images: List[NDArray[np.uint8]]) -> List[str]:
+        """
+        Perform prediction on several barcode crops with a single forward pass.
 
-        return output_data if isinstance(output_data, str) else "1244544219"
+        Args:
+            images (List[NDArray[np.uint8]]): The barcode crops.
+
+        Returns:
+            List[str]: Recognized info for every crop.
+        """
+        if not images:
+            return []
+        with stage("rec_preprocess"):
+            batch = torch.cat([preprocess_image(image) for image in images])
+        return self.predict_preprocessed(batch)
+
+    def predict_regions(self, image: NDArray[np.uint8], bboxes: Regions) -> List[str]:
+        """
+        Perform prediction on several regions of an image with a single forward pass.
+
+        The regions are extracted straight into the batch with `crop_regions`, without an intermediate crop each.
+
+        Args:
+            image (NDArray[np.uint8]): The full image.
+            bboxes (Regions): The barcode boxes in COCO format.
+
+        Returns:
+            List[str]: Recognized info for every region.
+        """
+        if not len(bboxes):
+            return []
+        with stage("rec_preprocess"):
+            batch = crop_regions(image, bboxes)
+        return self.predict_preprocessed(batch)
+
+    def predict_preprocessed(self, batch: torch.Tensor) -> List[str]:
+        """
+        Perform prediction on an already preprocessed batch, answering the cached crops from the cache.
+
+        Args:
+            batch (torch.Tensor): The batch built with `preprocess_image` or `crop_regions`.
+
+        Returns:
+            List[str]: Recognized info for every batch item.
+        """
+        if self.cache is None:
+            return self.forward(batch)
+
+        with stage("rec_cache"):
+            keys = content_keys(batch)
+            cached = self.cache.lookup(keys)
+        # the misses and a sample of the hits go through the model
+        forwarded = []
+        for index, cached_value in enumerate(cached):
+            if cached_value is None or self.cache.should_verify():
+                forwarded.append(index)
+        rec_values = list(cached)
+        if forwarded:
+            for position, rec_value in zip(forwarded, self.forward(batch[forwarded])):
+                hit = cached[position]
+                if hit is not None:
+                    self.cache.verify(hit, rec_value)
+                self.cache.store(keys[position], rec_value)
+                rec_values[position] = rec_value
+        return rec_values  # type: ignore
+
+    def forward(self, batch: torch.Tensor) -> List[str]:
+        """
+        Run the model on a preprocessed batch and decode the outputs.
+
+        Args:
+            batch (torch.Tensor): The batch built with `preprocess_image` or `crop_regions`.
+
+        Returns:
+            List[str]: Recognized info for every batch item.
+        """
+        with inference_tracker.track(MODEL_NAME):
+            with stage("rec_forward"):
+                output_data = self.optimizer.forward(self.model, batch).cpu().numpy()
+
+            with stage("rec_decode"):
+                return [self.decode_output(item_output) for item_output in output_data]
@@ -0,0 +1,192 @@
+"""Zero-downtime reload of the model checkpoints."""
+import os
+import threading
+import time
+from contextlib import ExitStack
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from dependency_injector import providers
+from loguru import logger
+
+from src.services.optimization import file_sha256
+from src.utils.metrics import MODEL_INFO, MODEL_LOADED_AT
+
+# config section -> container provider of the model
+MODEL_PROVIDERS = MappingProxyType({"segmentation_model": "seg_model", "recognizer_model": "rec_model"})
+WARMUP_IMAGE_SIZE: int = 224
+WARMUP_RUNS: int = 2
+SHORT_SHA_LENGTH: int = 12
+
+
+class ReloadInProgressError(Exception):
+    """Raised when a reload is requested while another one is running."""
+
+
+class CheckpointNotAllowedError(Exception):
+    """Raised when a reload is requested from a checkpoint outside of the weights directory."""
+
+
+def allowed_checkpoint(checkpoint: str, weights_dir: str) -> str:
+    """
+    Resolve a requested checkpoint and check that it lies inside the weights directory.
+
+    Args:
+        checkpoint (str): The requested checkpoint path.
+        weights_dir (str): The directory of the checkpoints that can be requested.
+
+    Returns:
+        str: The resolved checkpoint path, with the symbolic links followed.
+
+    Raises:
+        CheckpointNotAllowedError: If the checkpoint is outside of the weights directory.
+    """
+    resolved_dir = os.path.realpath(weights_dir)
+    resolved = os.path.realpath(checkpoint)
+    if os.path.commonpath((resolved_dir, resolved)) != resolved_dir:
+        raise CheckpointNotAllowedError(f"Checkpoints must be inside {weights_dir}.")
+    return resolved
+
+
+class ModelReloader:
+    """
+    Loads, warms up and swaps the model singletons of a container.
+
+    The new wrapper is built and warmed up while the old one keeps serving. The swap replaces the object the
+    container provider returns in a single assignment, so requests resolve either the old or the new model. The
+    requests in flight finish on the model they resolved, and the old one is freed with their last reference.
+
+    Only the checkpoints inside `weights_dir` can be requested, so the endpoint cannot be used to read arbitrary
+    files of the host.
+
+    Args:
+        container (Any): The application container.
+        weights_dir (str): The directory of the checkpoints that can be requested.
+    """
+
+    def __init__(self, container: Any, weights_dir: str):
+        """
+        Initialize the reloader.
+
+        Args:
+            container (Any): The application container.
+            weights_dir (str): The directory of the checkpoints that can be requested.
+        """
+        self.container = container
+        self.weights_dir = weights_dir
+        self._lock = threading.Lock()
+        self._overrides: Dict[str, providers.Object] = {}
+        self._versions: Dict[str, Tuple[str, str]] = {}
+
+    def report(self, model_name: str, checkpoint: str, sha256: str) -> None:
+        """
+        Export the checkpoint and checksum of the active model.
+
+        Args:
+            model_name (str): The config section of the model.
+            checkpoint (str): The checkpoint path.
+            sha256 (str): The sha256 of the checkpoint.
+        """
+        previous = self._versions.get(model_name)
+        if previous is not None:
+            MODEL_INFO.remove(model_name, *previous)
+        MODEL_INFO.labels(model=model_name, checkpoint=checkpoint, sha256=sha256).set(1)
+        MODEL_LOADED_AT.labels(model=model_name).set(time.time())
+        self._versions[model_name] = (checkpoint, sha256)
+
+    def report_configured(self) -> None:
+        """Export the versions of the configured checkpoints."""
+        for model_name in MODEL_PROVIDERS:
+            checkpoint = self.container.config()[model_name]["checkpoint"]
+            self.report(model_name, checkpoint, file_sha256(checkpoint))
+
+    def build(self, model_name: str, checkpoint: str) -> Any:
+        """
+        Build and warm up a wrapper with the arguments of the container provider and a new checkpoint.
+
+        Args:
+            model_name (str): The config section of the model.
+            checkpoint (str): The new checkpoint path.
+
+        Returns:
+            Any: The warmed up model wrapper.
+        """
+        provider = getattr(self.container, MODEL_PROVIDERS[model_name])
+        kwargs = dict(provider.kwargs)
+        for name, kwarg in provider.kwargs.items():
+            if providers.is_provider(kwarg):
+                kwargs[name] = kwarg()
+        kwargs["checkpoint"] = checkpoint
+        wrapper = provider.cls(**kwargs)
+        warmup_image = np.zeros((WARMUP_IMAGE_SIZE, WARMUP_IMAGE_SIZE, 3), dtype=np.uint8)
+        for _ in range(WARMUP_RUNS):
+            wrapper.predict(warmup_image)
+        return wrapper
+
+    def swap(self, model_name: str, wrapper: Any) -> None:
+        """
+        Make the container provider return the new wrapper.
+
+        Args:
+            model_name (str): The config section of the model.
+            wrapper (Any): The new model wrapper.
+        """
+        provider = getattr(self.container, MODEL_PROVIDERS[model_name])
+        override = self._overrides.get(model_name)
+        if override is not None:
+            override.set_provides(wrapper)
+            return
+        self._overrides[model_name] = providers.Object(wrapper)
+        provider.override(self._overrides[model_name])
+        # drop the reference the singleton keeps to the startup model
+        provider.reset()
+
+    def reload(self, model_name: str, checkpoint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load, warm up and swap a model.
+
+        Args:
+            model_name (str): The config section of the model.
+            checkpoint (Optional[str]): The new checkpoint inside the weights directory, defaults to the configured one.
+
+        Returns:
+            Dict[str, Any]: The model, checkpoint, sha256 and the load time in seconds.
+
+        Raises:
+            ReloadInProgressError: If another reload is running.
+        """
+        model_config = getattr(self.container.config, model_name)
+        if checkpoint is None:
+            checkpoint = model_config.checkpoint()
+        else:
+            checkpoint = allowed_checkpoint(checkpoint, self.weights_dir)
+        if not self._lock.acquire(blocking=False):
+            raise ReloadInProgressError("A reload is already running.")
+        started = time.perf_counter()
+        with ExitStack() as reloading:
+            reloading.callback(self._lock.release)
+            sha256 = self._swap_checkpoint(model_name, checkpoint)
+        load_seconds = time.perf_counter() - started
+        short_sha = sha256[:SHORT_SHA_LENGTH]
+        source = f"{checkpoint} ({short_sha})"
+        took = f"{load_seconds:.2f}s"
+        logger.info(f"Reloaded {model_name} from {source} in {took}")
+        return {"model": model_name, "checkpoint": checkpoint, "sha256": sha256, "load_seconds": load_seconds}
+
+    def _swap_checkpoint(self, model_name: str, checkpoint: str) -> str:
+        """
+        Build the model from the checkpoint, swap it in and record the new checkpoint.
+
+        Args:
+            model_name (str): The config section of the model.
+            checkpoint (str): The new checkpoint path.
+
+        Returns:
+            str: The sha256 of the checkpoint.
+        """
+        sha256 = file_sha256(checkpoint)
+        self.swap(model_name, self.build(model_name, checkpoint))
+        getattr(self.container.config, model_name).checkpoint.from_value(checkpoint)
+        self.report(model_name, checkpoint, sha256)
+        return sha256
@@ -0,0 +1,173 @@
+"""Scoring and selection of the connected components of a detector mask."""
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from src.utils.metrics import CROPS_SKIPPED
+
+ScoredBox = Tuple[List[int], float]
+Mask = NDArray[np.bool_]
+
+
+class ComponentSelector:
+    """
+    Turns a probability map into score-ranked barcode boxes.
+
+    The map is thresholded and labelled. With `merge_distance`, components closer than that many pixels are merged
+    into one, so the fragments of a barcode give a single box. Every component is scored with its mean probability,
+    using labelled reductions over the whole map instead of a loop per component. Components smaller than
+    `min_area` pixels or more elongated than `max_aspect_ratio` are skipped, and only the `top_k` best scored ones
+    are kept.
+
+    Args:
+        min_area (int): Minimum component area in pixels, 0 keeps all.
+        max_aspect_ratio (float): Maximum ratio of the long to the short box side, 0 keeps all.
+        merge_distance (int): Components closer than this many pixels are merged, 0 disables merging.
+        top_k (int): Maximum number of boxes, 0 keeps all.
+    """
+
+    def __init__(self, min_area: int = 0, max_aspect_ratio: float = 0, merge_distance: int = 0, top_k: int = 0):
+        """
+        Initialize the selector.
+
+        Args:
+            min_area (int): Minimum component area in pixels, 0 keeps all.
+            max_aspect_ratio (float): Maximum ratio of the long to the short box side, 0 keeps all.
+            merge_distance (int): Components closer than this many pixels are merged, 0 disables merging.
+            top_k (int): Maximum number of boxes, 0 keeps all.
+        """
+        self.min_area = min_area
+        self.max_aspect_ratio = max_aspect_ratio
+        self.merge_distance = merge_distance
+        self.top_k = top_k
+
+    def label(self, mask: Mask) -> Tuple[NDArray[np.int32], int]:
+        """
+        Label the components of a binary mask, merging the close ones.
+
+        Args:
+            mask (Mask): The binary mask.
+
+        Returns:
+            Tuple[NDArray[np.int32], int]: The labels of the mask pixels, 0 outside, and the number of components.
+        """
+        # scipy is slow to import, it is loaded by the detector warmup
+        from scipy import ndimage  # noqa: WPS433
+
+        if not self.merge_distance:
+            return ndimage.label(mask)
+        kernel_side = self.merge_distance + 1
+        kernel = np.ones((kernel_side, kernel_side), dtype=np.uint8)
+        dilated = cv2.dilate(mask.astype(np.uint8), kernel)
+        labels, num_components = ndimage.label(dilated)
+        labels[~mask] = 0
+        return labels, num_components
+
+    def skip(self, keep: Mask, condition: Mask, reason: str) -> Mask:
+        """
+        Drop the kept components failing a condition and count them.
+
+        Args:
+            keep (Mask): The components kept so far.
+            condition (Mask): The components passing the condition.
+            reason (str): The metrics label of the condition.
+
+        Returns:
+            Mask: The components kept after the condition.
+        """
+        dropped = np.logical_and(keep, np.logical_not(condition))
+        skipped = int(np.count_nonzero(dropped))
+        if skipped:
+            CROPS_SKIPPED.labels(reason=reason).inc(skipped)
+        return keep & condition
+
+    def filter(self, areas: NDArray[np.int64], boxes: NDArray[np.int64]) -> Mask:
+        """
+        Get the components passing the area and aspect ratio filters.
+
+        Args:
+            areas (NDArray[np.int64]): The component areas in pixels.
+            boxes (NDArray[np.int64]): The component boxes in COCO format.
+
+        Returns:
+            Mask: The kept components.
+        """
+        keep = np.ones(len(areas), dtype=bool)
+        if self.min_area:
+            keep = self.skip(keep, areas >= self.min_area, "area")
+        if self.max_aspect_ratio:
+            sides = np.sort(boxes[:, 2:], axis=1)
+            short_sides, long_sides = sides.T
+            max_long_sides = self.max_aspect_ratio * short_sides
+            keep = self.skip(keep, long_sides <= max_long_sides, "aspect_ratio")
+        return keep
+
+    def select(self, probabilities: NDArray[np.float32], threshold: float) -> List[ScoredBox]:
+        """
+        Get the boxes of the selected components, the best scored first.
+
+        Args:
+            probabilities (NDArray[np.float32]): The probability map.
+            threshold (float): The probability threshold of the mask.
+
+        Returns:
+            List[ScoredBox]: The boxes in COCO format [x_min, y_min, width, height] with their scores.
+        """
+        from scipy import ndimage  # noqa: WPS433
+
+        labels, num_components = self.label(probabilities > threshold)
+        if not num_components:
+            return []
+        index = np.arange(1, num_components + 1)
+        scores = np.asarray(ndimage.mean(probabilities, labels, index))
+        pixel_counts = np.bincount(labels.ravel(), minlength=num_components + 1)
+        boxes = component_boxes(labels, num_components)
+
+        selected = np.flatnonzero(self.filter(pixel_counts[1:], boxes))
+        selected = selected[np.argsort(-scores[selected], kind="stable")]
+        if self.top_k and len(selected) > self.top_k:
+            skipped = len(selected) - self.top_k
+            CROPS_SKIPPED.labels(reason="top_k").inc(skipped)
+            selected = selected[: self.top_k]
+        ranked_boxes = boxes[selected].tolist()
+        ranked_scores = scores[selected].tolist()
+        return list(zip(ranked_boxes, ranked_scores))
+
+
+def component_boxes(labels: NDArray[np.int32], num_components: int) -> NDArray[np.int64]:
+    """
+    Get the boxes of the labelled components.
+
+    Args:
+        labels (NDArray[np.int32]): The labels of the mask pixels, 0 outside.
+        num_components (int): The number of components.
+
+    Returns:
+        NDArray[np.int64]: The boxes in COCO format [x_min, y_min, width, height], one row per component.
+    """
+    from scipy import ndimage  # noqa: WPS433
+
+    boxes = []
+    for rows, cols in ndimage.find_objects(labels, num_components):
+        width = cols.stop - cols.start
+        height = rows.stop - rows.start
+        boxes.append([cols.start, rows.start, width, height])
+    return np.array(boxes)
+
+
+def masks_to_bboxes(mask: NDArray[np.uint8]) -> List[List[int]]:
+    """
+    Convert a binary mask with potentially multiple objects to a list of bounding boxes in COCO format.
+
+    Args:
+        mask (NDArray[np.uint8]): A binary mask where objects' pixels are 1 and the background is 0.
+
+    Returns:
+        List[List[int]]: A list of bounding boxes, each in the format [x_min, y_min, width, height].
+    """
+    from scipy import ndimage  # noqa: WPS433
+
+    labels, num_components = ndimage.label(mask)
+    return component_boxes(labels, num_components).tolist()
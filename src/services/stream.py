@@ -0,0 +1,129 @@
+"""Video stream processing with detector frame skipping and box tracking."""
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from src.services.detector import SegTorchWrapper
+from src.services.recognizer import RecTorchWrapper
+from src.services.tracker import BoxTracker
+from src.utils.metrics import STREAM_DETECTOR_RUNS, STREAM_RECOGNIZER_RUNS
+from src.utils.processing import prepare_bbox
+
+DIFF_FRAME_SIZE: int = 64
+DIFF_SCALE: float = 255.0
+
+# (frame index, encoded frame) of a frame waiting for processing
+QueuedFrame = Tuple[int, bytes]
+
+
+class StreamSession:
+    """
+    Stateful processor for a single stream of video frames.
+
+    The detector runs every `detect_every_n_frames` frames or when the frame differs from the last detected
+    frame by more than `frame_diff_threshold`. In between, boxes are carried forward by the tracker. The recognizer
+    is called only for tracks that appear for the first time.
+
+    Args:
+        detector (SegTorchWrapper): The segmentation service.
+        recognizer (RecTorchWrapper): The recognizer service.
+        detect_every_n_frames (int): Run the detector at least every N frames.
+        frame_diff_threshold (float): Mean absolute difference in [0, 1] that forces a detector run.
+        iou_threshold (float): Minimal IoU for a detection to continue a track.
+        max_track_age (int): Number of frames a track survives without a matching detection.
+        max_pending_frames (int): Number of received frames waiting for processing before the oldest is dropped.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        detector: SegTorchWrapper,
+        recognizer: RecTorchWrapper,
+        detect_every_n_frames: int = 5,
+        frame_diff_threshold: float = 0.1,
+        iou_threshold: float = 0.3,
+        max_track_age: int = 15,
+        max_pending_frames: int = 2,
+    ):
+        """
+        Initialize the stream session.
+
+        Args:
+            detector (SegTorchWrapper): The segmentation service.
+            recognizer (RecTorchWrapper): The recognizer service.
+            detect_every_n_frames (int): Run the detector at least every N frames.
+            frame_diff_threshold (float): Mean absolute difference in [0, 1] that forces a detector run.
+            iou_threshold (float): Minimal IoU for a detection to continue a track.
+            max_track_age (int): Number of frames a track survives without a matching detection.
+            max_pending_frames (int): Number of received frames waiting for processing before the oldest is dropped.
+        """
+        self.detector = detector
+        self.recognizer = recognizer
+        self.detect_every_n_frames = max(1, detect_every_n_frames)
+        self.frame_diff_threshold = frame_diff_threshold
+        self.tracker = BoxTracker(iou_threshold=iou_threshold, max_age=max_track_age)
+        self.max_pending_frames = max(1, max_pending_frames)
+        self._frames_since_detection = 0
+        self._reference_frame: Optional[NDArray[np.float32]] = None
+
+    @staticmethod
+    def frame_signature(frame: NDArray[np.uint8]) -> NDArray[np.float32]:
+        """
+        Build a small grayscale thumbnail of the frame used for cheap frame differencing.
+
+        Args:
+            frame (NDArray[np.uint8]): The BGR frame.
+
+        Returns:
+            NDArray[np.float32]: The normalized thumbnail.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumbnail = cv2.resize(gray, (DIFF_FRAME_SIZE, DIFF_FRAME_SIZE), interpolation=cv2.INTER_AREA)
+        return thumbnail.astype(np.float32) / DIFF_SCALE
+
+    def needs_detection(self, signature: NDArray[np.float32]) -> bool:
+        """
+        Decide whether the detector has to run on the current frame.
+
+        Args:
+            signature (NDArray[np.float32]): The thumbnail of the current frame.
+
+        Returns:
+            bool: True if the detector should run.
+        """
+        if self._reference_frame is None or self._frames_since_detection >= self.detect_every_n_frames:
+            return True
+        frame_diff = float(np.abs(signature - self._reference_frame).mean())
+        return frame_diff > self.frame_diff_threshold
+
+    def process(self, frame: NDArray[np.uint8]) -> Dict[str, Any]:
+        """
+        Process the next frame of the stream.
+
+        Args:
+            frame (NDArray[np.uint8]): The BGR frame.
+
+        Returns:
+            Dict[str, Any]: Whether the detector ran and the list of tracked barcodes.
+        """
+        signature = self.frame_signature(frame)
+        detected = self.needs_detection(signature)
+        if detected:
+            STREAM_DETECTOR_RUNS.inc()
+            new_tracks = self.tracker.update(self.detector.predict(frame))
+            STREAM_RECOGNIZER_RUNS.inc(len(new_tracks))
+            rec_values = self.recognizer.predict_regions(frame, [track.bbox for track in new_tracks])
+            for track, rec_value in zip(new_tracks, rec_values):
+                track.rec_value = rec_value
+            self._reference_frame = signature
+            self._frames_since_detection = 0
+        else:
+            self.tracker.advance()
+        self._frames_since_detection += 1
+
+        barcodes = [
+            {"track_id": tracked.track_id, "bbox": prepare_bbox(tracked.bbox), "value": tracked.rec_value}
+            for tracked in self.tracker.tracks
+        ]
+        return {"detected": detected, "barcodes": barcodes}
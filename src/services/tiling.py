@@ -0,0 +1,224 @@
+"""Coarse-to-fine tiled detection of the large images."""
+import math
+from itertools import islice
+from typing import Callable, List, Sequence, Tuple, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.utils.metrics import DETECTOR_TILES
+
+DEFAULT_TILE_SIZE: int = 448
+DEFAULT_OVERLAP: int = 64
+DEFAULT_ACTIVITY_THRESHOLD: float = 0.1
+
+# (y_min, x_min, y_max, x_max) of a tile in the image
+Tile = Tuple[int, int, int, int]
+Image = NDArray[np.uint8]
+ProbabilityMap = NDArray[np.float32]
+Raster = TypeVar("Raster", Image, ProbabilityMap)
+# runs the detector on the tile crops, giving the probability map of every crop in the crop resolution
+TileForward = Callable[[List[Image]], List[ProbabilityMap]]
+
+
+def tile_starts(side: int, tile_size: int, overlap: int) -> List[int]:
+    """
+    Get the offsets of the tiles covering a side, evenly spread and overlapping by at least `overlap` pixels.
+
+    Args:
+        side (int): The image side in pixels.
+        tile_size (int): The tile side in pixels.
+        overlap (int): Minimum overlap of the neighbouring tiles in pixels.
+
+    Returns:
+        List[int]: The tile offsets, a single 0 if the side fits into a tile.
+    """
+    if side <= tile_size:
+        return [0]
+    count = math.ceil((side - overlap) / (tile_size - overlap))
+    return [round(start) for start in np.linspace(0, side - tile_size, count)]
+
+
+def crop_tiles(image: Raster, tiles: Sequence[Tile]) -> List[Raster]:
+    """
+    Cut the tiles out of an image or a probability map.
+
+    Args:
+        image (Raster): The image or the probability map.
+        tiles (Sequence[Tile]): The tiles.
+
+    Returns:
+        List[Raster]: The crop of every tile.
+    """
+    crops = []
+    for top, left, bottom, right in tiles:
+        crops.append(image[top:bottom, left:right])
+    return crops
+
+
+class CoarseToFineTiler:
+    """
+    Picks the high-resolution tiles of a large image worth a detector forward.
+
+    The whole image is run through the detector first, squeezed into an input bucket, where small barcodes blur into
+    faint blobs. The image is then covered with overlapping tiles, and only the tiles where the coarse probability
+    exceeds `activity_threshold` are run at the tile resolution. The tile maps replace the coarse map where they
+    cover it, so the components spanning a tile seam are labelled as one box, and the detector cost grows with the
+    number of barcodes rather than with the image area.
+
+    Args:
+        min_side (int): Longest image side from which the images are tiled, 0 disables tiling.
+        tile_size (int): The tile side in image pixels.
+        overlap (int): Minimum overlap of the neighbouring tiles in pixels.
+        activity_threshold (float): Coarse probability marking a tile as active.
+
+    Raises:
+        ValueError: If the overlap is not smaller than the tiles.
+    """
+
+    def __init__(
+        self,
+        min_side: int = 0,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        overlap: int = DEFAULT_OVERLAP,
+        activity_threshold: float = DEFAULT_ACTIVITY_THRESHOLD,
+    ):
+        """
+        Initialize the tiler.
+
+        Args:
+            min_side (int): Longest image side from which the images are tiled, 0 disables tiling.
+            tile_size (int): The tile side in image pixels.
+            overlap (int): Minimum overlap of the neighbouring tiles in pixels.
+            activity_threshold (float): Coarse probability marking a tile as active.
+
+        Raises:
+            ValueError: If the overlap is not smaller than the tiles.
+        """
+        if overlap < 0 or overlap >= tile_size:
+            raise ValueError(f"The tile overlap {overlap} must be smaller than the tile size {tile_size}")
+        self.min_side = min_side
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.activity_threshold = activity_threshold
+
+    def applies(self, shape: Tuple[int, int]) -> bool:
+        """
+        Check whether an image is tiled.
+
+        Args:
+            shape (Tuple[int, int]): The (height, width) of the image.
+
+        Returns:
+            bool: True if the longest side reaches `min_side`.
+        """
+        return bool(self.min_side) and max(shape) >= self.min_side
+
+    def tiles(self, shape: Tuple[int, int]) -> List[Tile]:
+        """
+        Cover an image with overlapping tiles.
+
+        Args:
+            shape (Tuple[int, int]): The (height, width) of the image.
+
+        Returns:
+            List[Tile]: The tiles, row by row.
+        """
+        height, width = shape
+        size = self.tile_size
+        lefts = tile_starts(width, size, self.overlap)
+        tiles = []
+        for top in tile_starts(height, size, self.overlap):
+            bottom = min(top + size, height)
+            for left in lefts:
+                tiles.append((top, left, bottom, min(left + size, width)))
+        return tiles
+
+    def active_tiles(self, coarse: ProbabilityMap) -> List[Tile]:
+        """
+        Get the tiles where the coarse probability map shows activity, counting the evaluated and skipped ones.
+
+        Args:
+            coarse (ProbabilityMap): The coarse probability map in the image resolution.
+
+        Returns:
+            List[Tile]: The tiles to run at the tile resolution, none if the image is not tiled.
+        """
+        shape = (coarse.shape[0], coarse.shape[1])
+        if not self.applies(shape):
+            return []
+        tiles = self.tiles(shape)
+        active = []
+        for tile in tiles:
+            top, left, bottom, right = tile
+            region = coarse[top:bottom, left:right]
+            if region.max() > self.activity_threshold:
+                active.append(tile)
+        skipped = len(tiles) - len(active)
+        if active:
+            DETECTOR_TILES.labels(result="evaluated").inc(len(active))
+        if skipped:
+            DETECTOR_TILES.labels(result="skipped").inc(skipped)
+        return active
+
+    def refine(
+        self,
+        images: Sequence[Image],
+        probabilities: List[ProbabilityMap],
+        forward: TileForward,
+    ) -> List[ProbabilityMap]:
+        """
+        Refine the coarse probability maps of the large images with their active tiles.
+
+        The active tiles of all the images are run in one call of `forward`.
+
+        Args:
+            images (Sequence[Image]): The original images.
+            probabilities (List[ProbabilityMap]): The coarse probability map of every image.
+            forward (TileForward): Runs the detector on the tile crops.
+
+        Returns:
+            List[ProbabilityMap]: The refined probability map of every image.
+        """
+        image_tiles = [self.active_tiles(coarse) for coarse in probabilities]
+        crops = []
+        for image, tiles in zip(images, image_tiles):
+            crops.extend(crop_tiles(image, tiles))
+        if not crops:
+            return probabilities
+
+        fine = iter(forward(crops))
+        refined = []
+        for coarse_map, active in zip(probabilities, image_tiles):
+            tile_maps = list(islice(fine, len(active)))
+            refined.append(self.stitch(coarse_map, active, tile_maps))
+        return refined
+
+    @staticmethod
+    def stitch(
+        coarse: ProbabilityMap,
+        tiles: Sequence[Tile],
+        fine: Sequence[ProbabilityMap],
+    ) -> ProbabilityMap:
+        """
+        Replace the coarse probabilities with the tile ones where the tiles cover the image.
+
+        The overlapping tiles are combined with their maximum.
+
+        Args:
+            coarse (ProbabilityMap): The coarse probability map in the image resolution.
+            tiles (Sequence[Tile]): The evaluated tiles.
+            fine (Sequence[ProbabilityMap]): The probability map of every tile in the tile resolution.
+
+        Returns:
+            ProbabilityMap: The refined probability map.
+        """
+        if not tiles:
+            return coarse
+        refined = np.zeros_like(coarse)
+        covered = np.zeros(coarse.shape, dtype=bool)
+        for (top, left, bottom, right), probabilities in zip(tiles, fine):
+            region = refined[top:bottom, left:right]
+            np.maximum(region, probabilities, out=region)
+            covered[top:bottom, left:right] = True
+        return np.where(covered, refined, coarse)
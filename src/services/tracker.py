@@ -0,0 +1,224 @@
+"""Lightweight IoU box tracker used to carry detections between detector runs."""
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+IOU_THRESHOLD: float = 0.3
+MAX_TRACK_AGE: int = 15
+
+
+def span_overlap(span_a: Sequence[int], span_b: Sequence[int]) -> int:
+    """
+    Compute the overlap of two spans along one axis.
+
+    Args:
+        span_a (Sequence[int]): First span as (start, size).
+        span_b (Sequence[int]): Second span as (start, size).
+
+    Returns:
+        int: The length of the overlap, 0 for disjoint spans.
+    """
+    start_a, size_a = span_a
+    start_b, size_b = span_b
+    end = min(start_a + size_a, start_b + size_b)
+    return max(0, end - max(start_a, start_b))
+
+
+def bbox_area(bbox: Sequence[int]) -> int:
+    """
+    Compute the area of a bounding box in COCO format.
+
+    Args:
+        bbox (Sequence[int]): The bbox as [x_min, y_min, width, height].
+
+    Returns:
+        int: The area.
+    """
+    return bbox[2] * bbox[3]
+
+
+def bbox_iou(bbox_a: Sequence[int], bbox_b: Sequence[int]) -> float:
+    """
+    Compute intersection over union of two bounding boxes in COCO format.
+
+    Args:
+        bbox_a (Sequence[int]): First bbox as [x_min, y_min, width, height].
+        bbox_b (Sequence[int]): Second bbox as [x_min, y_min, width, height].
+
+    Returns:
+        float: The IoU value in [0, 1].
+    """
+    overlap_x = span_overlap(bbox_a[::2], bbox_b[::2])
+    overlap_y = span_overlap(bbox_a[1::2], bbox_b[1::2])
+    intersection = overlap_x * overlap_y
+    union = bbox_area(bbox_a) + bbox_area(bbox_b) - intersection
+    if union <= 0:
+        return 0
+    return intersection / union
+
+
+def iou_row(bbox: List[int], bboxes: List[List[int]]) -> List[float]:
+    """
+    Compute the IoU of a bounding box with every one of a list.
+
+    Args:
+        bbox (List[int]): The bbox in COCO format.
+        bboxes (List[List[int]]): The other bboxes in COCO format.
+
+    Returns:
+        List[float]: The IoU with every other bbox.
+    """
+    return [bbox_iou(bbox, other) for other in bboxes]
+
+
+class Track:
+    """
+    A single tracked barcode.
+
+    Attributes:
+        track_id (int): Unique id of the track within a tracker.
+        bbox (List[int]): Last known bbox in COCO format.
+        velocity (Tuple[float, float]): Per-frame (dx, dy) shift estimated from the last two detections.
+        rec_value (Optional[str]): Recognized barcode value, filled once for a new track.
+        age (int): Number of frames since the track was last matched to a detection.
+    """
+
+    def __init__(self, track_id: int, bbox: List[int]):
+        """
+        Initialize a new track.
+
+        Args:
+            track_id (int): Unique id of the track.
+            bbox (List[int]): Initial bbox in COCO format.
+        """
+        self.track_id = track_id
+        self.bbox = bbox
+        self.velocity: Tuple[float, float] = (0, 0)
+        self.rec_value: Optional[str] = None
+        self.age = 0
+        self._frames_since_update = 0
+
+    def advance(self) -> None:
+        """Shift the bbox forward by the estimated velocity for one frame without a detection."""
+        self.age += 1
+        self._frames_since_update += 1
+        x_min, y_min, width, height = self.bbox
+        shift_x, shift_y = self.velocity
+        new_x = round(x_min + shift_x)
+        new_y = round(y_min + shift_y)
+        self.bbox = [new_x, new_y, width, height]
+
+    def update(self, bbox: List[int]) -> None:
+        """
+        Update the track with a matched detection.
+
+        Args:
+            bbox (List[int]): The matched bbox in COCO format.
+        """
+        # the track was carried forward since the last detection, so undo the carried shift first
+        carried = self._frames_since_update
+        steps = max(carried, 1)
+        shift_x, shift_y = self.velocity
+        origin_x = self.bbox[0] - shift_x * carried
+        origin_y = self.bbox[1] - shift_y * carried
+        velocity_x = (bbox[0] - origin_x) / steps
+        velocity_y = (bbox[1] - origin_y) / steps
+        self.velocity = (velocity_x, velocity_y)
+        self.bbox = bbox
+        self.age = 0
+        self._frames_since_update = 0
+
+
+class BoxTracker:
+    """
+    Greedy IoU tracker.
+
+    Detections are matched to existing tracks by descending IoU. Unmatched detections start new tracks and
+    tracks that are not matched for `max_age` frames are dropped. Between detector runs the tracks are carried
+    forward with a constant velocity model.
+
+    Args:
+        iou_threshold (float): Minimal IoU for a detection to be matched to a track.
+        max_age (int): Number of frames a track survives without a matching detection.
+    """
+
+    def __init__(self, iou_threshold: float = IOU_THRESHOLD, max_age: int = MAX_TRACK_AGE):
+        """
+        Initialize the tracker.
+
+        Args:
+            iou_threshold (float): Minimal IoU for a detection to be matched to a track.
+            max_age (int): Number of frames a track survives without a matching detection.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    def advance(self) -> List[Track]:
+        """
+        Carry all tracks forward by one frame without running the detector.
+
+        Returns:
+            List[Track]: The alive tracks.
+        """
+        for track in self.tracks:
+            track.advance()
+        self.tracks = self.alive_tracks()
+        return self.tracks
+
+    def alive_tracks(self) -> List[Track]:
+        """
+        Get the tracks matched within the last `max_age` frames.
+
+        Returns:
+            List[Track]: The alive tracks.
+        """
+        return [track for track in self.tracks if track.age <= self.max_age]
+
+    def update(self, bboxes: List[List[int]]) -> List[Track]:
+        """
+        Match fresh detections to the tracks.
+
+        Args:
+            bboxes (List[List[int]]): Detected bboxes in COCO format.
+
+        Returns:
+            List[Track]: The tracks created for unmatched detections, i.e. the ones that need recognition.
+        """
+        for track in self.tracks:
+            track.advance()
+
+        matched_bboxes = self.match(bboxes) if self.tracks and bboxes else set()
+        new_tracks = []
+        for bbox_idx, bbox in enumerate(bboxes):
+            if bbox_idx not in matched_bboxes:
+                new_tracks.append(Track(self._next_id, bbox))
+                self._next_id += 1
+
+        self.tracks = self.alive_tracks() + new_tracks
+        return new_tracks
+
+    def match(self, bboxes: List[List[int]]) -> Set[int]:
+        """
+        Update the tracks with the detections of the highest IoU, greedily. Needs tracks and detections.
+
+        Args:
+            bboxes (List[List[int]]): Detected bboxes in COCO format.
+
+        Returns:
+            Set[int]: The indices of the matched detections.
+        """
+        matched_tracks: Set[int] = set()
+        matched_bboxes: Set[int] = set()
+        ious = np.array([iou_row(track.bbox, bboxes) for track in self.tracks])
+        for flat_idx in np.argsort(-ious, axis=None):
+            track_idx, bbox_idx = np.unravel_index(flat_idx, ious.shape)
+            if ious[track_idx, bbox_idx] < self.iou_threshold:
+                break
+            if track_idx in matched_tracks or bbox_idx in matched_bboxes:
+                continue
+            self.tracks[track_idx].update(bboxes[bbox_idx])
+            matched_tracks.add(track_idx)
+            matched_bboxes.add(bbox_idx)
+        return matched_bboxes
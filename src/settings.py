@@ -1,7 +1,20 @@
 """This module defines the AppSettings class which encapsulates settings related to App configuration."""
+from typing import List
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# 16 MiB
+RECORD_MAX_BODY_SIZE: int = 16777216
+METRICS_CACHE_TTL_SEC: float = 5
+RESOURCE_SAMPLE_INTERVAL_SEC: float = 15
+LOG_QUEUE_SIZE: int = 10000
+LOAD_WINDOW_SEC: float = 30
+LOAD_QUEUE_TARGET: int = 16
+HTTP_SERVICE_UNAVAILABLE: int = 503
+MIN_ERROR_STATUS: int = 400
+MAX_ERROR_STATUS: int = 599
+
 
 class AppSettings(BaseSettings):
     """Encapsulates settings related to App configuration."""
@@ -13,10 +26,83 @@ class AppSettings(BaseSettings):
     service_version: str = Field("0.0.1", description="Service version")
     component_name: str = Field("InferenceService", description="Service name")
     syslog_host: str = Field("127.0.0.1", description="SysLog host address")
+    log_queue_size: int = Field(
+        LOG_QUEUE_SIZE,
+        description="Log records waiting for shipping before new ones are dropped",
+        gt=0,
+    )
+    log_batch_size: int = Field(100, description="Maximum log records shipped per batch", gt=0)
+    log_flush_interval: float = Field(0.5, description="Seconds the log shipper waits for the next record", gt=0)
 
     # inference related settings
     base_config_path: str = Field("configs/config.yml", description="Base configuration file")
 
+    # metrics settings
+    stage_latency_buckets: List[float] = Field(
+        [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+        description="Buckets of the per-stage latency histograms in seconds",
+    )
+    image_megapixels_buckets: List[float] = Field(
+        [0.1, 0.3, 0.5, 1.0, 2.0, 4.0, 8.0, 12.0, 16.0, 24.0],
+        description="Buckets of the input image size histogram in megapixels",
+    )
+    metrics_cache_ttl: float = Field(
+        METRICS_CACHE_TTL_SEC,
+        description="Seconds between the background collections of the multiprocess /metrics, 0 collects every scrape",
+        ge=0,
+    )
+    resource_sample_interval: float = Field(
+        RESOURCE_SAMPLE_INTERVAL_SEC,
+        description="Seconds between samples of the worker resource usage, 0 disables the sampler",
+        ge=0,
+    )
+
+    # load reporting settings
+    load_window: float = Field(LOAD_WINDOW_SEC, description="Seconds of model latencies behind the reported p95", gt=0)
+    load_latency_target: float = Field(1.0, description="Model p95 latency in seconds reported as saturated", gt=0)
+    load_queue_target: int = Field(
+        LOAD_QUEUE_TARGET,
+        description="Waiting inference requests reported as saturated",
+        gt=0,
+    )
+    load_shed_threshold: float = Field(
+        1.0,
+        description="Saturation from which /health/load answers load_shed_status instead of 200",
+        ge=0,
+        le=1,
+    )
+    load_shed_status: int = Field(
+        HTTP_SERVICE_UNAVAILABLE,
+        description="Status of /health/load when saturated, 429 or 503",
+        ge=MIN_ERROR_STATUS,
+        le=MAX_ERROR_STATUS,
+    )
+
+    # debug settings
+    profile_enabled: bool = Field(default=False, description="Enable the /debug endpoints")
+    profile_max_seconds: float = Field(60.0, description="Longest allowed profile capture in seconds", gt=0)
+    profile_output_dir: str = Field("", description="Write profiles to this directory instead of returning them")
+    slow_request_threshold: float = Field(1.0, description="Requests slower than this many seconds are captured", ge=0)
+    slow_request_buffer_size: int = Field(100, description="Slow requests kept per worker, 0 disables capture", ge=0)
+
+    # admin settings
+    hot_reload_enabled: bool = Field(default=False, description="Enable the /admin/reload endpoint")
+    hot_reload_weights_dir: str = Field("weights", description="Directory of the checkpoints /admin/reload can load")
+
+    # traffic recording settings
+    traffic_record_enabled: bool = Field(default=False, description="Record sampled requests for later replay")
+    traffic_record_path: str = Field(
+        "recordings/traffic.jsonl",
+        description="JSONL file the recorded requests are appended to",
+    )
+    traffic_record_sample_rate: float = Field(1.0, description="Fraction of requests to record", ge=0, le=1)
+    traffic_record_bodies_dir: str = Field("", description="Directory to store request bodies by hash, if set")
+    traffic_record_max_body_size: int = Field(
+        RECORD_MAX_BODY_SIZE,
+        description="Largest request body in bytes buffered for recording, larger requests are recorded without it",
+        gt=0,
+    )
+
 
 # Create an instance of the AppSettings class
 app_settings = AppSettings()  # type: ignore
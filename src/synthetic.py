@@ -0,0 +1,232 @@
+"""Synthetic stand-ins for the model checkpoints and the input images, for weight-free tests and benchmarks.
+
+The models are defined in `src.utils.synthetic_models`. The images below carry barcode-like stripe patterns, which
+the synthetic detector fires on.
+
+Usage:
+    python -m src.synthetic --output-dir weights/synthetic --images-dir data/synthetic --num-images 100
+"""
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+import click
+import cv2
+import numpy as np
+import torch
+from numpy.random import Generator
+from numpy.typing import NDArray
+from omegaconf import DictConfig
+
+from src.utils import synthetic_models
+from src.utils.cli import with_options
+
+KEY_LENGTH: int = 12
+# everything besides the seed that determines the exported weights
+GENERATION_PARAMS = (
+    synthetic_models.DETECTOR_WIDTHS,
+    synthetic_models.SEQUENCE_LENGTH,
+    synthetic_models.NUM_SYMBOLS,
+    synthetic_models.STRIPE_WINDOW,
+    synthetic_models.STRIPE_THRESHOLD,
+    synthetic_models.STRIPE_GAIN,
+    synthetic_models.LEARNED_SCALE,
+    torch.__version__,
+)
+MODELS = (("detector", synthetic_models.SyntheticDetector), ("recognizer", synthetic_models.SyntheticRecognizer))
+
+MASK_VALUE: int = 255
+BACKGROUND_MEAN: int = 150
+BACKGROUND_AMPLITUDE: int = 40
+NOISE_STD: int = 3
+# (width, height) fractions of the grid cell covered by a barcode box
+MIN_BOX_FRACTION = (0.4, 0.3)
+MAX_BOX_FRACTION = (0.7, 0.6)
+MIN_MODULE_PX: int = 2
+MODULES_PER_BOX: int = 60
+MAX_BAR_MODULES: int = 3
+
+
+def export_synthetic_models(output_dir: str, seed: int = 0) -> Dict[str, str]:
+    """
+    Script the synthetic models and save them, unless they are already exported with the same parameters.
+
+    The file names carry a digest of the seed and the generation parameters, so a directory shared by runs with
+    different seeds or model versions never hands out weights generated for another run.
+
+    Args:
+        output_dir (str): The directory to save the checkpoints to.
+        seed (int): Seed of the random weights.
+
+    Returns:
+        Dict[str, str]: Paths of the "detector" and "recognizer" checkpoints.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    generation = repr((seed, *GENERATION_PARAMS)).encode()
+    key = hashlib.sha256(generation).hexdigest()[:KEY_LENGTH]
+    checkpoints = {}
+    for name, model_cls in MODELS:
+        checkpoint = os.path.join(output_dir, f"{name}-{key}.pt")
+        if not os.path.exists(checkpoint):
+            torch.manual_seed(seed)
+            torch.jit.save(torch.jit.script(model_cls().eval()), checkpoint)  # type: ignore
+        checkpoints[name] = checkpoint
+    return checkpoints
+
+
+def with_synthetic_checkpoints(cfg: DictConfig, output_dir: str, seed: int = 0) -> DictConfig:
+    """
+    Point the service configuration at the synthetic checkpoints.
+
+    Args:
+        cfg (DictConfig): The service configuration, updated in place.
+        output_dir (str): The directory to export the checkpoints to.
+        seed (int): Seed of the random weights.
+
+    Returns:
+        DictConfig: The updated configuration.
+    """
+    checkpoints = export_synthetic_models(output_dir, seed)
+    cfg["segmentation_model"]["checkpoint"] = checkpoints["detector"]
+    cfg["recognizer_model"]["checkpoint"] = checkpoints["recognizer"]
+    return cfg
+
+
+def barcode_layout(height: int, width: int, num_barcodes: int, rng: Generator) -> List[List[int]]:
+    """
+    Place non-touching barcode boxes on a grid with some jitter.
+
+    Args:
+        height (int): Image height.
+        width (int): Image width.
+        num_barcodes (int): Number of boxes.
+        rng (Generator): Random generator.
+
+    Returns:
+        List[List[int]]: Boxes in COCO format.
+    """
+    grid = int(np.ceil(np.sqrt(num_barcodes)))
+    cell = np.array([width // grid, height // grid])
+    bboxes = []
+    for idx in range(num_barcodes):
+        row, col = divmod(idx, grid)
+        size = (cell * rng.uniform(MIN_BOX_FRACTION, MAX_BOX_FRACTION)).astype(int)
+        jitter = rng.integers(1, np.maximum(2, cell - size))
+        origin = np.array([col, row]) * cell + jitter
+        bboxes.append([*origin.tolist(), *size.tolist()])
+    return bboxes
+
+
+def synthetic_background(height: int, width: int, rng: Generator) -> NDArray[np.uint8]:
+    """
+    Draw a smoothly shaded, slightly noisy gray background.
+
+    Args:
+        height (int): Image height.
+        width (int): Image width.
+        rng (Generator): Random generator.
+
+    Returns:
+        NDArray[np.uint8]: The BGR background.
+    """
+    rows = np.cos(np.linspace(0, np.pi, height))
+    cols = np.sin(np.linspace(0, np.pi, width))
+    noise = rng.normal(0, NOISE_STD, (height, width))
+    background = BACKGROUND_MEAN + BACKGROUND_AMPLITUDE * np.outer(rows, cols) + noise
+    gray = np.clip(background, 0, MASK_VALUE).astype(np.uint8)
+    bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+    return bgr.astype(np.uint8, copy=False)
+
+
+def barcode_stripes(box_width: int, rng: Generator) -> NDArray[np.uint8]:
+    """
+    Draw a row of random bars and spaces between two quiet zones.
+
+    Args:
+        box_width (int): Width of the barcode.
+        rng (Generator): Random generator.
+
+    Returns:
+        NDArray[np.uint8]: The row with 0 on the bars and 255 elsewhere.
+    """
+    module = max(MIN_MODULE_PX, box_width // MODULES_PER_BOX)
+    quiet_zone = module * 2
+    run_lengths = [quiet_zone]
+    position = quiet_zone
+    while position < box_width - quiet_zone:
+        run_length = module * int(rng.integers(1, MAX_BAR_MODULES + 1))
+        run_lengths.append(run_length)
+        position += run_length
+    # the runs alternate between a space and a bar, starting with the leading quiet zone
+    run_colors = np.array([MASK_VALUE, 0], dtype=np.uint8)
+    colors = np.resize(run_colors, len(run_lengths))
+    stripes = np.repeat(colors, run_lengths)
+    trailing_quiet_zone = np.full(box_width, MASK_VALUE, dtype=np.uint8)
+    return np.concatenate((stripes, trailing_quiet_zone))[:box_width]
+
+
+def synthetic_barcode_image(
+    height: int = 480,
+    width: int = 640,
+    num_barcodes: int = 1,
+    seed: int = 0,
+) -> Tuple[NDArray[np.uint8], NDArray[np.uint8]]:
+    """
+    Draw a deterministic image with barcode-like stripe patterns and its ground truth mask.
+
+    Args:
+        height (int): Image height.
+        width (int): Image width.
+        num_barcodes (int): Number of barcodes, i.e. connected components of the mask.
+        seed (int): Seed of the layout, the stripes and the background.
+
+    Returns:
+        Tuple[NDArray[np.uint8], NDArray[np.uint8]]: The BGR image and the mask with 255 on the barcodes.
+    """
+    rng = np.random.default_rng(seed)
+    image = synthetic_background(height, width, rng)
+    mask = np.zeros((height, width), dtype=np.uint8)
+
+    for x_min, y_min, box_width, box_height in barcode_layout(height, width, num_barcodes, rng):
+        rows = slice(y_min, y_min + box_height)
+        cols = slice(x_min, x_min + box_width)
+        stripes = barcode_stripes(box_width, rng)
+        image[rows, cols] = stripes[None, :, None]
+        mask[rows, cols] = MASK_VALUE
+    return image, mask
+
+
+@click.command()
+@with_options(
+    click.option("--output-dir", default="weights/synthetic", show_default=True, help="Checkpoints directory."),
+    click.option("--images-dir", default=None, help="Also write synthetic images, and masks to its masks/ subdir."),
+    click.option("--num-images", default=10, show_default=True, help="Number of synthetic images."),
+    click.option("--num-barcodes", default=3, show_default=True, help="Barcodes per synthetic image."),
+    click.option("--seed", default=0, show_default=True, help="Seed of the weights and the images."),
+)
+def main(output_dir: str, images_dir: str, num_images: int, num_barcodes: int, seed: int) -> None:
+    """
+    Export the synthetic checkpoints and optionally a set of synthetic images.
+
+    Args:
+        output_dir (str): Checkpoints directory.
+        images_dir (str): Also write synthetic images and masks to this directory.
+        num_images (int): Number of synthetic images.
+        num_barcodes (int): Barcodes per synthetic image.
+        seed (int): Seed of the weights and the images.
+    """
+    for name, path in export_synthetic_models(output_dir, seed).items():
+        click.echo(f"{name}: {path}")
+    if not images_dir:
+        return
+    masks_dir = os.path.join(images_dir, "masks")
+    os.makedirs(masks_dir, exist_ok=True)
+    for idx in range(num_images):
+        image, mask = synthetic_barcode_image(num_barcodes=num_barcodes, seed=seed + idx)
+        file_name = f"{idx:05d}.png"
+        cv2.imwrite(os.path.join(images_dir, file_name), image)
+        cv2.imwrite(os.path.join(masks_dir, file_name), mask)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
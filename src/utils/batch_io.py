@@ -0,0 +1,259 @@
+"""Input, checkpoint and progress of the offline batch runs."""
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import torch
+from loguru import logger
+from numpy.typing import NDArray
+
+from src.utils.processing import preprocess_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+DEFAULT_WORKERS: int = os.cpu_count() or 1
+PENDING_TASKS_PER_WORKER: int = 4
+PROGRESS_INTERVAL_SEC: float = 10
+# guards the rates against a zero elapsed time
+MIN_ELAPSED_SEC: float = 1e-9
+
+# (key, path) of a single input image
+BatchItem = Tuple[str, str]
+# (original image, preprocessed detector input)
+DecodedImage = Tuple[NDArray[np.uint8], NDArray[np.float32]]
+# the decoded image or None if the image could not be decoded
+LoadedImage = Optional[DecodedImage]
+LoadedItem = Tuple[BatchItem, LoadedImage]
+PendingLoad = Tuple[BatchItem, "Future[LoadedImage]"]
+# a result record in the format of `/recognizer/recognize_image`
+BatchRecord = Dict[str, Any]
+
+
+def collect_items(source: str) -> List[BatchItem]:
+    """
+    Collect the images to process from a directory or a JSONL manifest.
+
+    Every manifest line is a JSON object with a mandatory "path" key and an optional "id" key.
+    Relative paths are resolved against the manifest directory.
+
+    Args:
+        source (str): Path to a directory with images or to a JSONL manifest.
+
+    Returns:
+        List[BatchItem]: The (key, path) pairs in a stable order.
+    """
+    if os.path.isdir(source):
+        paths: List[str] = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, file_name) for file_name in files)
+        images = sorted(path for path in paths if path.lower().endswith(IMAGE_EXTENSIONS))
+        return [(os.path.relpath(path, source), path) for path in images]
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as manifest:
+        records = [json.loads(line) for line in manifest if line.strip()]
+    keys = [str(record.get("id", record["path"])) for record in records]
+    paths = [os.path.join(base_dir, record["path"]) for record in records]
+    return list(zip(keys, paths))
+
+
+def init_worker() -> None:
+    """Limit every pool worker to a single thread, the parallelism comes from the pool itself."""
+    cv2.setNumThreads(1)
+    torch.set_num_threads(1)
+
+
+def load_image(path: str) -> LoadedImage:
+    """
+    Decode and preprocess a single image. Executed in the pool workers.
+
+    Args:
+        path (str): Path to the image file.
+
+    Returns:
+        LoadedImage: The decoded image and the preprocessed detector input, or None if decoding failed.
+    """
+    # the stubs miss that imread gives None for an unreadable file
+    img: Optional[NDArray[np.uint8]] = cv2.imread(path, cv2.IMREAD_COLOR)  # type: ignore
+    if img is None:
+        return None
+    return img, preprocess_image(img)[0].numpy()
+
+
+def iter_loaded(batch_items: List[BatchItem], workers: Optional[int]) -> Iterator[LoadedItem]:
+    """
+    Decode the images in a process pool while keeping the input order and a bounded number of pending tasks.
+
+    Args:
+        batch_items (List[BatchItem]): The images to load.
+        workers (Optional[int]): Number of decode and preprocess processes, None for the CPU count.
+
+    Yields:
+        LoadedItem: The item and its loaded image.
+    """
+    max_pending = (workers or DEFAULT_WORKERS) * PENDING_TASKS_PER_WORKER
+    pending: Deque[PendingLoad] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        for batch_item in batch_items:
+            pending.append((batch_item, executor.submit(load_image, batch_item[1])))
+            if len(pending) >= max_pending:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        while pending:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+
+
+class Checkpoint:
+    """
+    Append-only list of the already processed keys, used to resume interrupted runs.
+
+    Args:
+        path (str): Path to the checkpoint file.
+        resume (bool): Whether to load the keys from an existing checkpoint file or to start from scratch.
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        """
+        Open the checkpoint file.
+
+        Args:
+            path (str): Path to the checkpoint file.
+            resume (bool): Whether to load the keys from an existing checkpoint file or to start from scratch.
+        """
+        self._stream = open(path, "a+" if resume else "w+", encoding="utf-8")  # noqa: WPS515
+        self._stream.seek(0)
+        self.done = {line.rstrip("\n") for line in self._stream if line.strip()}
+
+    def __enter__(self) -> "Checkpoint":
+        """
+        Enter the run.
+
+        Returns:
+            Checkpoint: The checkpoint itself.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Close the checkpoint file on exit.
+
+        Args:
+            exc_info: The exception raised in the run, if any.
+        """
+        self.close()
+
+    def pending(self, batch_items: List[BatchItem]) -> List[BatchItem]:
+        """
+        Drop the already processed items.
+
+        Args:
+            batch_items (List[BatchItem]): All the images of the run.
+
+        Returns:
+            List[BatchItem]: The images left to process.
+        """
+        todo = [batch_item for batch_item in batch_items if batch_item[0] not in self.done]
+        total = len(batch_items)
+        done_count = total - len(todo)
+        logger.info(f"{done_count} of {total} images are already processed")
+        return todo
+
+    def write(self, records: List[BatchRecord], output: IO[str]) -> None:
+        """
+        Write the result records and mark them as done.
+
+        Args:
+            records (List[BatchRecord]): The result records.
+            output (IO[str]): The output JSONL file.
+        """
+        lines = map(json.dumps, records)
+        output.writelines(f"{line}\n" for line in lines)
+        output.flush()
+        self.mark([record["id"] for record in records])
+
+    def mark(self, keys: List[str]) -> None:
+        """
+        Record the keys as processed. Must be called after the results are flushed.
+
+        Args:
+            keys (List[str]): The processed keys.
+        """
+        self._stream.writelines(f"{key}\n" for key in keys)
+        self._stream.flush()
+        self.done.update(keys)
+
+    def close(self) -> None:
+        """Close the checkpoint file."""
+        self._stream.close()
+
+
+class ProgressReporter:
+    """
+    Periodically log the throughput of the run.
+
+    Args:
+        total (int): Number of images to process.
+        interval (float): Minimal number of seconds between two reports.
+    """
+
+    def __init__(self, total: int, interval: float = PROGRESS_INTERVAL_SEC):
+        """
+        Initialize the reporter.
+
+        Args:
+            total (int): Number of images to process.
+            interval (float): Minimal number of seconds between two reports.
+        """
+        self.total = total
+        self.interval = interval
+        self.processed = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+        self._last_processed = 0
+
+    def update(self, count: int, force: bool = False) -> None:
+        """
+        Account for processed images and log the progress if the interval has passed.
+
+        Args:
+            count (int): Number of images processed since the previous call.
+            force (bool): Log regardless of the interval.
+        """
+        self.processed += count
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return
+        window_elapsed = max(now - self._last_report, MIN_ELAPSED_SEC)
+        window_rate = (self.processed - self._last_processed) / window_elapsed
+        total_rate = self.processed / max(now - self.started, MIN_ELAPSED_SEC)
+        rates = f"{window_rate:.1f} images/sec now, {total_rate:.1f} images/sec overall"
+        processed = f"{self.processed}/{self.total}"
+        logger.info(f"Processed {processed} images: {rates}")
+        self._last_report = now
+        self._last_processed = self.processed
+
+
+def iter_batches(loaded: Iterator[LoadedItem], batch_size: int) -> Iterator[List[LoadedItem]]:
+    """
+    Group the loaded images into batches.
+
+    Args:
+        loaded (Iterator[LoadedItem]): The loaded images.
+        batch_size (int): Number of images in a batch, the last batch may be smaller.
+
+    Yields:
+        List[LoadedItem]: The next batch.
+    """
+    batch: List[LoadedItem] = []
+    for loaded_item in loaded:
+        batch.append(loaded_item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,189 @@
+"""Module provides the benchmark registry and timing used by `python -m src.bench`.
+
+Benchmark cases live in `bench_*.py` files (by default in `tests/benchmarks`) and are registered with the
+`benchmark` decorator. A case function receives its parameters and returns the zero-argument callable to time.
+"""
+import gc
+import glob
+import itertools
+import os
+import platform
+import statistics
+import time
+from contextlib import ExitStack
+from functools import partial
+from importlib.util import module_from_spec, spec_from_file_location
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import click
+
+CASES_DIR: str = "tests/benchmarks"
+MIN_ROUND_TIME_SEC: float = 0.05
+ROUNDS: int = 7
+WARMUP_ROUNDS: int = 1
+# largest growth of the calls per round between two calibration rounds
+MAX_CALIBRATION_GROWTH: int = 10
+NAME_WIDTH: int = 70
+MS_WIDTH: int = 10
+
+Timed = Callable[[], Any]
+# builds the callable to time from the case parameters
+CaseFunction = Callable[..., Timed]
+Measurement = Dict[str, Any]
+
+# case name -> factory building the callable to time
+registry: Dict[str, Callable[[], Timed]] = {}
+
+
+class SkipBenchmarkError(Exception):
+    """Raised by a case factory when the case cannot run in the current environment."""
+
+
+def _case_name(name: str, case_params: Dict[str, Any]) -> str:
+    """
+    Name a case after its parameters.
+
+    Args:
+        name (str): The case name.
+        case_params (Dict[str, Any]): The parameter values of the case.
+
+    Returns:
+        str: The name with the sorted parameters, tuples are joined with "x".
+    """
+    labels = []
+    for key, param_value in sorted(case_params.items()):
+        is_sequence = isinstance(param_value, (tuple, list))
+        shown = "x".join(map(str, param_value)) if is_sequence else param_value
+        labels.append(f"{key}={shown}")
+    label = ",".join(labels)
+    return f"{name}[{label}]" if label else name
+
+
+def benchmark(name: str, **param_values: Sequence[Any]) -> Callable[[CaseFunction], CaseFunction]:
+    """
+    Register a benchmark case for every combination of the parameter values.
+
+    Args:
+        name (str): The case name.
+        param_values (Sequence[Any]): The values of every keyword parameter of the case function.
+
+    Returns:
+        Callable[[CaseFunction], CaseFunction]: The decorator registering the case function.
+    """
+
+    def decorator(case: CaseFunction) -> CaseFunction:
+        keys = sorted(param_values)
+        value_lists = [param_values[key] for key in keys]
+        for combination in itertools.product(*value_lists):
+            case_params = dict(zip(keys, combination))
+            registry[_case_name(name, case_params)] = partial(case, **case_params)
+        return case
+
+    return decorator
+
+
+def load_cases(cases_dir: str = CASES_DIR) -> None:
+    """
+    Import every `bench_*.py` module of the directory so that its cases get registered.
+
+    Args:
+        cases_dir (str): The directory with the benchmark modules.
+    """
+    for path in sorted(glob.glob(os.path.join(cases_dir, "bench_*.py"))):
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        spec = spec_from_file_location(module_name, path)
+        module = module_from_spec(spec)  # type: ignore
+        spec.loader.exec_module(module)  # type: ignore
+
+
+def _time_calls(func: Timed, number: int) -> float:
+    """
+    Time consecutive calls of the callable.
+
+    Args:
+        func (Timed): The callable to time.
+        number (int): Number of calls.
+
+    Returns:
+        float: The elapsed seconds.
+    """
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+
+def measure(func: Timed, rounds: int = ROUNDS, min_round_time: float = MIN_ROUND_TIME_SEC) -> Measurement:
+    """
+    Time the callable.
+
+    The number of calls per round is calibrated so that a round takes at least `min_round_time`.
+    The garbage collector is disabled while timing.
+
+    Args:
+        func (Timed): The callable to time.
+        rounds (int): Number of timed rounds.
+        min_round_time (float): Minimal duration of a round in seconds.
+
+    Returns:
+        Measurement: Median, min and max seconds per call, and the rounds and calls per round used.
+    """
+    for _ in range(WARMUP_ROUNDS):
+        func()
+
+    number = 1
+    elapsed = _time_calls(func, number)
+    while elapsed < min_round_time:
+        growth = int(min_round_time / elapsed) + 1 if elapsed > 0 else 2
+        number *= max(2, min(MAX_CALIBRATION_GROWTH, growth))
+        elapsed = _time_calls(func, number)
+
+    with ExitStack() as gc_guard:
+        if gc.isenabled():
+            gc.disable()
+            gc_guard.callback(gc.enable)
+        timings = [_time_calls(func, number) / number for _ in range(rounds)]
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def run_benchmarks(name_filter: Optional[str] = None, rounds: int = ROUNDS) -> Dict[str, Any]:
+    """
+    Run the registered cases.
+
+    Args:
+        name_filter (Optional[str]): Run only the cases whose name contains this substring.
+        rounds (int): Number of timed rounds per case.
+
+    Returns:
+        Dict[str, Any]: The environment description and the measurements per case.
+    """
+    measurements: Dict[str, Measurement] = {}
+    for case_name, factory in registry.items():
+        if name_filter and name_filter not in case_name:
+            continue
+        label = case_name.ljust(NAME_WIDTH)
+        try:
+            func = factory()
+        except SkipBenchmarkError as skip_reason:
+            click.echo(f"{label} skipped: {skip_reason}")
+            continue
+        measurement = measure(func, rounds=rounds)
+        measurements[case_name] = measurement
+        median_ms = measurement["median_s"] * 1000
+        shown_ms = f"{median_ms:.3f}".rjust(MS_WIDTH)
+        click.echo(f"{label} {shown_ms} ms")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.time(),
+        },
+        "cases": measurements,
+    }
@@ -0,0 +1,22 @@
+"""Helpers shared by the command line tools."""
+from functools import reduce
+from typing import Any, Callable
+
+Command = Callable[..., Any]
+
+
+def with_options(*options: Callable[[Command], Command]) -> Callable[[Command], Command]:
+    """
+    Combine several click options into a single decorator.
+
+    Args:
+        options (Callable[[Command], Command]): The click options, in the order they are listed in the help.
+
+    Returns:
+        Callable[[Command], Command]: The decorator applying all the options.
+    """
+
+    def decorator(command: Command) -> Command:
+        return reduce(lambda decorated, option: option(decorated), reversed(options), command)
+
+    return decorator
@@ -0,0 +1,194 @@
+"""Module provides the Prometheus exposition endpoint with a background refreshed cache of the aggregated workers."""
+import gzip
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence
+
+from loguru import logger
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.settings import app_settings
+from src.utils.metrics import SCRAPE_COLLECT_DURATION, SCRAPE_SIZE, SCRAPES, register
+
+METRICS_GZIP_LEVEL: int = 6
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Check whether the scraper accepts a gzip compressed response.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header of the scrape.
+
+    Returns:
+        bool: True if gzip is listed without a zero quality value.
+    """
+    for coding in accept_encoding.lower().split(","):
+        name, _, coding_params = coding.partition(";")
+        if name.strip() != "gzip":
+            continue
+        quality = coding_params.replace(" ", "").removeprefix("q=")
+        try:
+            return not quality or float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class MetricsExporter:
+    """
+    Serializer of the metrics exposition with a cache refreshed in the background.
+
+    In multiprocess mode every collection re-reads the mmap files of all the workers, so once `start` is called a
+    daemon thread collects the exposition every `ttl` seconds and the scrapes only serve the cached bytes. A scrape
+    collects by itself only if nothing is cached yet, or on every scrape with a zero `ttl`. The gzip copy is
+    compressed once per collection, on the first scrape that accepts it. The `refreshers` passed to `start` run
+    before every collection, so the gauges computed on demand, like the load of the worker, are never stale.
+
+    Args:
+        registry (CollectorRegistry): The registry to collect.
+        ttl (float): Seconds between the background collections, 0 collects on every scrape.
+    """
+
+    def __init__(self, registry: CollectorRegistry, ttl: float):
+        """
+        Initialize the exporter.
+
+        Args:
+            registry (CollectorRegistry): The registry to collect.
+            ttl (float): Seconds between the background collections, 0 collects on every scrape.
+        """
+        self.registry = registry
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._plain: Optional[bytes] = None
+        self._compressed: Optional[bytes] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refreshers: Sequence[Callable[[], Any]] = ()
+
+    def collect(self) -> bytes:
+        """
+        Collect and serialize the registry.
+
+        Returns:
+            bytes: The plain exposition.
+        """
+        for refresh in self._refreshers:
+            refresh()
+        started = time.perf_counter()
+        plain = generate_latest(self.registry)
+        SCRAPE_COLLECT_DURATION.observe(time.perf_counter() - started)
+        SCRAPE_SIZE.set(len(plain))
+        return plain
+
+    def start(self, refreshers: Sequence[Callable[[], Any]] = ()) -> None:
+        """
+        Start the background collections, unless every scrape collects.
+
+        Args:
+            refreshers (Sequence[Callable[[], Any]]): Exporters of the on-demand gauges to run before every collection.
+        """
+        self._refreshers = refreshers
+        if not self.ttl:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background collections and the refreshers, the last exposition stays cached."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._refreshers = ()
+
+    def exposition(self, compressed: bool = False) -> bytes:
+        """
+        Get the cached exposition, collecting it only if nothing is cached or the cache is disabled.
+
+        Args:
+            compressed (bool): Whether to return the gzip compressed exposition.
+
+        Returns:
+            bytes: The plain or the gzip compressed exposition.
+        """
+        with self._lock:
+            if self._plain is None or not self.ttl:
+                SCRAPES.labels(cache="miss").inc()
+                self._plain = self.collect()
+                self._compressed = None
+            else:
+                SCRAPES.labels(cache="hit").inc()
+            if not compressed:
+                return self._plain
+            if self._compressed is None:
+                self._compressed = gzip.compress(self._plain, compresslevel=METRICS_GZIP_LEVEL)
+            return self._compressed
+
+    def _run(self) -> None:
+        """Replace the cached exposition every TTL until stopped, outside the lock so the scrapes never wait."""
+        while not self._stop.wait(self.ttl):
+            try:
+                plain = self.collect()
+            except (OSError, ValueError) as exp:
+                logger.warning(f"Metrics collection failed: {exp}")
+                continue
+            with self._lock:
+                self._plain = plain
+                self._compressed = None
+
+    def response(self, accept_encoding: str) -> Response:
+        """
+        Build the scrape response.
+
+        Args:
+            accept_encoding (str): The Accept-Encoding header of the scrape.
+
+        Returns:
+            Response: The exposition, gzip compressed only if the scraper accepts it.
+        """
+        headers = {"Content-Type": CONTENT_TYPE_LATEST, "Vary": "Accept-Encoding"}
+        if accepts_gzip(accept_encoding):
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.exposition(compressed=True), headers=headers)
+        return Response(self.exposition(), headers=headers)
+
+
+@lru_cache(maxsize=1)
+def get_exporter() -> MetricsExporter:
+    """
+    Get the process-wide exporter.
+
+    The multiprocess registry, used when the 'prometheus_multiproc_dir' environment variable is set, is collected
+    every `metrics_cache_ttl` seconds once the worker starts the exporter. The default registry of a single process
+    is cheap to collect and is serialized on every scrape.
+
+    Returns:
+        MetricsExporter: The exporter.
+    """
+    if "prometheus_multiproc_dir" in os.environ:
+        return MetricsExporter(register(), app_settings.metrics_cache_ttl)
+    return MetricsExporter(REGISTRY, ttl=0)
+
+
+def metrics(request: Request) -> Response:
+    """
+    Generate a Prometheus metrics response.
+
+    If the application is running in a multiprocess environment (indicated by the 'prometheus_multiproc_dir'
+    environment variable), the workers are aggregated with a MultiProcessCollector in the background and the
+    exposition is served from a cache. Otherwise, the default registry is collected on every scrape.
+
+    Args:
+        request (Request): The incoming scrape request, its Accept-Encoding header enables gzip.
+
+    Returns:
+        Response: A response object containing Prometheus metrics data.
+    """
+    return get_exporter().response(request.headers.get("accept-encoding", ""))
@@ -0,0 +1,174 @@
+"""Module provides the in-flight inference tracking and the saturation score of a worker."""
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, DefaultDict, Deque, Dict, Iterator, Tuple
+
+from src.settings import app_settings
+from src.utils.metrics import LOAD_QUEUE_DEPTH, LOAD_SATURATION, MODEL_INFLIGHT, MODEL_LATENCY_P95
+
+LATENCY_SAMPLES: int = 2048
+LATENCY_QUANTILE: float = 0.95
+
+# the finish time and the latency of the recent calls
+Latencies = Deque[Tuple[float, float]]
+
+
+class InferenceTracker:
+    """
+    In-flight calls and recent latencies of the models of a worker.
+
+    Args:
+        window (float): Seconds of latencies the percentiles are computed over.
+        max_samples (int): Maximum number of latencies kept per model.
+    """
+
+    def __init__(self, window: float, max_samples: int = LATENCY_SAMPLES):
+        """
+        Initialize the tracker.
+
+        Args:
+            window (float): Seconds of latencies the percentiles are computed over.
+            max_samples (int): Maximum number of latencies kept per model.
+        """
+        self.window = window
+        self._inflight: DefaultDict[str, int] = defaultdict(int)
+        self._latencies: DefaultDict[str, Latencies] = defaultdict(
+            lambda: deque(maxlen=max_samples),
+        )
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, model: str) -> Iterator[None]:
+        """
+        Count a model call as in flight and record its latency.
+
+        Args:
+            model (str): The model name.
+
+        Yields:
+            None: Control back to the model call.
+        """
+        with self._lock:
+            self._inflight[model] += 1
+        MODEL_INFLIGHT.labels(model=model).inc()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._inflight[model] -= 1
+                self._latencies[model].append((finished, finished - started))
+            MODEL_INFLIGHT.labels(model=model).dec()
+
+    def inflight(self) -> Dict[str, int]:
+        """
+        Get the number of calls in flight.
+
+        Returns:
+            Dict[str, int]: The in-flight calls by model.
+        """
+        with self._lock:
+            return dict(self._inflight)
+
+    def latency_quantile(self, model: str, quantile: float = LATENCY_QUANTILE) -> float:
+        """
+        Get a latency quantile of the calls finished within the window.
+
+        Args:
+            model (str): The model name.
+            quantile (float): The quantile, from 0 to 1.
+
+        Returns:
+            float: The latency in seconds, 0 without recent calls.
+        """
+        oldest = time.perf_counter() - self.window
+        with self._lock:
+            recent = [latency for finished, latency in self._latencies[model] if finished >= oldest]
+        if not recent:
+            return 0
+        recent.sort()
+        rank = int(quantile * len(recent))
+        return recent[min(len(recent) - 1, rank)]
+
+    def models(self) -> Tuple[str, ...]:
+        """
+        Get the names of the tracked models.
+
+        Returns:
+            Tuple[str, ...]: The models called at least once.
+        """
+        with self._lock:
+            return tuple(self._latencies.keys() | self._inflight.keys())
+
+
+inference_tracker = InferenceTracker(app_settings.load_window)
+
+
+class LoadMonitor:
+    """
+    Load snapshot of a worker for load balancers and autoscaling.
+
+    The saturation score is the larger of the queue pressure, the waiting requests relative to `queue_target`, and
+    the latency pressure, the worst model p95 relative to `latency_target`, capped at 1.
+
+    Args:
+        scheduler (Any): The `FairScheduler` of the inference requests.
+        pipeline (Any): The `RecognitionPipeline`.
+        latency_target (float): Model p95 latency in seconds that counts as saturated.
+        queue_target (int): Number of waiting requests that counts as saturated.
+        tracker (InferenceTracker): The in-flight and latency tracker of the models.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        scheduler: Any,
+        pipeline: Any,
+        latency_target: float,
+        queue_target: int,
+        tracker: InferenceTracker = inference_tracker,
+    ):
+        """
+        Initialize the monitor.
+
+        Args:
+            scheduler (Any): The `FairScheduler` of the inference requests.
+            pipeline (Any): The `RecognitionPipeline`.
+            latency_target (float): Model p95 latency in seconds that counts as saturated.
+            queue_target (int): Number of waiting requests that counts as saturated.
+            tracker (InferenceTracker): The in-flight and latency tracker of the models.
+        """
+        self.scheduler = scheduler
+        self.pipeline = pipeline
+        self.latency_target = latency_target
+        self.queue_target = queue_target
+        self.tracker = tracker
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Compute the current load and export it as gauges.
+
+        Returns:
+            Dict[str, Any]: The saturation, queue depths, in-flight calls and p95 latencies by model.
+        """
+        scheduler_queue = self.scheduler.queued
+        pipeline_queue = self.pipeline.queue_depth()
+        queue_depth = scheduler_queue + pipeline_queue
+        p95 = {model: self.tracker.latency_quantile(model) for model in self.tracker.models()}
+        queue_pressure = queue_depth / self.queue_target
+        latency_pressure = max(p95.values(), default=0) / self.latency_target
+        saturation = min(1.0, max(queue_pressure, latency_pressure))
+
+        LOAD_SATURATION.set(saturation)
+        LOAD_QUEUE_DEPTH.set(queue_depth)
+        for model, latency in p95.items():
+            MODEL_LATENCY_P95.labels(model=model).set(latency)
+        return {
+            "saturation": saturation,
+            "queue_depth": {"scheduler": scheduler_queue, "pipeline": pipeline_queue},
+            "running": self.scheduler.running,
+            "inflight": self.tracker.inflight(),
+            "p95_latency": p95,
+        }
@@ -1,22 +1,20 @@
 """Module provides prometheus metrics middleware for Starlette."""
-import os
-from typing import Tuple
-
-from prometheus_client import (
-    CONTENT_TYPE_LATEST,
-    REGISTRY,
-    CollectorRegistry,
-    Counter,
-    Gauge,
-    generate_latest,
-)
-from starlette.requests import HTTPConnection, Request
-from starlette.responses import Response
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
 from starlette.routing import Match
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.settings import app_settings
+
 SERVICE_NAME = "barcode_recognizer"
+PATH_CACHE_SIZE: int = 1024
+WEBSOCKET_METHOD: str = "WEBSOCKET"
+BODY_SIZE_BUCKETS = (0, 1e3, 1e4, 1e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7, 5e7)
+
 REQUESTS = Counter(
     f"{SERVICE_NAME}_starlette_requests_total",
     "Total count of requests by method and path.",
@@ -41,6 +39,46 @@ EXCEPTIONS = Counter(
     ["method", "path_template", "exception_type"],
 )
 
+REQUEST_DURATION = Histogram(
+    f"{SERVICE_NAME}_request_duration_seconds",
+    "Histogram of request durations by method and path.",
+    ["method", "path_template"],
+    buckets=app_settings.stage_latency_buckets,
+)
+
+REQUEST_SIZE = Histogram(
+    f"{SERVICE_NAME}_request_size_bytes",
+    "Histogram of request body sizes by method and path.",
+    ["method", "path_template"],
+    buckets=BODY_SIZE_BUCKETS,
+)
+
+RESPONSE_SIZE = Histogram(
+    f"{SERVICE_NAME}_response_size_bytes",
+    "Histogram of response body sizes by method and path.",
+    ["method", "path_template"],
+    buckets=BODY_SIZE_BUCKETS,
+)
+
+# Scrape stats
+SCRAPES = Counter(
+    f"{SERVICE_NAME}_metrics_scrapes_total",
+    "Total count of /metrics scrapes by cache result (hit or miss).",
+    ["cache"],
+)
+
+SCRAPE_COLLECT_DURATION = Histogram(
+    f"{SERVICE_NAME}_metrics_collect_duration_seconds",
+    "Histogram of the time spent collecting and serializing the metrics exposition.",
+    buckets=app_settings.stage_latency_buckets,
+)
+
+SCRAPE_SIZE = Gauge(
+    f"{SERVICE_NAME}_metrics_exposition_bytes",
+    "Gauge of the uncompressed size of the last metrics exposition in bytes.",
+    multiprocess_mode="max",
+)
+
 # RAM stats
 USED_RAM = Gauge(
     f"{SERVICE_NAME}_used_ram",
@@ -52,6 +90,221 @@ TOTAL_USED_RAM = Gauge(
     "Gauge of ram currently being used in bytes",
 )
 
+# Worker resource stats
+PROCESS_USS = Gauge(
+    f"{SERVICE_NAME}_process_uss_bytes",
+    "Gauge of the unique set size of a worker in bytes",
+)
+
+PROCESS_CPU_SECONDS = Gauge(
+    f"{SERVICE_NAME}_process_cpu_seconds",
+    "Gauge of the CPU time consumed by a worker by mode (user or system)",
+    ["mode"],
+)
+
+PROCESS_THREADS = Gauge(
+    f"{SERVICE_NAME}_process_threads",
+    "Gauge of the number of threads of a worker",
+)
+
+PROCESS_OPEN_FDS = Gauge(
+    f"{SERVICE_NAME}_process_open_fds",
+    "Gauge of the number of open file descriptors of a worker",
+)
+
+TORCH_THREADS = Gauge(
+    f"{SERVICE_NAME}_torch_intra_op_threads",
+    "Gauge of the torch intra-op thread setting of a worker",
+)
+
+GC_COLLECTIONS = Counter(
+    f"{SERVICE_NAME}_gc_collections_total",
+    "Total count of garbage collections by generation.",
+    ["generation"],
+)
+
+GC_PAUSE = Histogram(
+    f"{SERVICE_NAME}_gc_pause_seconds",
+    "Histogram of garbage collection pauses by generation.",
+    ["generation"],
+    buckets=app_settings.stage_latency_buckets,
+)
+
+# Log shipping stats
+LOG_RECORDS = Counter(
+    f"{SERVICE_NAME}_log_records_total",
+    "Total count of log records handed to the log shipper by outcome (shipped, dropped or failed).",
+    ["outcome"],
+)
+
+# Video stream stats
+STREAM_FRAMES = Counter(
+    f"{SERVICE_NAME}_stream_frames_total",
+    "Total count of stream frames by outcome (processed or dropped).",
+    ["outcome"],
+)
+
+STREAM_DETECTOR_RUNS = Counter(
+    f"{SERVICE_NAME}_stream_detector_runs_total",
+    "Total count of detector runs on stream frames.",
+)
+
+STREAM_RECOGNIZER_RUNS = Counter(
+    f"{SERVICE_NAME}_stream_recognizer_runs_total",
+    "Total count of recognizer runs for new stream tracks.",
+)
+
+# Model version stats
+MODEL_INFO = Gauge(
+    f"{SERVICE_NAME}_model_info",
+    "Gauge set to 1 for the checkpoint and sha256 of the active model of a worker.",
+    ["model", "checkpoint", "sha256"],
+)
+
+MODEL_LOADED_AT = Gauge(
+    f"{SERVICE_NAME}_model_loaded_timestamp_seconds",
+    "Gauge of the unix time the active model of a worker was loaded.",
+    ["model"],
+)
+
+# Load stats
+LOAD_SATURATION = Gauge(
+    f"{SERVICE_NAME}_load_saturation",
+    "Gauge of the 0-1 saturation score of a worker, as reported by /health/load.",
+    multiprocess_mode="livemax",
+)
+
+LOAD_QUEUE_DEPTH = Gauge(
+    f"{SERVICE_NAME}_load_queue_depth",
+    "Gauge of the number of inference requests waiting in the scheduler and the pipeline queues of a worker.",
+)
+
+MODEL_INFLIGHT = Gauge(
+    f"{SERVICE_NAME}_model_inflight",
+    "Gauge of the number of model calls in flight by model.",
+    ["model"],
+    multiprocess_mode="livesum",
+)
+
+MODEL_LATENCY_P95 = Gauge(
+    f"{SERVICE_NAME}_model_latency_p95_seconds",
+    "Gauge of the recent p95 latency of the model calls of a worker by model.",
+    ["model"],
+)
+
+# Scheduler stats
+SCHEDULER_WAIT = Histogram(
+    f"{SERVICE_NAME}_scheduler_wait_seconds",
+    "Histogram of the time requests wait for an inference slot by priority class.",
+    ["priority_class"],
+    buckets=app_settings.stage_latency_buckets,
+)
+
+SCHEDULER_QUEUED = Gauge(
+    f"{SERVICE_NAME}_scheduler_queued",
+    "Gauge of the number of requests waiting for an inference slot by priority class.",
+    ["priority_class"],
+)
+
+SCHEDULER_REJECTED = Counter(
+    f"{SERVICE_NAME}_scheduler_rejected_total",
+    "Total count of requests rejected by the scheduler by priority class and reason (quota or queue_full).",
+    ["priority_class", "reason"],
+)
+
+# Recognition pipeline stats
+PIPELINE_BUSY = Counter(
+    f"{SERVICE_NAME}_pipeline_busy_seconds_total",
+    "Total time the workers of a recognition pipeline stage spent on requests, divide its rate by the workers.",
+    ["stage"],
+)
+
+PIPELINE_WORKERS = Gauge(
+    f"{SERVICE_NAME}_pipeline_workers",
+    "Gauge of the number of workers of a recognition pipeline stage.",
+    ["stage"],
+)
+
+PIPELINE_QUEUE_DEPTH = Gauge(
+    f"{SERVICE_NAME}_pipeline_queue_depth",
+    "Gauge of the number of requests waiting for a recognition pipeline stage.",
+    ["stage"],
+)
+
+PIPELINE_QUEUE_WAIT = Histogram(
+    f"{SERVICE_NAME}_pipeline_queue_wait_seconds",
+    "Histogram of the time requests wait for a recognition pipeline stage.",
+    ["stage"],
+    buckets=app_settings.stage_latency_buckets,
+)
+
+# Inference pipeline stats
+STAGE_LATENCY = Histogram(
+    f"{SERVICE_NAME}_stage_duration_seconds",
+    "Histogram of the time spent in every inference pipeline stage by endpoint.",
+    ["endpoint", "stage"],
+    buckets=app_settings.stage_latency_buckets,
+)
+
+IMAGE_MEGAPIXELS = Histogram(
+    f"{SERVICE_NAME}_image_megapixels",
+    "Histogram of the decoded input image sizes in megapixels by endpoint.",
+    ["endpoint"],
+    buckets=app_settings.image_megapixels_buckets,
+)
+
+DETECTOR_PADDING_RATIO = Histogram(
+    f"{SERVICE_NAME}_detector_padding_ratio",
+    "Histogram of the fraction of the detector input taken by the letterbox padding by input bucket.",
+    ["bucket"],
+    buckets=(0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1),
+)
+
+DETECTOR_BUCKET_LATENCY = Histogram(
+    f"{SERVICE_NAME}_detector_forward_seconds",
+    "Histogram of the detector forward duration by input bucket.",
+    ["bucket"],
+    buckets=app_settings.stage_latency_buckets,
+)
+
+DETECTOR_TILES = Counter(
+    f"{SERVICE_NAME}_detector_tiles_total",
+    "Total count of the high-resolution detector tiles by result (evaluated or skipped by the coarse pass).",
+    ["result"],
+)
+
+CROPS_SKIPPED = Counter(
+    f"{SERVICE_NAME}_crops_skipped_total",
+    "Total count of detected components not sent to the recognizer by reason (area, aspect_ratio or top_k).",
+    ["reason"],
+)
+
+# Recognizer crop cache stats
+REC_CACHE_LOOKUPS = Counter(
+    f"{SERVICE_NAME}_recognizer_cache_lookups_total",
+    "Total count of recognizer crop cache lookups by result (hit or miss).",
+    ["result"],
+)
+
+REC_CACHE_VERIFICATIONS = Counter(
+    f"{SERVICE_NAME}_recognizer_cache_verifications_total",
+    "Total count of sampled cache hits checked against a fresh forward by result (agree or disagree).",
+    ["result"],
+)
+
+REC_CACHE_SIZE = Gauge(
+    f"{SERVICE_NAME}_recognizer_cache_size",
+    "Gauge of the number of crops in the recognizer cache.",
+    multiprocess_mode="livesum",
+)
+
+BARCODES_PER_IMAGE = Histogram(
+    f"{SERVICE_NAME}_barcodes_per_image",
+    "Histogram of the number of detected barcodes per image by endpoint.",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
 
 # pylint: disable=import-error,import-outside-toplevel
 def register() -> CollectorRegistry:
@@ -72,56 +325,176 @@ def register() -> CollectorRegistry:
     return registry
 
 
-# pylint: disable=import-error,import-outside-toplevel
-def metrics(_: Request) -> Response:
+class RequestMeter:
     """
-    Generate a Prometheus metrics response.
-
-    This function dynamically imports Prometheus client components and configures a metrics collector.
-    If the application is running in a multiprocess environment (indicated by the 'prometheus_multiproc_dir'
-    environment variable), it sets up a MultiProcessCollector. Otherwise, it uses the default registry.
+    Wrapper of the receive and send channels of a single request, counting the body bytes and the status code.
 
     Args:
-        _: Request - The incoming request. Not used in the function but required for interface compatibility.
+        receive (Receive): The receive channel of the request.
+        send (Send): The send channel of the request.
+        content_length (Optional[int]): The declared request body size, None counts the bytes the app reads.
+    """
 
-    Returns:
-        Response: A response object containing Prometheus metrics data.
+    __slots__ = ("status_code", "request_size", "response_size", "_count_request_body", "_receive", "_send")
+
+    def __init__(self, receive: Receive, send: Send, content_length: Optional[int]):
+        """
+        Initialize the meter.
+
+        Args:
+            receive (Receive): The receive channel of the request.
+            send (Send): The send channel of the request.
+            content_length (Optional[int]): The declared request body size, None counts the bytes the app reads.
+        """
+        self.status_code: Optional[int] = None
+        # chunked requests have no content length, count the bytes the app reads instead
+        self._count_request_body = content_length is None
+        self.request_size = content_length or 0
+        self.response_size = 0
+        self._receive = receive
+        self._send = send
+
+    async def receive(self) -> Message:
+        """
+        Receive a request event.
+
+        Returns:
+            Message: The event.
+        """
+        message = await self._receive()
+        if self._count_request_body and message["type"] == "http.request":
+            self.request_size += len(message.get("body", b""))
+        return message
+
+    async def send(self, message: Message) -> None:
+        """
+        Send a response event.
+
+        Args:
+            message (Message): The event.
+        """
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            self.response_size += len(message.get("body", b""))
+        await self._send(message)
+
+
+class RouteMetrics:
     """
-    import prometheus_client
-    from prometheus_client import multiprocess as prom_mp
+    Labelled metric children of a single method and path template.
+
+    Resolving the children once per route keeps the label lookups of prometheus_client off the hot path.
+
+    Args:
+        method (str): The request method.
+        path_template (str): The path template of the route.
+    """
+
+    __slots__ = (
+        "method",
+        "path_template",
+        "_in_progress",
+        "_requests",
+        "_duration",
+        "_request_size",
+        "_response_size",
+        "_responses",
+    )
+
+    def __init__(self, method: str, path_template: str):
+        """
+        Resolve the labelled children.
+
+        Args:
+            method (str): The request method.
+            path_template (str): The path template of the route.
+        """
+        self.method = method
+        self.path_template = path_template
+        self._in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        self._requests = REQUESTS.labels(method=method, path_template=path_template)
+        self._duration = REQUEST_DURATION.labels(method=method, path_template=path_template)
+        self._request_size = REQUEST_SIZE.labels(method=method, path_template=path_template)
+        self._response_size = RESPONSE_SIZE.labels(method=method, path_template=path_template)
+        self._responses: Dict[Optional[int], Any] = {}
+
+    def start(self) -> float:
+        """
+        Count a started request.
 
-    if "prometheus_multiproc_dir" in os.environ:
-        registry = prometheus_client.CollectorRegistry()
-        prom_mp.MultiProcessCollector(registry)
-    else:
-        registry = REGISTRY
+        Returns:
+            float: The start time of the request.
+        """
+        self._in_progress.inc()
+        self._requests.inc()
+        return time.perf_counter()
 
-    return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+    def finish(self, meter: RequestMeter, started: float) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            meter (RequestMeter): The body sizes and the status code of the request.
+            started (float): The start time of the request.
+        """
+        self._duration.observe(time.perf_counter() - started)
+        self._request_size.observe(meter.request_size)
+        self._response_size.observe(meter.response_size)
+        self.responses(meter.status_code).inc()
+        self._in_progress.dec()
+
+    def responses(self, status_code: Optional[int]) -> Any:
+        """
+        Get the response counter of a status code.
+
+        Args:
+            status_code (Optional[int]): The response status code.
+
+        Returns:
+            Any: The labelled counter.
+        """
+        counter = self._responses.get(status_code)
+        if counter is None:
+            counter = RESPONSES.labels(method=self.method, path_template=self.path_template, status_code=status_code)
+            self._responses[status_code] = counter
+        return counter
 
 
 class PrometheusMiddleware:
     """
     Middleware for integrating Prometheus monitoring in an ASGI application.
 
-    This middleware collects and exposes metrics such as HTTP request counts,
-    in-progress requests, and exceptions for Prometheus monitoring.
+    This middleware collects and exposes metrics such as HTTP request counts, in-progress requests, exceptions,
+    request and response body sizes and request durations for Prometheus monitoring.
+
+    Path templates and their labelled metrics are resolved once per (scope type, method, path) and kept in a
+    bounded LRU cache, so the per-request cost does not grow with the number of routes.
 
     Attributes:
         app (ASGIApp): The ASGI application instance.
         filter_unhandled_paths (bool): Flag to determine whether to filter out metrics for unhandled paths.
+        path_cache_size (int): Maximum number of cached paths, 0 disables the cache.
     """
 
-    def __init__(self, app: ASGIApp, filter_unhandled_paths: bool = False) -> None:
+    def __init__(
+        self,
+        app: ASGIApp,
+        filter_unhandled_paths: bool = False,
+        path_cache_size: int = PATH_CACHE_SIZE,
+    ) -> None:
         """
         Initialize the PrometheusMiddleware.
 
         Args:
             app (ASGIApp): The ASGI application to wrap with the middleware.
-            filter_unhandled_paths (bool): If set to True, paths that are not explicitly handled by the application will
-                be filtered out from metrics collection. Defaults to False.
+            filter_unhandled_paths (bool): Whether to skip the paths the application does not handle. Defaults to False.
+            path_cache_size (int): Maximum number of cached paths, 0 disables the cache. Defaults to 1024.
         """
         self.app = app
         self.filter_unhandled_paths = filter_unhandled_paths
+        self.path_cache_size = path_cache_size
+        self._path_cache: "OrderedDict[Tuple[str, str, str], Optional[RouteMetrics]]" = OrderedDict()
 
     @staticmethod
     def get_path_template(scope: Scope) -> Tuple[str, bool]:
@@ -135,12 +508,11 @@ class PrometheusMiddleware:
             Tuple[str, bool]: A tuple containing the path template and a boolean indicating whether the path is
                 explicitly handled by the app.
         """
-        conn = HTTPConnection(scope)
         for route in scope["app"].routes:
             match, _ = route.matches(scope)
             if match == Match.FULL:
                 return route.path, True
-        return conn.url.path, False
+        return scope.get("root_path", "") + scope["path"], False
 
     def _is_path_filtered(self, is_handled_path: bool) -> bool:
         """
@@ -154,7 +526,64 @@ class PrometheusMiddleware:
         """
         return self.filter_unhandled_paths and not is_handled_path
 
-    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    @staticmethod
+    def content_length(scope: Scope) -> Optional[int]:
+        """
+        Get the declared request body size.
+
+        Args:
+            scope (Scope): The scope of the request.
+
+        Returns:
+            Optional[int]: The content length, or None if the header is missing or malformed.
+        """
+        for header_name, header_value in scope.get("headers", ()):
+            if header_name == b"content-length":
+                return int(header_value) if header_value.isdigit() else None
+        return None
+
+    def _resolve_metrics(self, scope: Scope, method: str) -> Optional[RouteMetrics]:
+        """
+        Resolve the metrics of the current request without the cache.
+
+        Args:
+            scope (Scope): The scope of the request.
+            method (str): The request method.
+
+        Returns:
+            Optional[RouteMetrics]: The route metrics, or None if the path is filtered out.
+        """
+        path_template, is_handled_path = self.get_path_template(scope)
+        if self._is_path_filtered(is_handled_path):
+            return None
+        return RouteMetrics(method, path_template)
+
+    def route_metrics(self, scope: Scope, method: str) -> Optional[RouteMetrics]:
+        """
+        Get the metrics of the current request from the cache, resolving them on a miss.
+
+        Args:
+            scope (Scope): The scope of the request.
+            method (str): The request method.
+
+        Returns:
+            Optional[RouteMetrics]: The route metrics, or None if the path is filtered out.
+        """
+        if not self.path_cache_size:
+            return self._resolve_metrics(scope, method)
+        key = (scope["type"], method, scope["path"])
+        try:
+            route_metrics = self._path_cache[key]
+        except KeyError:
+            route_metrics = self._resolve_metrics(scope, method)
+            self._path_cache[key] = route_metrics
+            if len(self._path_cache) > self.path_cache_size:
+                self._path_cache.popitem(last=False)
+            return route_metrics
+        self._path_cache.move_to_end(key)
+        return route_metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:  # noqa: WPS217
         """
         Asynchronous call method for the middleware.
 
@@ -168,33 +597,25 @@ class PrometheusMiddleware:
         Raises:
             BaseException: Propagates exceptions from the application while ensuring metrics are recorded.
         """
-        status_code = None
-
-        async def send_wrapper(message: Message) -> None:
-            nonlocal status_code
-            if message["type"] == "http.response.start":
-                status_code = message["status"]
-            await send(message)
-
         if scope["type"] not in {"http", "websocket"}:
             await self.app(scope, receive, send)
             return
 
-        path_template, is_handled_path = self.get_path_template(scope)
-        if self._is_path_filtered(is_handled_path):
+        # websocket scopes have no method
+        method = scope.get("method", WEBSOCKET_METHOD)
+        route_metrics = self.route_metrics(scope, method)
+        if route_metrics is None:
             await self.app(scope, receive, send)
             return
 
-        method = scope["method"]
-        REQUESTS_IN_PROGRESS.labels(method=method).inc()
-        REQUESTS.labels(method=method, path_template=path_template).inc()
+        meter = RequestMeter(receive, send, self.content_length(scope))
+        started = route_metrics.start()
         try:
-            await self.app(scope, receive, send_wrapper)
+            await self.app(scope, meter.receive, meter.send)
         except BaseException as exp:
             exp_type = type(exp).__name__
-            status_code = HTTP_500_INTERNAL_SERVER_ERROR
-            EXCEPTIONS.labels(method=method, path_template=path_template, exception_type=exp_type).inc()
+            meter.status_code = HTTP_500_INTERNAL_SERVER_ERROR
+            EXCEPTIONS.labels(method=method, path_template=route_metrics.path_template, exception_type=exp_type).inc()
             raise exp from None
         finally:
-            RESPONSES.labels(method=method, path_template=path_template, status_code=status_code).inc()
-            REQUESTS_IN_PROGRESS.labels(method=method).dec()
+            route_metrics.finish(meter, started)
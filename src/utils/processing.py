@@ -1,5 +1,6 @@
 """Utility functions for the service."""
-from typing import Dict, List, Tuple
+import math
+from typing import Dict, List, Sequence, Tuple
 
 import cv2
 import numpy as np
@@ -7,6 +8,9 @@ import torch
 from numpy.typing import NDArray
 
 BASE_SCALING_FACTOR: int = 255
+BUCKET_FILL_TOLERANCE: float = 0.05
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
 
 
 def prepare_bbox(bbox: List[int]) -> Dict[str, int]:
@@ -21,10 +25,23 @@ def prepare_bbox(bbox: List[int]) -> Dict[str, int]:
     x_min = bbox[0]
     x_max = x_min + bbox[2]
     y_min = bbox[1]
-    y_max = y_min + bbox[2]
+    y_max = y_min + bbox[3]
     return {"x_min": x_min, "x_max": x_max, "y_min": y_min, "y_max": y_max}
 
 
+def crop_bbox(image: NDArray[np.uint8], bbox: Dict[str, int]) -> NDArray[np.uint8]:
+    """Cut the bbox region out of the image.
+
+    Args:
+        image (NDArray[np.uint8]): The full image.
+        bbox (Dict[str, int]): Dict of bbox coords in MinMax.
+
+    Returns:
+        NDArray[np.uint8]: The view of the image inside the bbox.
+    """
+    return image[bbox["y_min"] : bbox["y_max"], bbox["x_min"] : bbox["x_max"], :]
+
+
 def preprocess_image(
     image: NDArray[np.uint8],
     target_image_size: Tuple[int, int] = (224, 224),
@@ -58,21 +75,21 @@ def preprocess_image(
     # Resize the image
     processed_image = cv2.resize(processed_image, (new_width, new_height))
 
-    # Add padding
+    # Add padding, the odd pixel goes to the bottom and right so the output is exactly the target size
     processed_image = cv2.copyMakeBorder(
         processed_image,
         pad_height,
-        pad_height,
-        pad_width,
+        target_height - new_height - pad_height,
         pad_width,
+        target_width - new_width - pad_width,
         cv2.BORDER_CONSTANT,
         value=[0, 0, 0],
     )
 
     # Transpose and normalization
     processed_image = np.transpose(processed_image, (2, 0, 1))
-    processed_image -= np.array([0.485, 0.456, 0.406])[:, None, None]
-    processed_image /= np.array([0.229, 0.224, 0.225])[:, None, None]
+    processed_image -= np.array(IMAGENET_MEAN)[:, None, None]
+    processed_image /= np.array(IMAGENET_STD)[:, None, None]
 
     return torch.from_numpy(processed_image)[None]
 
@@ -106,3 +123,58 @@ def resize_mask_back_to_original(mask: torch.Tensor, original_image_size: Tuple[
     cropped_mask = mask[pad_height : pad_height + new_height, pad_width : pad_width + new_width]
 
     return cv2.resize(cropped_mask, (original_width, original_height), interpolation=cv2.INTER_NEAREST)
+
+
+def bucket_scale(image_size: Tuple[int, ...], bucket: Tuple[int, int]) -> float:
+    """
+    Get the scale an image is resized with to fit into an input bucket.
+
+    Args:
+        image_size (Tuple[int, ...]): The (height, width) of the image.
+        bucket (Tuple[int, int]): The (height, width) of the bucket.
+
+    Returns:
+        float: The letterbox scale.
+    """
+    return min(bucket[0] / image_size[0], bucket[1] / image_size[1])
+
+
+def padding_ratio(image_size: Tuple[int, ...], bucket: Tuple[int, int]) -> float:
+    """
+    Get the fraction of an input bucket taken by the letterbox padding of an image.
+
+    Args:
+        image_size (Tuple[int, ...]): The (height, width) of the image.
+        bucket (Tuple[int, int]): The (height, width) of the bucket.
+
+    Returns:
+        float: The padded fraction of the bucket, from 0 to 1.
+    """
+    scale = bucket_scale(image_size, bucket)
+    resized_area = int(image_size[0] * scale) * int(image_size[1] * scale)
+    return 1 - resized_area / (bucket[0] * bucket[1])
+
+
+def select_bucket(
+    image_size: Tuple[int, ...],
+    buckets: Sequence[Tuple[int, int]],
+    tolerance: float = BUCKET_FILL_TOLERANCE,
+) -> Tuple[int, int]:
+    """
+    Select the input bucket of an image.
+
+    The buckets with the least padding, within `tolerance`, are candidates. Among them, the one with the letterbox
+    scale closest to 1 is taken, so large photos get the largest bucket and thumbnails are not upscaled for nothing.
+
+    Args:
+        image_size (Tuple[int, ...]): The (height, width) of the image.
+        buckets (Sequence[Tuple[int, int]]): The (height, width) of every bucket.
+        tolerance (float): Padding ratio difference under which buckets are considered equally good.
+
+    Returns:
+        Tuple[int, int]: The selected bucket.
+    """
+    ratios = [padding_ratio(image_size, bucket) for bucket in buckets]
+    least_padding = min(ratios)
+    candidates = [bucket for bucket, ratio in zip(buckets, ratios) if ratio <= least_padding + tolerance]
+    return min(candidates, key=lambda bucket: abs(math.log(bucket_scale(image_size, bucket))))
@@ -0,0 +1,223 @@
+"""Module provides on-demand profiling of a live worker: sampled Python stacks or torch traces of the forwards."""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Any, ClassVar, Dict, Iterator, List, Optional
+
+import torch
+from torch.profiler import ProfilerActivity
+
+SAMPLE_INTERVAL_SEC: float = 0.005
+TORCH_MAX_FORWARDS: int = 100
+
+# only one profile runs at a time in a worker
+profile_lock = threading.Lock()
+
+
+class TorchTraceSession:
+    """
+    Collector of the torch profiler traces of a sample of the model forwards run while it is active.
+
+    The torch profiler records the ops of the thread it is started on, so every sampled forward gets its own profiler.
+    A forward is sampled only while no other forward is being profiled and fewer than `max_forwards` were sampled,
+    the other forwards run unprofiled instead of waiting. The traces are exported once, when the session ends.
+    Entering the session makes it the active one of the worker.
+
+    Args:
+        max_forwards (int): Maximum number of sampled forwards.
+    """
+
+    active: ClassVar[Optional["TorchTraceSession"]] = None
+
+    def __init__(self, max_forwards: int = TORCH_MAX_FORWARDS):
+        """
+        Initialize an empty session.
+
+        Args:
+            max_forwards (int): Maximum number of sampled forwards.
+        """
+        self.max_forwards = max_forwards
+        self._profiles: List[torch.profiler.profile] = []
+        self._closed = False
+        self._sampling_lock = threading.Lock()
+
+    def __enter__(self) -> "TorchTraceSession":
+        """
+        Start sampling the forwards of the worker.
+
+        Returns:
+            TorchTraceSession: The session itself.
+        """
+        TorchTraceSession.active = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Stop sampling the forwards of the worker.
+
+        Args:
+            exc_info (Any): The exception raised during the capture, if any.
+        """
+        TorchTraceSession.active = None
+
+    @contextmanager
+    def record(self) -> Iterator[None]:
+        """
+        Profile the forward if no other forward is being profiled, otherwise run it unprofiled.
+
+        Yields:
+            None: Control to the forward.
+        """
+        if not self._sampling_lock.acquire(blocking=False):
+            yield
+            return
+        with ExitStack() as sampling:
+            sampling.callback(self._sampling_lock.release)
+            if self._closed or len(self._profiles) >= self.max_forwards:
+                yield
+                return
+            prof = torch.profiler.profile(activities=[ProfilerActivity.CPU], record_shapes=True)
+            with prof:
+                yield
+            self._profiles.append(prof)
+
+    def chrome_trace(self) -> bytes:
+        """
+        Close the session and merge the sampled traces, waiting for a forward that is still being profiled.
+
+        Returns:
+            bytes: The Chrome trace JSON.
+        """
+        with self._sampling_lock:
+            self._closed = True
+            events = self._export_events()
+        return json.dumps({"traceEvents": events}).encode("utf-8")
+
+    def _export_events(self) -> List[Dict[str, Any]]:
+        """
+        Export the trace events of the sampled forwards.
+
+        Returns:
+            List[Dict[str, Any]]: The Chrome trace events.
+        """
+        events: List[Dict[str, Any]] = []
+        with tempfile.TemporaryDirectory() as trace_dir:
+            trace_path = os.path.join(trace_dir, "trace.json")
+            for prof in self._profiles:
+                prof.export_chrome_trace(trace_path)
+                with open(trace_path, encoding="utf-8") as trace_json:
+                    events.extend(json.load(trace_json).get("traceEvents", []))
+        return events
+
+
+@contextmanager
+def forward_profile() -> Iterator[None]:
+    """
+    Profile the model forward when a torch trace is being captured, otherwise do nothing.
+
+    Yields:
+        None: Control to the forward.
+    """
+    session = TorchTraceSession.active
+    if session is None:
+        yield
+        return
+    with session.record():
+        yield
+
+
+def capture_torch_trace(seconds: float) -> bytes:
+    """
+    Capture the torch profiler traces of a sample of the model forwards run during the given time.
+
+    Args:
+        seconds (float): Capture duration.
+
+    Returns:
+        bytes: The Chrome trace JSON, viewable in chrome://tracing or Perfetto.
+    """
+    session = TorchTraceSession()
+    with session:
+        time.sleep(seconds)
+    return session.chrome_trace()
+
+
+def _fold_stack(thread_name: str, frame: Any) -> str:
+    """
+    Fold a Python stack into a single line, root first.
+
+    Args:
+        thread_name (str): The name of the thread, prepended as the root.
+        frame (Any): The innermost frame.
+
+    Returns:
+        str: The thread name and the frames as "function (file:line)" joined with ";".
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        function_name = code.co_name
+        file_name = os.path.basename(code.co_filename)
+        line_number = frame.f_lineno
+        frames.append(f"{function_name} ({file_name}:{line_number})")
+        frame = frame.f_back
+    frames.append(thread_name)
+    return ";".join(reversed(frames))
+
+
+def capture_python_profile(seconds: float, interval: float = SAMPLE_INTERVAL_SEC) -> bytes:
+    """
+    Sample the stacks of all the worker threads during the given time.
+
+    Args:
+        seconds (float): Capture duration.
+        interval (float): Seconds between samples.
+
+    Returns:
+        bytes: The samples in the folded stacks format of flamegraph.pl and speedscope, one "stack count" per line.
+    """
+    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+    samples: "Counter[str]" = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():  # noqa: WPS437
+            if ident == threading.get_ident():
+                continue
+            thread_name = thread_names.get(ident) or str(ident)
+            samples[_fold_stack(thread_name, frame)] += 1
+        time.sleep(interval)
+    counts = samples.most_common()
+    lines = [f"{stack} {count}\n" for stack, count in counts]
+    return "".join(lines).encode("utf-8")
+
+
+def write_profile(artifact: bytes, output_dir: str, mode: str, extension: str) -> str:
+    """
+    Write a profile to the output directory under a unique name.
+
+    The name holds the mode, the worker pid and the capture time, and a random suffix keeps the profiles captured
+    within the same second apart.
+
+    Args:
+        artifact (bytes): The profile.
+        output_dir (str): The directory to write to, created if missing.
+        mode (str): The profile mode.
+        extension (str): The file extension.
+
+    Returns:
+        str: The path of the written profile.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = int(time.time())
+    name_parts = (mode, os.getpid(), stamp, uuid.uuid4().hex)
+    stem = "_".join(map(str, name_parts))
+    path = os.path.join(output_dir, f"{stem}.{extension}")
+    with open(path, "wb") as profile_file:
+        profile_file.write(artifact)
+    return path
@@ -1,6 +1,7 @@
 """Module provides functionality for monitoring and logging RAM usage of the current process and the overall system."""
 import asyncio
 import os
+from functools import lru_cache
 from typing import Tuple
 
 import psutil
@@ -10,6 +11,20 @@ from src.utils.metrics import TOTAL_USED_RAM, USED_RAM
 RAM_CHECK_TIMEOUT: int = 120
 
 
+@lru_cache(maxsize=1)
+def get_process(pid: int) -> psutil.Process:
+    """
+    Get the psutil handle of a process, reused while the PID does not change.
+
+    Args:
+        pid (int): The process id.
+
+    Returns:
+        psutil.Process: The process handle.
+    """
+    return psutil.Process(pid)
+
+
 def process_memory_bytes() -> Tuple[int, int]:
     """
     Get the memory usage in bytes of the current process.
@@ -18,8 +33,7 @@ def process_memory_bytes() -> Tuple[int, int]:
         tuple[int, int]: A tuple containing the memory usage in bytes (rss) of the current process and its PID.
     """
     pid = os.getpid()
-    process = psutil.Process(pid)
-    mem_info = process.memory_info()
+    mem_info = get_process(pid).memory_info()
     return mem_info.rss, pid
 
 
@@ -0,0 +1,391 @@
+"""Module provides a traffic recording middleware producing JSONL files for `src.replay`."""
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+RECORD_QUEUE_SIZE: int = 10000
+CANONICAL_BOUNDARY: str = "recorded-request-boundary"
+# 16 MiB
+DEFAULT_MAX_BODY_SIZE: int = 16777216
+
+Record = Dict[str, Any]
+# a queued record, None stops the writer thread
+QueuedRecord = Optional[Record]
+
+
+class TrafficRecorder:
+    """
+    Background writer of the recorded requests.
+
+    Records are put into a bounded queue and written by a daemon thread, so the event loop never waits for
+    the disk. When the queue is full the record is dropped.
+
+    Args:
+        path (str): The JSONL file the records are appended to.
+        bodies_dir (str): Directory to store the request bodies named by their sha256, empty to skip bodies.
+    """
+
+    def __init__(self, path: str, bodies_dir: str = ""):
+        """
+        Initialize the recorder and start the writer thread.
+
+        Args:
+            path (str): The JSONL file the records are appended to.
+            bodies_dir (str): Directory to store the request bodies named by their sha256, empty to skip bodies.
+        """
+        self.path = path
+        self.bodies_dir = bodies_dir
+        self.dropped = 0
+        records_dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(records_dir, exist_ok=True)
+        self._queue: "queue.Queue[QueuedRecord]" = queue.Queue(maxsize=RECORD_QUEUE_SIZE)
+        if bodies_dir:
+            os.makedirs(bodies_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name="traffic-recorder", daemon=True)
+        self._thread.start()
+
+    def put(self, record: Record) -> None:
+        """
+        Enqueue a record for writing.
+
+        Args:
+            record (Record): The request record. The `_body` key holds the raw request body, None if the
+                body was too large to buffer.
+        """
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Write the pending records and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _store_body(self, digest: str, body: bytes) -> None:
+        """
+        Store the request body under its digest unless it is already stored.
+
+        Args:
+            digest (str): The sha256 of the body.
+            body (bytes): The raw request body.
+        """
+        body_path = os.path.join(self.bodies_dir, digest)
+        if not os.path.exists(body_path):
+            with open(body_path, "wb") as body_file:
+                body_file.write(body)
+
+    @staticmethod
+    def canonicalize(record: Record, body: bytes) -> bytes:
+        """
+        Replace the random multipart boundary with a fixed one, so the same upload always has the same hash.
+
+        Args:
+            record (Record): The request record, its content type is updated in place.
+            body (bytes): The raw request body.
+
+        Returns:
+            bytes: The body with the canonical boundary.
+        """
+        content_type = record["content_type"]
+        _, _, boundary = content_type.partition("boundary=")
+        boundary = boundary.split(";")[0].strip('"')
+        if not boundary:
+            return body
+        record.update(content_type=content_type.replace(boundary, CANONICAL_BOUNDARY))
+        return body.replace(boundary.encode("latin-1"), CANONICAL_BOUNDARY.encode("latin-1"))
+
+    def _write_loop(self) -> None:
+        """Hash the bodies and write the queued records until the stop marker is received."""
+        with open(self.path, "a", encoding="utf-8") as record_file:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                body = record.pop("_body")
+                if body is not None:
+                    body = self.canonicalize(record, body)
+                    record["sha256"] = hashlib.sha256(body).hexdigest()
+                if self.bodies_dir and body:
+                    self._store_body(record["sha256"], body)
+                line = json.dumps(record)
+                record_file.write(f"{line}\n")
+                if self._queue.empty():
+                    record_file.flush()
+
+
+class RecordedRequest:
+    """
+    A sampled request: buffers its body, wraps its ASGI callables and queues its record when the request completes.
+
+    The body is read before the application runs, so it is recorded whether or not the application consumes it, and
+    the buffered events are handed to the application first.
+
+    Args:
+        scope (Scope): The scope of the request.
+        receive (Receive): The receive callable of the request.
+        send (Send): The send callable of the request.
+        recorder (TrafficRecorder): The background writer.
+        max_body_size (int): Largest body in bytes buffered, a larger body is streamed to the application.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        recorder: TrafficRecorder,
+        max_body_size: int,
+    ):
+        """
+        Start the record of the request.
+
+        Args:
+            scope (Scope): The scope of the request.
+            receive (Receive): The receive callable of the request.
+            send (Send): The send callable of the request.
+            recorder (TrafficRecorder): The background writer.
+            max_body_size (int): Largest body in bytes buffered, a larger body is streamed to the application.
+        """
+        headers = dict(scope["headers"])
+        self.record: Record = {
+            "ts": time.time(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "content_type": headers.get(b"content-type", b"").decode("latin-1"),
+            "status_code": None,
+        }
+        content_length = headers.get(b"content-length", b"")
+        self._content_length = int(content_length) if content_length.isdigit() else None
+        self._size = 0
+        self._receive = receive
+        self._send = send
+        self._recorder = recorder
+        self._max_body_size = max_body_size
+        self._buffered: Deque[Message] = deque()
+        self._body: Optional[bytes] = None
+        self._started = time.perf_counter()
+
+    async def __aenter__(self) -> "RecordedRequest":
+        """
+        Buffer the request body up to the size limit.
+
+        Returns:
+            RecordedRequest: The request itself.
+        """
+        more_body = self._content_length != 0
+        while more_body and self._size <= self._max_body_size:
+            message = await self.read()
+            self._buffered.append(message)
+            # a disconnect ends the body too
+            more_body = message.get("more_body", False)
+        if self._size <= self._max_body_size:
+            chunks = [message.get("body", b"") for message in self._buffered]
+            self._body = b"".join(chunks)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """
+        Complete the record and queue it, also when the application failed.
+
+        Args:
+            exc_info: The exception raised by the application, if any.
+        """
+        self.record["duration"] = time.perf_counter() - self._started
+        self.record["size"] = self._size if self._content_length is None else self._content_length
+        # hashing and storing happen in the writer thread, off the event loop
+        self.record["_body"] = self._body
+        self._recorder.put(self.record)
+
+    async def read(self) -> Message:
+        """
+        Receive a request event from the server and count its body.
+
+        Returns:
+            Message: The event.
+        """
+        message = await self._receive()
+        if message["type"] == "http.request":
+            self._size += len(message.get("body", b""))
+        return message
+
+    async def receive(self) -> Message:
+        """
+        Receive a request event, the buffered ones first.
+
+        Returns:
+            Message: The event.
+        """
+        if self._buffered:
+            return self._buffered.popleft()
+        return await self.read()
+
+    async def send(self, message: Message) -> None:
+        """
+        Send a response event and keep the response status.
+
+        Args:
+            message (Message): The event.
+        """
+        if message["type"] == "http.response.start":
+            self.record["status_code"] = message["status"]
+        await self._send(message)
+
+
+class TrafficRecordingMiddleware:
+    """
+    Middleware that samples HTTP requests into a JSONL file suitable for `python -m src.replay`.
+
+    Every record holds the arrival time, method, path, content type, body size and sha256, status code and
+    the time spent in the application. The body is buffered by the middleware, so requests the application rejects
+    before reading them are recorded too. Multipart boundaries are canonicalized before hashing, so the same
+    uploaded image always gets the same sha256. Bodies larger than `max_body_size` are not kept, their records
+    take the size from the content length but have no sha256, and the replay sends its fallback image instead.
+
+    Attributes:
+        app (ASGIApp): The ASGI application instance.
+        recorder (TrafficRecorder): The background writer.
+        sample_rate (float): Fraction of requests to record.
+        excluded_paths (List[str]): Paths that are never recorded.
+        max_body_size (int): Largest request body in bytes buffered for recording.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        app: ASGIApp,
+        recorder: TrafficRecorder,
+        sample_rate: float = 1.0,
+        excluded_paths: Optional[List[str]] = None,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    ) -> None:
+        """
+        Initialize the TrafficRecordingMiddleware.
+
+        Args:
+            app (ASGIApp): The ASGI application to wrap with the middleware.
+            recorder (TrafficRecorder): The background writer.
+            sample_rate (float): Fraction of requests to record. Defaults to 1.0.
+            excluded_paths (Optional[List[str]]): Paths that are never recorded. Defaults to /metrics.
+            max_body_size (int): Largest request body in bytes buffered for recording. Defaults to 16 MiB.
+        """
+        self.app = app
+        self.recorder = recorder
+        self.sample_rate = sample_rate
+        self.excluded_paths = excluded_paths if excluded_paths is not None else ["/metrics"]
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Asynchronous call method for the middleware.
+
+        Args:
+            scope (Scope): The scope of the request, containing request details.
+            receive (Receive): An awaitable callable yielding request events.
+            send (Send): An awaitable callable used for sending response events.
+        """
+        if not self._sampled(scope):
+            await self.app(scope, receive, send)
+            return
+        async with RecordedRequest(scope, receive, send, self.recorder, self.max_body_size) as request:
+            await self.app(scope, request.receive, request.send)
+
+    def _sampled(self, scope: Scope) -> bool:
+        """
+        Decide whether a request is recorded.
+
+        Args:
+            scope (Scope): The scope of the request.
+
+        Returns:
+            bool: True for the sampled HTTP requests outside the excluded paths.
+        """
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            return False
+        # sampling, not security
+        return random.random() < self.sample_rate  # noqa: S311
+
+
+def load_records(path: str) -> List[Record]:
+    """
+    Load the recorded requests ordered by arrival time.
+
+    Args:
+        path (str): The JSONL file written by `TrafficRecordingMiddleware`.
+
+    Returns:
+        List[Record]: The records.
+    """
+    with open(path, encoding="utf-8") as records_file:
+        records = [json.loads(line) for line in records_file if line.strip()]
+    return sorted(records, key=lambda record: record.get("ts", 0))
+
+
+class BodyResolver:
+    """
+    Build the request body for a record.
+
+    The stored body is looked up by its sha256 in `bodies_dir`. When it is missing, the fallback image is sent
+    as the multipart "image" field the inference endpoints expect.
+
+    Args:
+        bodies_dir (Optional[str]): Directory with the bodies stored by the recorder.
+        fallback_image (Optional[str]): Image to send when the recorded body is not available.
+    """
+
+    def __init__(self, bodies_dir: Optional[str] = None, fallback_image: Optional[str] = None):
+        """
+        Initialize the resolver.
+
+        Args:
+            bodies_dir (Optional[str]): Directory with the bodies stored by the recorder.
+            fallback_image (Optional[str]): Image to send when the recorded body is not available.
+        """
+        self.bodies_dir = bodies_dir
+        self.fallback_image: Optional[bytes] = None
+        if fallback_image:
+            with open(fallback_image, "rb") as image_file:
+                self.fallback_image = image_file.read()
+        self._cache: Dict[str, bytes] = {}
+
+    def request_kwargs(self, record: Record) -> Dict[str, Any]:
+        """
+        Build the httpx request keyword arguments for a record.
+
+        Args:
+            record (Record): The recorded request.
+
+        Returns:
+            Dict[str, Any]: The body related keyword arguments.
+        """
+        body = self._load_body(record.get("sha256", ""))
+        if body is not None:
+            return {"content": body, "headers": {"content-type": record["content_type"]}}
+        if record["size"] and self.fallback_image is not None:
+            return {"files": {"image": self.fallback_image}}
+        return {}
+
+    def _load_body(self, digest: str) -> Optional[bytes]:
+        """
+        Read a stored body once and keep it for the following requests.
+
+        Args:
+            digest (str): The sha256 of the body, empty if the body was not recorded.
+
+        Returns:
+            Optional[bytes]: The body, None if it is not stored.
+        """
+        if not self.bodies_dir or not digest:
+            return None
+        body_path = os.path.join(self.bodies_dir, digest)
+        if digest not in self._cache and os.path.exists(body_path):
+            with open(body_path, "rb") as body_file:
+                self._cache[digest] = body_file.read()
+        return self._cache.get(digest)
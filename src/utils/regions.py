@@ -0,0 +1,150 @@
+"""Letterboxed and normalized crops of several image regions in a single `roi_align` call."""
+from typing import Sequence, Tuple
+
+import numpy as np
+import torch
+from numpy.typing import NDArray
+
+from src.utils.processing import BASE_SCALING_FACTOR, IMAGENET_MEAN, IMAGENET_STD
+
+TARGET_IMAGE_SIZE = (224, 224)
+# the padding and size (width, height) pairs reordered to [pad_height, pad_width, new_height, new_width]
+PLACEMENT_ORDER = (1, 0, 3, 2)
+
+Image = NDArray[np.uint8]
+Coords = NDArray[np.int64]
+Regions = Sequence[Sequence[int]]
+
+
+def letterbox_rois(
+    bboxes: Regions,
+    target_image_size: Tuple[int, int] = TARGET_IMAGE_SIZE,
+) -> Tuple[NDArray[np.float32], NDArray[np.int64]]:
+    """
+    Get the `roi_align` boxes that letterbox image regions the way `preprocess_image` does.
+
+    Every box is widened to the padding around its region, with the bin size of the resized region, so the region
+    lands on the same output pixels as after `preprocess_image`.
+
+    Args:
+        bboxes (Regions): The regions in COCO format [x_min, y_min, width, height].
+        target_image_size (Tuple[int, int]): The target image size (height, width).
+
+    Returns:
+        Tuple[NDArray[np.float32], NDArray[np.int64]]: The [x1, y1, x2, y2] boxes and the [pad_height, pad_width,
+            new_height, new_width] placement of every region in the output.
+    """
+    boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    # the sizes are (width, height) pairs like the boxes
+    sizes = boxes[:, 2:]
+    target = np.array(target_image_size[::-1])
+    scale = (target / sizes).min(axis=1, keepdims=True)
+    new_sizes = np.maximum((sizes * scale).astype(np.int64), 1)
+    pads = (target - new_sizes) // 2
+    bins = sizes / new_sizes
+
+    starts = boxes[:, :2] - pads * bins
+    rois = np.concatenate([starts, starts + target * bins], axis=1)
+    placement = np.hstack([pads, new_sizes])
+    return rois.astype(np.float32), placement[:, PLACEMENT_ORDER]
+
+
+def covered_part(image: Image, bboxes: Regions) -> Tuple[Image, Coords]:
+    """
+    Cut the part of an image covered by the regions.
+
+    Args:
+        image (Image): The full image.
+        bboxes (Regions): The regions in COCO format [x_min, y_min, width, height].
+
+    Returns:
+        Tuple[Image, Coords]: The covered part and its (x, y) offset in the image.
+    """
+    boxes = np.asarray(bboxes).reshape(-1, 4)
+    starts = boxes[:, :2]
+    stops = starts + boxes[:, 2:]
+    x_offset, y_offset = starts.min(axis=0)
+    x_stop, y_stop = stops.max(axis=0)
+    covered = np.ascontiguousarray(image[y_offset:y_stop, x_offset:x_stop])
+    return covered, np.array([x_offset, y_offset])
+
+
+def letterbox_span(pad: torch.Tensor, size: torch.Tensor, length: int) -> torch.Tensor:
+    """
+    Get the positions along an output axis covered by the resized regions.
+
+    Args:
+        pad (torch.Tensor): The (N, 1) padding before every region.
+        size (torch.Tensor): The (N, 1) resized length of every region.
+        length (int): The output length.
+
+    Returns:
+        torch.Tensor: The (N, length) mask of the covered positions.
+    """
+    positions = torch.arange(length)[None]
+    return torch.logical_and(positions >= pad, positions < pad + size)
+
+
+def letterbox_mask(placement: Coords, target_image_size: Tuple[int, int]) -> torch.Tensor:
+    """
+    Get the output pixels covered by the resized regions, outside of their padding.
+
+    Args:
+        placement (Coords): The [pad_height, pad_width, new_height, new_width] of every region.
+        target_image_size (Tuple[int, int]): The target image size (height, width).
+
+    Returns:
+        torch.Tensor: The (N, 1, height, width) mask of the regions.
+    """
+    target_height, target_width = target_image_size
+    columns = torch.from_numpy(placement).T
+    pad_height, pad_width, new_height, new_width = columns[:, :, None]
+    rows = letterbox_span(pad_height, new_height, target_height)[:, None, :, None]
+    cols = letterbox_span(pad_width, new_width, target_width)[:, None, None, :]
+    return rows & cols
+
+
+def crop_regions(
+    image: Image,
+    bboxes: Regions,
+    target_image_size: Tuple[int, int] = TARGET_IMAGE_SIZE,
+) -> torch.Tensor:
+    """
+    Cut, letterbox and normalize several regions of an image in one call.
+
+    The part of the image covered by the regions is converted to a tensor once and all regions are sampled from it
+    with `torchvision.ops.roi_align`, one bilinear sample per output pixel at the pixel centres like `cv2.resize`.
+    The normalization is applied to the small output, which is equivalent since it is affine, and the padding is
+    filled with the normalized black of `preprocess_image`.
+
+    Args:
+        image (Image): The full image.
+        bboxes (Regions): The regions in COCO format [x_min, y_min, width, height].
+        target_image_size (Tuple[int, int]): The target image size (height, width).
+
+    Returns:
+        torch.Tensor: The batch of the preprocessed regions, as `preprocess_image` would give for their crops.
+    """
+    # torchvision is slow to import, it is loaded with the first crops
+    from torchvision.ops import roi_align  # noqa: WPS433
+
+    if not len(bboxes):
+        return torch.zeros(0, 3, *target_image_size)
+    covered, offset = covered_part(image, bboxes)
+    rois, placement = letterbox_rois(bboxes, target_image_size)
+    rois -= np.tile(offset, 2).astype(np.float32)
+
+    tensor = torch.from_numpy(covered).permute(2, 0, 1)
+    batch = roi_align(
+        tensor[None].float(),
+        [torch.from_numpy(rois)],
+        output_size=target_image_size,
+        spatial_scale=1,
+        sampling_ratio=1,
+        aligned=True,
+    )
+    mean = torch.tensor(IMAGENET_MEAN).view(1, -1, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, -1, 1, 1)
+    batch = (batch / BASE_SCALING_FACTOR - mean) / std
+    inside = letterbox_mask(placement, target_image_size)
+    return torch.where(inside, batch, -mean / std)
@@ -0,0 +1,115 @@
+"""Module provides a background sampler of the worker process resources."""
+import gc
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import psutil
+import torch
+from loguru import logger
+
+from src.utils import metrics
+
+
+def count_open_fds(process: psutil.Process) -> int:
+    """
+    Count the open file descriptors of a process.
+
+    Args:
+        process (psutil.Process): The process.
+
+    Returns:
+        int: The number of descriptors, or of open files where descriptors are not available.
+    """
+    if psutil.POSIX:
+        return process.num_fds()
+    return len(process.open_files())
+
+
+class ResourceSampler:
+    """
+    Daemon thread periodically exporting the resource usage of the current worker.
+
+    Every `interval` seconds it records RSS and USS, user and system CPU time, thread and open file descriptor
+    counts, the torch intra-op thread setting and the system used RAM. Garbage collections and their pause
+    times are recorded by a `gc.callbacks` hook as they happen.
+
+    The sampler runs in its own thread, so the psutil calls never stall the event loop.
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, interval: float):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval (float): Seconds between samples.
+        """
+        self.interval = interval
+        self.process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._gc_started: float = 0
+
+    def sample(self) -> None:
+        """Record the current resource usage."""
+        self._sample_process()
+        metrics.TORCH_THREADS.set(torch.get_num_threads())
+        metrics.TOTAL_USED_RAM.set(psutil.virtual_memory().used)
+
+    def _sample_process(self) -> None:
+        """Record the memory, CPU time, threads and open file descriptors of the worker process."""
+        with self.process.oneshot():
+            memory = self.process.memory_full_info()
+            cpu_times = self.process.cpu_times()
+            threads = self.process.num_threads()
+            open_fds = count_open_fds(self.process)
+        metrics.USED_RAM.set(memory.rss)
+        metrics.PROCESS_USS.set(memory.uss)
+        metrics.PROCESS_CPU_SECONDS.labels(mode="user").set(cpu_times.user)
+        metrics.PROCESS_CPU_SECONDS.labels(mode="system").set(cpu_times.system)
+        metrics.PROCESS_THREADS.set(threads)
+        metrics.PROCESS_OPEN_FDS.set(open_fds)
+
+    def _on_gc(self, phase: str, details: Dict[str, Any]) -> None:
+        """
+        Record a garbage collection, called by the interpreter around every collection.
+
+        Args:
+            phase (str): "start" or "stop".
+            details (Dict[str, Any]): Collection details with the generation.
+        """
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+            return
+        generation = str(details["generation"])
+        metrics.GC_COLLECTIONS.labels(generation=generation).inc()
+        pause = time.perf_counter() - self._gc_started
+        metrics.GC_PAUSE.labels(generation=generation).observe(pause)
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except psutil.Error as exp:
+                logger.warning(f"Resource sampling failed: {exp}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Install the GC hook and start the sampling thread."""
+        gc.callbacks.append(self._on_gc)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread and remove the GC hook."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
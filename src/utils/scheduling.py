@@ -0,0 +1,338 @@
+"""Module provides weighted fair scheduling of the inference requests across priority classes and tenants."""
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utils.metrics import SCHEDULER_QUEUED, SCHEDULER_REJECTED, SCHEDULER_WAIT
+
+ANONYMOUS_TENANT: str = "anonymous"
+MAX_TENANTS: int = 10000
+HTTP_TOO_MANY_REQUESTS: int = 429
+HTTP_SERVICE_UNAVAILABLE: int = 503
+
+ClassOptions = Mapping[str, Mapping[str, Any]]
+Quota = Dict[str, float]
+TenantQuotas = Dict[str, Quota]
+
+
+class SchedulerRejectedError(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Args:
+        reason (str): "quota" or "queue_full".
+        retry_after (float): Seconds after which the request may succeed.
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        """
+        Initialize the error.
+
+        Args:
+            reason (str): "quota" or "queue_full".
+            retry_after (float): Seconds after which the request may succeed.
+        """
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Request quota refilled at a constant rate.
+
+    Args:
+        rate (float): Requests per second.
+        burst (float): Bucket capacity.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Requests per second.
+            burst (float): Bucket capacity.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Take a token.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until the next token.
+        """
+        now = time.monotonic()
+        refilled = self.tokens + (now - self.updated) * self.rate
+        self.tokens = min(self.burst, refilled)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+def create_bucket(quota: Quota) -> Optional[TokenBucket]:
+    """
+    Create the token bucket of a quota.
+
+    Args:
+        quota (Quota): The `rate` in requests per second, 0 disables, and the `burst`.
+
+    Returns:
+        Optional[TokenBucket]: The full bucket, None without a quota.
+    """
+    rate = quota.get("rate", 0)
+    if not rate:
+        return None
+    return TokenBucket(rate, quota.get("burst", rate) or 1)
+
+
+class FairScheduler:
+    """
+    Admission of the inference requests to a fixed number of concurrent slots.
+
+    Every request belongs to a priority class, chosen by its path, and to a tenant, given by a header. Every
+    (class, tenant) pair is a flow weighted with the class weight, and the waiting requests are started in the order
+    of their virtual finish times (start-time fair queuing). A flooding tenant only delays its own flow, and a class
+    with a higher weight gets a proportionally larger share of the slots. Tenants over their token bucket quota and
+    requests over the queue limit are rejected right away.
+
+    Must be used from a single event loop.
+
+    Args:
+        concurrency (int): Number of requests running at once.
+        classes (ClassOptions): The `weight` and the `paths` of every priority class by name.
+        max_queue (int): Maximum number of waiting requests, 0 for no limit.
+        quota (Optional[Quota]): Default `rate` (requests per second, 0 disables) and `burst` per tenant.
+        tenant_quotas (Optional[TenantQuotas]): Quotas of specific tenants.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        concurrency: int,
+        classes: ClassOptions,
+        max_queue: int = 0,
+        quota: Optional[Quota] = None,
+        tenant_quotas: Optional[TenantQuotas] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            concurrency (int): Number of requests running at once.
+            classes (ClassOptions): The `weight` and the `paths` of every priority class by name.
+            max_queue (int): Maximum number of waiting requests, 0 for no limit.
+            quota (Optional[Quota]): Default `rate` (requests per second, 0 disables) and `burst`.
+            tenant_quotas (Optional[TenantQuotas]): Quotas of specific tenants.
+        """
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.weights: Dict[str, float] = {}
+        self._path_classes: Dict[str, str] = {}
+        for name, options in classes.items():
+            self.weights[name] = float(options.get("weight", 1))
+            self._path_classes.update(dict.fromkeys(options.get("paths", []), name))
+        self.quota = dict(quota or {})
+        configured_quotas = tenant_quotas or {}
+        self.tenant_quotas = {tenant: dict(tenant_quota) for tenant, tenant_quota in configured_quotas.items()}
+        self.running = 0
+        self._waiting: List[Tuple[float, int, asyncio.Future, str]] = []
+        self._sequence = itertools.count()
+        self._virtual_time: float = 0
+        self._finish_tags: Dict[Tuple[str, str], float] = {}
+        self._buckets: "OrderedDict[str, Optional[TokenBucket]]" = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        """
+        Get the number of waiting requests.
+
+        Returns:
+            int: The queue length, including the cancelled requests not yet skipped.
+        """
+        return len(self._waiting)
+
+    def classify(self, path: str) -> Optional[str]:
+        """
+        Get the priority class of a path.
+
+        Args:
+            path (str): The request path.
+
+        Returns:
+            Optional[str]: The class name, None for the paths that are not scheduled.
+        """
+        return self._path_classes.get(path)
+
+    def bucket(self, tenant: str) -> Optional[TokenBucket]:
+        """
+        Get the token bucket of a tenant, the least recently seen tenants are forgotten.
+
+        Args:
+            tenant (str): The tenant.
+
+        Returns:
+            Optional[TokenBucket]: The bucket, None if the tenant has no quota.
+        """
+        try:
+            bucket = self._buckets.pop(tenant)
+        except KeyError:
+            bucket = create_bucket(self.tenant_quotas.get(tenant, self.quota))
+        # (re)inserted last, so the first tenant is the least recently seen
+        self._buckets[tenant] = bucket
+        if len(self._buckets) > MAX_TENANTS:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    async def acquire(self, priority_class: str, tenant: str) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            priority_class (str): The class of the request.
+            tenant (str): The tenant of the request.
+
+        Raises:
+            SchedulerRejectedError: If the tenant is over its quota or the queue is full.
+        """
+        bucket = self.bucket(tenant)
+        retry_after = bucket.take() if bucket is not None else 0
+        if retry_after:
+            SCHEDULER_REJECTED.labels(priority_class=priority_class, reason="quota").inc()
+            raise SchedulerRejectedError("quota", retry_after)
+
+        started = time.perf_counter()
+        if self.running < self.concurrency and not self._waiting:
+            self.running += 1
+            SCHEDULER_WAIT.labels(priority_class=priority_class).observe(0)
+            return
+        if self.max_queue and len(self._waiting) >= self.max_queue:
+            SCHEDULER_REJECTED.labels(priority_class=priority_class, reason="queue_full").inc()
+            raise SchedulerRejectedError("queue_full", 1)
+        await self._wait_turn(priority_class, tenant)
+        SCHEDULER_WAIT.labels(priority_class=priority_class).observe(time.perf_counter() - started)
+
+    async def _wait_turn(self, priority_class: str, tenant: str) -> None:
+        """
+        Queue a request with the finish tag of its flow and wait until `release` starts it.
+
+        Args:
+            priority_class (str): The class of the request.
+            tenant (str): The tenant of the request.
+
+        Raises:
+            asyncio.CancelledError: If the request is cancelled, the slot it was given in the meantime is freed.
+        """
+        flow = (priority_class, tenant)
+        flow_start = max(self._virtual_time, self._finish_tags.get(flow, 0))
+        finish_tag = flow_start + 1 / self.weights[priority_class]
+        self._finish_tags[flow] = finish_tag
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (finish_tag, next(self._sequence), future, priority_class))
+        SCHEDULER_QUEUED.labels(priority_class=priority_class).inc()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot and start the waiting requests with the smallest finish tags."""
+        self.running -= 1
+        while self._waiting and self.running < self.concurrency:
+            finish_tag, _, future, priority_class = heapq.heappop(self._waiting)
+            SCHEDULER_QUEUED.labels(priority_class=priority_class).dec()
+            if future.cancelled():
+                continue
+            self._virtual_time = finish_tag
+            self.running += 1
+            future.set_result(None)
+        if not self._waiting:
+            # a new busy period starts from scratch
+            self._virtual_time = 0
+            self._finish_tags.clear()
+
+
+class FairSchedulingMiddleware:
+    """
+    Middleware admitting the scheduled HTTP requests through a `FairScheduler`.
+
+    Attributes:
+        app (ASGIApp): The ASGI application instance.
+        scheduler (FairScheduler): The scheduler.
+        tenant_header (bytes): Lowercase name of the header identifying the tenant.
+    """
+
+    def __init__(self, app: ASGIApp, scheduler: FairScheduler, tenant_header: str) -> None:
+        """
+        Initialize the FairSchedulingMiddleware.
+
+        Args:
+            app (ASGIApp): The ASGI application to wrap with the middleware.
+            scheduler (FairScheduler): The scheduler.
+            tenant_header (str): Name of the header identifying the tenant.
+        """
+        self.app = app
+        self.scheduler = scheduler
+        self.tenant_header = tenant_header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Asynchronous call method for the middleware.
+
+        Args:
+            scope (Scope): The scope of the request, containing request details.
+            receive (Receive): An awaitable callable yielding request events.
+            send (Send): An awaitable callable used for sending response events.
+        """
+        is_http = scope["type"] == "http"
+        priority_class = self.scheduler.classify(scope["path"]) if is_http else None
+        if priority_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        tenant_id = dict(scope["headers"]).get(self.tenant_header, b"")
+        tenant = tenant_id.decode("latin-1") or ANONYMOUS_TENANT
+        try:
+            await self.scheduler.acquire(priority_class, tenant)
+        except SchedulerRejectedError as exp:
+            await self.reject(send, exp)
+            return
+        with ExitStack() as slot:
+            slot.callback(self.scheduler.release)
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    async def reject(send: Send, error: SchedulerRejectedError) -> None:
+        """
+        Answer a rejected request, 429 for a tenant over quota and 503 for a full queue.
+
+        Args:
+            send (Send): An awaitable callable used for sending response events.
+            error (SchedulerRejectedError): The rejection.
+        """
+        status = HTTP_TOO_MANY_REQUESTS if error.reason == "quota" else HTTP_SERVICE_UNAVAILABLE
+        body = json.dumps({"detail": str(error)}).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(math.ceil(error.retry_after)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,65 @@
+"""Module provides the result formats of the inference endpoints."""
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.services.selection import ScoredBox
+from src.utils.processing import prepare_bbox
+
+BBOX_COLUMNS = ("x_min", "y_min", "x_max", "y_max")
+
+Record = Dict[str, Any]
+Columns = Dict[str, Any]
+RecValues = Sequence[str]
+
+
+class ResultFormat(str, Enum):  # noqa: WPS600
+    """Layout of the detected barcodes in a response."""
+
+    records = "records"
+    columnar = "columnar"
+
+
+def barcode_records(scored: Sequence[ScoredBox], rec_values: RecValues) -> List[Record]:
+    """
+    Build a record per barcode.
+
+    Args:
+        scored (Sequence[ScoredBox]): The boxes in COCO format with their scores.
+        rec_values (RecValues): The recognized value of every box.
+
+    Returns:
+        List[Record]: The {"bbox", "score", "value"} records, with the boxes in MinMax format.
+    """
+    return [
+        {"bbox": prepare_bbox(bbox), "score": score, "value": rec_value}
+        for (bbox, score), rec_value in zip(scored, rec_values)
+    ]
+
+
+def barcode_columns(scored: Sequence[ScoredBox], rec_values: Optional[RecValues] = None) -> Columns:
+    """
+    Build parallel arrays of the box corners, scores and values.
+
+    The columns are contiguous numpy arrays, which `ORJSONResponse` writes without converting every number to a
+    Python object.
+
+    Args:
+        scored (Sequence[ScoredBox]): The boxes in COCO format with their scores.
+        rec_values (Optional[RecValues]): The recognized value of every box, None to leave the values out.
+
+    Returns:
+        Columns: The "x_min", "y_min", "x_max", "y_max" and "scores" arrays, and "values" if given.
+    """
+    bboxes = [bbox for bbox, _ in scored]
+    boxes = np.array(bboxes, dtype=np.int64).reshape(-1, 4)
+    starts = boxes[:, :2]
+    stops = starts + boxes[:, 2:]
+    corners = np.ascontiguousarray(np.hstack([starts, stops]).T)
+    columns: Columns = dict(zip(BBOX_COLUMNS, corners))
+    scores = [score for _, score in scored]
+    columns["scores"] = np.array(scores, dtype=np.float64)
+    if rec_values is not None:
+        columns["values"] = list(rec_values)
+    return columns
@@ -0,0 +1,130 @@
+"""Module provides a ring buffer of the slow requests of a worker with their stage breakdown."""
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utils.metrics import PrometheusMiddleware, RequestMeter
+from src.utils.timing import RequestTrace, trace_request
+
+ROUNDING_DIGITS: int = 6
+
+
+class SlowRequestLog:
+    """
+    Bounded ring buffer of the requests slower than a threshold.
+
+    Args:
+        threshold (float): Requests taking longer than this many seconds are captured and logged.
+        size (int): Number of the most recent slow requests kept.
+    """
+
+    def __init__(self, threshold: float, size: int):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            threshold (float): Requests taking longer than this many seconds are captured and logged.
+            size (int): Number of the most recent slow requests kept.
+        """
+        self.threshold = threshold
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, trace: RequestTrace, duration: float, upload_size: int, status_code: Optional[int]) -> None:
+        """
+        Capture and log the request if it is slow.
+
+        Args:
+            trace (RequestTrace): The trace of the request.
+            duration (float): The request duration in seconds.
+            upload_size (int): The request body size in bytes.
+            status_code (Optional[int]): The response status code.
+        """
+        if duration < self.threshold:
+            return
+        image_shape = trace.attributes.get("image_shape")
+        entry = {
+            "ts": time.time(),
+            "endpoint": trace.endpoint,
+            "duration": round(duration, ROUNDING_DIGITS),
+            "status_code": status_code,
+            "upload_size": upload_size,
+            "image_shape": list(image_shape) if image_shape else None,
+            "barcodes": trace.attributes.get("barcodes"),
+            "queue_wait": round(trace.attributes.get("queue_wait", 0), ROUNDING_DIGITS),
+            "stages": {name: round(elapsed, ROUNDING_DIGITS) for name, elapsed in trace.stages.items()},
+        }
+        with self._lock:
+            self._entries.append(entry)
+        summary = f"{trace.endpoint} took {duration:.3f}s"
+        logger.warning(f"Slow request to {summary}: {entry}")
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Get the captured requests, the slowest first.
+
+        Returns:
+            List[Dict[str, Any]]: The captured requests.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda entry: entry["duration"], reverse=True)
+
+
+class SlowRequestMiddleware:
+    """
+    Middleware attaching a trace to every HTTP request and reporting slow ones to a `SlowRequestLog`.
+
+    The trace is attached at the request arrival and reused by the endpoints, so the stage timings, the image
+    attributes and the wait until the endpoint starts all land in one place.
+
+    Attributes:
+        app (ASGIApp): The ASGI application instance.
+        slow_requests (SlowRequestLog): The buffer of slow requests.
+    """
+
+    def __init__(self, app: ASGIApp, slow_requests: SlowRequestLog) -> None:
+        """
+        Initialize the SlowRequestMiddleware.
+
+        Args:
+            app (ASGIApp): The ASGI application to wrap with the middleware.
+            slow_requests (SlowRequestLog): The buffer of slow requests.
+        """
+        self.app = app
+        self.slow_requests = slow_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Asynchronous call method for the middleware.
+
+        Args:
+            scope (Scope): The scope of the request, containing request details.
+            receive (Receive): An awaitable callable yielding request events.
+            send (Send): An awaitable callable used for sending response events.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        meter = RequestMeter(receive, send, PrometheusMiddleware.content_length(scope))
+        with trace_request(scope["path"]) as trace:
+            with ExitStack() as reporting:
+                reporting.callback(self._report, trace, meter)
+                await self.app(scope, meter.receive, meter.send)
+
+    def _report(self, trace: RequestTrace, meter: RequestMeter) -> None:
+        """
+        Report a finished request to the buffer of slow requests.
+
+        Args:
+            trace (RequestTrace): The trace of the request.
+            meter (RequestMeter): The meter of the request body and the status code.
+        """
+        duration = time.perf_counter() - trace.started
+        self.slow_requests.observe(trace, duration, meter.request_size, meter.status_code)
@@ -0,0 +1,167 @@
+"""Random-weight stand-ins with the input and output contracts of the real model checkpoints.
+
+The detector is a UNet-sized graph and the recognizer a ResNet-18. To give the pipeline something realistic to do,
+the detector output is dominated by a fixed stripe-energy filter, so it fires on barcode-like regions.
+"""
+from typing import Final, List, Tuple
+
+import torch
+import torchvision
+from torch import nn  # noqa: WPS458
+from torch.nn import functional  # noqa: WPS458
+
+INPUT_CHANNELS: int = 3
+DETECTOR_WIDTHS = (32, 64, 128, 256)
+SEQUENCE_LENGTH: int = 13
+NUM_SYMBOLS: int = 11
+
+STRIPE_WINDOW: int = 9
+STRIPE_THRESHOLD: float = 0.8
+STRIPE_GAIN: float = 10
+LEARNED_SCALE: float = 1e-3
+
+
+class ConvBlock(nn.Module):
+    """Two 3x3 convolutions with batch norm and ReLU."""
+
+    def __init__(self, in_channels: int, out_channels: int):
+        """
+        Initialize the block.
+
+        Args:
+            in_channels (int): Number of input channels.
+            out_channels (int): Number of output channels.
+        """
+        super().__init__()
+        self.block = nn.Sequential(
+            nn.Conv2d(in_channels, out_channels, 3, padding=1, bias=False),
+            nn.BatchNorm2d(out_channels),
+            nn.ReLU(inplace=True),
+            nn.Conv2d(out_channels, out_channels, 3, padding=1, bias=False),
+            nn.BatchNorm2d(out_channels),
+            nn.ReLU(inplace=True),
+        )
+
+    def forward(self, features: torch.Tensor) -> torch.Tensor:
+        """
+        Apply the block.
+
+        Args:
+            features (torch.Tensor): Input features.
+
+        Returns:
+            torch.Tensor: Output features.
+        """
+        return self.block(features)
+
+
+class SyntheticDetector(nn.Module):
+    """
+    UNet with random weights mapping a (B, 3, H, W) normalized batch to (B, 1, H, W) mask logits.
+
+    Args:
+        widths (Tuple[int, ...]): Number of channels on every encoder level.
+    """
+
+    # TorchScript reads python numbers only as constants of the module
+    __constants__ = ("stripe_window", "stripe_threshold", "stripe_gain", "learned_scale")
+    stripe_window: Final[int] = STRIPE_WINDOW
+    stripe_threshold: Final[float] = STRIPE_THRESHOLD
+    stripe_gain: Final[float] = STRIPE_GAIN
+    learned_scale: Final[float] = LEARNED_SCALE
+    gradient_kernel: torch.Tensor
+
+    def __init__(self, widths: Tuple[int, ...] = DETECTOR_WIDTHS):
+        """
+        Initialize the detector.
+
+        Args:
+            widths (Tuple[int, ...]): Number of channels on every encoder level.
+        """
+        super().__init__()
+        encoder_inputs = (INPUT_CHANNELS, *widths[:-1])
+        encoder = [ConvBlock(*channels) for channels in zip(encoder_inputs, widths)]
+        self.down = nn.ModuleList(encoder)
+        decoder_widths = widths[-2::-1]
+        decoder_inputs = (widths[-1], *decoder_widths[:-1])
+        decoder_channels = zip(decoder_inputs, decoder_widths)
+        decoder = [ConvBlock(in_width + width, width) for in_width, width in decoder_channels]
+        self.up = nn.ModuleList(decoder)
+        self.head = nn.Conv2d(widths[0], 1, 1)
+        gradient_kernel = torch.tensor([[[[-1.0, 1.0]]]])
+        self.register_buffer("gradient_kernel", gradient_kernel)
+
+    def stripe_logits(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Score every pixel by the local energy of the horizontal gradient, high on barcode stripes.
+
+        Args:
+            batch (torch.Tensor): The normalized input batch.
+
+        Returns:
+            torch.Tensor: The (B, 1, H, W) logits.
+        """
+        gray = batch.mean(dim=1, keepdim=True)
+        # pad the right edge so that the horizontal gradient keeps the input width
+        padded = functional.pad(gray, [0, 1, 0, 0], mode="replicate")
+        gradient = functional.conv2d(padded, self.gradient_kernel).abs()
+        energy = functional.avg_pool2d(
+            gradient,
+            self.stripe_window,
+            stride=1,
+            padding=self.stripe_window // 2,
+            count_include_pad=False,
+        )
+        return self.stripe_gain * (energy - self.stripe_threshold)
+
+    def forward(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Predict the mask logits.
+
+        Args:
+            batch (torch.Tensor): The normalized input batch.
+
+        Returns:
+            torch.Tensor: The (B, 1, H, W) logits.
+        """
+        skips: List[torch.Tensor] = []
+        features = batch
+        for level, down_block in enumerate(self.down):
+            if level > 0:
+                features = functional.max_pool2d(features, 2)
+            features = down_block(features)
+            skips.append(features)
+        skips.pop()
+        for up_block in self.up:
+            skip = skips.pop()
+            skip_size = skip.shape[-2:]
+            features = functional.interpolate(features, size=skip_size, mode="bilinear", align_corners=False)
+            features = up_block(torch.cat([features, skip], dim=1))
+        learned = torch.tanh(self.head(features))
+        return self.stripe_logits(batch) + self.learned_scale * learned
+
+
+class SyntheticRecognizer(nn.Module):
+    """ResNet-18 with random weights mapping a (B, 3, 224, 224) batch to (B, sequence, symbols) logits."""
+
+    __constants__ = ("sequence_length", "num_symbols")
+    sequence_length: Final[int] = SEQUENCE_LENGTH
+    num_symbols: Final[int] = NUM_SYMBOLS
+
+    def __init__(self):
+        """Initialize the recognizer."""
+        super().__init__()
+        self.backbone = torchvision.models.resnet18(weights=None, num_classes=SEQUENCE_LENGTH * NUM_SYMBOLS)
+
+    def forward(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Predict the symbol logits.
+
+        Args:
+            batch (torch.Tensor): The normalized input batch.
+
+        Returns:
+            torch.Tensor: The (B, sequence, symbols) logits.
+        """
+        logits = self.backbone(batch)
+        return logits.view(logits.shape[0], self.sequence_length, self.num_symbols)
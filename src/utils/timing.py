@@ -0,0 +1,175 @@
+"""Module provides a lightweight per-request stage timer exported as Prometheus histograms."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.utils.metrics import BARCODES_PER_IMAGE, IMAGE_MEGAPIXELS, STAGE_LATENCY
+
+DEFAULT_ENDPOINT: str = "internal"
+PIXELS_PER_MEGAPIXEL: float = 1e6
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+# labelled histogram children, so the hot path skips the locked label lookup of prometheus_client
+_stage_children: Dict[Tuple[str, str], Any] = {}
+
+
+class RequestTrace:
+    """
+    Timings and attributes of a single request.
+
+    Args:
+        endpoint (str): The endpoint label of the request.
+    """
+
+    __slots__ = ("endpoint", "started", "stages", "attributes")
+
+    def __init__(self, endpoint: str):
+        """
+        Initialize an empty trace.
+
+        Args:
+            endpoint (str): The endpoint label of the request.
+        """
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.attributes: Dict[str, Any] = {}
+
+
+class StageTimer:
+    """
+    Context manager measuring a pipeline stage of the current request.
+
+    The elapsed time is added to the current trace and observed in the stage latency histogram. Outside of a
+    traced request the stage is reported under the `internal` endpoint.
+
+    Args:
+        name (str): The stage name.
+    """
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        """
+        Initialize the timer.
+
+        Args:
+            name (str): The stage name.
+        """
+        self.name = name
+        self.started: float = 0
+
+    def __enter__(self) -> "StageTimer":
+        """
+        Start the timer.
+
+        Returns:
+            StageTimer: The timer itself.
+        """
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Stop the timer and record the elapsed time.
+
+        Args:
+            exc_info (Any): The exception info, the stage is recorded either way.
+        """
+        elapsed = time.perf_counter() - self.started
+        trace = _current_trace.get()
+        endpoint = DEFAULT_ENDPOINT
+        if trace is not None:
+            endpoint = trace.endpoint
+            spent = trace.stages.get(self.name, 0)
+            trace.stages[self.name] = spent + elapsed
+        child = _stage_children.get((endpoint, self.name))
+        if child is None:
+            child = STAGE_LATENCY.labels(endpoint=endpoint, stage=self.name)
+            _stage_children[endpoint, self.name] = child
+        child.observe(elapsed)
+
+
+def stage(name: str) -> StageTimer:
+    """
+    Measure a pipeline stage of the current request.
+
+    Args:
+        name (str): The stage name, e.g. "decode", "preprocess" or "forward".
+
+    Returns:
+        StageTimer: The context manager timing the stage.
+    """
+    return StageTimer(name)
+
+
+@contextmanager
+def trace_request(endpoint: str) -> Iterator[RequestTrace]:
+    """
+    Attach a new trace to the current context, or reuse the trace that is already attached.
+
+    A trace attached by a middleware at the request arrival is reused, and the time until the endpoint started,
+    i.e. the upload parsing and the thread pool wait, is recorded as the `queue_wait` attribute.
+
+    Args:
+        endpoint (str): The endpoint label of the request.
+
+    Yields:
+        RequestTrace: The trace of the current request.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.endpoint = endpoint
+        trace.attributes["queue_wait"] = time.perf_counter() - trace.started
+        yield trace
+        return
+    trace = RequestTrace(endpoint)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """
+    Get the trace of the current request.
+
+    Returns:
+        Optional[RequestTrace]: The trace, or None outside of a traced request.
+    """
+    return _current_trace.get()
+
+
+def observe_image(image: np.ndarray) -> None:
+    """
+    Record the size of a decoded input image.
+
+    Args:
+        image (np.ndarray): The decoded image.
+    """
+    megapixels = image.shape[0] * image.shape[1] / PIXELS_PER_MEGAPIXEL
+    trace = _current_trace.get()
+    endpoint = DEFAULT_ENDPOINT
+    if trace is not None:
+        endpoint = trace.endpoint
+        trace.attributes["image_shape"] = image.shape[:2]
+    IMAGE_MEGAPIXELS.labels(endpoint=endpoint).observe(megapixels)
+
+
+def observe_barcodes(count: int) -> None:
+    """
+    Record the number of barcodes detected on an image.
+
+    Args:
+        count (int): The number of barcodes.
+    """
+    trace = _current_trace.get()
+    endpoint = DEFAULT_ENDPOINT
+    if trace is not None:
+        endpoint = trace.endpoint
+        trace.attributes["barcodes"] = count
+    BARCODES_PER_IMAGE.labels(endpoint=endpoint).observe(count)
@@ -0,0 +1,89 @@
+"""This module wires the background services and the middlewares of a worker into the app."""
+
+from contextlib import ExitStack, asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import loguru
+from fastapi import FastAPI
+
+from src.containers.containers import AppContainer
+from src.settings import app_settings
+from src.utils.exposition import get_exporter
+from src.utils.metrics import PrometheusMiddleware
+from src.utils.recording import TrafficRecorder, TrafficRecordingMiddleware
+from src.utils.resources import ResourceSampler
+from src.utils.scheduling import FairSchedulingMiddleware
+from src.utils.slow_requests import SlowRequestMiddleware
+
+
+def create_recorder() -> Optional[TrafficRecorder]:
+    """
+    Create the traffic recorder if recording is enabled.
+
+    Returns:
+        Optional[TrafficRecorder]: The recorder, None if recording is disabled.
+    """
+    if not app_settings.traffic_record_enabled:
+        return None
+    return TrafficRecorder(app_settings.traffic_record_path, app_settings.traffic_record_bodies_dir)
+
+
+@asynccontextmanager
+async def worker_lifespan(
+    _: FastAPI,
+    container: AppContainer,
+    app_logger: "loguru.Logger",
+    recorder: Optional[TrafficRecorder],
+) -> AsyncIterator[None]:
+    """
+    Run the background services of the worker while the app is serving.
+
+    Args:
+        container (AppContainer): The configured application container.
+        app_logger (loguru.Logger): The logger to close on shutdown.
+        recorder (Optional[TrafficRecorder]): The traffic recorder to close on shutdown, if any.
+
+    Yields:
+        None: Control back to the server until shutdown.
+    """
+    with ExitStack() as services:
+        # the callbacks run in reverse order, so the logger is closed last
+        services.callback(container.logger_initializer().close_logger, app_logger)
+        if recorder is not None:
+            services.callback(recorder.close)
+        if app_settings.resource_sample_interval:
+            sampler = ResourceSampler(app_settings.resource_sample_interval)
+            sampler.start()
+            services.callback(sampler.stop)
+        services.callback(container.recognition_pipeline().close)
+        exporter = get_exporter()
+        exporter.start(refreshers=[container.load_monitor().snapshot])
+        services.callback(exporter.stop)
+        yield
+
+
+def add_middlewares(app: FastAPI, container: AppContainer, recorder: Optional[TrafficRecorder]) -> None:
+    """
+    Add the enabled middlewares to the app, the recording middleware outermost.
+
+    Args:
+        app (FastAPI): The application.
+        container (AppContainer): The configured application container.
+        recorder (Optional[TrafficRecorder]): The traffic recorder, None if recording is disabled.
+    """
+    if container.config.scheduler.concurrency():
+        app.add_middleware(
+            FairSchedulingMiddleware,
+            scheduler=container.scheduler(),
+            tenant_header=container.config.scheduler.tenant_header(),
+        )
+    if app_settings.slow_request_buffer_size:
+        app.add_middleware(SlowRequestMiddleware, slow_requests=container.slow_requests())
+    app.add_middleware(PrometheusMiddleware, filter_unhandled_paths=True)
+    if recorder is not None:
+        app.add_middleware(
+            TrafficRecordingMiddleware,
+            recorder=recorder,
+            sample_rate=app_settings.traffic_record_sample_rate,
+            max_body_size=app_settings.traffic_record_max_body_size,
+        )
@@ -0,0 +1,116 @@
+"""End-to-end latency benchmarks of the inference endpoints through the ASGI app."""
+import asyncio
+import os
+import tempfile
+from typing import Any, Callable, List
+
+import cv2
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app import create_inference_app
+from src.client.clients import AsyncBarcodeClient, BarcodeClient
+from src.utils.benchmark import benchmark
+
+TESTS_DIR = os.path.dirname(os.path.dirname(__file__))
+SAMPLE_IMAGE = os.path.join(TESTS_DIR, "images", "image.jpg")
+SYNTHETIC_WEIGHTS_DIR = os.path.join(tempfile.gettempdir(), "synthetic_weights")
+ENDPOINTS = (
+    "/detector/predict_mask",
+    "/detector/predict_barcodes",
+    "/recognizer/recognize_barcode",
+    "/recognizer/recognize_image",
+)
+# a 12 megapixel phone photo
+PHOTO_SIZE = (4000, 3000)
+PHOTOS_PER_BATCH: int = 16
+
+
+def build_client() -> TestClient:
+    """
+    Build a test client for an app wired with the configured models.
+
+    Returns:
+        TestClient: The client.
+    """
+    return TestClient(create_inference_app(SYNTHETIC_WEIGHTS_DIR))
+
+
+def encode_photo() -> bytes:
+    """
+    Upscale the sample image to the size of a phone photo.
+
+    Returns:
+        bytes: The JPEG photo.
+    """
+    photo = cv2.resize(cv2.imread(SAMPLE_IMAGE), PHOTO_SIZE)
+    return cv2.imencode(".jpg", photo)[1].tobytes()
+
+
+async def recognize_photos(app: FastAPI, photos: List[bytes], concurrency: int) -> Any:
+    """
+    Recognize photos with the asyncio client of an in-process app.
+
+    Args:
+        app (FastAPI): The app.
+        photos (List[bytes]): The JPEG photos.
+        concurrency (int): Maximum number of concurrent requests.
+
+    Returns:
+        Any: The records of every photo.
+    """
+    transport = httpx.ASGITransport(app=app)  # type: ignore
+    http = httpx.AsyncClient(transport=transport, base_url="http://testserver")
+    async with AsyncBarcodeClient(http, concurrency=concurrency) as client:
+        return await client.recognize_images(photos)
+
+
+@benchmark("endpoint", path=ENDPOINTS)
+def bench_endpoint(path: str) -> Callable[[], Any]:
+    """
+    Send the sample image to an inference endpoint.
+
+    Args:
+        path (str): The endpoint path.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    client = build_client()
+    with open(SAMPLE_IMAGE, "rb") as image_file:
+        files = {"image": image_file.read()}
+    return lambda: client.post(path, files=files).raise_for_status()
+
+
+@benchmark("client_recognize_image", downscale=[True, False])
+def bench_client_recognize_image(downscale: bool) -> Callable[[], Any]:
+    """
+    Recognize a phone photo with the client, downscaled on the client side or uploaded as is.
+
+    Args:
+        downscale (bool): Whether the client downscales the photo.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    client = BarcodeClient(build_client(), downscale=downscale)
+    photo = encode_photo()
+    return lambda: client.recognize_image(photo)
+
+
+@benchmark("async_client_recognize_images", concurrency=[1, 8])
+def bench_async_client_recognize_images(concurrency: int) -> Callable[[], Any]:
+    """
+    Recognize a batch of phone photos with the asyncio client.
+
+    Args:
+        concurrency (int): Maximum number of concurrent requests.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    app = create_inference_app(SYNTHETIC_WEIGHTS_DIR)
+    photo = encode_photo()
+    photos = [photo for _ in range(PHOTOS_PER_BATCH)]
+    return lambda: asyncio.run(recognize_photos(app, photos, concurrency))
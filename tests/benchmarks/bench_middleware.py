@@ -0,0 +1,117 @@
+"""Per-request overhead benchmarks of the Prometheus middleware."""
+import asyncio
+from functools import partial
+from typing import Any, Callable
+
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope
+
+from src.utils.benchmark import benchmark
+from src.utils.metrics import PATH_CACHE_SIZE, PrometheusMiddleware
+
+ROUTE_COUNTS = (5, 50)
+VARIANTS = ("none", "uncached", "cached")
+REQUESTS_PER_CALL: int = 100
+BODY_SIZE: int = 1024
+
+
+async def empty_response(_: Any) -> Response:
+    """
+    Answer with an empty response.
+
+    Returns:
+        Response: The response.
+    """
+    return Response(b"")
+
+
+async def receive_body(body: bytes) -> Message:
+    """
+    Receive the whole request body at once.
+
+    Args:
+        body (bytes): The request body.
+
+    Returns:
+        Message: The request event.
+    """
+    return {"type": "http.request", "body": body, "more_body": False}
+
+
+async def discard_response(_: Message) -> None:
+    """Discard the response."""
+
+
+async def send_requests(asgi_app: ASGIApp, scope: Scope, receive: Receive) -> None:
+    """
+    Send a batch of requests with the same scope.
+
+    Args:
+        asgi_app (ASGIApp): The app.
+        scope (Scope): The request scope.
+        receive (Receive): The receive channel.
+    """
+    for _ in range(REQUESTS_PER_CALL):
+        await asgi_app(dict(scope), receive, discard_response)
+
+
+def build_app(routes: int) -> Starlette:
+    """
+    Build an app with the given number of routes answering with an empty response.
+
+    Args:
+        routes (int): Number of routes, requests go to the last one.
+
+    Returns:
+        Starlette: The app.
+    """
+    paths = [f"/route_{idx}/predict" for idx in range(routes)]
+    return Starlette(routes=[Route(path, empty_response, methods=["POST"]) for path in paths])
+
+
+def build_middleware(app: Starlette, variant: str) -> ASGIApp:
+    """
+    Wrap the app with the middleware variant.
+
+    Args:
+        app (Starlette): The app.
+        variant (str): "none" for the bare app, "uncached" for per-request route matching or "cached".
+
+    Returns:
+        ASGIApp: The wrapped app.
+    """
+    if variant == "none":
+        return app
+    path_cache_size = PATH_CACHE_SIZE if variant == "cached" else 0
+    return PrometheusMiddleware(app, filter_unhandled_paths=True, path_cache_size=path_cache_size)
+
+
+@benchmark("prometheus_middleware", routes=ROUTE_COUNTS, variant=VARIANTS)
+def bench_prometheus_middleware(routes: int, variant: str) -> Callable[[], Any]:
+    """
+    Send a batch of requests through the ASGI stack without a server.
+
+    Args:
+        routes (int): Number of app routes.
+        variant (str): The middleware variant.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    app = build_app(routes)
+    last_route = routes - 1
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": f"/route_{last_route}/predict",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "app": app,
+    }
+    receive = partial(receive_body, b"x" * BODY_SIZE)
+    batch = partial(send_requests, build_middleware(app, variant), scope, receive)
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(batch())
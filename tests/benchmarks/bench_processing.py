@@ -0,0 +1,106 @@
+"""Benchmarks of the pre- and postprocessing hot paths."""
+import base64
+from typing import Any, Callable, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.services.selection import masks_to_bboxes
+from src.synthetic import synthetic_barcode_image
+from src.utils.benchmark import benchmark
+from src.utils.processing import prepare_bbox, preprocess_image, resize_mask_back_to_original
+
+IMAGE_SIZES = ((480, 640), (1080, 1920), (3000, 4000))
+COMPONENT_COUNTS = (1, 10, 100)
+MASK_SIZE = (1080, 1920)
+MODEL_MASK_SIZE = (224, 224)
+SEED: int = 0
+
+
+def barcode_mask(size: Tuple[int, int], num_components: int) -> NDArray[np.uint8]:
+    """
+    Build the ground truth mask of a synthetic image with the given number of barcodes.
+
+    Args:
+        size (Tuple[int, int]): The (height, width) of the mask.
+        num_components (int): Number of barcodes.
+
+    Returns:
+        NDArray[np.uint8]: The mask with 255 on the barcodes.
+    """
+    return synthetic_barcode_image(*size, num_barcodes=num_components, seed=SEED)[1]
+
+
+@benchmark("preprocess_image", size=IMAGE_SIZES)
+def bench_preprocess_image(size: Tuple[int, int]) -> Callable[[], Any]:
+    """
+    Letterbox and normalize an image for the models.
+
+    Args:
+        size (Tuple[int, int]): The (height, width) of the image.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    image = synthetic_barcode_image(*size, seed=SEED)[0]
+    return lambda: preprocess_image(image)
+
+
+@benchmark("resize_mask_back_to_original", size=IMAGE_SIZES)
+def bench_resize_mask_back_to_original(size: Tuple[int, int]) -> Callable[[], Any]:
+    """
+    Resize a model mask back to the original image size.
+
+    Args:
+        size (Tuple[int, int]): The (height, width) of the original image.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    mask = barcode_mask(MODEL_MASK_SIZE, 10)
+    return lambda: resize_mask_back_to_original(mask, size)  # type: ignore
+
+
+@benchmark("masks_to_bboxes", components=COMPONENT_COUNTS)
+def bench_masks_to_bboxes(components: int) -> Callable[[], Any]:
+    """
+    Extract the bboxes of the connected components of a full resolution mask.
+
+    Args:
+        components (int): Number of components in the mask.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    mask = barcode_mask(MASK_SIZE, components)
+    return lambda: masks_to_bboxes(mask)
+
+
+@benchmark("prepare_bbox", components=COMPONENT_COUNTS)
+def bench_prepare_bbox(components: int) -> Callable[[], Any]:
+    """
+    Convert the bboxes of an image to the response format.
+
+    Args:
+        components (int): Number of bboxes.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    bboxes = masks_to_bboxes(barcode_mask(MASK_SIZE, components))
+    return lambda: [prepare_bbox(bbox) for bbox in bboxes]
+
+
+@benchmark("base64_mask_encoding", size=IMAGE_SIZES)
+def bench_base64_mask_encoding(size: Tuple[int, int]) -> Callable[[], Any]:
+    """
+    Encode a float mask the way `/detector/predict_mask` does.
+
+    Args:
+        size (Tuple[int, int]): The (height, width) of the mask.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    mask = np.random.default_rng(SEED).random(size, dtype=np.float32)
+    return lambda: base64.b64encode(mask.tobytes()).decode("utf-8")
@@ -0,0 +1,63 @@
+"""Benchmarks of the recognizer batch building from the detected regions."""
+from typing import Any, Callable, List
+
+import numpy as np
+import torch
+from numpy.typing import NDArray
+
+from src.services.selection import masks_to_bboxes
+from src.synthetic import synthetic_barcode_image
+from src.utils.benchmark import benchmark
+from src.utils.processing import crop_bbox, prepare_bbox, preprocess_image
+from src.utils.regions import crop_regions
+
+COMPONENT_COUNTS = (1, 10, 100)
+IMAGE_SIZE = (1080, 1920)
+SEED: int = 0
+
+
+def crop_and_preprocess(image: NDArray[np.uint8], bboxes: List[List[int]]) -> torch.Tensor:
+    """
+    Build the recognizer batch of an image by slicing and preprocessing every crop.
+
+    Args:
+        image (NDArray[np.uint8]): The image.
+        bboxes (List[List[int]]): The regions in COCO format.
+
+    Returns:
+        torch.Tensor: The preprocessed crops.
+    """
+    crops = [crop_bbox(image, prepare_bbox(bbox)) for bbox in bboxes]
+    return torch.cat([preprocess_image(crop) for crop in crops])
+
+
+@benchmark("crop_and_preprocess", crops=COMPONENT_COUNTS)
+def bench_crop_and_preprocess(crops: int) -> Callable[[], Any]:
+    """
+    Build the recognizer batch of an image crop by crop.
+
+    Args:
+        crops (int): Number of crops in the image.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    image, mask = synthetic_barcode_image(*IMAGE_SIZE, num_barcodes=crops, seed=SEED)
+    bboxes = masks_to_bboxes(mask)
+    return lambda: crop_and_preprocess(image, bboxes)
+
+
+@benchmark("crop_regions", crops=COMPONENT_COUNTS)
+def bench_crop_regions(crops: int) -> Callable[[], Any]:
+    """
+    Build the recognizer batch of an image with a single `roi_align` call.
+
+    Args:
+        crops (int): Number of crops in the image.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    image, mask = synthetic_barcode_image(*IMAGE_SIZE, num_barcodes=crops, seed=SEED)
+    bboxes = masks_to_bboxes(mask)
+    return lambda: crop_regions(image, bboxes)
@@ -0,0 +1,92 @@
+"""Benchmarks of the response serialization of the inference endpoints."""
+import json
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+from src.services.selection import ScoredBox
+from src.utils.benchmark import benchmark
+from src.utils.serialization import barcode_columns, barcode_records
+
+BARCODE_COUNTS = (1, 100, 1000)
+SEED: int = 0
+MAX_COORDINATE: int = 1000
+MAX_VALUE: int = 1000000000000
+
+
+def recognized_barcodes(barcodes: int) -> Tuple[List[ScoredBox], List[str]]:
+    """
+    Build random scored boxes and values.
+
+    Args:
+        barcodes (int): Number of barcodes.
+
+    Returns:
+        Tuple[List[ScoredBox], List[str]]: The scored boxes in COCO format and their values.
+    """
+    rng = np.random.default_rng(SEED)
+    boxes = rng.integers(0, MAX_COORDINATE, (barcodes, 4)).tolist()
+    scores = rng.random(barcodes).tolist()
+    rec_values = [str(rec_value) for rec_value in rng.integers(MAX_VALUE, size=barcodes)]
+    return list(zip(boxes, scores)), rec_values
+
+
+def barcode_response(scored: List[ScoredBox], rec_values: List[str]) -> Dict[str, Any]:
+    """
+    Build the records response of `/recognizer/recognize_image`.
+
+    Args:
+        scored (List[ScoredBox]): The scored boxes in COCO format.
+        rec_values (List[str]): The value of every box.
+
+    Returns:
+        Dict[str, Any]: The response body.
+    """
+    return {"barcodes": barcode_records(scored, rec_values)}
+
+
+@benchmark("serialize_jsonable_encoder", barcodes=BARCODE_COUNTS)
+def bench_serialize_jsonable_encoder(barcodes: int) -> Callable[[], Any]:
+    """
+    Serialize the records the way FastAPI does for a returned dict.
+
+    Args:
+        barcodes (int): Number of barcodes.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    scored, rec_values = recognized_barcodes(barcodes)
+    return lambda: json.dumps(jsonable_encoder(barcode_response(scored, rec_values))).encode()
+
+
+@benchmark("serialize_orjson_records", barcodes=BARCODE_COUNTS)
+def bench_serialize_orjson_records(barcodes: int) -> Callable[[], Any]:
+    """
+    Serialize the records with `ORJSONResponse`.
+
+    Args:
+        barcodes (int): Number of barcodes.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    scored, rec_values = recognized_barcodes(barcodes)
+    return lambda: ORJSONResponse(barcode_response(scored, rec_values)).body
+
+
+@benchmark("serialize_orjson_columnar", barcodes=BARCODE_COUNTS)
+def bench_serialize_orjson_columnar(barcodes: int) -> Callable[[], Any]:
+    """
+    Serialize the columns with `ORJSONResponse`.
+
+    Args:
+        barcodes (int): Number of barcodes.
+
+    Returns:
+        Callable[[], Any]: The timed callable.
+    """
+    scored, rec_values = recognized_barcodes(barcodes)
+    return lambda: ORJSONResponse(barcode_columns(scored, rec_values)).body
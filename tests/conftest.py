@@ -9,15 +9,11 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from numpy.typing import NDArray
-from omegaconf import DictConfig, OmegaConf
+from omegaconf import DictConfig
 
+from src.app import ROUTERS, load_config
 from src.containers.containers import AppContainer
-from src.routes import (  # noqa: F401
-    detector_endpoints,
-    health_endpoints,
-    recognizer_endpoints,
-)
-from src.routes.routers import detector_router, health_router, recognizer_router
+from src.utils.slow_requests import SlowRequestMiddleware
 
 TESTS_DIR = os.path.dirname(__file__)
 
@@ -29,8 +25,7 @@ def sample_image_bytes():
     Returns:
         bytes: The loaded image in bytes format.
     """
-    image_file = open(os.path.join(TESTS_DIR, "images", "image.jpg"), "rb")  # noqa: WPS515
-    with open(image_file, "rb") as b_file:
+    with open(os.path.join(TESTS_DIR, "images", "image.jpg"), "rb") as b_file:
         return b_file.read()
 
 
@@ -46,13 +41,20 @@ def sample_image_np() -> NDArray[np.uint8]:
 
 
 @pytest.fixture(scope="session")
-def app_config() -> DictConfig:
+def app_config(tmp_path_factory: pytest.TempPathFactory) -> DictConfig:
     """Fixture for loading the application configuration from a YAML file.
 
+    When the real checkpoints are not available, or `SYNTHETIC_MODELS=1` is set, the configuration points at
+    synthetic stand-in models, so the tests run on a clean machine.
+
+    Args:
+        tmp_path_factory (pytest.TempPathFactory): Session temporary directory factory.
+
     Returns:
         DictConfig: The loaded application configuration.
     """
-    return OmegaConf.load("configs/config.yml")  # type: ignore
+    synthetic_weights_dir = str(tmp_path_factory.mktemp("synthetic_weights"))
+    return load_config(synthetic_weights_dir, force_synthetic=os.environ.get("SYNTHETIC_MODELS") == "1")
 
 
 @pytest.fixture
@@ -82,8 +84,9 @@ def wired_app_container(app_config: Any) -> Generator[AppContainer, None, None]:
     """
     container = AppContainer()
     container.config.from_dict(app_config)
-    container.wire([detector_endpoints, recognizer_endpoints])
+    container.wire(packages=["src.routes"])
     yield container
+    container.recognition_pipeline().close()
     container.unwire()
 
 
@@ -98,9 +101,9 @@ def test_app(wired_app_container: AppContainer):  # noqa: WPS442
         FastAPI: The FastAPI app with included routers.
     """
     app = FastAPI()
-    app.include_router(health_router, prefix="/health", tags=["health"])
-    app.include_router(detector_router, prefix="/detector", tags=["detector"])
-    app.include_router(recognizer_router, prefix="/recognizer", tags=["recognizer"])
+    app.add_middleware(SlowRequestMiddleware, slow_requests=wired_app_container.slow_requests())
+    for router, name in ROUTERS:
+        app.include_router(router, prefix=f"/{name}", tags=[name])
     return app
 
 
@@ -0,0 +1,85 @@
+"""This module contains tests for the administration endpoints of a FastAPI application."""
+import os
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from src.containers.containers import AppContainer
+from src.settings import app_settings
+
+SHA256_HEX_LENGTH: int = 64
+
+
+def post_reload(client: TestClient, **query: str) -> Response:
+    """Request a model reload.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        query (str): The query parameters.
+
+    Returns:
+        Response: The response.
+    """
+    return client.post("/admin/reload", params=query)
+
+
+def test_reload_is_disabled_by_default(client: TestClient):
+    """Test that the reload endpoint answers 404 unless enabled.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+    """
+    response = post_reload(client, model="segmentation_model")
+    assert response.status_code == HTTPStatus.NOT_FOUND  # noqa: S101
+
+
+def test_reload_swaps_the_detector(
+    client: TestClient,
+    wired_app_container: AppContainer,
+    sample_image_bytes: bytes,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that the detector keeps answering after its checkpoint is reloaded.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        wired_app_container (AppContainer): The wired application container.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+        monkeypatch (pytest.MonkeyPatch): Fixture to enable reloading.
+    """
+    monkeypatch.setattr(app_settings, "hot_reload_enabled", value=True)
+    old_model = wired_app_container.seg_model()
+    response = post_reload(client, model="segmentation_model")
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+    assert len(response.json()["sha256"]) == SHA256_HEX_LENGTH  # noqa: S101
+    assert wired_app_container.seg_model() is not old_model  # noqa: S101
+
+    response = client.post("/detector/predict_barcodes", files={"image": sample_image_bytes})
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+
+
+def test_reload_of_a_missing_checkpoint(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test that a checkpoint failing to load is reported as a bad request.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        monkeypatch (pytest.MonkeyPatch): Fixture to enable reloading.
+    """
+    monkeypatch.setattr(app_settings, "hot_reload_enabled", value=True)
+    checkpoint = os.path.join(app_settings.hot_reload_weights_dir, "missing.pt")
+    response = post_reload(client, model="recognizer_model", checkpoint=checkpoint)
+    assert response.status_code == HTTPStatus.BAD_REQUEST  # noqa: S101
+
+
+def test_reload_outside_weights_dir(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test that a checkpoint outside of the weights directory is forbidden.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        monkeypatch (pytest.MonkeyPatch): Fixture to enable reloading.
+    """
+    monkeypatch.setattr(app_settings, "hot_reload_enabled", value=True)
+    response = post_reload(client, model="recognizer_model", checkpoint="/etc/passwd")
+    assert response.status_code == HTTPStatus.FORBIDDEN  # noqa: S101
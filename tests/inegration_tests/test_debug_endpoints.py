@@ -0,0 +1,63 @@
+"""This module contains tests for the debugging endpoints of a FastAPI application."""
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.settings import app_settings
+
+
+@pytest.mark.parametrize("path", ["/debug/profile", "/debug/slow"])
+def test_debug_is_disabled_by_default(client: TestClient, path: str):
+    """Test that the debugging endpoints answer 404 unless enabled.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        path (str): The debugging endpoint.
+    """
+    response = client.get(path, params={"seconds": 0.1})
+    assert response.status_code == HTTPStatus.NOT_FOUND  # noqa: S101
+
+
+def test_slow_requests(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test that the slow requests are listed once the debugging endpoints are enabled.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        monkeypatch (pytest.MonkeyPatch): Fixture to enable the debugging endpoints.
+    """
+    monkeypatch.setattr(app_settings, "profile_enabled", value=True)
+    response = client.get("/debug/slow")
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+    assert isinstance(response.json()["requests"], list)  # noqa: S101
+
+
+def test_python_profile(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test that the python profile returns folded stacks of the worker threads.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        monkeypatch (pytest.MonkeyPatch): Fixture to enable profiling.
+    """
+    monkeypatch.setattr(app_settings, "profile_enabled", value=True)
+    response = client.get("/debug/profile", params={"seconds": 0.2, "mode": "python"})
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+    stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack  # noqa: S101
+    assert int(count) > 0  # noqa: S101
+
+
+def test_profile_writes_to_output_dir(client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path):
+    """Test that the profile is written to the configured directory.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        monkeypatch (pytest.MonkeyPatch): Fixture to enable profiling.
+        tmp_path: Temporary output directory.
+    """
+    monkeypatch.setattr(app_settings, "profile_enabled", value=True)
+    monkeypatch.setattr(app_settings, "profile_output_dir", str(tmp_path))
+    response = client.get("/debug/profile", params={"seconds": 0.1})
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+    with open(response.json()["path"], encoding="utf-8") as profile_file:
+        assert profile_file.read()  # noqa: S101
@@ -9,6 +9,10 @@ from http import HTTPStatus
 import numpy as np
 from fastapi.testclient import TestClient
 
+PREDICT_BARCODES: str = "/detector/predict_barcodes"
+IMAGE_FIELD: str = "image"
+BBOXES_FIELD: str = "bboxes"
+
 
 def test_predict_barcodes(client: TestClient, sample_image_bytes: bytes):
     """Test the predict_barcodes endpoint of the detector in the FastAPI application.
@@ -67,3 +71,22 @@ def test_predict_mask(client: TestClient, sample_image_bytes: bytes, sample_imag
     # Decode the base64 string back to bytes
     mask_bytes = base64.b64decode(predicted_mask["base64_encoded_mask"])
     np.frombuffer(mask_bytes, dtype=np.float32).reshape((height, width))
+
+
+def test_predict_barcodes_columnar(client: TestClient, sample_image_bytes: bytes):
+    """Test that the columnar format gives the boxes of the records format as parallel arrays.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+    """
+    files = {IMAGE_FIELD: sample_image_bytes}
+    records = client.post(PREDICT_BARCODES, files=files).json()
+    response = client.post(PREDICT_BARCODES, params={"format": "columnar"}, files=files)
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+
+    columns = response.json()
+    bboxes = records[BBOXES_FIELD]
+    assert columns["x_min"] == [bbox["x_min"] for bbox in bboxes]  # noqa: S101
+    assert columns["y_max"] == [bbox["y_max"] for bbox in bboxes]  # noqa: S101
+    assert columns["scores"] == records["scores"]  # noqa: S101
@@ -1,8 +1,11 @@
 """Health endpoints related tests."""
 from http import HTTPStatus
 
+import pytest
 from fastapi.testclient import TestClient
 
+from src.settings import app_settings
+
 
 def test_health_checker(client: TestClient):
     """Test the health_checker endpoint of the health route in the FastAPI application.
@@ -18,3 +21,32 @@ def test_health_checker(client: TestClient):
     """
     response = client.get("/health/health_checker")
     assert response.status_code == HTTPStatus.OK  # noqa: S101
+
+
+def test_load(client: TestClient, sample_image_bytes: bytes):
+    """Test that the load endpoint reports the worker load after an inference.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+    """
+    client.post("/recognizer/recognize_image", files={"image": sample_image_bytes})
+    response = client.get("/health/load")
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+    load = response.json()
+    assert 0 <= load["saturation"] <= 1  # noqa: S101
+    assert load["p95_latency"]["segmentation_model"] > 0  # noqa: S101
+    assert load["inflight"]["segmentation_model"] == 0  # noqa: S101
+
+
+def test_load_sheds_when_saturated(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test that the load endpoint answers the configured status from the threshold on.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        monkeypatch (pytest.MonkeyPatch): Fixture to lower the threshold.
+    """
+    monkeypatch.setattr(app_settings, "load_shed_threshold", 0)
+    monkeypatch.setattr(app_settings, "load_shed_status", HTTPStatus.TOO_MANY_REQUESTS)
+    response = client.get("/health/load")
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS  # noqa: S101
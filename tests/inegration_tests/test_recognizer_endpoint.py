@@ -57,3 +57,19 @@ def test_recognize_image(client: TestClient, sample_image_bytes: bytes):
     assert "barcodes" in predicted_image_info  # noqa: S101
     assert "bbox" in predicted_image_info["barcodes"][0]  # noqa: S101
     assert "value" in predicted_image_info["barcodes"][0]  # noqa: S101
+
+
+def test_recognize_image_columnar(client: TestClient, sample_image_bytes: bytes):
+    """Test that the columnar format holds parallel arrays of the boxes, scores and values.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+    """
+    response = client.post("/recognizer/recognize_image?format=columnar", files={"image": sample_image_bytes})
+    assert response.status_code == HTTPStatus.OK  # noqa: S101
+
+    columns = response.json()
+    assert columns["values"]  # noqa: S101
+    for key in ("x_min", "y_min", "x_max", "y_max", "scores"):
+        assert len(columns[key]) == len(columns["values"])  # noqa: S101
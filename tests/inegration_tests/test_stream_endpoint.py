@@ -0,0 +1,39 @@
+"""This module contains tests for recognizing barcodes on a video stream using a FastAPI application.
+
+The tests use FastAPI's TestClient to open a WebSocket connection to the application,
+and then check the messages to ensure that they are correct.
+"""
+from fastapi.testclient import TestClient
+
+NUM_FRAMES: int = 3
+
+
+def test_recognize_frames(client: TestClient, sample_image_bytes: bytes):
+    """Test the recognize_frames endpoint of the stream route in the FastAPI application.
+
+    This test sends the same frame several times over a WebSocket connection to the
+    "/stream/recognize_frames" endpoint and waits for the result of every frame before sending the next one.
+    Only the first frame should trigger the detector, the following ones reuse the tracked boxes.
+
+    Args:
+        client (TestClient): The test client used to send requests to the application.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+
+    Raises:
+        AssertionError: If the frame results do not include mandatory keys or the detector is not skipped.
+    """
+    with client.websocket_connect("/stream/recognize_frames") as websocket:
+        frame_results = []
+        for _ in range(NUM_FRAMES):
+            websocket.send_bytes(sample_image_bytes)
+            frame_results.append(websocket.receive_json())
+
+    frames = [frame_result["frame"] for frame_result in frame_results]
+    assert frames == list(range(NUM_FRAMES))  # noqa: S101
+    assert frame_results[0]["detected"]  # noqa: S101
+    redetected = [frame_result["detected"] for frame_result in frame_results[1:]]
+    assert not any(redetected)  # noqa: S101
+    first_barcode = frame_results[0]["barcodes"][0]
+    assert "track_id" in first_barcode  # noqa: S101
+    last_barcode = frame_results[-1]["barcodes"][0]
+    assert first_barcode["value"] == last_barcode["value"]  # noqa: S101
@@ -0,0 +1,116 @@
+"""This module contains tests for recording and replaying traffic of a FastAPI application.
+
+The tests record requests sent with FastAPI's TestClient through the recording middleware,
+and then replay the recorded file against the same application in-process.
+"""
+import asyncio
+import json
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.replay import Report, build_report, replay, schedule_offsets
+from src.utils.recording import BodyResolver, Record, TrafficRecorder, TrafficRecordingMiddleware, load_records
+
+NUM_REQUESTS: int = 3
+SMALL_BODY_SIZE: int = 100
+PREDICT_ENDPOINT: str = "/detector/predict_barcodes"
+BODIES_DIR: str = "bodies"
+
+
+def record_requests(test_app: FastAPI, sample_image_bytes: bytes, tmp_path) -> List[Record]:
+    """Send the image uploads and a health check through the recording middleware.
+
+    Args:
+        test_app (FastAPI): The FastAPI app.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+        tmp_path (Path): Temporary directory provided by pytest, the bodies are stored in its BODIES_DIR.
+
+    Returns:
+        List[Record]: The recorded requests.
+    """
+    records_path = str(tmp_path / "traffic.jsonl")
+    recorder = TrafficRecorder(records_path, str(tmp_path / BODIES_DIR))
+    test_app.add_middleware(TrafficRecordingMiddleware, recorder=recorder)
+    client = TestClient(test_app)
+    for _ in range(NUM_REQUESTS):
+        client.post(PREDICT_ENDPOINT, files={"image": sample_image_bytes})
+    client.get("/health/health_checker")
+    recorder.close()
+    return load_records(records_path)
+
+
+async def replay_report(test_app: FastAPI, records: List[Record], bodies_dir: str) -> Report:
+    """Replay the records against the app as fast as possible.
+
+    Args:
+        test_app (FastAPI): The FastAPI app.
+        records (List[Record]): The recorded requests.
+        bodies_dir (str): Directory with the recorded request bodies.
+
+    Returns:
+        Report: The replay report.
+    """
+    transport = httpx.ASGITransport(app=test_app)  # type: ignore
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay") as async_client:
+        offsets = schedule_offsets(records, speed=0, rate=0)
+        replay_results, wall_time = await replay(async_client, records, BodyResolver(bodies_dir), offsets, 2)
+    return build_report(replay_results, wall_time)
+
+
+def test_uploads_are_recorded_by_hash(test_app: FastAPI, sample_image_bytes: bytes, tmp_path):
+    """Test that every request is recorded and the same upload always gets the same sha256.
+
+    Args:
+        test_app (FastAPI): The FastAPI app.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+        tmp_path (Path): Temporary directory provided by pytest.
+    """
+    records = record_requests(test_app, sample_image_bytes, tmp_path)
+
+    assert len(records) == NUM_REQUESTS + 1  # noqa: S101
+    assert len({record["sha256"] for record in records[:NUM_REQUESTS]}) == 1  # noqa: S101
+    assert records[0]["size"] > len(sample_image_bytes)  # noqa: S101
+
+
+def test_replay_reports_every_endpoint(test_app: FastAPI, sample_image_bytes: bytes, tmp_path):
+    """Test that recorded requests are replayed with their stored bodies and reported per endpoint.
+
+    Args:
+        test_app (FastAPI): The FastAPI app.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+        tmp_path (Path): Temporary directory provided by pytest.
+    """
+    records = record_requests(test_app, sample_image_bytes, tmp_path)
+
+    report = asyncio.run(replay_report(test_app, records, str(tmp_path / BODIES_DIR)))
+
+    json.dumps(report)
+    assert report["total"]["requests"] == NUM_REQUESTS + 1  # noqa: S101
+    assert report[f"POST {PREDICT_ENDPOINT}"]["error_rate"] == 0  # noqa: S101
+    assert "p99_ms" in report["GET /health/health_checker"]  # noqa: S101
+
+
+def test_large_bodies_are_recorded_without_body(test_app: FastAPI, sample_image_bytes: bytes, tmp_path):
+    """Test that a body over the size limit is recorded with its size only, and a smaller one is kept.
+
+    Args:
+        test_app (FastAPI): The FastAPI app.
+        sample_image_bytes (bytes): The byte representation of a sample image.
+        tmp_path (Path): Temporary directory provided by pytest.
+    """
+    records_path = str(tmp_path / "recordings" / "traffic.jsonl")
+    recorder = TrafficRecorder(records_path, str(tmp_path / BODIES_DIR))
+    test_app.add_middleware(TrafficRecordingMiddleware, recorder=recorder, max_body_size=len(sample_image_bytes))
+    client = TestClient(test_app)
+    client.post(PREDICT_ENDPOINT, files={"image": sample_image_bytes})
+    client.post(PREDICT_ENDPOINT, content=sample_image_bytes[:SMALL_BODY_SIZE])
+    recorder.close()
+
+    large, small = load_records(records_path)
+    assert "sha256" not in large  # noqa: S101
+    assert large["size"] > len(sample_image_bytes)  # noqa: S101
+    assert small["size"] == SMALL_BODY_SIZE  # noqa: S101
+    assert (tmp_path / BODIES_DIR / small["sha256"]).exists()  # noqa: S101
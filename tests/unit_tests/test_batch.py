@@ -0,0 +1,113 @@
+"""Unit tests."""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.batch import detect, run_batch
+from src.containers.containers import AppContainer
+from src.utils.batch_io import collect_items
+
+TESTS_DIR = os.path.dirname(os.path.dirname(__file__))
+SAMPLE_IMAGE = os.path.join(TESTS_DIR, "images", "image.jpg")
+INPUT_SHAPE = (3, 224, 224)
+# an odd letterbox padding used to give a row less
+ODD_INPUT_SHAPE = (3, 223, 224)
+LOADED_SHAPES = (INPUT_SHAPE, ODD_INPUT_SHAPE, INPUT_SHAPE)
+
+
+def test_collect_items_from_manifest(tmp_path):
+    """
+    Test that manifest paths are resolved against the manifest directory and ids are kept.
+
+    Args:
+        tmp_path (Path): Temporary directory provided by pytest.
+    """
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text('{"path": "a.jpg", "id": "first"}\n\n{"path": "b.jpg"}\n')
+
+    assert collect_items(str(manifest)) == [  # noqa: S101
+        ("first", str(tmp_path / "a.jpg")),
+        ("b.jpg", str(tmp_path / "b.jpg")),
+    ]
+
+
+class ShapeRecordingDetector:
+    """Detector stand-in answering every image with its original height."""
+
+    def __init__(self) -> None:
+        """Initialize the recorded batch sizes."""
+        self.batch_sizes: Dict[tuple, int] = {}
+
+    def predict_preprocessed_scored(self, batch, initial_shapes, images):
+        """
+        Record the size of the batch by input shape.
+
+        Args:
+            batch: The stacked detector inputs.
+            initial_shapes: The (height, width) of every original image.
+            images: The original images.
+
+        Returns:
+            list: The original height of every image.
+        """
+        self.batch_sizes[batch.shape[1:]] = len(batch)
+        return [height for height, _ in initial_shapes]
+
+
+def loaded_image(height: int, input_shape: tuple) -> tuple:
+    """
+    Build a blank loaded image.
+
+    Args:
+        height (int): The original image height.
+        input_shape (tuple): The detector input shape.
+
+    Returns:
+        tuple: The original image and the detector input.
+    """
+    original = np.zeros((height, 1, 3), np.uint8)
+    return original, np.zeros(input_shape, np.float32)
+
+
+def test_detect_stacks_identical_shapes():
+    """Test that inputs of different shapes go to separate forwards and the results keep the image order."""
+    detector = ShapeRecordingDetector()
+    loaded = [loaded_image(height, shape) for height, shape in enumerate(LOADED_SHAPES)]
+
+    heights: List[int] = detect(detector, loaded)  # type: ignore
+
+    assert heights == [0, 1, 2]  # noqa: S101
+    assert detector.batch_sizes == {INPUT_SHAPE: 2, ODD_INPUT_SHAPE: 1}  # noqa: S101
+
+
+def test_run_batch_resumes_from_checkpoint(app_container: AppContainer, tmp_path):
+    """
+    Test that a batch run writes a record per image and a second run skips the processed images.
+
+    Args:
+        app_container (AppContainer): The application container holding the models.
+        tmp_path (Path): Temporary directory provided by pytest.
+    """
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    for idx in range(3):
+        shutil.copy(SAMPLE_IMAGE, images_dir / f"{idx}.jpg")
+    (images_dir / "broken.jpg").write_bytes(b"not an image")
+    output = str(tmp_path / "out.jsonl")
+    checkpoint = str(tmp_path / "out.ckpt")
+    run_params: Dict[str, Any] = {"batch_size": 2, "rec_batch_size": 4, "workers": 2}
+
+    batch_items = collect_items(str(images_dir))
+    processed = run_batch(app_container, batch_items, output, checkpoint, **run_params)
+    assert processed == len(batch_items)  # noqa: S101
+    assert not run_batch(app_container, batch_items, output, checkpoint, **run_params)  # noqa: S101
+
+    with open(output, encoding="utf-8") as output_file:
+        records = {record["id"]: record for record in map(json.loads, output_file)}
+    assert set(records) == {"0.jpg", "1.jpg", "2.jpg", "broken.jpg"}  # noqa: S101
+    assert "error" in records["broken.jpg"]  # noqa: S101
+    assert "value" in records["0.jpg"]["barcodes"][0]  # noqa: S101
@@ -0,0 +1,55 @@
+"""Unit tests."""
+
+from typing import Any, Dict
+
+from src.bench import compare_results
+from src.utils.benchmark import benchmark, measure, registry
+
+TOLERANCE: float = 0.25
+MIN_ROUND_TIME_SEC: float = 1e-3
+# slower than the baseline, but within the tolerance
+TOLERATED_MEDIAN: float = 1.1
+
+
+def medians(**case_medians: float) -> Dict[str, Any]:
+    """Build the results of a run from the case medians.
+
+    Args:
+        case_medians (float): The median seconds per case name.
+
+    Returns:
+        Dict[str, Any]: The results in the format of `run_benchmarks`.
+    """
+    return {"cases": {case_name: {"median_s": median} for case_name, median in case_medians.items()}}
+
+
+def test_benchmark_registers_every_combination():
+    """Test that a case is registered per parameter combination with a readable name."""
+
+    @benchmark("unit_case", size=[(1, 2)], count=[1, 3])
+    def unit_case(size, count):  # noqa: WPS430
+        return lambda: size[0] * count
+
+    unit_cases = [case_name for case_name in registry if case_name.startswith("unit_case")]
+    assert "unit_case[count=1,size=1x2]" in registry  # noqa: S101
+    assert registry["unit_case[count=3,size=1x2]"]()() == 3  # noqa: S101
+    for case_name in unit_cases:
+        registry.pop(case_name)
+
+
+def test_measure_reports_per_call_time():
+    """Test that the measurement is positive and consistent."""
+    measurement = measure(lambda: sum(range(100)), rounds=3, min_round_time=MIN_ROUND_TIME_SEC)
+    assert 0 < measurement["min_s"] <= measurement["median_s"]  # noqa: S101
+    assert measurement["median_s"] <= measurement["max_s"]  # noqa: S101
+
+
+def test_compare_results_flags_only_regressions():
+    """Test that only the cases slower than the tolerance are reported as regressions."""
+    baseline = medians(fast=1, slow=1)
+    current = medians(fast=TOLERATED_MEDIAN, slow=2, new=1)
+
+    lines, regressions = compare_results(baseline, current, TOLERANCE)
+
+    assert regressions == ["slow"]  # noqa: S101
+    assert len(lines) == len(current["cases"])  # noqa: S101
@@ -0,0 +1,59 @@
+"""Unit tests."""
+
+import numpy as np
+import pytest
+
+from src.utils.processing import padding_ratio, preprocess_image, resize_mask_back_to_original, select_bucket
+
+SQUARE = (224, 224)
+WIDE = (192, 256)
+TALL = (256, 192)
+PANORAMA = (160, 320)
+BUCKETS = (SQUARE, WIDE, TALL, PANORAMA, PANORAMA[::-1])
+THUMBNAIL_BUCKET = (128, 128)
+WHITE: int = 255
+ODD_SIZES = ((333, 517), (517, 333), (101, 1001))
+# (height, width) of an image and the bucket with the least padding
+LEAST_PADDED = (
+    ((1000, 1000), SQUARE),
+    ((480, 640), WIDE),
+    ((640, 480), TALL),
+    ((600, 1200), PANORAMA),
+    ((300, 1600), PANORAMA),
+)
+
+
+@pytest.mark.parametrize(("image_size", "bucket"), LEAST_PADDED)
+def test_select_bucket_with_least_padding(image_size, bucket):
+    """Test that an image goes to the bucket with the least padding.
+
+    Args:
+        image_size: The (height, width) of the image.
+        bucket: The expected bucket.
+    """
+    assert select_bucket(image_size, BUCKETS) == bucket  # noqa: S101
+    assert padding_ratio(image_size, bucket) <= padding_ratio(image_size, SQUARE)  # noqa: S101
+
+
+def test_select_bucket_avoids_upscaling():
+    """Test that among equally padded buckets a thumbnail goes to the smallest one and a photo to the largest."""
+    buckets = (SQUARE, THUMBNAIL_BUCKET)
+    assert select_bucket((100, 100), buckets) == THUMBNAIL_BUCKET  # noqa: S101
+    assert select_bucket((1000, 1000), buckets) == SQUARE  # noqa: S101
+
+
+@pytest.mark.parametrize("image_size", ODD_SIZES)
+def test_preprocess_fills_the_bucket_exactly(image_size):
+    """Test that odd paddings still give a batch of the bucket shape and the mask maps back to the image.
+
+    Args:
+        image_size: The (height, width) of the image.
+    """
+    image = np.full((*image_size, 3), WHITE, dtype=np.uint8)
+    bucket = select_bucket(image_size, BUCKETS)
+    batch = preprocess_image(image, bucket)
+    assert tuple(batch.shape) == (1, 3, *bucket)  # noqa: S101
+
+    mask = np.zeros(bucket, dtype=np.uint8)
+    mask[batch[0, 0].numpy() > 0] = 1
+    assert resize_mask_back_to_original(mask, image_size).all()  # type: ignore  # noqa: S101
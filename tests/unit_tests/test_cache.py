@@ -0,0 +1,197 @@
+"""Unit tests."""
+
+from types import MappingProxyType
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from prometheus_client import REGISTRY
+
+from src.services.cache import CropCache, content_keys
+from src.services.recognizer import RecTorchWrapper
+
+CROP_SIZE = (224, 224)
+# width of a bar module in pixels, and of the quiet zone around the barcode in modules
+MODULE_WIDTH: int = 4
+QUIET_ZONE: int = 9
+BARCODE_HEIGHT: int = 150
+# EAN-13 digit codes, the "R" codes invert the "L" ones and the "G" codes mirror the "R" ones
+L_CODES = ("0001101", "0011001", "0010011", "0111101", "0100011", "0110001", "0101111", "0111011", "0110111", "0001011")
+INVERTED = str.maketrans("01", "10")
+R_CODES = tuple(code.translate(INVERTED) for code in L_CODES)
+G_CODES = tuple(code[::-1] for code in R_CODES)
+LEFT_CODES = MappingProxyType({"L": L_CODES, "G": G_CODES})
+# "L" or "G" code of the six left digits, by the first digit
+PARITIES = ("LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG", "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL")
+GUARD: str = "101"
+CENTER_GUARD: str = "01010"
+CHECK_WEIGHT: int = 3
+BASE_DIGITS: str = "590123412345"
+# the barcodes with one of the first 12 digits of the base one incremented
+NEIGHBOUR_DIGITS = (
+    "690123412345",
+    "500123412345",
+    "591123412345",
+    "590223412345",
+    "590133412345",
+    "590124412345",
+    "590123512345",
+    "590123422345",
+    "590123413345",
+    "590123412445",
+    "590123412355",
+    "590123412346",
+)
+# the keys of one-digit neighbours differ in at least 4 bits
+TOLERANCES = (0, 1)
+TIGHT_QUIET_ZONE: int = 3
+SHIFT: int = 7
+NOISE: float = 0.2
+CACHE_SIZE: int = 16
+
+
+def ean13_pattern(digits: str) -> str:
+    """
+    Encode an EAN-13 barcode as modules.
+
+    Args:
+        digits (str): The first 12 digits, the check digit is appended.
+
+    Returns:
+        str: The 95 modules, "1" for a bar.
+    """
+    numbers = [int(digit) for digit in digits]
+    odd = sum(numbers[::2])
+    even = sum(numbers[1::2])
+    numbers.append(-(odd + CHECK_WEIGHT * even) % 10)
+    left_digits = zip(PARITIES[numbers[0]], numbers[1:7])
+    left = [LEFT_CODES[parity][number] for parity, number in left_digits]
+    right = [R_CODES[number] for number in numbers[7:]]
+    return "".join([GUARD, *left, CENTER_GUARD, *right, GUARD])
+
+
+def ean13_crop(digits: str, quiet_zone: int = QUIET_ZONE, shift: int = 0, noise: float = 0) -> torch.Tensor:
+    """
+    Render the normalized crop of an EAN-13 barcode.
+
+    Args:
+        digits (str): The first 12 digits, the check digit is appended.
+        quiet_zone (int): Width of the margin around the barcode in modules.
+        shift (int): Horizontal shift of the barcode in pixels before resizing.
+        noise (float): Standard deviation of the gaussian noise added to the crop.
+
+    Returns:
+        torch.Tensor: A batch with the single crop, resized to the recognizer input like a letterboxed crop.
+    """
+    modules = np.pad([int(module) for module in ean13_pattern(digits)], quiet_zone)
+    row = np.repeat(1 - modules, MODULE_WIDTH).astype(np.float32)
+    barcode = np.tile(np.roll(row, shift), (BARCODE_HEIGHT, 1))
+    crop = cv2.resize(barcode, CROP_SIZE[::-1], interpolation=cv2.INTER_AREA)
+    rng = np.random.default_rng(0)
+    noisy = crop + rng.normal(0, noise, CROP_SIZE).astype(np.float32)
+    batch = np.broadcast_to(noisy, (1, 3, *CROP_SIZE))
+    return torch.from_numpy(np.ascontiguousarray(batch))
+
+
+def cache_metric(name: str, label: str) -> float:
+    """
+    Get the value of a crop cache counter.
+
+    Args:
+        name (str): The counter name, without the service prefix.
+        label (str): The result label.
+
+    Returns:
+        float: The counter value, 0 before the first increment.
+    """
+    return REGISTRY.get_sample_value(f"barcode_recognizer_recognizer_cache_{name}_total", {"result": label}) or 0
+
+
+class CountingRecognizer(RecTorchWrapper):
+    """Recognizer without a model, answering the number of bar pixels and counting the forwarded crops."""
+
+    def __init__(self, cache: CropCache):
+        """
+        Initialize the recognizer.
+
+        Args:
+            cache (CropCache): The crop cache.
+        """
+        self.cache = cache
+        self.forwarded = 0
+
+    def forward(self, batch: torch.Tensor) -> list:
+        """
+        Answer the number of bar pixels of every crop.
+
+        Args:
+            batch (torch.Tensor): The crops.
+
+        Returns:
+            list: The pixel counts as strings.
+        """
+        self.forwarded += len(batch)
+        crops = np.asarray(batch)
+        return [str(np.count_nonzero(crop < crop.mean())) for crop in crops]
+
+
+@pytest.mark.parametrize("tolerance", TOLERANCES)
+def test_near_duplicates_hit_but_not_neighbours(tolerance: int):
+    """Test that shifted, rescaled, brighter or noisy crops of a barcode hit, and one-digit neighbours never do.
+
+    Args:
+        tolerance (int): The tolerance of the cache.
+    """
+    base = ean13_crop(BASE_DIGITS)
+    rescaled = ean13_crop(BASE_DIGITS, quiet_zone=TIGHT_QUIET_ZONE)
+    shifted = ean13_crop(BASE_DIGITS, shift=SHIFT)
+    noisy = ean13_crop(BASE_DIGITS, noise=NOISE)
+    brighter = base * 2 + 1
+    keys = content_keys(torch.cat([brighter, rescaled, shifted, noisy]))
+    cache = CropCache(size=CACHE_SIZE, tolerance=tolerance)
+    for digits in NEIGHBOUR_DIGITS:
+        cache.store(content_keys(ean13_crop(digits))[0], digits)
+
+    assert cache.lookup(content_keys(base)) == [None]  # noqa: S101
+    cache.store(content_keys(base)[0], BASE_DIGITS)
+    assert cache.lookup(keys) == [BASE_DIGITS for _ in keys]  # noqa: S101
+
+
+@pytest.mark.parametrize("tolerance", TOLERANCES)
+def test_cache_evicts_least_recently_used(tolerance: int):
+    """Test that the cache keeps at most `size` crops, the most recently used ones.
+
+    Args:
+        tolerance (int): The tolerance of the cache.
+    """
+    cache = CropCache(size=2, tolerance=tolerance)
+    first, second, third = NEIGHBOUR_DIGITS[:3]
+    crops = [ean13_crop(digits) for digits in (first, second, third)]
+    keys = content_keys(torch.cat(crops))
+    cache.store(keys[0], first)
+    cache.store(keys[1], second)
+    cache.lookup([keys[0]])
+    cache.store(keys[2], third)
+
+    assert len(cache) == 2  # noqa: S101
+    assert cache.lookup(keys) == [first, None, third]  # noqa: S101
+
+
+def test_recognizer_skips_forward_on_hits():
+    """Test that the cached crops skip the forward and the sampled hits are verified."""
+    recognizer = CountingRecognizer(CropCache(size=CACHE_SIZE))
+    batch = torch.cat([ean13_crop(digits) for digits in NEIGHBOUR_DIGITS[:2]])
+    crops = len(batch)
+    hits_before = cache_metric("lookups", "hit")
+    first = recognizer.predict_preprocessed(batch)
+
+    cached = recognizer.predict_preprocessed(batch)
+    assert (cached, recognizer.forwarded) == (first, crops)  # noqa: S101
+    assert cache_metric("lookups", "hit") == hits_before + crops  # noqa: S101
+
+    recognizer.cache.verify_rate = 1  # type: ignore
+    agreed_before = cache_metric("verifications", "agree")
+    verified = recognizer.predict_preprocessed(batch)
+    assert (verified, recognizer.forwarded) == (first, 2 * crops)  # noqa: S101
+    assert cache_metric("verifications", "agree") == agreed_before + crops  # noqa: S101
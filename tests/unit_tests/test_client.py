@@ -0,0 +1,198 @@
+"""Unit tests."""
+
+import asyncio
+import json
+from http import HTTPStatus
+from types import MappingProxyType
+from typing import List, Tuple
+
+import cv2
+import httpx
+import numpy as np
+import pytest
+
+from src.client.clients import AsyncBarcodeClient, BarcodeClient, Records, ServiceError
+from src.client.retries import RetryPolicy
+
+MAX_PIXEL: int = 255
+BBOX_X_MAX: int = 30
+BBOX = MappingProxyType({"x_min": 10, "y_min": 20, "x_max": BBOX_X_MAX, "y_max": 40})
+RECORDS = ({"bbox": dict(BBOX), "score": 0.9, "value": "42"},)
+BARCODES_JSON = json.dumps({"barcodes": RECORDS})
+DETECTIONS_JSON = json.dumps({"bboxes": [dict(BBOX)], "scores": [0.9]})
+BUSY_JSON = json.dumps({"detail": "busy"})
+RETRY_AFTER_SEC: int = 2
+BACKOFF_SEC: float = 0.1
+SMALL_SHAPE = (100, 200)
+PHOTO_SHAPE = (2000, 3000)
+TILE_SHAPE = (50, 50)
+CONCURRENCY: int = 2
+IMAGE_COUNT: int = 6
+# (status, headers) of a failed attempt
+Failure = Tuple[int, dict]
+
+
+def encoded_image(height: int, width: int) -> bytes:
+    """
+    Encode a random image.
+
+    Args:
+        height (int): The image height.
+        width (int): The image width.
+
+    Returns:
+        bytes: The JPEG image.
+    """
+    rng = np.random.default_rng(0)
+    shape = (height, width, 3)
+    pixels = rng.integers(0, MAX_PIXEL, shape, dtype=np.uint8, endpoint=True)
+    _, buffer = cv2.imencode(".jpg", pixels)
+    return buffer.tobytes()
+
+
+class FlakyServer:
+    """Mock server answering the given failures before the barcodes, recording the received requests."""
+
+    def __init__(self, failures: List[Failure]):
+        """
+        Initialize the server.
+
+        Args:
+            failures (List[Failure]): The (status, headers) of the failed attempts.
+        """
+        self.failures = failures
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a request.
+
+        Args:
+            request (httpx.Request): The request.
+
+        Returns:
+            httpx.Response: The next failure, then the detections or the barcodes.
+        """
+        self.requests.append(request)
+        if self.failures:
+            status, headers = self.failures.pop(0)
+            return httpx.Response(status, headers=headers, content=BUSY_JSON)
+        if request.url.path == "/detector/predict_barcodes":
+            return httpx.Response(HTTPStatus.OK, content=DETECTIONS_JSON)
+        return httpx.Response(HTTPStatus.OK, content=BARCODES_JSON)
+
+    def client(self, retry: RetryPolicy) -> BarcodeClient:
+        """
+        Build a client of the server.
+
+        Args:
+            retry (RetryPolicy): The retries of the client.
+
+        Returns:
+            BarcodeClient: The client.
+        """
+        http = httpx.Client(base_url="http://service", transport=httpx.MockTransport(self))
+        return BarcodeClient(http, retry=retry)
+
+
+class SlowServer:
+    """Mock server answering the barcodes after a delay, recording the peak number of requests in flight."""
+
+    def __init__(self) -> None:
+        """Initialize the server."""
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a request after a delay.
+
+        Args:
+            request (httpx.Request): The request.
+
+        Returns:
+            httpx.Response: The barcodes.
+        """
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(BACKOFF_SEC)
+        self.in_flight -= 1
+        return httpx.Response(HTTPStatus.OK, content=BARCODES_JSON)
+
+    async def recognize(self, images: List[bytes], concurrency: int) -> List[Records]:
+        """
+        Recognize images with an asyncio client of the server.
+
+        Args:
+            images (List[bytes]): The encoded images.
+            concurrency (int): Maximum number of concurrent requests of the client.
+
+        Returns:
+            List[Records]: The records of every image.
+        """
+        http = httpx.AsyncClient(base_url="http://service", transport=httpx.MockTransport(self))
+        async with AsyncBarcodeClient(http, concurrency=concurrency) as client:
+            return await client.recognize_images(images)
+
+
+def test_client_retries_rejected_requests(monkeypatch):
+    """Test that the rejected attempts are retried after the asked delay.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    sleeps: List[float] = []
+    monkeypatch.setattr("src.client.clients.time.sleep", sleeps.append)
+    limited = (HTTPStatus.TOO_MANY_REQUESTS, {"retry-after": str(RETRY_AFTER_SEC)})
+    server = FlakyServer([limited, (HTTPStatus.SERVICE_UNAVAILABLE, {})])
+    client = server.client(RetryPolicy(backoff=BACKOFF_SEC))
+
+    barcodes = client.recognize_image(encoded_image(*SMALL_SHAPE))
+    assert barcodes == list(RECORDS)  # noqa: S101
+    assert sleeps == [RETRY_AFTER_SEC, 2 * BACKOFF_SEC]  # noqa: S101
+    assert len(server.requests) == 3  # noqa: S101
+
+
+def test_client_raises_after_the_retries(monkeypatch):
+    """Test that the error of the last attempt is raised.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr("src.client.clients.time.sleep", lambda _: None)
+    server = FlakyServer([(HTTPStatus.SERVICE_UNAVAILABLE, {}) for _ in range(3)])
+    client = server.client(RetryPolicy(retries=2))
+
+    with pytest.raises(ServiceError, match="503: busy"):
+        client.predict_barcodes(encoded_image(*SMALL_SHAPE))
+    assert len(server.requests) == 3  # noqa: S101
+
+
+def test_full_resolution_skips_the_downscale():
+    """Test that only the full resolution recognition and detection upload the original image."""
+    server = FlakyServer([])
+    client = server.client(RetryPolicy())
+    image = encoded_image(*PHOTO_SHAPE)
+
+    downscaled = client.recognize_image(image)
+    client.recognize_image(image, full_resolution=True)
+    client.predict_barcodes(image)
+    detected = client.predict_barcodes(image, full_resolution=True)
+
+    uploads = [len(request.content) for request in server.requests]
+    downscaled_uploads, full_uploads = uploads[::2], uploads[1::2]
+    assert max(downscaled_uploads) < len(image) < min(full_uploads)  # noqa: S101
+    assert downscaled[0]["bbox"]["x_max"] > BBOX_X_MAX  # noqa: S101
+    assert detected["bboxes"] == [BBOX]  # noqa: S101
+
+
+def test_async_client_bounds_the_concurrency():
+    """Test that no more than `concurrency` requests are in flight."""
+    server = SlowServer()
+    image = encoded_image(*TILE_SHAPE)
+    images = [image for _ in range(IMAGE_COUNT)]
+
+    records = asyncio.run(server.recognize(images, CONCURRENCY))
+
+    assert len(records) == IMAGE_COUNT  # noqa: S101
+    assert server.peak == CONCURRENCY  # noqa: S101
@@ -1,12 +1,18 @@
 """Unit tests."""
 
 from copy import deepcopy
+from types import MappingProxyType
 
 import numpy as np
+import pytest
 from numpy.typing import NDArray
+from prometheus_client import REGISTRY
 
 from src.containers.containers import AppContainer
 
+# every image is tiled, with the tile size of the default bucket
+TILING = MappingProxyType({"min_side": 1, "tile_size": 448, "overlap": 64})
+
 
 def test_seg_predicts_not_fail(app_container: AppContainer, sample_image_np: NDArray[np.uint8]):
     """
@@ -35,3 +41,82 @@ def test_seg_predict_dont_mutate_initial_image(app_container: AppContainer, samp
     model.predict(sample_image_np)
 
     assert np.allclose(sample_image_np, image_to_compare)  # noqa: S101
+
+
+def test_seg_warms_up_every_input_bucket(app_container: AppContainer):
+    """
+    Test that the detector keeps the configured input buckets it supports.
+
+    Args:
+        app_container (AppContainer): The application container holding the seg model.
+    """
+    segmentor = app_container.seg_model()
+    configured = [tuple(bucket) for bucket in app_container.config.segmentation_model.input_buckets()]
+    assert segmentor.input_buckets == configured  # noqa: S101
+
+
+def test_seg_predicts_mixed_buckets_in_order(app_container: AppContainer, sample_image_np: NDArray[np.uint8]):
+    """
+    Test that a batch spanning several input buckets returns the boxes in the order of the images.
+
+    Args:
+        app_container (AppContainer): The application container holding the seg model.
+        sample_image_np (NDArray[np.uint8]): The numpy array of the sample image to be tested.
+    """
+    segmentor = app_container.seg_model()
+    wide_image = np.concatenate([sample_image_np, sample_image_np], axis=1)
+    images = [wide_image, sample_image_np, wide_image]
+    predictions = segmentor.predict_batch_scored(images)
+    expected = [segmentor.predict_scored(image) for image in images]
+
+    boxes = [[bbox for bbox, _ in scored] for scored in predictions]
+    assert boxes == [[bbox for bbox, _ in scored] for scored in expected]  # noqa: S101
+    # the last bits of the scores depend on the other images of the batch
+    scores = [score for scored in predictions for _, score in scored]
+    assert scores == pytest.approx([score for scored in expected for _, score in scored])  # noqa: S101
+
+
+def tiles_counted(label: str) -> float:
+    """
+    Get the count of the detector tiles with a result.
+
+    Args:
+        label (str): The tile result.
+
+    Returns:
+        float: The counter value, 0 before the first increment.
+    """
+    return REGISTRY.get_sample_value("barcode_recognizer_detector_tiles_total", {"result": label}) or 0
+
+
+def test_seg_tiling_skips_inactive_tiles(app_container: AppContainer, sample_image_np: NDArray[np.uint8]):
+    """
+    Test that with no active tile the tiled detector gives the coarse boxes and counts the skipped tiles.
+
+    Args:
+        app_container (AppContainer): The application container holding the seg model.
+        sample_image_np (NDArray[np.uint8]): The numpy array of the sample image to be tested.
+    """
+    coarse = app_container.seg_model().predict_scored(sample_image_np)
+    app_container.seg_model.reset()
+    segmentor = app_container.seg_model(tiling=dict(TILING, activity_threshold=1))
+    skipped = tiles_counted("skipped")
+    assert segmentor.predict_scored(sample_image_np) == coarse  # noqa: S101
+    tiles = len(segmentor.tiler.tiles(sample_image_np.shape[:2]))  # type: ignore
+    assert tiles_counted("skipped") - skipped == tiles  # noqa: S101
+
+
+def test_seg_tiling_evaluates_active_tiles(app_container: AppContainer, sample_image_np: NDArray[np.uint8]):
+    """
+    Test that every active tile is evaluated in a batch together with the tiles of the other images.
+
+    Args:
+        app_container (AppContainer): The application container holding the seg model.
+        sample_image_np (NDArray[np.uint8]): The numpy array of the sample image to be tested.
+    """
+    segmentor = app_container.seg_model(tiling=dict(TILING, activity_threshold=-1))
+    evaluated = tiles_counted("evaluated")
+    predictions = segmentor.predict_batch_scored([sample_image_np, sample_image_np])
+    assert predictions[0] == predictions[1]  # noqa: S101
+    tiles = len(segmentor.tiler.tiles(sample_image_np.shape[:2]))  # type: ignore
+    assert tiles_counted("evaluated") - evaluated == 2 * tiles  # noqa: S101
@@ -0,0 +1,51 @@
+"""Unit tests."""
+
+from types import MappingProxyType
+
+import cv2
+import numpy as np
+
+from src.client.images import prepare_image
+
+MAX_PIXEL: int = 255
+MAX_SIDE: int = 320
+LARGE_SHAPE = (600, 1200)
+SMALL_SHAPE = (100, 200)
+BBOX = MappingProxyType({"x_min": 10, "y_min": 20, "x_max": 30, "y_max": 40})
+# the bbox scaled from the (160, 320) upload back to the (600, 1200) image
+ORIGINAL_BBOX = MappingProxyType({"x_min": 38, "y_min": 75, "x_max": 112, "y_max": 150})
+
+
+def encoded_image(height: int, width: int) -> bytes:
+    """
+    Encode a random image.
+
+    Args:
+        height (int): The image height.
+        width (int): The image width.
+
+    Returns:
+        bytes: The JPEG image.
+    """
+    rng = np.random.default_rng(0)
+    shape = (height, width, 3)
+    pixels = rng.integers(0, MAX_PIXEL, shape, dtype=np.uint8, endpoint=True)
+    _, buffer = cv2.imencode(".jpg", pixels)
+    return buffer.tobytes()
+
+
+def test_prepare_image_downscales():
+    """Test that a large image is downscaled to the longest side and the boxes are mapped back."""
+    prepared = prepare_image(encoded_image(*LARGE_SHAPE), MAX_SIDE)
+
+    assert prepared.shape == (MAX_SIDE // 2, MAX_SIDE)  # noqa: S101
+    assert prepared.original_shape == LARGE_SHAPE  # noqa: S101
+    assert prepared.rescale_bbox(dict(BBOX)) == ORIGINAL_BBOX  # noqa: S101
+
+
+def test_prepare_image_keeps_small_images():
+    """Test that an image fitting the side is uploaded as is."""
+    image = encoded_image(*SMALL_SHAPE)
+
+    assert prepare_image(image, MAX_SIDE).body is image  # noqa: S101
+    assert prepare_image(image, None).body is image  # noqa: S101
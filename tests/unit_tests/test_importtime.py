@@ -0,0 +1,37 @@
+"""Unit tests."""
+
+from src.importtime import MAX_STARTUP_OVERHEAD, measure_imports, package_totals, parse_importtime, startup_overhead
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     numpy.core
+import time:        80 |        200 |   numpy
+import time:        30 |        230 | src.app
+"""
+# (package, self microseconds, cumulative microseconds, nesting depth) of the report
+TIMINGS = (
+    ("numpy.core", 120, 120, 2),
+    ("numpy", 80, 200, 1),
+    ("src.app", 30, 230, 0),
+)
+PACKAGE_TOTALS = (("numpy", 200), ("src", 30))
+
+
+def test_parse_importtime():
+    """Test that the report is parsed with the nesting depth and summed per package."""
+    timings = parse_importtime(REPORT)
+
+    assert timings == list(TIMINGS)  # noqa: S101
+    assert package_totals(timings) == list(PACKAGE_TOTALS)  # noqa: S101
+
+
+def test_app_imports_no_lazy_module():
+    """Test that the app imports none of the lazy modules."""
+    assert not measure_imports().lazy_loaded()  # noqa: S101
+
+
+def test_app_cold_start():
+    """Test that the app import takes little more than the import of the dependencies every route needs.
+
+    The import times are compared to each other rather than to a wall time budget, which depends on the machine.
+    """
+    assert startup_overhead() < MAX_STARTUP_OVERHEAD  # noqa: S101
@@ -0,0 +1,83 @@
+"""Unit tests."""
+import time
+
+import pytest
+
+from src.utils.load import InferenceTracker, LoadMonitor
+
+MODEL: str = "model"
+WINDOW_SEC: float = 60
+SLOW_CALL_SEC: float = 0.01
+FAST_CALLS: int = 19
+MEDIAN: float = 0.5
+QUEUE_TARGET: int = 10
+QUEUED: int = 2
+
+
+class FakeQueues:
+    """Scheduler and pipeline with fixed queue depths."""
+
+    running = 2
+
+    def __init__(self, queued: int):
+        """
+        Initialize the queues.
+
+        Args:
+            queued (int): The number of waiting requests of the scheduler and of the pipeline each.
+        """
+        self.queued = queued
+
+    def queue_depth(self) -> int:
+        """
+        Get the pipeline queue depth.
+
+        Returns:
+            int: The waiting requests.
+        """
+        return self.queued
+
+
+def load_monitor(tracker: InferenceTracker, queued: int = 0, latency_target: float = 1) -> LoadMonitor:
+    """
+    Create a monitor of a scheduler and a pipeline with the same queue depth.
+
+    Args:
+        tracker (InferenceTracker): The tracker of the model calls.
+        queued (int): The waiting requests of the scheduler and of the pipeline each.
+        latency_target (float): Model p95 latency in seconds that counts as saturated.
+
+    Returns:
+        LoadMonitor: The monitor.
+    """
+    queues = FakeQueues(queued)
+    return LoadMonitor(queues, queues, latency_target=latency_target, queue_target=QUEUE_TARGET, tracker=tracker)
+
+
+def test_tracker_counts_inflight_and_latency():
+    """Test that calls in flight are counted and their latencies give the p95."""
+    tracker = InferenceTracker(window=WINDOW_SEC)
+    with tracker.track(MODEL):
+        assert tracker.inflight() == {MODEL: 1}  # noqa: S101
+        time.sleep(SLOW_CALL_SEC)
+    for _ in range(FAST_CALLS):
+        with tracker.track(MODEL):
+            time.sleep(0)
+    assert tracker.inflight() == {MODEL: 0}  # noqa: S101
+    assert tracker.latency_quantile(MODEL) >= SLOW_CALL_SEC  # noqa: S101
+    assert tracker.latency_quantile(MODEL, MEDIAN) < SLOW_CALL_SEC  # noqa: S101
+    assert tracker.latency_quantile("other") == 0  # noqa: S101
+
+
+def test_saturation_from_queue_and_latency():
+    """Test that the saturation is the larger of the queue and the latency pressure, capped at 1."""
+    tracker = InferenceTracker(window=WINDOW_SEC)
+    idle = load_monitor(tracker).snapshot()
+    queued = load_monitor(tracker, queued=QUEUED).snapshot()
+    with tracker.track(MODEL):
+        time.sleep(SLOW_CALL_SEC * 2)
+    slow = load_monitor(tracker, latency_target=SLOW_CALL_SEC).snapshot()
+
+    saturations = [idle["saturation"], queued["saturation"], slow["saturation"]]
+    assert saturations == pytest.approx([0, QUEUED * 2 / QUEUE_TARGET, 1])  # noqa: S101
+    assert queued["queue_depth"] == {"scheduler": QUEUED, "pipeline": QUEUED}  # noqa: S101
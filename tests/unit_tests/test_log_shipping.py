@@ -0,0 +1,134 @@
+"""Unit tests."""
+
+import json
+import logging
+import threading
+import time
+from typing import List
+
+from loguru import logger
+from prometheus_client import REGISTRY
+
+from src.logger import shipping
+
+MESSAGES: int = 200
+QUEUE_SIZE: int = 10
+BATCH_SIZE: int = 4
+FLUSH_INTERVAL_SEC: float = 0.05
+SHORT_TIMEOUT_SEC: float = 0.01
+# long enough for a whole batch logged every SHORT_TIMEOUT_SEC
+BATCH_INTERVAL_SEC: float = 1
+DROPPED_SAMPLE = ("barcode_recognizer_log_records_total", {"outcome": "dropped"})
+
+
+class StalledHandler(logging.Handler):
+    """Stand-in of a syslog host that hangs until released."""
+
+    def __init__(self) -> None:
+        """Initialize the handler."""
+        super().__init__()
+        self.resume = threading.Event()
+        self.closed = threading.Event()
+        self.messages: List[str] = []
+        self.flushes = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Block until released, then keep the message.
+
+        Args:
+            record (logging.LogRecord): The record.
+        """
+        self.resume.wait()
+        self.messages.append(record.getMessage())
+
+    def flush(self) -> None:
+        """Count the flushes, one per shipped batch."""
+        self.flushes += 1
+
+    def close(self) -> None:
+        """Mark the handler as closed."""
+        super().close()
+        self.closed.set()
+
+
+def start_shipper(destination: StalledHandler, flush_interval: float = FLUSH_INTERVAL_SEC) -> shipping.QueuedLogShipper:
+    """
+    Start a shipper to the destination.
+
+    Args:
+        destination (StalledHandler): The destination handler.
+        flush_interval (float): Seconds a batch waits for more records.
+
+    Returns:
+        shipping.QueuedLogShipper: The running shipper.
+    """
+    shipper = shipping.QueuedLogShipper(
+        destination,
+        queue_size=QUEUE_SIZE,
+        batch_size=BATCH_SIZE,
+        flush_interval=flush_interval,
+    )
+    shipper.start()
+    return shipper
+
+
+def test_stalled_destination_is_not_awaited():
+    """Test that logging stays fast while the destination hangs, overflow is dropped and close flushes the rest."""
+    destination = StalledHandler()
+    shipper = start_shipper(destination)
+    handler_id = logger.add(shipper.write, format="{message}")
+    dropped_before = REGISTRY.get_sample_value(*DROPPED_SAMPLE) or 0
+
+    started = time.perf_counter()
+    for idx in range(MESSAGES):
+        logger.info(f"message {idx}")
+    elapsed = time.perf_counter() - started
+    logger.remove(handler_id)
+    destination.resume.set()
+    shipper.close()
+
+    dropped = REGISTRY.get_sample_value(*DROPPED_SAMPLE) or 0
+    assert elapsed < 1  # noqa: S101
+    assert dropped - dropped_before + len(destination.messages) == MESSAGES  # noqa: S101
+    assert json.loads(destination.messages[0])["record"]["message"] == "message 0"  # noqa: S101
+
+
+def test_busy_destination_is_closed_last(monkeypatch):
+    """Test that a close timing out on a stalled destination leaves the handler open until the thread is done.
+
+    Args:
+        monkeypatch: Fixture to shorten the close timeout.
+    """
+    monkeypatch.setattr(shipping, "STOP_TIMEOUT_SEC", SHORT_TIMEOUT_SEC)
+    destination = StalledHandler()
+    shipper = start_shipper(destination)
+    handler_id = logger.add(shipper.write, format="{message}")
+    logger.info("last message")
+    logger.remove(handler_id)
+
+    shipper.close()
+    closed_early = destination.closed.is_set()
+    destination.resume.set()
+
+    assert not closed_early  # noqa: S101
+    assert destination.closed.wait(1)  # noqa: S101
+    assert len(destination.messages) == 1  # noqa: S101
+
+
+def test_records_are_shipped_in_batches():
+    """Test that the records logged during the flush interval are serialized by the shipper and shipped in one batch."""
+    destination = StalledHandler()
+    destination.resume.set()
+    shipper = start_shipper(destination, flush_interval=BATCH_INTERVAL_SEC)
+    handler_id = logger.add(shipper.write, format="{message}")
+    for idx in range(BATCH_SIZE):
+        logger.bind(index=idx).info("batched")
+        time.sleep(SHORT_TIMEOUT_SEC)
+    logger.remove(handler_id)
+    shipper.close()
+
+    records = [json.loads(message)["record"] for message in destination.messages]
+    indexes = [record["extra"]["index"] for record in records]
+    assert indexes == list(range(BATCH_SIZE))  # noqa: S101
+    assert destination.flushes == 1  # noqa: S101
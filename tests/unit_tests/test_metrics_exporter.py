@@ -0,0 +1,95 @@
+"""Unit tests."""
+
+import gzip
+import time
+from contextlib import ExitStack
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge
+
+from src.utils.exposition import MetricsExporter, accepts_gzip
+
+TTL_SEC: int = 60
+REFRESH_SEC: float = 0.01
+TIMEOUT_SEC: float = 5
+
+
+def scrapes_missed() -> float:
+    """
+    Get the count of the scrapes that collected the registry themselves.
+
+    Returns:
+        float: The counter value, 0 before the first increment.
+    """
+    return REGISTRY.get_sample_value("barcode_recognizer_metrics_scrapes_total", {"cache": "miss"}) or 0
+
+
+def test_cached_exposition_until_refreshed():
+    """Test that the scrapes are served from the cache and gzip matches the plain exposition."""
+    registry = CollectorRegistry()
+    counter = Counter("cached_total", "Test counter.", registry=registry)
+    exporter = MetricsExporter(registry, ttl=TTL_SEC)
+
+    first = exporter.response("")
+    counter.inc()
+    second = exporter.response("deflate, gzip")
+
+    assert b"cached_total 0.0" in first.body  # noqa: S101
+    assert second.headers["content-encoding"] == "gzip"  # noqa: S101
+    assert gzip.decompress(second.body) == first.body  # noqa: S101
+
+
+def test_background_refresh_serves_the_scrapes():
+    """Test that the started exporter collects in the background and the scrapes never collect themselves."""
+    registry = CollectorRegistry()
+    counter = Counter("refreshed_total", "Test counter.", registry=registry)
+    exporter = MetricsExporter(registry, ttl=REFRESH_SEC)
+    exporter.exposition()
+    missed = scrapes_missed()
+
+    counter.inc()
+    deadline = time.monotonic() + TIMEOUT_SEC
+    with ExitStack() as running:
+        exporter.start()
+        running.callback(exporter.stop)
+        while b"refreshed_total 1.0" not in exporter.exposition() and time.monotonic() < deadline:
+            time.sleep(REFRESH_SEC)
+
+    assert b"refreshed_total 1.0" in exporter.exposition()  # noqa: S101
+    assert scrapes_missed() == missed  # noqa: S101
+
+
+def test_zero_ttl_collects_every_scrape():
+    """Test that a zero TTL collects the registry on every scrape and never starts the background collections."""
+    registry = CollectorRegistry()
+    counter = Counter("fresh_total", "Test counter.", registry=registry)
+    exporter = MetricsExporter(registry, ttl=0)
+    exporter.start()
+
+    exporter.response("")
+    counter.inc()
+    assert b"fresh_total 1.0" in exporter.response("").body  # noqa: S101
+    exporter.stop()
+
+
+def test_refreshers_run_before_every_collection():
+    """Test that the refreshers update their gauges before every scrape collects, until the exporter is stopped."""
+    registry = CollectorRegistry()
+    gauge = Gauge("refreshed_load", "Test gauge.", registry=registry)
+    exporter = MetricsExporter(registry, ttl=0)
+    exporter.start(refreshers=[gauge.inc])
+
+    scrapes = [exporter.response("").body for _ in range(2)]
+    exporter.stop()
+    scrapes.append(exporter.response("").body)
+
+    loads = [line for scrape in scrapes for line in scrape.splitlines() if line.startswith(b"refreshed_load ")]
+    assert loads == [b"refreshed_load 1.0", b"refreshed_load 2.0", b"refreshed_load 2.0"]  # noqa: S101
+
+
+def test_gzip_only_for_gzip_scrapers():
+    """Test that the exposition is plain unless the scraper accepts gzip."""
+    exporter = MetricsExporter(CollectorRegistry(), ttl=TTL_SEC)
+
+    for accept_encoding in ("", "deflate", "x-gzip", "gzip;q=0"):
+        assert "content-encoding" not in exporter.response(accept_encoding).headers  # noqa: S101
+    assert accepts_gzip("br, gzip;q=0.5")  # noqa: S101
@@ -0,0 +1,40 @@
+"""Unit tests."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from starlette.status import HTTP_200_OK
+
+from src.utils.metrics import PrometheusMiddleware
+
+SIZE_SUM = "barcode_recognizer_request_size_bytes_sum"
+RESPONSES_TOTAL = "barcode_recognizer_starlette_responses_total"
+REQUESTS_TOTAL = "barcode_recognizer_starlette_requests_total"
+ITEM_BODY: bytes = b"x" * 10
+ITEM_IDS = (1, 2, 1)
+
+
+def test_middleware_caches_templates_and_sizes():
+    """Test that templates are cached per path, unhandled paths are filtered and body sizes are recorded."""
+    app = FastAPI()
+
+    @app.post("/items/{item_id}")
+    def echo(item_id: int) -> dict:  # noqa: WPS430
+        return {"item_id": item_id}
+
+    app.add_middleware(PrometheusMiddleware, filter_unhandled_paths=True, path_cache_size=1)
+    labels = {"method": "POST", "path_template": "/items/{item_id}"}
+    ok_labels = {**labels, "status_code": str(HTTP_200_OK)}
+    size_before = REGISTRY.get_sample_value(SIZE_SUM, labels) or 0
+    responses_before = REGISTRY.get_sample_value(RESPONSES_TOTAL, ok_labels) or 0
+
+    client = TestClient(app)
+    responses = [client.post(f"/items/{item_id}", content=ITEM_BODY) for item_id in ITEM_IDS]
+    client.post("/unknown")
+    sizes = len(ITEM_BODY) * len(ITEM_IDS)
+
+    assert {response.status_code for response in responses} == {HTTP_200_OK}  # noqa: S101
+    assert REGISTRY.get_sample_value(SIZE_SUM, labels) == size_before + sizes  # noqa: S101
+    assert REGISTRY.get_sample_value(RESPONSES_TOTAL, ok_labels) == responses_before + len(ITEM_IDS)  # noqa: S101
+    unknown = {"method": "POST", "path_template": "/unknown"}
+    assert REGISTRY.get_sample_value(REQUESTS_TOTAL, unknown) is None  # noqa: S101
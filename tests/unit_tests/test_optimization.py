@@ -0,0 +1,122 @@
+"""Unit tests."""
+
+import os
+from functools import partial
+from typing import List
+
+import pytest
+import torch
+
+from src.services.optimization import InferenceOptimizer
+
+DEVICE: str = "cpu"
+CHANNELS: int = 8
+INPUT_SIZE: int = 32
+ATOL: float = 1e-4
+MIN_RUNNING_VAR: float = 0.5
+MAX_RUNNING_VAR: float = 2
+ORIGINAL_LOAD = torch.jit.load  # type: ignore
+
+
+def save_conv_bn(path: str) -> None:
+    """
+    Script and save a small conv-bn model with non-trivial batch norm statistics.
+
+    Args:
+        path (str): The checkpoint path.
+    """
+    torch.manual_seed(0)
+    conv = torch.nn.Conv2d(3, CHANNELS, 3, padding=1)
+    norm = torch.nn.BatchNorm2d(CHANNELS)
+    norm.running_mean = torch.empty(CHANNELS).uniform_(-1, 1)
+    norm.running_var = torch.empty(CHANNELS).uniform_(MIN_RUNNING_VAR, MAX_RUNNING_VAR)
+    model = torch.nn.Sequential(conv, norm, torch.nn.ReLU())
+    torch.jit.save(torch.jit.script(model.eval()), path)  # type: ignore
+
+
+def forbid_freeze(*args, **kwargs):
+    """
+    Stand-in of `torch.jit.freeze` failing the test if called.
+
+    Args:
+        args: Positional arguments of the call.
+        kwargs: Keyword arguments of the call.
+
+    Raises:
+        AssertionError: Always.
+    """
+    raise AssertionError("The cached artifact must be loaded instead of freezing the model")
+
+
+def recording_load(loaded: List[str], path: str, *args, **kwargs) -> torch.nn.Module:
+    """
+    Stand-in of `torch.jit.load` recording the loaded paths.
+
+    Args:
+        loaded (List[str]): The loaded paths.
+        path (str): The loaded path.
+        args: Other positional arguments of the call.
+        kwargs: Keyword arguments of the call.
+
+    Returns:
+        torch.nn.Module: The loaded model.
+    """
+    loaded.append(path)
+    return ORIGINAL_LOAD(path, *args, **kwargs)
+
+
+def test_frozen_model_matches(tmp_path):
+    """Test that the frozen model matches the original and is written to the cache.
+
+    Args:
+        tmp_path: The checkpoint and cache directory.
+    """
+    checkpoint = str(tmp_path / "model.pt")
+    save_conv_bn(checkpoint)
+    optimizer = InferenceOptimizer(freeze=True, channels_last=True, cache_dir=str(tmp_path), input_size=INPUT_SIZE)
+
+    optimized = optimizer.load(checkpoint, DEVICE)
+    assert optimizer.freeze  # noqa: S101
+    assert os.path.exists(optimizer.cache_path(checkpoint, DEVICE))  # noqa: S101
+
+    batch = torch.rand(2, 3, INPUT_SIZE, INPUT_SIZE)
+    with torch.inference_mode():
+        expected = torch.jit.load(checkpoint)(batch)  # type: ignore
+        actual = optimizer.forward(optimized, batch)
+    assert torch.allclose(actual, expected, atol=ATOL)  # noqa: S101
+
+
+def test_cached_model_skips_freezing(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Test that the next optimizer of the same checkpoint loads the cached artifact and never freezes.
+
+    Args:
+        tmp_path: The checkpoint and cache directory.
+        monkeypatch (pytest.MonkeyPatch): Fixture to forbid freezing and record the loads.
+    """
+    checkpoint = str(tmp_path / "model.pt")
+    save_conv_bn(checkpoint)
+    first = InferenceOptimizer(freeze=True, cache_dir=str(tmp_path), input_size=INPUT_SIZE)
+    first.load(checkpoint, DEVICE)
+
+    loaded: List[str] = []
+    monkeypatch.setattr(torch.jit, "freeze", forbid_freeze)
+    monkeypatch.setattr(torch.jit, "load", partial(recording_load, loaded))
+    optimizer = InferenceOptimizer(freeze=True, cache_dir=str(tmp_path), input_size=INPUT_SIZE)
+    optimizer.load(checkpoint, DEVICE)
+
+    assert optimizer.freeze  # noqa: S101
+    assert loaded == [checkpoint, optimizer.cache_path(checkpoint, DEVICE)]  # noqa: S101
+
+
+def test_failed_self_check_falls_back(tmp_path):
+    """Test that an optimization producing different outputs is disabled.
+
+    Args:
+        tmp_path: The checkpoint directory.
+    """
+    checkpoint = str(tmp_path / "model.pt")
+    save_conv_bn(checkpoint)
+    optimizer = InferenceOptimizer(bf16=True, tolerance=0, input_size=INPUT_SIZE)
+
+    optimizer.load(checkpoint, DEVICE)
+    assert not optimizer.bf16  # noqa: S101
@@ -0,0 +1,150 @@
+"""Unit tests."""
+import threading
+from concurrent.futures import wait
+from contextlib import ExitStack
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+import torch
+
+from src.services.pipeline import RecognitionPipeline
+from src.utils.metrics import PIPELINE_BUSY
+from src.utils.timing import trace_request
+
+TIMEOUT_SEC: float = 5
+HEIGHT: int = 10
+WIDTHS = (20, 40, 60)
+SCORE: float = 0.9
+RECOGNIZER_INPUT_WIDTH: str = "224"
+DETECT_OPTIONS = MappingProxyType({"detect": {"workers": 2, "queue_size": 2}})
+
+
+def blank_image(width: int = HEIGHT) -> np.ndarray:
+    """
+    Create a black image of the test height.
+
+    Args:
+        width (int): The image width.
+
+    Returns:
+        np.ndarray: The image.
+    """
+    return np.zeros((HEIGHT, width, 3), dtype=np.uint8)
+
+
+class FakeDetector:
+    """Detector returning one box per image, counting the detected images and blocking until released."""
+
+    def __init__(self) -> None:
+        """Initialize the count and the detector released."""
+        self.detected = threading.Semaphore(0)
+        self.release = threading.Event()
+        self.release.set()
+
+    def predict_scored(self, image: np.ndarray) -> list:
+        """
+        Return a box covering the top left quarter.
+
+        Args:
+            image (np.ndarray): The image.
+
+        Returns:
+            list: The scored boxes.
+
+        Raises:
+            ValueError: For an empty image.
+        """
+        if not image.size:
+            raise ValueError("Empty image")
+        self.detected.release()
+        self.release.wait()
+        height, width = image.shape[:2]
+        return [([0, 0, width // 2, height // 2], SCORE)]
+
+
+class FakeRecognizer:
+    """Recognizer returning the input widths, blocking until released."""
+
+    def __init__(self) -> None:
+        """Initialize the recognizer released."""
+        self.release = threading.Event()
+        self.release.set()
+
+    def predict_preprocessed(self, batch: torch.Tensor) -> list:
+        """
+        Wait for the release and return the input widths.
+
+        Args:
+            batch (torch.Tensor): The preprocessed crops.
+
+        Returns:
+            list: The input widths as strings.
+        """
+        self.release.wait()
+        return [str(crop.shape[-1]) for crop in batch]
+
+
+def test_pipeline_recognizes_in_order():
+    """Test that every request gets its own barcodes and the stage timings land in its trace."""
+    pipeline = RecognitionPipeline(FakeDetector, FakeRecognizer, DETECT_OPTIONS)
+    with ExitStack() as running:
+        running.callback(pipeline.close)
+        trace = running.enter_context(trace_request("/test"))
+        futures = [pipeline.submit(blank_image(width)) for width in WIDTHS]
+        outputs = [future.result(timeout=TIMEOUT_SEC) for future in futures]
+        traced_stages = set(trace.stages)
+
+    boxes = [scored[0][0] for scored, _ in outputs]
+    quarters = [[0, 0, width // 2, HEIGHT // 2] for width in WIDTHS]
+    assert boxes == quarters  # noqa: S101
+    assert outputs[0][1] == [RECOGNIZER_INPUT_WIDTH]  # noqa: S101
+    assert "crop" in traced_stages  # noqa: S101
+    assert PIPELINE_BUSY.labels(stage="detect")._value.get() > 0  # noqa: S101,WPS437
+
+
+def test_pipeline_stages_overlap():
+    """Test that the detector serves the next requests while the recognizer is busy with a previous one."""
+    detector, recognizer = FakeDetector(), FakeRecognizer()
+    recognizer.release.clear()
+    pipeline = RecognitionPipeline(lambda: detector, lambda: recognizer)
+    with ExitStack() as running:
+        # the callbacks run in reverse order, so the recognizer is released before the close
+        running.callback(pipeline.close)
+        running.callback(recognizer.release.set)
+        futures = [pipeline.submit(blank_image()) for _ in WIDTHS]
+        detected = [detector.detected.acquire(timeout=TIMEOUT_SEC) for _ in futures]
+        pending = wait(futures, timeout=0.1).not_done
+    assert all(detected) and pending == set(futures)  # noqa: S101
+    assert all(future.done() for future in futures)  # noqa: S101
+
+
+def test_pipeline_propagates_errors():
+    """Test that a failing request resolves with the error and the workers keep serving."""
+    pipeline = RecognitionPipeline(FakeDetector, FakeRecognizer)
+    with ExitStack() as running:
+        running.callback(pipeline.close)
+        failing = pipeline.submit(blank_image(width=0))
+        with pytest.raises(ValueError):
+            failing.result(timeout=TIMEOUT_SEC)
+        _, barcodes = pipeline.submit(blank_image()).result(timeout=TIMEOUT_SEC)
+    assert barcodes  # noqa: S101
+
+
+def test_cancelled_job_is_skipped():
+    """Test that a job cancelled while queued is dropped and the workers keep serving the next ones."""
+    detector = FakeDetector()
+    detector.release.clear()
+    pipeline = RecognitionPipeline(lambda: detector, FakeRecognizer)
+    with ExitStack() as running:
+        running.callback(pipeline.close)
+        running.callback(detector.release.set)
+        busy = pipeline.submit(blank_image())
+        detector.detected.acquire(timeout=TIMEOUT_SEC)
+        cancelled = pipeline.submit(blank_image())
+        queued = pipeline.submit(blank_image())
+        cancelled.cancel()
+        detector.release.set()
+        _, barcodes = queued.result(timeout=TIMEOUT_SEC)
+    assert barcodes and busy.done()  # noqa: S101
+    assert cancelled.cancelled()  # noqa: S101
@@ -0,0 +1,33 @@
+"""Unit tests."""
+
+import json
+
+import torch
+
+from src.utils.profiling import TorchTraceSession, forward_profile, write_profile
+
+PROFILE_COUNT: int = 3
+
+
+def test_busy_sampler_runs_the_forward_unprofiled():
+    """Test that a forward run while another one is profiled neither waits nor is profiled, and the trace exports."""
+    session = TorchTraceSession()
+    with session:
+        with forward_profile():
+            # the sampling lock is held by the outer forward, a blocking wait would deadlock here
+            with forward_profile():
+                torch.ones(2).add(1)
+    assert TorchTraceSession.active is None  # noqa: S101
+    assert json.loads(session.chrome_trace())["traceEvents"]  # noqa: S101
+
+
+def test_profiles_get_unique_names(tmp_path):
+    """Test that the profiles written within the same second do not overwrite each other.
+
+    Args:
+        tmp_path: The output directory.
+    """
+    output_dir = str(tmp_path)
+    paths = {write_profile(b"stack 1\n", output_dir, "python", "folded") for _ in range(PROFILE_COUNT)}
+    assert len(paths) == PROFILE_COUNT  # noqa: S101
+    assert len(list(tmp_path.iterdir())) == PROFILE_COUNT  # noqa: S101
@@ -0,0 +1,83 @@
+"""Unit tests."""
+
+from types import MappingProxyType
+
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from src.utils.processing import crop_bbox, prepare_bbox, preprocess_image
+from src.utils.regions import TARGET_IMAGE_SIZE, crop_regions
+
+# the regions in COCO format, the last one smaller than the target size
+BBOXES = (
+    (10, 20, 150, 40),
+    (200, 100, 30, 120),
+    (50, 150, 224, 100),
+    (0, 0, 17, 9),
+)
+IMAGE_SHAPE = (300, 400, 3)
+MAX_PIXEL: int = 255
+BLUR_SIGMA: int = 3
+BBOX = (1, 2, 10, 20)
+MIN_MAX_BBOX = MappingProxyType({"x_min": 1, "x_max": 11, "y_min": 2, "y_max": 22})
+ATOL: float = 0.1
+MAX_MEAN_ERROR: float = 1e-3
+
+
+@pytest.fixture(name="smooth_image")
+def smooth_image_fixture() -> np.ndarray:
+    """
+    Get a blurred noise image, so the crop borders hold no sharp edges.
+
+    Returns:
+        np.ndarray: The BGR image.
+    """
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, MAX_PIXEL, IMAGE_SHAPE, dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), BLUR_SIGMA)
+
+
+def crop_and_preprocess(image: np.ndarray) -> torch.Tensor:
+    """
+    Build the batch of the regions by cropping and preprocessing them one by one.
+
+    Args:
+        image (np.ndarray): The image.
+
+    Returns:
+        torch.Tensor: The preprocessed regions.
+    """
+    crops = [crop_bbox(image, prepare_bbox(list(bbox))) for bbox in BBOXES]
+    return torch.cat([preprocess_image(crop) for crop in crops])
+
+
+def test_prepare_bbox_uses_height():
+    """Test that the bbox height gives y_max."""
+    assert prepare_bbox(list(BBOX)) == MIN_MAX_BBOX  # noqa: S101
+
+
+def test_crop_regions_matches_preprocess_image(smooth_image: np.ndarray):
+    """
+    Test that the regions come out as `preprocess_image` gives for their crops.
+
+    Args:
+        smooth_image (np.ndarray): The image.
+    """
+    batch = crop_regions(smooth_image, BBOXES)
+    errors = (batch - crop_and_preprocess(smooth_image)).abs()
+
+    assert batch.shape == (len(BBOXES), 3, *TARGET_IMAGE_SIZE)  # noqa: S101
+    assert errors.max() <= ATOL  # noqa: S101
+    assert errors.mean() < MAX_MEAN_ERROR  # noqa: S101
+
+
+def test_crop_regions_without_regions(smooth_image: np.ndarray):
+    """
+    Test that no regions give an empty batch.
+
+    Args:
+        smooth_image (np.ndarray): The image.
+    """
+    assert crop_regions(smooth_image, []).shape == (0, 3, *TARGET_IMAGE_SIZE)  # noqa: S101
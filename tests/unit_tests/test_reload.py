@@ -0,0 +1,192 @@
+"""Unit tests."""
+import os
+import threading
+import weakref
+from contextlib import ExitStack
+from typing import Optional, Tuple, Type
+
+import pytest
+from dependency_injector import containers, providers
+
+from src.services.optimization import file_sha256
+from src.services.reload import WARMUP_RUNS, CheckpointNotAllowedError, ModelReloader, ReloadInProgressError
+from src.utils.metrics import MODEL_INFO
+
+SEG_MODEL: str = "segmentation_model"
+REC_MODEL: str = "recognizer_model"
+SEG_V1: str = "seg_v1.pt"
+SEG_V2: str = "seg_v2.pt"
+SEG_V3: str = "seg_v3.pt"
+REC_V1: str = "rec_v1.pt"
+OUTSIDE: str = "outside.pt"
+LINK: str = "link.pt"
+# checkpoint paths relative to the weights directory and the errors rejecting them
+REJECTED_CHECKPOINTS = (
+    ("missing.pt", OSError),
+    (os.path.join(os.pardir, OUTSIDE), CheckpointNotAllowedError),
+    (LINK, CheckpointNotAllowedError),
+)
+
+
+class FakeWrapper:
+    """Model wrapper counting its warmup predictions, which wait for the `gate` events when it is set."""
+
+    gate: Optional[Tuple[threading.Event, threading.Event]] = None
+
+    def __init__(self, checkpoint: str, device: str):
+        """
+        Initialize the wrapper.
+
+        Args:
+            checkpoint (str): The checkpoint path.
+            device (str): The device.
+        """
+        self.checkpoint = checkpoint
+        self.device = device
+        self.predictions = 0
+
+    def predict(self, image) -> None:
+        """
+        Count a prediction.
+
+        Args:
+            image: The input image.
+        """
+        if self.gate is not None:
+            started, release = self.gate
+            started.set()
+            release.wait()
+        self.predictions += 1
+
+
+class FakeContainer(containers.DeclarativeContainer):
+    """Container with the model providers of the app container."""
+
+    __self__ = providers.Self()
+    config = providers.Configuration()
+    seg_model = providers.Singleton(
+        FakeWrapper,
+        checkpoint=config.segmentation_model.checkpoint,
+        device=config.segmentation_model.device,
+    )
+    rec_model = providers.Singleton(
+        FakeWrapper,
+        checkpoint=config.recognizer_model.checkpoint,
+        device=config.recognizer_model.device,
+    )
+    model_reloader = providers.Singleton(ModelReloader, container=__self__, weights_dir=config.weights_dir)
+
+
+@pytest.fixture(name="container")
+def container_fixture(tmp_path) -> FakeContainer:
+    """Fixture for a container with a weights directory of checkpoints, and a checkpoint outside of it.
+
+    Args:
+        tmp_path: Temporary directory.
+
+    Returns:
+        FakeContainer: The configured container.
+    """
+    weights_dir = tmp_path / "weights"
+    weights_dir.mkdir()
+    for name in (SEG_V1, SEG_V2, SEG_V3, REC_V1):
+        (weights_dir / name).write_bytes(name.encode())
+    outside = tmp_path / OUTSIDE
+    outside.write_bytes(OUTSIDE.encode())
+    (weights_dir / LINK).symlink_to(outside)
+    fake_container = FakeContainer()
+    fake_container.config.from_dict(
+        {
+            "weights_dir": str(weights_dir),
+            SEG_MODEL: {"checkpoint": str(weights_dir / SEG_V1), "device": "cpu"},
+            REC_MODEL: {"checkpoint": str(weights_dir / REC_V1), "device": "cpu"},
+        },
+    )
+    return fake_container
+
+
+def model_versions(model_name: str) -> dict:
+    """Get the exported checkpoint and sha256 labels of a model.
+
+    Args:
+        model_name (str): The config section of the model.
+
+    Returns:
+        dict: The active checkpoint mapped to its sha256.
+    """
+    return {
+        sample.labels["checkpoint"]: sample.labels["sha256"]
+        for metric in MODEL_INFO.collect()
+        for sample in metric.samples
+        if sample.labels["model"] == model_name
+    }
+
+
+def test_reload_swaps_the_model(container: FakeContainer):
+    """Test that a reload warms up the new model and swaps it while the old one stays usable by its holders.
+
+    Args:
+        container (FakeContainer): The container.
+    """
+    weights_dir = container.config.weights_dir()
+    reloader = container.model_reloader()
+    # the requests holding the old model, dropped after the checks
+    in_flight = [container.seg_model()]
+    old_ref = weakref.ref(in_flight[0])
+
+    replaced = os.path.join(weights_dir, SEG_V2)
+    reloader.reload(SEG_MODEL, replaced)
+    reloaded = container.seg_model()
+    assert (reloaded.checkpoint, reloaded.predictions) == (replaced, WARMUP_RUNS)  # noqa: S101
+    assert in_flight[0].checkpoint == os.path.join(weights_dir, SEG_V1)  # noqa: S101
+    assert container.rec_model().checkpoint == os.path.join(weights_dir, REC_V1)  # noqa: S101
+
+    in_flight.clear()
+    assert old_ref() is None  # noqa: S101
+
+    active = os.path.join(weights_dir, SEG_V3)
+    reloader.reload(SEG_MODEL, active)
+    configured = container.config.segmentation_model.checkpoint()
+    exported = model_versions(SEG_MODEL)
+    # the sha256 labels of the replaced checkpoints are removed
+    reported = (configured, exported.get(replaced), exported.get(active))
+    assert reported == (active, None, file_sha256(active))  # noqa: S101
+
+
+@pytest.mark.parametrize(("checkpoint_name", "error"), REJECTED_CHECKPOINTS)
+def test_rejected_reload_keeps_the_model(container: FakeContainer, checkpoint_name: str, error: Type[Exception]):
+    """Test that a missing checkpoint, or one escaping the weights directory, leaves the active model in place.
+
+    Args:
+        container (FakeContainer): The container.
+        checkpoint_name (str): The checkpoint path relative to the weights directory.
+        error (Type[Exception]): The expected error.
+    """
+    active = container.seg_model()
+    checkpoint = os.path.join(container.config.weights_dir(), checkpoint_name)
+    with pytest.raises(error):
+        container.model_reloader().reload(SEG_MODEL, checkpoint)
+    assert container.seg_model() is active  # noqa: S101
+
+
+def test_concurrent_reload_is_rejected(container: FakeContainer, monkeypatch: pytest.MonkeyPatch):
+    """Test that only one reload runs at a time.
+
+    Args:
+        container (FakeContainer): The container.
+        monkeypatch (pytest.MonkeyPatch): Fixture to slow down the warmup.
+    """
+    reloader = container.model_reloader()
+    started = threading.Event()
+    release = threading.Event()
+    monkeypatch.setattr(FakeWrapper, "gate", (started, release))
+    first = threading.Thread(target=reloader.reload, args=(REC_MODEL,))
+
+    with ExitStack() as running:
+        # the callbacks run in reverse order, so the first reload is released before the join
+        running.callback(first.join)
+        running.callback(release.set)
+        first.start()
+        started.wait()
+        with pytest.raises(ReloadInProgressError):
+            reloader.reload(REC_MODEL)
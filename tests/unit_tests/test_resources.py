@@ -0,0 +1,26 @@
+"""Unit tests."""
+
+import gc
+
+from prometheus_client import REGISTRY
+
+from src.utils.resources import ResourceSampler
+
+SAMPLE_INTERVAL_SEC: float = 60
+FULL_COLLECTIONS = ("barcode_recognizer_gc_collections_total", {"generation": "2"})
+
+
+def test_sampler_records_process_and_gc_stats():
+    """Test that a sample fills the process gauges and the GC hook counts collections until stopped."""
+    sampler = ResourceSampler(interval=SAMPLE_INTERVAL_SEC)
+    sampler.start()
+    sampler.sample()
+    before = REGISTRY.get_sample_value(*FULL_COLLECTIONS) or 0
+    gc.collect()
+    after = REGISTRY.get_sample_value(*FULL_COLLECTIONS)
+    sampler.stop()
+
+    assert after == before + 1  # noqa: S101
+    assert (REGISTRY.get_sample_value("barcode_recognizer_process_threads") or 0) >= 1  # noqa: S101
+    assert (REGISTRY.get_sample_value("barcode_recognizer_process_uss_bytes") or 0) > 0  # noqa: S101
+    assert sampler._on_gc not in gc.callbacks  # noqa: S101,WPS437
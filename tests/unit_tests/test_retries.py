@@ -0,0 +1,32 @@
+"""Unit tests."""
+
+from http import HTTPStatus
+
+import httpx
+
+from src.client.retries import RetryPolicy, retry_delay
+
+BACKOFF_SEC: float = 0.5
+MAX_BACKOFF_SEC: int = 30
+RETRY_AFTER_SEC: int = 3
+
+
+def test_retry_delay_honours_retry_after():
+    """Test that the delay follows the Retry-After header, otherwise backs off exponentially."""
+    headers = {"retry-after": str(RETRY_AFTER_SEC)}
+    limited = httpx.Response(HTTPStatus.TOO_MANY_REQUESTS, headers=headers)
+    unavailable = httpx.Response(HTTPStatus.SERVICE_UNAVAILABLE)
+
+    assert retry_delay(limited, 0, BACKOFF_SEC, MAX_BACKOFF_SEC) == RETRY_AFTER_SEC  # noqa: S101
+    assert retry_delay(unavailable, 2, BACKOFF_SEC, MAX_BACKOFF_SEC) == 4 * BACKOFF_SEC  # noqa: S101
+    assert retry_delay(None, 10, BACKOFF_SEC, MAX_BACKOFF_SEC) == MAX_BACKOFF_SEC  # noqa: S101
+
+
+def test_retry_policy_stops_retrying():
+    """Test that neither the other errors nor the attempts over the retries are retried."""
+    policy = RetryPolicy(retries=1, backoff=BACKOFF_SEC)
+    unavailable = httpx.Response(HTTPStatus.SERVICE_UNAVAILABLE)
+
+    assert policy.delay(unavailable, 0) == BACKOFF_SEC  # noqa: S101
+    assert policy.delay(unavailable, 1) is None  # noqa: S101
+    assert policy.delay(httpx.Response(HTTPStatus.BAD_REQUEST), 0) is None  # noqa: S101
@@ -0,0 +1,149 @@
+"""Unit tests."""
+import asyncio
+from contextlib import ExitStack
+from http import HTTPStatus
+from types import MappingProxyType
+from typing import List, Tuple
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.utils.scheduling import FairScheduler, FairSchedulingMiddleware, SchedulerRejectedError
+
+BULK: str = "bulk"
+INTERACTIVE: str = "interactive"
+CHEAP_PATH: str = "/cheap"
+HEALTH_PATH: str = "/health"
+TENANT_HEADER: str = "X-Tenant-Id"
+CLASSES = MappingProxyType(
+    {
+        INTERACTIVE: {"weight": 8, "paths": [CHEAP_PATH]},
+        BULK: {"weight": 1, "paths": ["/expensive"]},
+    },
+)
+QUEUED = 4
+FLOOD_NAMES = tuple(f"flood-{index}" for index in range(10))
+IMAGE_NAMES = tuple(f"image-{index}" for index in range(QUEUED))
+CROP_NAMES = tuple(f"crop-{index}" for index in range(QUEUED))
+FLOOD = tuple((BULK, "flood", name) for name in FLOOD_NAMES)
+EXPENSIVE = tuple((BULK, "flood", name) for name in IMAGE_NAMES)
+CHEAP = tuple((INTERACTIVE, "flood", name) for name in CROP_NAMES)
+# the requests in arrival order, and the first ones to start
+FAIR_ORDERS = (
+    # a tenant queued behind a flood is started after at most one request of the flood
+    ((*FLOOD, (BULK, "other", "other")), ["flood-0", "other"]),
+    # the cheap class overtakes the queued expensive requests
+    ((*EXPENSIVE, *CHEAP), list(CROP_NAMES)),
+)
+
+Request = Tuple[str, str, str]
+
+
+async def run_flood(scheduler: FairScheduler, requests: Tuple[Request, ...]) -> List[str]:
+    """Hold the only slot, queue the requests and release them one by one.
+
+    Args:
+        scheduler (FairScheduler): The scheduler with a single slot.
+        requests (Tuple[Request, ...]): The (class, tenant, name) of every request, in arrival order.
+
+    Returns:
+        List[str]: The request names in the order they were started.
+    """
+    await scheduler.acquire(BULK, "holder")
+    waiting = {}
+    for priority_class, tenant, name in requests:
+        waiting[name] = asyncio.create_task(scheduler.acquire(priority_class, tenant))
+    await asyncio.sleep(0)
+    started: List[str] = []
+    for _ in requests:
+        scheduler.release()
+        await asyncio.sleep(0)
+        # every release starts a single request
+        done = {request for request, task in waiting.items() if task.done()}
+        started.extend(done.difference(started))
+    scheduler.release()
+    return started
+
+
+def empty_response() -> dict:
+    """
+    Endpoint answering an empty body.
+
+    Returns:
+        dict: The empty body.
+    """
+    return {}
+
+
+@pytest.mark.parametrize(("requests", "first"), FAIR_ORDERS)
+def test_fair_order(requests: Tuple[Request, ...], first: List[str]):
+    """Test that the waiting requests start in the order of their weighted flows.
+
+    Args:
+        requests (Tuple[Request, ...]): The (class, tenant, name) of every request, in arrival order.
+        first (List[str]): The names of the first started requests.
+    """
+    scheduler = FairScheduler(concurrency=1, classes=CLASSES)
+    started = asyncio.run(run_flood(scheduler, requests))
+    assert started[: len(first)] == first  # noqa: S101
+
+
+def test_cancelled_waiter_frees_its_place():
+    """Test that a request cancelled while waiting is skipped and does not leak a slot."""
+    scheduler = FairScheduler(concurrency=1, classes=CLASSES)
+    with ExitStack() as running:
+        loop = asyncio.new_event_loop()
+        running.callback(loop.close)
+        loop.run_until_complete(scheduler.acquire(BULK, "a"))
+        waiter = loop.create_task(scheduler.acquire(BULK, "b"))
+        loop.run_until_complete(asyncio.sleep(0))
+        waiter.cancel()
+        loop.run_until_complete(asyncio.sleep(0))
+        scheduler.release()
+    assert scheduler.running == 0  # noqa: S101
+
+
+def test_quota_and_queue_limits():
+    """Test that a tenant over its token bucket and a request over the queue limit are rejected."""
+    scheduler = FairScheduler(
+        concurrency=1,
+        classes=CLASSES,
+        max_queue=1,
+        quota={"rate": 0},
+        tenant_quotas={"limited": {"rate": 1, "burst": 1}},
+    )
+    with ExitStack() as running:
+        loop = asyncio.new_event_loop()
+        running.callback(loop.close)
+        loop.run_until_complete(scheduler.acquire(BULK, "limited"))
+        with pytest.raises(SchedulerRejectedError, match="quota"):
+            loop.run_until_complete(scheduler.acquire(BULK, "limited"))
+        waiter = loop.create_task(scheduler.acquire(BULK, "free"))
+        loop.run_until_complete(asyncio.sleep(0))
+        with pytest.raises(SchedulerRejectedError, match="queue_full"):
+            loop.run_until_complete(scheduler.acquire(BULK, "free"))
+        scheduler.release()
+        loop.run_until_complete(waiter)
+        scheduler.release()
+    assert scheduler.running == 0  # noqa: S101
+
+
+def test_middleware_rejects_over_quota():
+    """Test that the middleware answers 429 with Retry-After and leaves unscheduled paths alone."""
+    scheduler = FairScheduler(concurrency=1, classes=CLASSES, quota={"rate": 0.01, "burst": 1})
+    app = FastAPI()
+    app.add_middleware(FairSchedulingMiddleware, scheduler=scheduler, tenant_header=TENANT_HEADER)
+    app.post(CHEAP_PATH)(empty_response)
+    app.get(HEALTH_PATH)(empty_response)
+
+    client = TestClient(app)
+    headers = {TENANT_HEADER: "t1"}
+    assert client.post(CHEAP_PATH, headers=headers).status_code == HTTPStatus.OK  # noqa: S101
+    response = client.post(CHEAP_PATH, headers=headers)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS  # noqa: S101
+    assert int(response.headers["retry-after"]) > 0  # noqa: S101
+    other_tenant = client.post(CHEAP_PATH, headers={TENANT_HEADER: "t2"})
+    unscheduled = client.get(HEALTH_PATH, headers=headers)
+    assert [other_tenant.status_code, unscheduled.status_code] == [HTTPStatus.OK, HTTPStatus.OK]  # noqa: S101
+    assert scheduler.running == 0  # noqa: S101
@@ -0,0 +1,74 @@
+"""Unit tests."""
+
+from types import MappingProxyType
+
+import numpy as np
+
+from src.services.selection import ComponentSelector, masks_to_bboxes
+from src.utils.metrics import CROPS_SKIPPED
+
+THRESHOLD: float = 0.5
+MAP_SHAPE = (100, 200)
+# the drawn regions as row start, row stop, column start, column stop and probability
+CONFIDENT = (10, 30, 10, 60, 0.9)
+LEFT_FRAGMENT = (50, 70, 10, 40, 0.7)
+RIGHT_FRAGMENT = (50, 70, 42, 70, 0.7)
+SPECK = (90, 92, 150, 152, 0.99)
+LINE = (80, 81, 100, 190, 0.8)
+REGIONS = (CONFIDENT, LEFT_FRAGMENT, RIGHT_FRAGMENT, SPECK, LINE)
+CONFIDENT_BOX = (10, 10, 50, 20)
+MERGED_BOX = (10, 50, 60, 20)
+FILTERS = MappingProxyType({"min_area": 16, "max_aspect_ratio": 20, "merge_distance": 2})
+SKIP_REASONS = ("area", "aspect_ratio", "top_k")
+
+
+def probability_map() -> np.ndarray:
+    """Draw a map with a confident barcode, a weaker one split in two fragments, a speck and a line.
+
+    Returns:
+        np.ndarray: The probability map.
+    """
+    probabilities = np.zeros(MAP_SHAPE, dtype=np.float32)
+    for row_start, row_stop, col_start, col_stop, probability in REGIONS:
+        probabilities[row_start:row_stop, col_start:col_stop] = probability
+    return probabilities
+
+
+def skipped_counts() -> np.ndarray:
+    """Get the counts of the skipped crops, one per skip reason.
+
+    Returns:
+        np.ndarray: The counter values.
+    """
+    counters = [CROPS_SKIPPED.labels(reason=reason) for reason in SKIP_REASONS]
+    return np.array([counter._value.get() for counter in counters])  # noqa: WPS437
+
+
+def test_unfiltered_selection_keeps_all():
+    """Test that the default selector returns the components of `masks_to_bboxes` ranked by score."""
+    probabilities = probability_map()
+    scored = ComponentSelector().select(probabilities, THRESHOLD)
+    expected = masks_to_bboxes((probabilities > THRESHOLD).astype(np.uint8))
+    assert sorted(bbox for bbox, _ in scored) == sorted(expected)  # noqa: S101
+    scores = [score for _, score in scored]
+    assert scores == sorted(scores, reverse=True)  # noqa: S101
+
+
+def test_selection_filters_and_caps():
+    """Test that specks and lines are skipped and the boxes capped by score."""
+    counts_before = skipped_counts()
+    scored = ComponentSelector(top_k=1, **FILTERS).select(probability_map(), THRESHOLD)
+
+    assert len(scored) == 1  # noqa: S101
+    assert tuple(scored[0][0]) == CONFIDENT_BOX  # noqa: S101
+    assert np.isclose(scored[0][1], CONFIDENT[-1])  # noqa: S101
+    assert (skipped_counts() - counts_before).tolist() == [1, 1, 1]  # noqa: S101
+
+
+def test_close_fragments_are_merged():
+    """Test that the fragments of a barcode give a single box scored with their mean probability."""
+    scored = ComponentSelector(**FILTERS).select(probability_map(), THRESHOLD)
+
+    bboxes = [tuple(bbox) for bbox, _ in scored]
+    assert bboxes == [CONFIDENT_BOX, MERGED_BOX]  # noqa: S101
+    assert np.isclose(scored[1][1], LEFT_FRAGMENT[-1])  # noqa: S101
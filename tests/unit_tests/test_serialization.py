@@ -0,0 +1,30 @@
+"""Unit tests."""
+
+import json
+
+from fastapi.responses import ORJSONResponse
+
+from src.utils.serialization import BBOX_COLUMNS, barcode_columns, barcode_records
+
+BBOXES = ([10, 20, 30, 40], [1, 2, 3, 4])
+SCORES = (0.9, 0.5)
+SCORED = tuple(zip(BBOXES, SCORES))
+REC_VALUES = ("a", "b")
+
+
+def test_barcode_columns_match_records():
+    """Test that the columns hold the records field by field."""
+    records = barcode_records(SCORED, REC_VALUES)
+    columns = json.loads(ORJSONResponse(barcode_columns(SCORED, REC_VALUES)).body)
+
+    for key in BBOX_COLUMNS:
+        assert columns[key] == [record["bbox"][key] for record in records]  # noqa: S101
+    assert columns["scores"] == [record["score"] for record in records]  # noqa: S101
+    assert columns["values"] == list(REC_VALUES)  # noqa: S101
+
+
+def test_barcode_columns_without_boxes():
+    """Test that no boxes give empty columns and no values are left out."""
+    columns = json.loads(ORJSONResponse(barcode_columns([])).body)
+
+    assert columns == dict.fromkeys((*BBOX_COLUMNS, "scores"), [])  # noqa: S101
@@ -0,0 +1,44 @@
+"""Unit tests."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.utils.slow_requests import SlowRequestLog, SlowRequestMiddleware
+from src.utils.timing import observe_barcodes, stage, trace_request
+
+BODY_SIZE: int = 10
+BARCODES: int = 3
+FAST_DURATION_SEC: float = 0.01
+
+
+def test_slow_requests_are_captured_with_stages():
+    """Test that a request over the threshold lands in the buffer with its stages and attributes."""
+    slow_requests = SlowRequestLog(threshold=0, size=2)
+    app = FastAPI()
+    app.add_middleware(SlowRequestMiddleware, slow_requests=slow_requests)
+
+    @app.post("/work")
+    def work() -> dict:  # noqa: WPS430
+        with trace_request("/work"):
+            with stage("compute"):
+                sum(range(1000))
+            observe_barcodes(BARCODES)
+        return {}
+
+    client = TestClient(app)
+    for _ in range(3):
+        client.post("/work", content=b"x" * BODY_SIZE)
+
+    slowest, fastest = slow_requests.entries()
+    assert slowest["duration"] >= fastest["duration"]  # noqa: S101
+    assert (slowest["upload_size"], slowest["barcodes"]) == (BODY_SIZE, BARCODES)  # noqa: S101
+    assert "compute" in slowest["stages"]  # noqa: S101
+    assert slowest["queue_wait"] >= 0  # noqa: S101
+
+
+def test_fast_requests_are_skipped():
+    """Test that requests under the threshold are not captured."""
+    slow_requests = SlowRequestLog(threshold=60, size=10)
+    with trace_request("/fast") as trace:
+        slow_requests.observe(trace, duration=FAST_DURATION_SEC, upload_size=0, status_code=None)
+    assert not slow_requests.entries()  # noqa: S101
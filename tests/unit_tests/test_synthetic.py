@@ -0,0 +1,69 @@
+"""Unit tests."""
+
+import os
+
+import pytest
+import torch
+
+from src.services.detector import SegTorchWrapper
+from src.services.selection import masks_to_bboxes
+from src.synthetic import export_synthetic_models, synthetic_barcode_image
+from src.utils.synthetic_models import NUM_SYMBOLS, SEQUENCE_LENGTH
+
+IMAGE_SIZE = (1080, 1920)
+MODEL_INPUT_SIZE = (224, 224)
+DETECTOR: str = "detector"
+
+
+@pytest.mark.parametrize("num_barcodes", [1, 10, 100])
+def test_synthetic_mask_components(num_barcodes: int):
+    """Test that the synthetic mask has exactly one connected component per barcode.
+
+    Args:
+        num_barcodes (int): Number of barcodes in the image.
+    """
+    image, mask = synthetic_barcode_image(*IMAGE_SIZE, num_barcodes=num_barcodes)
+    assert image.shape == (*IMAGE_SIZE, 3)  # noqa: S101
+    assert len(masks_to_bboxes(mask)) == num_barcodes  # noqa: S101
+
+
+def test_synthetic_models_contract(tmp_path):
+    """Test that the exported models keep the input and output shapes of the real checkpoints.
+
+    Args:
+        tmp_path: The checkpoints directory.
+    """
+    checkpoints = export_synthetic_models(str(tmp_path))
+    detector = torch.jit.load(checkpoints[DETECTOR])  # type: ignore
+    recognizer = torch.jit.load(checkpoints["recognizer"])  # type: ignore
+    batch = torch.zeros(2, 3, *MODEL_INPUT_SIZE)
+    with torch.no_grad():
+        assert tuple(detector(batch).shape) == (2, 1, *MODEL_INPUT_SIZE)  # noqa: S101
+        assert tuple(recognizer(batch).shape) == (2, SEQUENCE_LENGTH, NUM_SYMBOLS)  # noqa: S101
+
+
+def test_checkpoints_are_cached_per_seed(tmp_path):
+    """Test that a shared directory reuses the checkpoints of the same seed and never those of another seed.
+
+    Args:
+        tmp_path: The checkpoints directory.
+    """
+    first = export_synthetic_models(str(tmp_path), seed=0)
+    other_seed = export_synthetic_models(str(tmp_path), seed=1)
+    exported_at = os.path.getmtime(first[DETECTOR])
+
+    assert export_synthetic_models(str(tmp_path), seed=0) == first  # noqa: S101
+    assert os.path.getmtime(first[DETECTOR]) == exported_at  # noqa: S101
+    assert set(first.values()).isdisjoint(other_seed.values())  # noqa: S101
+
+
+def test_synthetic_detector_fires_on_barcodes(tmp_path):
+    """Test that the synthetic detector finds the barcodes of a synthetic image.
+
+    Args:
+        tmp_path: The checkpoints directory.
+    """
+    checkpoints = export_synthetic_models(str(tmp_path))
+    image, _ = synthetic_barcode_image(num_barcodes=3)
+    detector = SegTorchWrapper(checkpoints[DETECTOR])
+    assert len(detector.predict(image)) == 3  # noqa: S101
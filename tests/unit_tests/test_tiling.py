@@ -0,0 +1,135 @@
+"""Unit tests."""
+
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from src.services.selection import ComponentSelector
+from src.services.tiling import CoarseToFineTiler, ProbabilityMap, crop_tiles, tile_starts
+
+THRESHOLD: float = 0.5
+TILE_SIZE: int = 448
+OVERLAP: int = 64
+MIN_SIDE: int = 1000
+SIDES = (100, TILE_SIZE, TILE_SIZE + 1, MIN_SIDE, 4000)
+# a 800x1200 coarse map with activity in the top right one of its six 400 px tiles
+SPARSE_TILER = MappingProxyType({"min_side": MIN_SIDE, "tile_size": 400, "overlap": 0})
+SPARSE_SHAPE = (800, 1200)
+SPARSE_ACTIVITY = (100, 900, 110, 910)
+TILE_RESULTS = ("evaluated", "skipped")
+ACTIVE_TILE = (0, 800, 400, 1200)
+INACTIVE_TILES: int = 5
+# a 100x100 image covered by two 60 px tiles, with a barcode across their seam and one outside of them
+SEAM_TILER = MappingProxyType({"min_side": 100, "tile_size": 60, "overlap": 20})
+SEAM_SHAPE = (100, 100)
+SEAM_TILES = ((0, 0, 60, 60), (0, 40, 60, 100))
+TILE_SHAPE = (60, 60)
+SEAM_BARCODE = (20, 30, 30, 70)
+COARSE_BARCODE = (80, 80, 90, 90)
+SEAM_BOXES = ([30, 20, 40, 10], [80, 80, 10, 10])
+PROBABILITY: float = 0.8
+IMAGE_COUNT: int = 3
+
+
+def tiles_counted(label: str) -> float:
+    """
+    Get the count of the detector tiles with a result.
+
+    Args:
+        label (str): The tile result.
+
+    Returns:
+        float: The counter value, 0 before the first increment.
+    """
+    return REGISTRY.get_sample_value("barcode_recognizer_detector_tiles_total", {"result": label}) or 0
+
+
+def probability_map(shape: tuple, region: tuple) -> ProbabilityMap:
+    """
+    Build a probability map with a single active region.
+
+    Args:
+        shape (tuple): The (height, width) of the map.
+        region (tuple): The (y_min, x_min, y_max, x_max) of the active region.
+
+    Returns:
+        ProbabilityMap: The map.
+    """
+    probabilities = np.zeros(shape, dtype=np.float32)
+    top, left, bottom, right = region
+    probabilities[top:bottom, left:right] = PROBABILITY
+    return probabilities
+
+
+@pytest.mark.parametrize("side", SIDES)
+def test_tiles_cover_the_side_with_the_overlap(side):
+    """Test that the tiles cover the side and the neighbouring ones overlap by at least the overlap.
+
+    Args:
+        side: The image side.
+    """
+    starts = np.array(tile_starts(side, TILE_SIZE, OVERLAP))
+    ends = starts + TILE_SIZE
+    overlaps = ends[:-1] - starts[1:]
+
+    covered = ends[-1] >= side
+    assert (starts[0], covered) == (0, True)  # noqa: S101
+    assert overlaps.min(initial=OVERLAP) >= OVERLAP  # noqa: S101
+
+
+def test_only_the_large_images_are_tiled():
+    """Test that the images are tiled from `min_side` on, never with tiling disabled, and the overlap is checked."""
+    tiler = CoarseToFineTiler(min_side=MIN_SIDE)
+    large = tiler.applies((TILE_SIZE, MIN_SIDE))
+    small = tiler.applies((TILE_SIZE, MIN_SIDE - 1))
+    disabled = CoarseToFineTiler().applies((MIN_SIDE, MIN_SIDE))
+
+    assert (large, small, disabled) == (True, False, False)  # noqa: S101
+    with pytest.raises(ValueError):
+        CoarseToFineTiler(min_side=MIN_SIDE, tile_size=OVERLAP, overlap=OVERLAP)
+
+
+def test_active_tiles_skip_the_empty_regions():
+    """Test that only the tiles with coarse activity are evaluated and both results are counted."""
+    tiler = CoarseToFineTiler(**SPARSE_TILER)
+    coarse = probability_map(SPARSE_SHAPE, SPARSE_ACTIVITY)
+    counted = [tiles_counted(label) for label in TILE_RESULTS]
+
+    active = tiler.active_tiles(coarse)
+
+    increments = np.subtract([tiles_counted(label) for label in TILE_RESULTS], counted)
+    assert active == [ACTIVE_TILE]  # noqa: S101
+    assert increments.tolist() == [1, INACTIVE_TILES]  # noqa: S101
+
+
+def test_stitch_merges_a_barcode_across_the_seam():
+    """Test that a barcode split by a tile seam gives one box, and the coarse map is kept outside the tiles."""
+    tiler = CoarseToFineTiler(**SEAM_TILER)
+    barcode = probability_map(SEAM_SHAPE, SEAM_BARCODE)
+    fine = crop_tiles(barcode, SEAM_TILES)
+
+    refined = tiler.stitch(probability_map(SEAM_SHAPE, COARSE_BARCODE), SEAM_TILES, fine)
+
+    selected = ComponentSelector().select(refined, THRESHOLD)
+    assert sorted(bbox for bbox, _ in selected) == list(SEAM_BOXES)  # noqa: S101
+
+
+def test_refine_batches_the_tiles_of_all_images():
+    """Test that the active tiles of every image are run in one call and stitched back into their own image."""
+    tiler = CoarseToFineTiler(**SEAM_TILER)
+    images = list(np.zeros((IMAGE_COUNT, *SEAM_SHAPE), dtype=np.uint8))
+    barcode = probability_map(SEAM_SHAPE, COARSE_BARCODE)
+    coarse = [barcode, barcode, np.zeros(SEAM_SHAPE, dtype=np.float32)]
+    calls = []
+
+    def forward(crops):  # noqa: WPS430
+        calls.append(len(crops))
+        numbers = np.arange(len(crops), dtype=np.float32)
+        return [np.full(TILE_SHAPE, number) for number in numbers]
+
+    refined = tiler.refine(images, coarse, forward)
+
+    assert calls == [2]  # noqa: S101
+    assert [probabilities.max() for probabilities in refined] == [0, 1, 0]  # noqa: S101
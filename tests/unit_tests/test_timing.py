@@ -0,0 +1,53 @@
+"""Unit tests."""
+
+from prometheus_client import REGISTRY
+
+from src.utils.timing import current_trace, observe_barcodes, stage, trace_request
+
+STAGE_COUNT = "barcode_recognizer_stage_duration_seconds_count"
+STAGE_NAME: str = "work"
+
+
+def stage_count(endpoint: str, stage_name: str) -> float:
+    """
+    Get the number of observations of a stage.
+
+    Args:
+        endpoint (str): The endpoint label.
+        stage_name (str): The stage label.
+
+    Returns:
+        float: The histogram count.
+    """
+    return REGISTRY.get_sample_value(STAGE_COUNT, {"endpoint": endpoint, "stage": stage_name}) or 0
+
+
+def test_stage_is_recorded_in_trace_and_histogram():
+    """Test that a stage inside a traced request lands in the trace and in the endpoint histogram."""
+    before = stage_count("/test", STAGE_NAME)
+    with trace_request("/test") as trace:
+        with stage(STAGE_NAME):
+            sum(range(1000))
+        with stage(STAGE_NAME):
+            sum(range(1000))
+        observe_barcodes(2)
+        assert trace.stages[STAGE_NAME] > 0  # noqa: S101
+        assert trace.attributes["barcodes"] == 2  # noqa: S101
+    assert stage_count("/test", STAGE_NAME) == before + 2  # noqa: S101
+    assert current_trace() is None  # noqa: S101
+
+
+def test_nested_trace_is_reused():
+    """Test that an endpoint trace reuses the trace attached by an outer caller."""
+    with trace_request("/outer") as outer:
+        with trace_request("/inner") as inner:
+            assert inner is outer  # noqa: S101
+        assert outer.endpoint == "/inner"  # noqa: S101
+
+
+def test_stage_outside_of_request():
+    """Test that stages outside of a traced request are reported under the internal endpoint."""
+    before = stage_count("internal", "offline")
+    with stage("offline"):
+        sum(range(10))
+    assert stage_count("internal", "offline") == before + 1  # noqa: S101
@@ -0,0 +1,43 @@
+"""Unit tests."""
+
+import math
+
+from src.services.tracker import BoxTracker, bbox_iou
+
+IOU_THRESHOLD: float = 0.3
+BOX = (0, 0, 10, 10)
+DISJOINT_BOX = (20, 20, 10, 10)
+HALF_SHIFTED_BOX = (5, 0, 10, 10)
+MOVING_BOX = (10, 10, 20, 20)
+STEP: int = 4
+
+
+def test_bbox_iou():
+    """Test IoU of identical, disjoint and half-overlapping bboxes."""
+    assert bbox_iou(BOX, BOX) == 1  # noqa: S101
+    assert bbox_iou(BOX, DISJOINT_BOX) == 0  # noqa: S101
+    assert math.isclose(bbox_iou(BOX, HALF_SHIFTED_BOX), 1 / 3)  # noqa: S101
+
+
+def test_tracker_keeps_ids_for_moving_box():
+    """Test that a slowly moving box keeps its track and only the first detection is reported as new."""
+    tracker = BoxTracker(iou_threshold=IOU_THRESHOLD, max_age=3)
+    new_tracks = tracker.update([list(MOVING_BOX)])
+    assert len(new_tracks) == 1  # noqa: S101
+    track_id = new_tracks[0].track_id
+
+    moved_box = [MOVING_BOX[0] + STEP, *MOVING_BOX[1:]]
+    assert not tracker.update([moved_box])  # noqa: S101
+    tracker.advance()
+    carried = tracker.tracks[0]
+    assert carried.track_id == track_id  # noqa: S101
+    assert carried.bbox[0] == moved_box[0] + STEP  # noqa: S101
+
+
+def test_tracker_drops_stale_tracks():
+    """Test that tracks without matching detections are dropped after max_age frames."""
+    tracker = BoxTracker(iou_threshold=IOU_THRESHOLD, max_age=2)
+    tracker.update([list(MOVING_BOX)])
+    for _ in range(3):
+        tracker.advance()
+    assert not tracker.tracks  # noqa: S101